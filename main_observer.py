@@ -232,7 +232,7 @@ if __name__ == '__main__' or __name__ == 'observer__main__':
     context = engine.rootContext()
 
     # Set context properties
-    observer_data = ObserverData()
+    observer_data = ObserverData(snapshot_path=ObserverData.default_snapshot_path())
     context.setContextProperty('observer_data', observer_data)
 
     appstate = ObserverState(db=observer_data)
@@ -282,5 +282,6 @@ if __name__ == '__main__' or __name__ == 'observer__main__':
         ps.print_stats()
         print(s.getvalue())
 
+    observer_data.save_snapshot()  # Quicker start next time
     close_orm()  # ObserverORM
     sys.exit(ret)
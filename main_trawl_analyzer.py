@@ -13,6 +13,7 @@ __author__ = 'Todd.Hay'
 #-------------------------------------------------------------------------------
 import sys
 import logging
+import multiprocessing
 import traceback
 import io
 import arrow
@@ -225,6 +226,9 @@ class TrawlAnalyzer:
 # Main Function
 if __name__ == '__main__':
 
+    # Required for the sensor data loading process pool in the frozen executable
+    multiprocessing.freeze_support()
+
     # sys.excepthook = exception_hook
 
     # Create main app
@@ -17,6 +17,7 @@ from PyQt5.QtCore import QAbstractListModel, QVariant, QModelIndex, pyqtSlot, \
 import logging
 import unittest
 import random
+from difflib import SequenceMatcher
 from py.common.FramTestUtil import LoggingQueue
 
 
@@ -30,6 +31,7 @@ class FramListModel(QAbstractListModel):
         self._roles = {}
         self._ordered_rolenames = []  # For use by ObserverData queries
         self._auto_role_id = Qt.UserRole + 1  # For use by "automatic" role adding
+        self._indexes = {}  # rolename: {str(value): [row indices]}, None when it needs to be rebuilt
 
     @pyqtSlot(result=int)
     def rowCount(self, parent=None):
@@ -63,6 +65,47 @@ class FramListModel(QAbstractListModel):
             self._roles[self._auto_role_id] = name.encode('utf-8')
             self._auto_role_id += 1
 
+    def add_index(self, rolename):
+        """
+        Add a hash index on a role, used by is_item_in_model, get_item_index and where instead of a linear scan.
+        The index is kept up to date by the model methods, so values of an indexed role must be changed through
+        setProperty or replace rather than by editing the item dicts directly
+        :param rolename: role to index
+        """
+        self._indexes[rolename] = None
+
+    def _index(self, rolename):
+        """
+        Return the index of a role, rebuilding it if it was invalidated by a change to the rows
+        :param rolename: indexed role
+        :return: dict of str(value): list of row indices in ascending order
+        """
+        if self._indexes[rolename] is None:
+            index = {}
+            for row, item in enumerate(self._data_items):
+                index.setdefault(str(item.get(rolename)), []).append(row)
+            self._indexes[rolename] = index
+        return self._indexes[rolename]
+
+    def _invalidate_indexes(self, rolename=None):
+        """
+        Mark the indexes, or only the index of rolename, to be rebuilt on their next use
+        :param rolename: role whose index to invalidate, None for all of them
+        """
+        for name in self._indexes:
+            if rolename is None or name == rolename:
+                self._indexes[name] = None
+
+    def _index_appended_rows(self, first):
+        """
+        Add the rows from first to the end of the list to the indexes that are currently built
+        :param first: first appended row
+        """
+        for rolename, index in self._indexes.items():
+            if index is not None:
+                for row in range(first, len(self._data_items)):
+                    index.setdefault(str(self._data_items[row].get(rolename)), []).append(row)
+
     # @pyqtProperty(QVariant)
     def roleNames(self):
         """
@@ -160,22 +203,84 @@ class FramListModel(QAbstractListModel):
         """
         self.beginResetModel()
         self._data_items.clear()
+        self._invalidate_indexes()
         self.endResetModel()
 
     @pyqtSlot()
-    def setItems(self, items):
+    def setItems(self, items, key=None):
         """
         Set all of the items at once
         :param items: list of dictionary element items
+        :param key: rolename identifying the items.  If given, the new items are diffed against the current ones by
+            this role and only the rows that were removed, inserted or changed are signalled to the views, instead of
+            resetting the whole model
         :return:
         """
+        if key is not None and items is not self._data_items:
+            self._set_items_by_diff(items=items, key=key)
+            return
+
         self.clear()  # Careful - this will clear the items param, if set earlier (reference)
         self.beginInsertRows(QModelIndex(), 0, len(items) - 1)
         # del self._data_items[:]
         self._data_items = items
+        self._invalidate_indexes()
         self.endInsertRows()
         self.countChanged.emit(self.rowCount())
 
+    def _set_items_by_diff(self, items, key):
+        """
+        Replace the items with the minimal row removals, insertions and data changes, see setItems
+        :param items: list of dictionary element items
+        :param key: rolename identifying the items
+        """
+        old_keys = [str(x.get(key)) for x in self._data_items]
+        new_keys = [str(x.get(key)) for x in items]
+        opcodes = SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes()
+
+        # Apply the changes from the end of the list so that the row numbers of the earlier opcodes stay valid
+        count = self.rowCount()
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == 'equal':
+                changed = [k for k in range(i2 - i1) if self._data_items[i1 + k] != items[j1 + k]]
+                self._data_items[i1:i2] = items[j1:j2]
+                if changed:
+                    self.dataChanged.emit(self.index(i1 + changed[0], 0), self.index(i1 + changed[-1], 0))
+                continue
+
+            if tag in ('delete', 'replace'):
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._data_items[i1:i2]
+                self.endRemoveRows()
+
+            if tag in ('insert', 'replace'):
+                self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                self._data_items[i1:i1] = items[j1:j2]
+                self.endInsertRows()
+
+        # Keep the same list reference semantics as a reset
+        self._data_items = items
+        self._invalidate_indexes()
+        if count != self.rowCount():
+            self.countChanged.emit(self.rowCount())
+
+    def appendItems(self, items):
+        """
+        Insert several items at the end of the list with a single row insertion
+        :param items: list of items to insert (dict)
+        :return: index of the first item
+        """
+        append_idx = len(self._data_items)
+        if not items:
+            return append_idx
+
+        self.beginInsertRows(QModelIndex(), append_idx, append_idx + len(items) - 1)
+        self._data_items.extend(items)
+        self._index_appended_rows(first=append_idx)
+        self.endInsertRows()
+        self.countChanged.emit(self.rowCount())
+        return append_idx
+
     # @pyqtSlot(dict)
     def appendItem(self, item):
         """
@@ -207,6 +312,10 @@ class FramListModel(QAbstractListModel):
         # beginInsertRows from QAbstractListModel:
         self.beginInsertRows(QModelIndex(), index, index)
         self._data_items.insert(index, item)
+        if index >= len(self._data_items) - 1:
+            self._index_appended_rows(first=len(self._data_items) - 1)
+        else:
+            self._invalidate_indexes()
         self.endInsertRows()
         self.countChanged.emit(self.rowCount())
 
@@ -237,6 +346,7 @@ class FramListModel(QAbstractListModel):
         # Did not find a beginReplaceRows function, so apparently not needed
         try:
             self._data_items[index] = item
+            self._invalidate_indexes()
         except Exception as e:
             self._logger.error(e)
         self.dataChanged.emit(self.index(index, 0), self.index(index, 0))
@@ -253,6 +363,7 @@ class FramListModel(QAbstractListModel):
             # self._logger.debug("Index of item to remove = {}".format(index))
             self.beginRemoveRows(QModelIndex(), index, index)
             del self._data_items[index]
+            self._invalidate_indexes()
             self.endRemoveRows()
             self.countChanged.emit(self.rowCount())
         except IndexError as e:
@@ -278,6 +389,8 @@ class FramListModel(QAbstractListModel):
         """
         try:
             self._data_items[index][property] = value
+            if property in self._indexes:
+                self._invalidate_indexes(rolename=property)
             # self._logger.debug(f"data_items[{index}]['{property}'] = {value}")
             self.dataChanged.emit(self.index(index, 0), self.index(index, 0))
         except IndexError as ie:
@@ -313,6 +426,9 @@ class FramListModel(QAbstractListModel):
             value = value.toVariant()
 
         value = str(value)
+        if rolename in self._indexes:
+            return value in self._index(rolename)
+
         for item in self.items:
             if str(item[rolename]) == str(value):
                 # logging.info(rolename + ' item in model: ' + str(value))
@@ -324,9 +440,8 @@ class FramListModel(QAbstractListModel):
     @pyqtSlot(QVariant, QVariant, result=int)
     def get_item_index(self, rolename, value):
         """
-        Does order n search,
+        Does order n search, unless the role is indexed (see add_index)
         Find index of a value with the given role is in the model (via string compare.)
-        TODO faster way to do this?
 
         :param rolename: rolename for search
         :param value: value to look for
@@ -338,6 +453,10 @@ class FramListModel(QAbstractListModel):
             value = value.toVariant()
 
         value = str(value)
+        if rolename in self._indexes:
+            rows = self._index(rolename).get(value)
+            return rows[0] if rows else -1
+
         for idx in range(0, self.count):
             if str(self.items[idx][rolename]) == str(value):
                 return idx
@@ -346,7 +465,7 @@ class FramListModel(QAbstractListModel):
     @pyqtSlot(QVariant, QVariant, result=QVariant)
     def where(self, rolename, value):
         """
-        Does order n search,
+        Does order n search, unless the role is indexed (see add_index)
         Find item of a value with the given role is in the model (via string compare.)
         This is an extension of the get_item_index method above, in that this will
         return a list of all of the items that match the rolename/value query.  Note that
@@ -361,7 +480,11 @@ class FramListModel(QAbstractListModel):
         if isinstance(value, QJSValue):
             value = value.toVariant()
 
-        list_items = [{"index": i, "item": x} for i, x in enumerate(self.items) if x[rolename] == str(value)]
+        if rolename in self._indexes:
+            rows = self._index(rolename).get(str(value), [])
+            list_items = [{"index": i, "item": self.items[i]} for i in rows if self.items[i][rolename] == str(value)]
+        else:
+            list_items = [{"index": i, "item": x} for i, x in enumerate(self.items) if x[rolename] == str(value)]
         return list_items if list_items else (None, None)
 
 
@@ -554,5 +677,53 @@ class TestFramListModel(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.testmodel.get_role_number("NoSuchRoleName_xxxx")
 
+    def test_index(self):
+        self.addroles_auto()
+        self.testmodel.add_index('testrole')
+        for data in self.testing_data:
+            self.testmodel.appendItem(dict(data))
+        self.assertTrue(self.testmodel.is_item_in_model('testrole', 'testing three'))
+        self.assertEqual(self.testmodel.get_item_index('testrole', 'testing three'), 1)
+
+        self.testmodel.insertItem(0, {'testrole': 'testing five', 'testrole2': 'testing six'})
+        self.assertEqual(self.testmodel.get_item_index('testrole', 'testing three'), 2)
+
+        self.testmodel.setProperty(2, 'testrole', 'changed')
+        self.assertFalse(self.testmodel.is_item_in_model('testrole', 'testing three'))
+        self.assertEqual(self.testmodel.where('testrole', 'changed')[0]["index"], 2)
+
+        self.testmodel.remove(0)
+        self.assertEqual(self.testmodel.get_item_index('testrole', 'changed'), 1)
+        self.assertEqual(self.testmodel.get_item_index('testrole', 'testing five'), -1)
+
+    def test_appendItems(self):
+        self.addroles_auto()
+        self.testmodel.add_index('testrole')
+        self.adddata()
+        inserted = []
+        self.testmodel.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        self.testmodel.appendItems([{'testrole': self.randword(), 'testrole2': str(i)} for i in range(100)])
+        self.assertEqual(inserted, [(2, 101)])
+        self.assertEqual(self.testmodel.count, 102)
+        self.assertEqual(self.testmodel.get_item_index('testrole', self.testmodel.get(101)['testrole']), 101)
+
+    def test_setItems_diff(self):
+        self.addroles_auto()
+        self.testmodel.setItems([{'testrole': str(i), 'testrole2': 'x'} for i in range(10)])
+        removed, inserted, changed = [], [], []
+        self.testmodel.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+        self.testmodel.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        self.testmodel.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+
+        items = [{'testrole': str(i), 'testrole2': 'x'} for i in range(10) if i != 3]
+        items[6]['testrole2'] = 'y'
+        items.append({'testrole': '10', 'testrole2': 'x'})
+        self.testmodel.setItems(items, key='testrole')
+
+        self.assertEqual(removed, [(3, 3)])
+        self.assertEqual(inserted, [(10, 10)])
+        self.assertEqual(changed, [(7, 7)])
+        self.assertEqual(self.testmodel.items, items)
+
 if __name__ == '__main__':
     unittest.main()
@@ -45,7 +45,8 @@ class FramTreeItem(QObject):
         self.itemData = data
         self.headers = headers
         self.parentItem = parent
-        self.childItems = []
+        self._childItems = []
+        self._child_rows = None     # id(child): row number, None when it needs to be rebuilt
         # self.mixes = []
 
         self.is_expanded = False
@@ -70,6 +71,30 @@ class FramTreeItem(QObject):
     #
     #     self._index = index
 
+    @property
+    def childItems(self):
+        """
+        List of the children of the item.  Assigning a new list invalidates the cached row numbers
+        :return:
+        """
+        return self._childItems
+
+    @childItems.setter
+    def childItems(self, items):
+        self._childItems = items
+        self._child_rows = None
+
+    def child_row(self, item):
+        """
+        Return the row of the given child, using a map of the child row numbers that is rebuilt after the
+        children are inserted or removed
+        :param item: FramTreeItem - child item
+        :return: int - row of the child, or None if it is not a child of this item
+        """
+        if self._child_rows is None:
+            self._child_rows = {id(x): i for i, x in enumerate(self._childItems)}
+        return self._child_rows.get(id(item))
+
     @pyqtProperty(bool)
     def isExpanded(self):
         """
@@ -93,6 +118,8 @@ class FramTreeItem(QObject):
         # if item is not None:
         if isinstance(item, FramTreeItem):
             self.childItems.append(item)
+            if self._child_rows is not None:
+                self._child_rows[id(item)] = len(self.childItems) - 1
             return True
 
         return False
@@ -166,8 +193,9 @@ class FramTreeItem(QObject):
         :return:
         """
         if self.parentItem is not None:
-            if self in self.parentItem.childItems:
-                return self.parentItem.childItems.index(self)
+            row = self.parentItem.child_row(self)
+            if row is not None:
+                return row
         return 0
 
     @pyqtSlot(int, int, int, result=bool)
@@ -186,6 +214,7 @@ class FramTreeItem(QObject):
             data = [None] * columns
             newItem = FramTreeItem(data=data, parent=self, headers=headers)
             self.childItems.insert(position + row, newItem)
+        self._child_rows = None
 
         return True
 
@@ -219,6 +248,7 @@ class FramTreeItem(QObject):
 
         for row in range(position+count-1, position-1, -1):
             del self.childItems[row]
+        self._child_rows = None
 
         return True
 
@@ -230,6 +260,7 @@ class FramTreeItem(QObject):
         """
         for row in range(self.childCount()-1, -1, -1):
             del self.childItems[row]
+        self._child_rows = None
 
     @pyqtSlot(int, result=bool)
     def hasChild(self, row_number):
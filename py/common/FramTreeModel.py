@@ -23,6 +23,7 @@ from operator import itemgetter
 import logging
 import unittest
 import random
+import time
 from py.common.FramTreeItem import FramTreeItem
 from copy import deepcopy
 
@@ -59,6 +60,8 @@ class FramTreeModel(QAbstractItemModel):
 
         self._mixCount = {}     # Keeps track of the Mix / Submix numbers
 
+        self._value_index = {}  # column number: {value: first FramTreeItem with that value}, see get_index_by_role_value
+
     @pyqtProperty(QVariant)
     def mixCount(self):
         """
@@ -295,10 +298,51 @@ class FramTreeModel(QAbstractItemModel):
         #
         # return index
 
+    def _build_value_index(self, col_num):
+        """
+        Method to build the map of the values of a column to the first item, in the same depth first order as
+        get_index_recursively, holding that value
+        :param col_num: int - column number to index
+        :return: dict - value: FramTreeItem
+        """
+        index = {}
+        stack = [self._rootItem]
+        while stack:
+            item = stack.pop()
+            index.setdefault(item.data(column=col_num).value(), item)
+            stack.extend(reversed(item.childItems))
+        self._value_index[col_num] = index
+        return index
+
+    def _invalidate_value_index(self, col_num=None):
+        """
+        Method to drop the value maps, or only the one of col_num, after the tree or its data has changed
+        :param col_num: int - column number, None for all of the columns
+        :return:
+        """
+        if col_num is None:
+            self._value_index.clear()
+        else:
+            self._value_index.pop(col_num, None)
+
+    def _is_in_tree(self, item):
+        """
+        Method to check that an item is still attached to the tree through its parents
+        :param item: FramTreeItem
+        :return: bool
+        """
+        while item is not self._rootItem:
+            parent = item.parentItem
+            if parent is None or parent.child_row(item) is None:
+                return False
+            item = parent
+        return True
+
     @pyqtSlot(str, QVariant, result=QModelIndex)
     def get_index_by_role_value(self, role, value):
         """
-        Method to find the QModelIndex corresponding to the role with the specified value
+        Method to find the QModelIndex corresponding to the role with the specified value.  The items are looked up
+        in a value map of the column that is rebuilt after the tree changes, instead of walking the whole tree
         :param role: str - representing the role in the FramTreeModel
         :param value: QVariant - value of the role to search for
         :return: QModelIndex - return the index of the newly found role + value
@@ -306,7 +350,25 @@ class FramTreeModel(QAbstractItemModel):
         col_num = self.getColumnNumber(role)
         if isinstance(value, QJSValue):
             value = value.toVariant()
-        return self.get_index_recursively(self._rootItem, col_num=col_num, value=value)
+
+        try:
+            index = self._value_index.get(col_num)
+            if index is None:
+                index = self._build_value_index(col_num=col_num)
+            item = index.get(value)
+
+            # Rebuild once if the item was changed or detached directly through the FramTreeItem methods
+            if item is not None and (not self._is_in_tree(item) or item.data(column=col_num).value() != value):
+                item = self._build_value_index(col_num=col_num).get(value)
+
+        except TypeError:
+            # Unhashable values
+            return self.get_index_recursively(self._rootItem, col_num=col_num, value=value)
+
+        if item is None:
+            return QModelIndex()
+
+        return self.createIndex(item.row, col_num, item)
 
     @pyqtSlot(str, QVariant, result=QModelIndex)
     def get_row_index_by_role_value(self, role, value):
@@ -476,6 +538,7 @@ class FramTreeModel(QAbstractItemModel):
         item = self.getItem(index)
         result = item.setData(index.column(), value)
         if result:
+            self._invalidate_value_index(col_num=index.column())
 
             # self.dataChanged.emit(index, index, [])
             self.dataChanged.emit(index, index, [role])
@@ -496,6 +559,7 @@ class FramTreeModel(QAbstractItemModel):
         self.beginInsertRows(parent, position, position + count - 1)
         # self.beginInsertRows(QModelIndex(), position, position + count - 1)
         success = parentItem.insertChildren(position, count, self.columnCount(parent), self._ordered_rolenames)
+        self._invalidate_value_index()
         self.endInsertRows()
 
         return success
@@ -516,6 +580,7 @@ class FramTreeModel(QAbstractItemModel):
 
         self.beginRemoveRows(parent, position, position + count - 1)
         success = parentItem.removeChildren(position, count)
+        self._invalidate_value_index()
         self.endRemoveRows()
 
         return success
@@ -534,6 +599,7 @@ class FramTreeModel(QAbstractItemModel):
 
         self.beginInsertRows(parent, 0, len(items)-1)
         parentItem.childItems = items
+        self._invalidate_value_index()
         self.endInsertRows()
 
         # logging.info('setChildItems: {0}'.format(parentItem.childCount()))
@@ -548,6 +614,7 @@ class FramTreeModel(QAbstractItemModel):
         parentItem = self.rootItem
         self.beginRemoveRows(parent, 0, parentItem.childCount()-1)
         parentItem.clear()
+        self._invalidate_value_index()
         self.endRemoveRows()
 
         # Clear the list of all of the type = Taxon descendants as well.  This list is used for checking
@@ -648,6 +715,51 @@ class TestFramTreeModel(unittest.TestCase):
 
         logging.info('self.rootItem childrenCount: ' + str(self.testmodel._rootItem.childCount))
 
+    def test_catch_tree_benchmark(self):
+        """
+        Benchmark the lookups on a 5,000 node catch tree of species, mixes, submixes and baskets
+        """
+        model = FramTreeModel(headers=["displayName", "type", "catchId"])
+        nodes = [model.rootItem]
+        catch_id = 0
+
+        def add_child(parent, name, type):
+            nonlocal catch_id
+            catch_id += 1
+            item = FramTreeItem(data=[name, type, catch_id], parent=parent, headers=model._ordered_rolenames)
+            parent.appendChild(item)
+            nodes.append(item)
+            return item
+
+        while len(nodes) < 5000:
+            mix = add_child(model.rootItem, f"Mix #{catch_id}", "Mix")
+            for i in range(10):
+                submix = add_child(mix, f"Submix #{i+1}", "Submix")
+                for j in range(20):
+                    taxon = add_child(submix, f"Species {catch_id}", "Taxon")
+                    add_child(taxon, f"Basket {catch_id}", "Basket")
+
+        col_num = model.getColumnNumber("catchId")
+        catch_ids = random.sample(range(1, catch_id + 1), 500)
+
+        start = time.perf_counter()
+        expected = [model.get_index_recursively(model.rootItem, col_num=col_num, value=x).internalPointer()
+                    for x in catch_ids]
+        recursive_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [model.get_index_by_role_value("catchId", x).internalPointer() for x in catch_ids]
+        index_time = time.perf_counter() - start
+
+        logging.info(f"{len(nodes)} nodes, 500 lookups: recursive {recursive_time:.3f}s, indexed {index_time:.3f}s")
+        self.assertEqual(found, expected)
+        self.assertEqual([x.row for x in found], [x.parentItem.childItems.index(x) for x in found])
+
+        # The map follows the tree after rows are removed
+        taxon = found[0]
+        model.removeRows(taxon.row, 1, model.createIndex(taxon.parentItem.row, 0, taxon.parentItem))
+        self.assertFalse(model.get_index_by_role_value("catchId", taxon.data(col_num).value()).isValid())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -245,8 +245,8 @@ class CatchCategory(QObject):
         # Only instantiate once: reference is being passed around. Clear, don't re-instantiate.
         if self._full_list_cc_model is None:
             raise Exception('Expected full catch category model to have been instantiated.')
-        self._full_list_cc_model.clear()
-        self._full_list_cc_model.setItems(full_list_ccs.copy()) # TODO: Is copy necessary?
+        # Keyed by ID, so a reload after filtering only signals the rows that were filtered out
+        self._full_list_cc_model.setItems(full_list_ccs.copy(), key='catch_category') # TODO: Is copy necessary?
 
     def _add_category_by_code(self, cc_model, cat_code):
         """ Given a category code and a frequent or trip category model,
@@ -443,7 +443,7 @@ class CatchCategory(QObject):
 
         active_copy = self.catch_categories.copy()
         filtered_active = self._filter_cclist(active_copy, code)
-        self._active_cc_model.setItems(filtered_active)
+        self._active_cc_model.setItems(filtered_active, key='catch_category')
 
         self.modelChanged.emit()    # Let the tvAvailableCC TableView know the model has changed.
 
@@ -19,6 +19,9 @@ class CatchCategoryModel(FramListModel):
         super().__init__(parent)
         for role_name in self.model_props:
             self.add_role_name(role_name)
+        # Looked up by ID and code on every add, remove and frequent/trip list load
+        self.add_index('catch_category')
+        self.add_index('catch_category_code')
 
 
     @property
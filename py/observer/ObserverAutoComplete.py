@@ -2,6 +2,8 @@
 
 from PyQt5.QtCore import pyqtSlot, pyqtProperty, QObject, QVariant
 from py.observer.ObserverData import ObserverData
+from bisect import bisect_left
+from collections import defaultdict
 from enum import Enum
 import logging
 import unittest
@@ -34,12 +36,85 @@ class ACAllowable():
                'bs_sample_methods', 'fg_gear_types', 'avg_soak_times'
 
 
+class AutoCompleteIndex:
+    """
+    Search index over one suggestion list, built once per list:
+    - a sorted list of the lower-cased suggestions, bisected for matches at the start of a suggestion
+    - a 2- and 3-gram index of the lower-cased suggestions for (full search) matches anywhere in a suggestion
+    Matches are returned in the order of the suggestion list.
+    """
+    NGRAM_SIZES = (2, 3)
+
+    def __init__(self, source, abbreviations=None):
+        """
+        @param source: suggestion list, as loaded from ObserverData. Kept to tell whether the list has changed.
+        @param abbreviations: if not None, common word abbreviations applied to the suggestions
+        """
+        self.source = source
+        self.source_len = len(source)
+        self.suggestions = ObserverAutoComplete._abbreviate_suggestions(source, abbreviations) \
+            if abbreviations else list(source)
+        self._lowered = [sug.lower() for sug in self.suggestions]
+        self._sorted = sorted((sug, i) for i, sug in enumerate(self._lowered))
+        self._sorted_keys = [sug for sug, _ in self._sorted]
+        self._ngrams = defaultdict(set)
+        for i, sug in enumerate(self._lowered):
+            for n in self.NGRAM_SIZES:
+                for j in range(len(sug) - n + 1):
+                    self._ngrams[sug[j:j + n]].add(i)
+
+    def is_index_of(self, source):
+        return source is self.source and len(source) == self.source_len
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def _prefix_matches(self, partial_str_lc):
+        matches = set()
+        for k in range(bisect_left(self._sorted_keys, partial_str_lc), len(self._sorted_keys)):
+            if not self._sorted_keys[k].startswith(partial_str_lc):
+                break
+            matches.add(self._sorted[k][1])
+        return matches
+
+    def _substring_matches(self, partial_str_lc):
+        n = max(self.NGRAM_SIZES)
+        if len(partial_str_lc) < min(self.NGRAM_SIZES):
+            return {i for i, sug in enumerate(self._lowered) if partial_str_lc in sug}
+        if len(partial_str_lc) <= n:
+            return set(self._ngrams.get(partial_str_lc, ()))
+
+        # Candidates have every trigram of the partial string. Intersect from the rarest trigram.
+        postings = sorted((self._ngrams.get(partial_str_lc[j:j + n], set())
+                           for j in range(len(partial_str_lc) - n + 1)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {i for i in candidates if partial_str_lc in self._lowered[i]}
+
+    def search(self, partial_str, full_search):
+        """
+        @param partial_str: user input
+        @param full_search: also match partial_str anywhere in a suggestion, not just at its start
+        @return: matching suggestions, in list order
+        """
+        partial_str_lc = partial_str.lower()
+        if not partial_str_lc:
+            return list(self.suggestions)
+        matches = self._substring_matches(partial_str_lc) if full_search else self._prefix_matches(partial_str_lc)
+        return [self.suggestions[i] for i in sorted(matches)]
+
+
 class ObserverAutoComplete(QObject):
     def __init__(self, db):  # requires ObserverData
         super(ObserverAutoComplete, self).__init__()
         self._logger = logging.getLogger(__name__)
         self._suggestions = []  # Returned fresults from search
         self._suggestion_data = []  # Data to choose from
+        self._suggestion_index = None  # AutoCompleteIndex of _suggestion_data
+        self._suggestion_indexes = {}  # ACDataTypes: AutoCompleteIndex, rebuilt if its ObserverData list changes
         self._current_loaded_data = ACDataTypes.none  # Only load data once
         self._db = db
         self._full_search = False  # enables more comprehensive substring search...
@@ -53,6 +128,7 @@ class ObserverAutoComplete(QObject):
         self._logger.debug("Suggestions clear")
         self._current_loaded_data = ACDataTypes.none
         self._suggestion_data = []
+        self._suggestion_index = None
 
     @pyqtSlot(int, bool, name='suggestFisheriesByProgID')
     def suggest_fisheries_by_progid(self, program_id, is_fg):
@@ -60,6 +136,7 @@ class ObserverAutoComplete(QObject):
         self._current_loaded_data = ACDataTypes.fisheries
         self._logger.debug("Loading fisheries")
         self._suggestion_data = self._db.get_fisheries_by_program_id(program_id, is_fg)
+        self._index_suggestion_data()
 
     @pyqtSlot(int, name='suggestCaptainsByVesselId')
     def suggest_captains_by_vesselid(self, vessel_id):
@@ -149,11 +226,8 @@ class ObserverAutoComplete(QObject):
             '(large': '(LG',
         }
 
-        # Apply the abbreviations to the currently loaded data
-        # TODO: Consider applying these abbreviations once, in __init__, to full set of suggestions.
-        if self._abbreviate_suggestions:
-            self._suggestion_data = ObserverAutoComplete._abbreviate_suggestions(
-                    self._suggestion_data, common_word_abbreviations)
+        # Apply the abbreviations to the currently loaded data - once, when the list is indexed.
+        self._index_suggestion_data(common_word_abbreviations if self._abbreviate_suggestions else None)
 
         # dtypes added will have full substring search
         full_search_types = {
@@ -170,6 +244,21 @@ class ObserverAutoComplete(QObject):
 
         self.search()
 
+    def _index_suggestion_data(self, abbreviations=None):
+        """
+        Replace the just-loaded suggestion list with its (cached) index's, abbreviated if specified.
+        @param abbreviations: common word abbreviations to apply, or None
+        """
+        if self._current_loaded_data == ACDataTypes.none:
+            return
+        index = self._suggestion_indexes.get(self._current_loaded_data)
+        if index is None or not index.is_index_of(self._suggestion_data):
+            self._logger.debug(f'Indexing {len(self._suggestion_data)} {self._current_loaded_data.name}')
+            index = AutoCompleteIndex(self._suggestion_data, abbreviations)
+            self._suggestion_indexes[self._current_loaded_data] = index
+        self._suggestion_index = index
+        self._suggestion_data = index.suggestions
+
     @staticmethod
     def _calculate_when_full_search_kicks_in(n_suggestions):
         """ Full-search on all the words can be time-consuming,
@@ -211,12 +300,9 @@ class ObserverAutoComplete(QObject):
         # Check for substring match starting at beginning of suggestion.
         # In addition, if full search enabled and substring is long enough (e.g. two characters),
         # check for substring match starting anywhere in suggestion.
-        partial_str_lc = partial_str.lower()
-        self._suggestions = [
-            sug for sug in self._suggestion_data
-            if sug.lower().startswith(partial_str_lc) or
-                    (do_full_search and sug.lower().find(partial_str_lc) > 0)
-        ]
+        if self._suggestion_index is None or self._suggestion_index.suggestions is not self._suggestion_data:
+            self._index_suggestion_data()
+        self._suggestions = self._suggestion_index.search(partial_str, do_full_search)
 
         if self._current_loaded_data == ACDataTypes.captains:
             self._suggestions.append('"Not Listed"')  # FIELD-2076: give user option (doesn't actually do anything)
@@ -351,6 +437,14 @@ class TestObserverAutoComplete(unittest.TestCase):
         self.assertEqual(13, len(three_letter_suggestions))
         self.assertIn(suggestion_expected_only_with_full_search, three_letter_suggestions)
 
+    def test_index_built_once_per_list(self):
+        self.ac.suggest('trawl_gear_types')
+        index = self.ac._suggestion_index
+        self.ac.suggest('vessels')
+        self.ac.suggest('trawl_gear_types')
+        self.assertIs(index, self.ac._suggestion_index)
+        self.assertIs(index.suggestions, self.ac._suggestion_data)
+
     def test_list_first_ten_entries_of_each_suggestion_list(self):
         """Not a test, just a synopsis of the various ACAllowable types."""
         for suggestion_list_type in ACAllowable().type_names:
@@ -363,6 +457,40 @@ class TestObserverAutoComplete(unittest.TestCase):
             for line in self.ac._suggestion_data[-5:]:
                 print("\t{}".format(line))
 
+class TestAutoCompleteIndex(unittest.TestCase):
+    """
+    Test AutoCompleteIndex against a scan of the whole suggestion list
+    """
+    suggestions = ['BLACKJACK - OR079ADG', 'ALBA Albatross Unid', 'Albers Seafoods CRESCENT CITY',
+                   'ORCA - WN1234', 'Sea Lion', 'sea lion', 'CRAB Dungeness crab', 'a', '']
+
+    def _scan(self, partial_str, full_search):
+        partial_str_lc = partial_str.lower()
+        return [sug for sug in self.suggestions
+                if sug.lower().startswith(partial_str_lc) or (full_search and sug.lower().find(partial_str_lc) > 0)]
+
+    def test_matches_scan(self):
+        index = AutoCompleteIndex(self.suggestions)
+        for partial_str in ('', 'a', 'O', 'or', 'OR0', 'crab', 'rab', 'ab dun', 'sea lion', 'Lion', 'CITY',
+                            'cityx', 'zz', ' - '):
+            for full_search in (False, True):
+                self.assertEqual(self._scan(partial_str, full_search), index.search(partial_str, full_search),
+                                 f'{partial_str!r}, full_search={full_search}')
+
+    def test_rebuilt_when_source_changes(self):
+        source = list(self.suggestions)
+        index = AutoCompleteIndex(source)
+        self.assertTrue(index.is_index_of(source))
+        self.assertFalse(index.is_index_of(list(source)))
+        source.append('New Vessel')
+        self.assertFalse(index.is_index_of(source))
+
+    def test_abbreviated(self):
+        index = AutoCompleteIndex(['BT Bottom Trawl (small footrope)'], {'(small': '(SM'})
+        self.assertEqual(['BT Bottom Trawl (SM footrope)'], index.search('(sm', True))
+        self.assertEqual([], index.search('small', True))
+
+
 class TestAbbreviating(unittest.TestCase):
     """
     Test the abbreviating static methods in ObserverAutoComplete
@@ -57,9 +57,12 @@ def activate_encryption(db):
     if not activate_key or not optecs_key:
         raise Exception('SQLite Encryption Extension Keys not found. Run (newest) set_optecs_sync_pw.py')
     else:
-        c = db.get_cursor()
-        c.execute(f"PRAGMA activate_extensions='{activate_key}';")
-        c.execute(f"PRAGMA key = '{optecs_key}';")
+        _activate_encryption_keys(db.get_cursor(), activate_key, optecs_key)
+
+
+def _activate_encryption_keys(c, activate_key, optecs_key):
+    c.execute(f"PRAGMA activate_extensions='{activate_key}';")
+    c.execute(f"PRAGMA key = '{optecs_key}';")
 
 
 
@@ -102,6 +105,21 @@ def connect_orm():
     else:
         logging.info('Already connected to DB')
 
+def open_readonly_connection():
+    """
+    Open a separate, read only connection to the database, e.g. for reads on a worker thread.
+    The caller closes it.
+    @return: apsw.Connection
+    """
+    connection = apsw.Connection(find_db_path(), flags=apsw.SQLITE_OPEN_READONLY)
+    connection.setbusytimeout(DATABASE_TIMEOUT)
+    if use_encrypted_database:
+        obs_credentials_namespace = 'OPTECS v1'
+        _activate_encryption_keys(connection.cursor(),
+                                  keyring.get_password(obs_credentials_namespace, 'see_activation'),
+                                  keyring.get_password(obs_credentials_namespace, 'optecs_see_key'))
+    return connection
+
 def get_db_version_info():
     return (f"APSW version: {apsw.apswversion()}; " +
             f"SQLite lib version: {apsw.sqlitelibversion()}; " +
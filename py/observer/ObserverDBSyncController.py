@@ -13,7 +13,6 @@ import logging
 import re
 import textwrap
 
-import io
 from time import sleep
 
 from PyQt5.QtCore import QObject, pyqtSlot, QThread
@@ -400,6 +399,50 @@ class ObserverDBSyncController(QObject):
         if bool_str in binary_lookup.keys():
             return binary_lookup[bool_str]
 
+    @staticmethod
+    def _fk_id(row, field_name):
+        """
+        DB helper
+        @return: raw ID of a foreign key, read from the row without querying the related table
+        """
+        return row._data.get(field_name)
+
+    @staticmethod
+    def _trip_query(model, trip_id, *join_path):
+        """
+        Build one joined SELECT of the rows of model that belong to a trip, instead of collecting the IDs
+        of each parent table and passing them on in IN clauses
+        @param model: peewee model to export
+        @param trip_id: trip ID
+        @param join_path: models to join, in order, from model up to FishingActivities
+        @return: peewee query
+        """
+        query = model.select()
+        for parent in join_path:
+            query = query.join(parent)
+        return query.where(FishingActivities.trip == trip_id)
+
+    def _export_csv(self, filename, required_headers, rows):
+        """
+        Stream rows to the CSV writer, making each record API friendly as it is written
+        @param filename: filename for upload
+        @param required_headers: CSV header
+        @param rows: iterable of row values, e.g. a generator over one query
+        @return: filename, CSV unencoded, or None if there are no rows
+        """
+        output = ApiFriendlyCsvOutput()
+        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
+        for row_values in rows:
+            if not output.record_count:
+                writer.writerow(required_headers)  # Header
+            writer.writerow(row_values)
+
+        if not output.record_count:
+            return filename, None
+
+        self._logger.debug(f'{filename}: {output.record_count - 1} rows')
+        return filename, output.getvalue()
+
     # <editor-fold desc="Generate TRIPS">
     def generate_trips_csv(self, trip_id, user_id):
         """
@@ -425,49 +468,39 @@ class ObserverDBSyncController(QObject):
         ]
         # Get trips
         activities_q = Trips.select().where(Trips.trip == trip_id)
-        output = io.StringIO()
-
-        if not len(activities_q):
-            return filename, None
-
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in activities_q:
-            return_port = row.return_port.port if row.return_port else None
-            departure_port = row.departure_port.port if row.departure_port else None
-            first_receiver = row.first_receiver.ifq_dealer if row.first_receiver else None
-            fishing_days = row.fishing_days_count if row.fishing_days_count else None
-            skipper = row.skipper.contact if row.skipper else None
-            # trip_status = '1'  # "Open"
-            trip_status = '2'  # NFO-545: "Open-Restricted"
-            program_id = row.program.program
-            row_values = [
-                row.trip, row.vessel.vessel, row.user.user, program_id, row.debriefing,
-                # "TRIP_ID", "VESSEL_ID", "USER_ID", "PROGRAM_ID", "DEBRIEFING_ID",
-                trip_status, departure_port, row.departure_date,
-                # "TRIP_STATUS", "DEPARTURE_PORT_ID", "DEPARTURE_DATE",
-                return_port, row.return_date, row.logbook_number, row.notes,
-                # "RETURN_PORT_ID", "RETURN_DATE", "LOGBOOK_NUMBER", "NOTES",
-                row.data_quality, row.created_by, row.created_date, None,
-                # "DATA_QUALITY", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY",
-                None, None, None, row.observer_logbook,
-                # "MODIFIED_DATE", "OTC_KP", "TOTAL_HOOKS_KP", "OBSERVER_LOGBOOK",
-                row.evaluation, row.partial_trip, skipper, row.fishery, row.crew_size,
-                # "EVALUATION_ID", "PARTIAL_TRIP", "SKIPPER_ID", "FISHERY", "CREW_SIZE",
-                None, None, row.logbook_type, first_receiver,  # TODO: PERMIT_NUMBER, LICENSE_NUMBER
-                # "PERMIT_NUMBER", "LICENSE_NUMBER", "LOGBOOK_TYPE", "FIRST_RECEIVER",
-                None, None, None, None, ObserverDBUtil.get_data_source(),  # FIELD-2121 rewrite ds in case its changed
-                # "EXPORT", "EXTERNAL_TRIP_ID", "DO_EXPAND", "RUN_TER", "DATA_SOURCE",
-                None, None, row.fish_processed, None,
-                # "ROW_PROCESSED", "ROW_STATUS", "FISH_PROCESSED", "NO_FISHING_ACTIVITY",
-                None, fishing_days
-                # "INTENDED_GEAR_TYPE", "TOTAL_FISHING_DAYS"
-            ]
-            writer.writerow(row_values)
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-        return filename, csv_output
+        data_source = ObserverDBUtil.get_data_source()  # FIELD-2121 rewrite ds in case its changed
+
+        def rows():
+            for row in activities_q:
+                fishing_days = row.fishing_days_count if row.fishing_days_count else None
+                # trip_status = '1'  # "Open"
+                trip_status = '2'  # NFO-545: "Open-Restricted"
+                yield [
+                    row.trip, self._fk_id(row, 'vessel'), self._fk_id(row, 'user'), self._fk_id(row, 'program'),
+                    row.debriefing,
+                    # "TRIP_ID", "VESSEL_ID", "USER_ID", "PROGRAM_ID", "DEBRIEFING_ID",
+                    trip_status, self._fk_id(row, 'departure_port'), row.departure_date,
+                    # "TRIP_STATUS", "DEPARTURE_PORT_ID", "DEPARTURE_DATE",
+                    self._fk_id(row, 'return_port'), row.return_date, row.logbook_number, row.notes,
+                    # "RETURN_PORT_ID", "RETURN_DATE", "LOGBOOK_NUMBER", "NOTES",
+                    row.data_quality, row.created_by, row.created_date, None,
+                    # "DATA_QUALITY", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY",
+                    None, None, None, row.observer_logbook,
+                    # "MODIFIED_DATE", "OTC_KP", "TOTAL_HOOKS_KP", "OBSERVER_LOGBOOK",
+                    row.evaluation, row.partial_trip, self._fk_id(row, 'skipper'), row.fishery, row.crew_size,
+                    # "EVALUATION_ID", "PARTIAL_TRIP", "SKIPPER_ID", "FISHERY", "CREW_SIZE",
+                    None, None, row.logbook_type, self._fk_id(row, 'first_receiver'),
+                    # TODO: PERMIT_NUMBER, LICENSE_NUMBER
+                    # "PERMIT_NUMBER", "LICENSE_NUMBER", "LOGBOOK_TYPE", "FIRST_RECEIVER",
+                    None, None, None, None, data_source,
+                    # "EXPORT", "EXTERNAL_TRIP_ID", "DO_EXPAND", "RUN_TER", "DATA_SOURCE",
+                    None, None, row.fish_processed, None,
+                    # "ROW_PROCESSED", "ROW_STATUS", "FISH_PROCESSED", "NO_FISHING_ACTIVITY",
+                    None, fishing_days
+                    # "INTENDED_GEAR_TYPE", "TOTAL_FISHING_DAYS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -491,46 +524,39 @@ class ObserverDBSyncController(QObject):
         ]
         # Get hauls/ sets
         activities_q = FishingActivities.select().where(FishingActivities.trip == trip_id)
-        output = io.StringIO()
-
-        if not len(activities_q):
-            return filename, None
-
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in activities_q:
-            target_strategy = row.target_strategy.catch_category if row.target_strategy else None
-            brd_present = self._translate_bool_to_binary_str(row.brd_present)
-            deterrent_used = self._translate_bool_to_binary_str(row.deterrent_used)
-            row_values = [
-                row.fishing_activity,
-                # "FISHING_ACTIVITY_ID",
-                row.trip.trip, row.fishing_activity_num, row.observer_total_catch,
-                # "TRIP_ID", "FISHING_ACTIVITY_NUM", "OBSERVER_TOTAL_CATCH",
-                'LB', row.otc_weight_method,
-                # "OTC_WEIGHT_UM", "OTC_WEIGHT_METHOD",
-                row.total_hooks, row.gear_type, row.gear_performance,
-                # "TOTAL_HOOKS", "GEAR_TYPE", "GEAR_PERFORMANCE",
-                row.beaufort_value, row.volume, row.volume_um, row.density, row.density_um, row.notes,
-                # "BEAUFORT_VALUE", "VOLUME", "VOLUME_UM", "DENSITY", "DENSITY_UM", "NOTES",
-                row.created_by, row.created_date, None, None, target_strategy, None,
-                # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "TARGET_STRATEGY_ID", "CATCH_WEIGHT_KP",
-                None, None, row.efp, None, None,
-                # "CATCH_COUNT_KP", "HOOKS_SAMPLED_KP", "EFP", "SAMPLE_WEIGHT_KP", "SAMPLE_COUNT_KP",
-                deterrent_used, row.avg_soak_time, row.tot_gear_segments, row.gear_segments_lost, None,
-                # "DETERRENT_USED", "AVG_SOAK_TIME", "TOT_GEAR_SEGMENTS", "GEAR_SEGMENTS_LOST", "EXCLUDER_TYPE",
-                row.total_hooks_lost, ObserverDBUtil.get_data_source(),
-                # "TOTAL_HOOKS_LOST", "DATA_SOURCE",
-                None, None, row.data_quality,
-                # "ROW_PROCESSED", "ROW_STATUS", "DATA_QUALITY",
-                row.cal_weight, row.fit, brd_present
-                # "CAL_WEIGHT", "FIT", "BRD_PRESENT"
-            ]
-            writer.writerow(row_values)
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-        return filename, csv_output
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in activities_q:
+                brd_present = self._translate_bool_to_binary_str(row.brd_present)
+                deterrent_used = self._translate_bool_to_binary_str(row.deterrent_used)
+                yield [
+                    row.fishing_activity,
+                    # "FISHING_ACTIVITY_ID",
+                    self._fk_id(row, 'trip'), row.fishing_activity_num, row.observer_total_catch,
+                    # "TRIP_ID", "FISHING_ACTIVITY_NUM", "OBSERVER_TOTAL_CATCH",
+                    'LB', row.otc_weight_method,
+                    # "OTC_WEIGHT_UM", "OTC_WEIGHT_METHOD",
+                    row.total_hooks, row.gear_type, row.gear_performance,
+                    # "TOTAL_HOOKS", "GEAR_TYPE", "GEAR_PERFORMANCE",
+                    row.beaufort_value, row.volume, row.volume_um, row.density, row.density_um, row.notes,
+                    # "BEAUFORT_VALUE", "VOLUME", "VOLUME_UM", "DENSITY", "DENSITY_UM", "NOTES",
+                    row.created_by, row.created_date, None, None, self._fk_id(row, 'target_strategy'), None,
+                    # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "TARGET_STRATEGY_ID",
+                    # "CATCH_WEIGHT_KP",
+                    None, None, row.efp, None, None,
+                    # "CATCH_COUNT_KP", "HOOKS_SAMPLED_KP", "EFP", "SAMPLE_WEIGHT_KP", "SAMPLE_COUNT_KP",
+                    deterrent_used, row.avg_soak_time, row.tot_gear_segments, row.gear_segments_lost, None,
+                    # "DETERRENT_USED", "AVG_SOAK_TIME", "TOT_GEAR_SEGMENTS", "GEAR_SEGMENTS_LOST", "EXCLUDER_TYPE",
+                    row.total_hooks_lost, data_source,
+                    # "TOTAL_HOOKS_LOST", "DATA_SOURCE",
+                    None, None, row.data_quality,
+                    # "ROW_PROCESSED", "ROW_STATUS", "DATA_QUALITY",
+                    row.cal_weight, row.fit, brd_present
+                    # "CAL_WEIGHT", "FIT", "BRD_PRESENT"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -550,39 +576,26 @@ class ObserverDBSyncController(QObject):
             "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activities
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-        # Get related locations
-        locations_q = FishingLocations.select().where(FishingLocations.fishing_activity << fishing_activity_ids)  # IN
-
-        if not len(locations_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in locations_q:
-            row_values = [
-                row.fishing_location, row.fishing_activity.fishing_activity, row.location_date,
-                # "FISHING_LOCATION_ID", "FISHING_ACTIVITY_ID", "LOCATION_DATE",
-                row.latitude, row.longitude, row.depth, row.depth_um, row.position,
-                # "LATITUDE", "LONGITUDE", "DEPTH", "DEPTH_UM", "POSITION",
-                row.created_by, row.created_date, None, None,
-                # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE",
-                row.notes, ObserverDBUtil.get_data_source(),
-                # "NOTES", "DATA_SOURCE",
-                None, None
-                # "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get locations of the trip's activities
+        locations_q = self._trip_query(FishingLocations, trip_id, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in locations_q:
+                yield [
+                    row.fishing_location, self._fk_id(row, 'fishing_activity'), row.location_date,
+                    # "FISHING_LOCATION_ID", "FISHING_ACTIVITY_ID", "LOCATION_DATE",
+                    row.latitude, row.longitude, row.depth, row.depth_um, row.position,
+                    # "LATITUDE", "LONGITUDE", "DEPTH", "DEPTH_UM", "POSITION",
+                    row.created_by, row.created_date, None, None,
+                    # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE",
+                    row.notes, data_source,
+                    # "NOTES", "DATA_SOURCE",
+                    None, None
+                    # "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -608,49 +621,36 @@ class ObserverDBSyncController(QObject):
             "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activities
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-        # Get related catches
-        catches_q = Catches.select().where((Catches.fishing_activity << fishing_activity_ids))
-
-        if not len(catches_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in catches_q:
-            row_values = [
-                row.catch, row.fishing_activity.fishing_activity, row.catch_category.catch_category,
-                # "CATCH_ID", "FISHING_ACTIVITY_ID", "CATCH_CATEGORY_ID",
-                row.catch_weight, row.catch_weight_um,
-                # "CATCH_WEIGHT", "CATCH_WEIGHT_UM",
-                row.catch_count, row.catch_weight_method, row.catch_disposition, row.discard_reason,
-                # "CATCH_COUNT", "CATCH_WEIGHT_METHOD", "CATCH_DISPOSITION", "DISCARD_REASON",
-                row.catch_purity, row.volume, row.volume_um, row.density, row.density_um, row.catch_num,
-                # "CATCH_PURITY", "VOLUME", "VOLUME_UM", "DENSITY", "DENSITY_UM", "CATCH_NUM",
-                row.notes, row.created_by, row.created_date, None, None, row.hooks_sampled,
-                # "NOTES", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "HOOKS_SAMPLED",
-                row.sample_weight, row.sample_weight_um, row.sample_count, None, None,
-                # "SAMPLE_WEIGHT", "SAMPLE_WEIGHT_UM", "SAMPLE_COUNT", "CATCH_WEIGHT_ITQ", "LENGTH_ITQ",
-                None, None, None, None,
-                # "DENSITY_BASKET_WEIGHT_ITQ", "WIDTH_ITQ", "DEPTH_ITQ", "BASKETS_WEIGHED_ITQ",
-                None, None, None, None,
-                # "TOTAL_BASKETS_ITQ", "PARTIAL_BASKET_WEIGHT_ITQ", "UNITS_SAMPLED_ITQ", "TOTAL_UNITS_ITQ",
-                row.gear_segments_sampled, None, None, None,
-                # "GEAR_SEGMENTS_SAMPLED", "BASKET_WEIGHT_KP", "ADDL_BASKET_WEIGHT_KP", "BASKET_WEIGHT_COUNT_KP",
-                ObserverDBUtil.get_data_source(), None, None
-                # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get catches of the trip's activities
+        catches_q = self._trip_query(Catches, trip_id, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in catches_q:
+                yield [
+                    row.catch, self._fk_id(row, 'fishing_activity'), self._fk_id(row, 'catch_category'),
+                    # "CATCH_ID", "FISHING_ACTIVITY_ID", "CATCH_CATEGORY_ID",
+                    row.catch_weight, row.catch_weight_um,
+                    # "CATCH_WEIGHT", "CATCH_WEIGHT_UM",
+                    row.catch_count, row.catch_weight_method, row.catch_disposition, row.discard_reason,
+                    # "CATCH_COUNT", "CATCH_WEIGHT_METHOD", "CATCH_DISPOSITION", "DISCARD_REASON",
+                    row.catch_purity, row.volume, row.volume_um, row.density, row.density_um, row.catch_num,
+                    # "CATCH_PURITY", "VOLUME", "VOLUME_UM", "DENSITY", "DENSITY_UM", "CATCH_NUM",
+                    row.notes, row.created_by, row.created_date, None, None, row.hooks_sampled,
+                    # "NOTES", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "HOOKS_SAMPLED",
+                    row.sample_weight, row.sample_weight_um, row.sample_count, None, None,
+                    # "SAMPLE_WEIGHT", "SAMPLE_WEIGHT_UM", "SAMPLE_COUNT", "CATCH_WEIGHT_ITQ", "LENGTH_ITQ",
+                    None, None, None, None,
+                    # "DENSITY_BASKET_WEIGHT_ITQ", "WIDTH_ITQ", "DEPTH_ITQ", "BASKETS_WEIGHED_ITQ",
+                    None, None, None, None,
+                    # "TOTAL_BASKETS_ITQ", "PARTIAL_BASKET_WEIGHT_ITQ", "UNITS_SAMPLED_ITQ", "TOTAL_UNITS_ITQ",
+                    row.gear_segments_sampled, None, None, None,
+                    # "GEAR_SEGMENTS_SAMPLED", "BASKET_WEIGHT_KP", "ADDL_BASKET_WEIGHT_KP", "BASKET_WEIGHT_COUNT_KP",
+                    data_source, None, None
+                    # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -668,40 +668,23 @@ class ObserverDBSyncController(QObject):
             "BASKET_NUMBER", "DATA_QUALITY", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related species comp id's
-        species_q = SpeciesCompositions.select().where(SpeciesCompositions.catch << catch_ids)  # IN
-
-        if not len(species_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in species_q:
-            row_values = [
-                row.species_composition, row.catch.catch, row.sample_method, row.notes, row.created_by,
-                # "SPECIES_COMPOSITION_ID", "CATCH_ID", "SAMPLE_METHOD", "NOTES", "CREATED_BY",
-                row.created_date, None, None, None, None,
-                # "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "SPECIES_WEIGHT_KP", "SPECIES_NUMBER_KP",
-                row.basket_number, row.data_quality, ObserverDBUtil.get_data_source(), None, None
-                # "BASKET_NUMBER", "DATA_QUALITY", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
+        # Get species comps of the trip's catches
+        species_q = self._trip_query(SpeciesCompositions, trip_id, Catches, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
 
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
+        def rows():
+            for row in species_q:
+                yield [
+                    row.species_composition, self._fk_id(row, 'catch'), row.sample_method, row.notes,
+                    row.created_by,
+                    # "SPECIES_COMPOSITION_ID", "CATCH_ID", "SAMPLE_METHOD", "NOTES", "CREATED_BY",
+                    row.created_date, None, None, None, None,
+                    # "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "SPECIES_WEIGHT_KP", "SPECIES_NUMBER_KP",
+                    row.basket_number, row.data_quality, data_source, None, None
+                    # "BASKET_NUMBER", "DATA_QUALITY", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
 
-        return filename, csv_output
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -721,52 +704,30 @@ class ObserverDBSyncController(QObject):
             "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related species comp id's
-        species_q = SpeciesCompositions.select().where(SpeciesCompositions.catch << catch_ids)  # IN
-        species_comp_ids = [q.species_composition for q in species_q]
-
-        # Get species comp items
-        species_comp_items_q = SpeciesCompositionItems.select(). \
-            where(SpeciesCompositionItems.species_composition << species_comp_ids)
+        # Get species comp items of the trip's species comps
+        species_comp_items_q = self._trip_query(SpeciesCompositionItems, trip_id,
+                                                SpeciesCompositions, Catches, FishingActivities)
 
         # Exclude items for OPTECS-only Species MIX, a pseudo-species used to collect catch-level basket data.
         species_comp_items_q = self._filter_mix_species_comp_items(species_comp_items_q)
-
-        if not len(species_comp_items_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in species_comp_items_q:
-            row_values = [
-                row.species_comp_item, row.species.species, row.species_composition.species_composition,
-                # "SPECIES_COMP_ITEM_ID", "SPECIES_ID", "SPECIES_COMPOSITION_ID",
-                row.species_weight, row.species_weight_um, row.species_number, row.notes,
-                # "SPECIES_WEIGHT", "SPECIES_WEIGHT_UM", "SPECIES_NUMBER", "NOTES",
-                row.discard_reason, row.created_by, row.created_date, None, None,
-                # "DISCARD_REASON", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE",
-                row.handling, row.total_tally, None, None, ObserverDBUtil.get_data_source(),
-                # "HANDLING", "TOTAL_TALLY", "SPECIES_WEIGHT_KP_ITQ", "SPECIES_NUMBER_KP_ITQ", "DATA_SOURCE",
-                None, None
-                # "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in species_comp_items_q:
+                yield [
+                    row.species_comp_item, self._fk_id(row, 'species'), self._fk_id(row, 'species_composition'),
+                    # "SPECIES_COMP_ITEM_ID", "SPECIES_ID", "SPECIES_COMPOSITION_ID",
+                    row.species_weight, row.species_weight_um, row.species_number, row.notes,
+                    # "SPECIES_WEIGHT", "SPECIES_WEIGHT_UM", "SPECIES_NUMBER", "NOTES",
+                    row.discard_reason, row.created_by, row.created_date, None, None,
+                    # "DISCARD_REASON", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE",
+                    row.handling, row.total_tally, None, None, data_source,
+                    # "HANDLING", "TOTAL_TALLY", "SPECIES_WEIGHT_KP_ITQ", "SPECIES_NUMBER_KP_ITQ", "DATA_SOURCE",
+                    None, None
+                    # "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     def _filter_mix_species_comp_items(self, species_comp_items_q):
         """
@@ -801,62 +762,34 @@ class ObserverDBSyncController(QObject):
             "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related species comp id's
-        species_q = SpeciesCompositions.select().where(SpeciesCompositions.catch << catch_ids)  # IN
-        species_comp_ids = [q.species_composition for q in species_q]
-
-        # Get species comp items
-        species_comp_items_q = SpeciesCompositionItems.select(). \
-            where(SpeciesCompositionItems.species_composition << species_comp_ids)  # IN
-        species_comp_item_ids = [q.species_comp_item for q in species_comp_items_q]
-
-        # Get species comp baskets
-        species_baskets_q = SpeciesCompositionBaskets.select(). \
-            where((SpeciesCompositionBaskets.species_comp_item << species_comp_item_ids) &
-                  (SpeciesCompositionBaskets.basket_weight_itq.is_null(False)))# omit trawl tallies
-                  # & (SpeciesCompositionBaskets.is_fg_tally_local.is_null(True)))  # omit fg tallies
-
-
-        if not len(species_baskets_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in species_baskets_q:
-            row_values = [
-                row.species_comp_basket, row.species_comp_item.species_comp_item,
-                # "SPECIES_COMP_BASKET_ID", "SPECIES_COMP_ITEM_ID",
-                row.basket_weight_itq, row.fish_number_itq,
-                # "BASKET_WEIGHT_ITQ", "FISH_NUMBER_ITQ",
-                # FIELD-2087: recast to Oracle date; TODO: fix sync_upload.SPECIES_COMP_BASKETS created_date dtype
-                ObserverDBUtil.convert_datestr(
-                    row.created_date,
-                    ObserverDBUtil.default_dateformat,
-                    ObserverDBUtil.oracle_date_format
-                ),
-                # "CREATED_DATE"
-                row.created_by, None,
-                # "CREATED_BY", "MODIFIED_BY",
-                ObserverDBUtil.get_data_source(), None, None
-                # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get species comp baskets of the trip's species comp items
+        species_baskets_q = self._trip_query(SpeciesCompositionBaskets, trip_id, SpeciesCompositionItems,
+                                             SpeciesCompositions, Catches, FishingActivities). \
+            where(SpeciesCompositionBaskets.basket_weight_itq.is_null(False))  # omit trawl tallies
+            # & (SpeciesCompositionBaskets.is_fg_tally_local.is_null(True)))  # omit fg tallies
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in species_baskets_q:
+                yield [
+                    row.species_comp_basket, self._fk_id(row, 'species_comp_item'),
+                    # "SPECIES_COMP_BASKET_ID", "SPECIES_COMP_ITEM_ID",
+                    row.basket_weight_itq, row.fish_number_itq,
+                    # "BASKET_WEIGHT_ITQ", "FISH_NUMBER_ITQ",
+                    # FIELD-2087: recast to Oracle date; TODO: fix sync_upload.SPECIES_COMP_BASKETS created_date dtype
+                    ObserverDBUtil.convert_datestr(
+                        row.created_date,
+                        ObserverDBUtil.default_dateformat,
+                        ObserverDBUtil.oracle_date_format
+                    ),
+                    # "CREATED_DATE"
+                    row.created_by, None,
+                    # "CREATED_BY", "MODIFIED_BY",
+                    data_source, None, None
+                    # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -877,53 +810,35 @@ class ObserverDBSyncController(QObject):
             "BASKET_TYPE"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related catch additional baskets
-        addl_baskets_q = CatchAdditionalBaskets.select().where(CatchAdditionalBaskets.catch << catch_ids)  # IN
-
-        if not len(addl_baskets_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in addl_baskets_q:
-            row_values = [
-                # "CATCH_ADDTL_BASKETS_ID", "CATCH_ID",
-                row.catch_addtl_baskets, row.catch.catch,
-                # "BASKET_WEIGHT",
-                row.basket_weight,
-                # "CREATED_DATE",
-                # FIELD-2087: recast to Oracle date; TODO: fix sync_upload.CAB created_date dtype
-                ObserverDBUtil.convert_datestr(
-                    row.created_date,
-                    ObserverDBUtil.default_dateformat,
-                    ObserverDBUtil.oracle_date_format
-                ),
-                #"CREATED_BY",
-                row.created_by,
-                # "MODIFIED_DATE", "MODIFIED_BY",
-                None, None,
-                # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS",
-                ObserverDBUtil.get_data_source(), None, None,
-                # "BASKET_TYPE"
-                row.basket_type
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get catch additional baskets of the trip's catches
+        addl_baskets_q = self._trip_query(CatchAdditionalBaskets, trip_id, Catches, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in addl_baskets_q:
+                yield [
+                    # "CATCH_ADDTL_BASKETS_ID", "CATCH_ID",
+                    row.catch_addtl_baskets, self._fk_id(row, 'catch'),
+                    # "BASKET_WEIGHT",
+                    row.basket_weight,
+                    # "CREATED_DATE",
+                    # FIELD-2087: recast to Oracle date; TODO: fix sync_upload.CAB created_date dtype
+                    ObserverDBUtil.convert_datestr(
+                        row.created_date,
+                        ObserverDBUtil.default_dateformat,
+                        ObserverDBUtil.oracle_date_format
+                    ),
+                    #"CREATED_BY",
+                    row.created_by,
+                    # "MODIFIED_DATE", "MODIFIED_BY",
+                    None, None,
+                    # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS",
+                    data_source, None, None,
+                    # "BASKET_TYPE"
+                    row.basket_type
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
         # </editor-fold>
 
     # <editor-fold desc="Generate BIO_SPECIMENS">
@@ -940,43 +855,26 @@ class ObserverDBSyncController(QObject):
             "LF_LENGTH_KP", "FREQUENCY_KP", "DISCARD_REASON", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related bio specimens
-        biospecimens_q = BioSpecimens.select().where(BioSpecimens.catch << catch_ids)  # IN
-
-        if not len(biospecimens_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in biospecimens_q:
-            row_values = [
-                row.bio_specimen, row.catch.catch, row.species.species, row.sample_method, row.notes,
-                # "BIO_SPECIMEN_ID", "CATCH_ID", "SPECIES_ID", "SAMPLE_METHOD", "NOTES",
-                row.created_by, row.created_date, None, None, None,
-                # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "SPECIMEN_LENGTH_KP",
-                None, None, None, row.discard_reason,
-                ObserverDBUtil.get_data_source(),
-                # "SPECIMEN_WEIGHT_KP", "LF_LENGTH_KP", "FREQUENCY_KP", "DISCARD_REASON", "DATA_SOURCE",
-                None, None
-                # "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get bio specimens of the trip's catches
+        biospecimens_q = self._trip_query(BioSpecimens, trip_id, Catches, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in biospecimens_q:
+                yield [
+                    row.bio_specimen, self._fk_id(row, 'catch'), self._fk_id(row, 'species'), row.sample_method,
+                    row.notes,
+                    # "BIO_SPECIMEN_ID", "CATCH_ID", "SPECIES_ID", "SAMPLE_METHOD", "NOTES",
+                    row.created_by, row.created_date, None, None, None,
+                    # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "SPECIMEN_LENGTH_KP",
+                    None, None, None, row.discard_reason,
+                    data_source,
+                    # "SPECIMEN_WEIGHT_KP", "LF_LENGTH_KP", "FREQUENCY_KP", "DISCARD_REASON", "DATA_SOURCE",
+                    None, None
+                    # "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -995,50 +893,26 @@ class ObserverDBSyncController(QObject):
             "ADIPOSE_PRESENT", "MATURITY", "BAND_ID", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related bio specimens
-        biospecimens_q = BioSpecimens.select().where(BioSpecimens.catch << catch_ids)  # IN
-        bio_specimen_ids = [q.bio_specimen for q in biospecimens_q]
-
-        # Get related biospecimen items
-        biospecimen_items_q = BioSpecimenItems.select(). \
-            where((BioSpecimenItems.bio_specimen.in_(bio_specimen_ids)))
-        # Could not get string operations to work.
-
-        if not len(biospecimen_items_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in biospecimen_items_q:
-            if row.notes == 'Tally':
-                continue
-            row_values = [
-                row.bio_specimen_item, row.bio_specimen.bio_specimen, row.specimen_weight,
-                # "BIO_SPECIMEN_ITEM_ID", "BIO_SPECIMEN_ID", "SPECIMEN_WEIGHT",
-                row.specimen_weight_um, row.specimen_length, row.specimen_length_um, row.specimen_sex,
-                # "SPECIMEN_WEIGHT_UM", "SPECIMEN_LENGTH", "SPECIMEN_LENGTH_UM", "SPECIMEN_SEX",
-                row.notes, row.created_by, row.created_date, None, None, row.viability,
-                # "NOTES", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "VIABILITY",
-                row.adipose_present, row.maturity, row.band, ObserverDBUtil.get_data_source(), None, None
-                # "ADIPOSE_PRESENT", "MATURITY", "BAND_ID", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-
-        return filename, csv_output
+        # Get biospecimen items of the trip's bio specimens
+        biospecimen_items_q = self._trip_query(BioSpecimenItems, trip_id, BioSpecimens, Catches, FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in biospecimen_items_q:
+                if row.notes == 'Tally':
+                    continue
+                yield [
+                    row.bio_specimen_item, self._fk_id(row, 'bio_specimen'), row.specimen_weight,
+                    # "BIO_SPECIMEN_ITEM_ID", "BIO_SPECIMEN_ID", "SPECIMEN_WEIGHT",
+                    row.specimen_weight_um, row.specimen_length, row.specimen_length_um, row.specimen_sex,
+                    # "SPECIMEN_WEIGHT_UM", "SPECIMEN_LENGTH", "SPECIMEN_LENGTH_UM", "SPECIMEN_SEX",
+                    row.notes, row.created_by, row.created_date, None, None, row.viability,
+                    # "NOTES", "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "VIABILITY",
+                    row.adipose_present, row.maturity, row.band, data_source, None, None
+                    # "ADIPOSE_PRESENT", "MATURITY", "BAND_ID", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -1058,52 +932,29 @@ class ObserverDBSyncController(QObject):
             "ROW_PROCESSED", "ROW_STATUS"
         ]
 
-        # Get activity id's
-        activities_q = FishingActivities.select(FishingActivities.fishing_activity).where(
-            FishingActivities.trip == trip_id)
-        fishing_activity_ids = [q.fishing_activity for q in activities_q]
-
-        # Get related catch id's
-        catches_q = Catches.select().where(Catches.fishing_activity << fishing_activity_ids)  # IN
-        catch_ids = [q.catch for q in catches_q]
-
-        # Get related bio specimens
-        biospecimens_q = BioSpecimens.select().where(BioSpecimens.catch << catch_ids)  # IN
-        bio_specimen_ids = [q.bio_specimen for q in biospecimens_q]
-
-        # Get related biospecimen items
-        biospecimen_items_q = BioSpecimenItems.select(). \
-            where(BioSpecimenItems.bio_specimen << bio_specimen_ids)  # IN
-        bio_specimen_item_ids = [q.bio_specimen_item for q in biospecimen_items_q]
-
-        # Get Dissections
-        dissections_q = Dissections.select().where(Dissections.bio_specimen_item << bio_specimen_item_ids)  # IN
-
-        if not len(dissections_q):
-            return filename, None
-
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in dissections_q:
-            row_values = [
-                row.dissection, row.bio_specimen_item.bio_specimen_item, row.dissection_type, row.dissection_barcode,
-                # "DISSECTION_ID", "BIO_SPECIMEN_ITEM_ID", "DISSECTION_TYPE", "DISSECTION_BARCODE",
-                row.created_by, row.created_date, None, None, row.rack,
-                # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "RACK_ID",
-                row.rack_position, row.bs_result, row.cwt_code, row.cwt_status, row.cwt_type, row.age,
-                # "RACK_POSITION", "BS_RESULT", "CWT_CODE", "CWT_STATUS", "CWT_TYPE", "AGE",
-                row.age_reader, row.age_date, row.age_location, row.age_method, row.band,
-                ObserverDBUtil.get_data_source(),
-                # "AGE_READER", "AGE_DATE", "AGE_LOCATION", "AGE_METHOD", "BAND_ID", "DATA_SOURCE",
-                None, None
-                # "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-        return filename, csv_output
+        # Get dissections of the trip's biospecimen items
+        dissections_q = self._trip_query(Dissections, trip_id, BioSpecimenItems, BioSpecimens, Catches,
+                                         FishingActivities)
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in dissections_q:
+                yield [
+                    row.dissection, self._fk_id(row, 'bio_specimen_item'), row.dissection_type,
+                    row.dissection_barcode,
+                    # "DISSECTION_ID", "BIO_SPECIMEN_ITEM_ID", "DISSECTION_TYPE", "DISSECTION_BARCODE",
+                    row.created_by, row.created_date, None, None, row.rack,
+                    # "CREATED_BY", "CREATED_DATE", "MODIFIED_BY", "MODIFIED_DATE", "RACK_ID",
+                    row.rack_position, row.bs_result, row.cwt_code, row.cwt_status, row.cwt_type, row.age,
+                    # "RACK_POSITION", "BS_RESULT", "CWT_CODE", "CWT_STATUS", "CWT_TYPE", "AGE",
+                    row.age_reader, row.age_date, row.age_location, row.age_method, row.band,
+                    data_source,
+                    # "AGE_READER", "AGE_DATE", "AGE_LOCATION", "AGE_METHOD", "BAND_ID", "DATA_SOURCE",
+                    None, None
+                    # "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -1124,25 +975,19 @@ class ObserverDBSyncController(QObject):
         ]
         # Get certs
         certs_q = TripCertificates.select().where(TripCertificates.trip == trip_id)
-        output = io.StringIO()
+        data_source = ObserverDBUtil.get_data_source()
 
-        if not len(certs_q):
-            return filename, None
+        def rows():
+            for row in certs_q:
+                yield [
+                    row.trip_certificate, self._fk_id(row, 'trip'), row.certificate_number, row.created_date,
+                    row.created_by,
+                    # "TRIP_CERTIFICATE_ID", "TRIP_ID", "CERTIFICATE_NUMBER", "CREATED_DATE", "CREATED_BY",
+                    None, None, row.certification, data_source, None, None
+                    # "MODIFIED_DATE", "MODIFIED_BY", "CERTIFICATION_ID", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
 
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in certs_q:
-            row_values = [
-                row.trip_certificate, row.trip.trip, row.certificate_number, row.created_date, row.created_by,
-                # "TRIP_CERTIFICATE_ID", "TRIP_ID", "CERTIFICATE_NUMBER", "CREATED_DATE", "CREATED_BY",
-                None, None, row.certification, ObserverDBUtil.get_data_source(), None, None
-                # "MODIFIED_DATE", "MODIFIED_BY", "CERTIFICATION_ID", "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-        return filename, csv_output
+        return self._export_csv(filename, required_headers, rows())
 
     # </editor-fold>
 
@@ -1162,25 +1007,38 @@ class ObserverDBSyncController(QObject):
             "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
         ]
         certs_q = FishTickets.select().where(FishTickets.trip == trip_id)
-        output = io.StringIO()
+        data_source = ObserverDBUtil.get_data_source()
+
+        def rows():
+            for row in certs_q:
+                yield [
+                    row.fish_ticket, row.fish_ticket_number, row.created_by, row.created_date,
+                    # "FISH_TICKET_ID", "FISH_TICKET_NUMBER", "CREATED_BY", "CREATED_DATE",
+                    None, None, self._fk_id(row, 'trip'), row.state_agency, row.fish_ticket_date,
+                    # "MODIFIED_BY", "MODIFIED_DATE", "TRIP_ID", "STATE_AGENCY", "FISH_TICKET_DATE",
+                    data_source, None, None
+                    # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
+                ]
+
+        return self._export_csv(filename, required_headers, rows())
+        # </editor-fold>
 
-        if not len(certs_q):
-            return filename, None
 
-        writer = csv.writer(output, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(required_headers)  # Header
-
-        for row in certs_q:
-            row_values = [
-                row.fish_ticket, row.fish_ticket_number, row.created_by, row.created_date,
-                # "FISH_TICKET_ID", "FISH_TICKET_NUMBER", "CREATED_BY", "CREATED_DATE",
-                None, None, row.trip.trip, row.state_agency, row.fish_ticket_date,
-                # "MODIFIED_BY", "MODIFIED_DATE", "TRIP_ID", "STATE_AGENCY", "FISH_TICKET_DATE",
-                ObserverDBUtil.get_data_source(), None, None
-                # "DATA_SOURCE", "ROW_PROCESSED", "ROW_STATUS"
-            ]
-            writer.writerow(row_values)
-        csv_output = output.getvalue()
-        csv_output = self.make_csv_api_friendly(csv_output)
-        return filename, csv_output
-        # </editor-fold>
+class ApiFriendlyCsvOutput:
+    """
+    Write target for csv.writer that applies ObserverDBSyncController.make_csv_api_friendly to each record as it is
+    written, so a trip's CSV is built in a single pass rather than rewritten as a whole once it is complete.
+    The substitutions never span a record terminator, so the result matches fixing up the complete CSV.
+    """
+    def __init__(self):
+        self._records = []
+
+    @property
+    def record_count(self):
+        return len(self._records)
+
+    def write(self, record):
+        self._records.append(ObserverDBSyncController.make_csv_api_friendly(record))
+
+    def getvalue(self):
+        return ''.join(self._records)
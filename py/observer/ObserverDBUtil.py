@@ -18,6 +18,7 @@ import os
 import socket
 import shutil
 import re
+import threading
 
 from decimal import *
 from typing import Any, Dict, List, Type, Union
@@ -35,6 +36,104 @@ from py.observer.ObserverConfig import optecs_version
 import unittest
 
 
+class SettingsCache:
+    """
+    Process-wide cache of the SETTINGS table (PARAMETER: VALUE), loaded with one SELECT.
+    ObserverDBUtil's setting reads are served from it, and its setting writes and clears write through to it.
+    Any other write on the reading thread's connection (e.g. Settings.create elsewhere), or a commit on any
+    other connection, causes a reload on the next read.
+    """
+    _lock = threading.RLock()
+    _values = None  # PARAMETER: VALUE
+    _loaded_token = None  # (database, connection, total changes, data version) when _values was last current
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def _current_token():
+        db = Settings._meta.database
+        connection = db.get_conn()
+        # PRAGMA data_version changes on a commit by any other connection, e.g. another thread's
+        data_version = list(connection.cursor().execute('PRAGMA data_version'))[0][0]
+        return db, connection, connection.total_changes(), data_version
+
+    @classmethod
+    def _current_values(cls) -> Dict[str, Any]:
+        token = cls._current_token()
+        if cls._values is not None and token == cls._loaded_token:
+            cls.hits += 1
+            return cls._values
+        cls.misses += 1
+        values = {}
+        for parameter, value in Settings.select(Settings.parameter, Settings.value).order_by(
+                Settings.settings).tuples():
+            values.setdefault(parameter, value)  # Settings.get returns the first
+        cls._values = values
+        cls._loaded_token = token
+        return values
+
+    @classmethod
+    def get(cls, parameter: str, fallback_value=None):
+        """
+        @param parameter: e.g. 'current_user_id'
+        @param fallback_value: value to return if parameter not in SETTINGS
+        @return: VALUE (possibly None) or fallback_value
+        """
+        with cls._lock:
+            return cls._current_values().get(parameter, fallback_value)
+
+    @classmethod
+    def contains(cls, parameter: str) -> bool:
+        with cls._lock:
+            return parameter in cls._current_values()
+
+    @classmethod
+    def write_through(cls, parameter: str, value, write) -> Any:
+        """
+        Perform a write of one setting to SETTINGS, updating the cache to match if it was current,
+        else invalidating it.
+        @param parameter: PARAMETER written
+        @param value: new VALUE, or None to remove the parameter
+        @param write: function performing the write
+        @return: write's return value
+        """
+        with cls._lock:
+            was_current = cls._values is not None and cls._current_token() == cls._loaded_token
+            try:
+                result = write()
+            except Exception:
+                cls.invalidate()
+                raise
+            if was_current:
+                if value is None:
+                    cls._values.pop(parameter, None)
+                else:
+                    cls._values[parameter] = value
+                cls._loaded_token = cls._current_token()
+            else:
+                cls.invalidate()  # E.g. a write on another thread's connection, which won't move this one's token
+            return result
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Reload on the next read. For writes made on another thread's connection, e.g. DB sync.
+        """
+        with cls._lock:
+            cls._values = None
+            cls._loaded_token = None
+
+    @classmethod
+    def clear(cls):
+        """
+        Discard the cache and zero the counters. E.g. for unit tests that recreate SETTINGS.
+        """
+        with cls._lock:
+            cls.invalidate()
+            cls.hits = 0
+            cls.misses = 0
+
+
 class ObserverDBUtil:
     default_dateformat = 'MM/DD/YYYY HH:mm'  # Updated for arrow
     javascript_dateformat = 'YYYY-MM-DDTHH:mm:ss'  # For QML interactions
@@ -45,10 +144,9 @@ class ObserverDBUtil:
 
     @staticmethod
     def db_load_setting(parameter):
-        try:
-            return Settings.get(Settings.parameter == parameter).value
-        except Settings.DoesNotExist as e:
-            logging.info('DB Setting does not exist: ' + parameter)
+        if SettingsCache.contains(parameter):
+            return SettingsCache.get(parameter)
+        logging.info('DB Setting does not exist: ' + parameter)
         return None
 
     @staticmethod
@@ -60,6 +158,11 @@ class ObserverDBUtil:
         :param value: Value to save as Str
         :return: True if saved
         """
+        return SettingsCache.write_through(parameter, str(value),
+                                           lambda: ObserverDBUtil._db_save_setting(parameter, value))
+
+    @staticmethod
+    def _db_save_setting(parameter, value):
         id_query = Settings.select().where(Settings.parameter == parameter)
         if not id_query.exists():
             Settings.create(parameter=parameter)
@@ -159,18 +262,21 @@ class ObserverDBUtil:
 
         numeric_field_empty_string_cnts = {}
         fields_to_coerce = []
-        for numeric_field in numeric_fields:
+        if numeric_fields:
             # Do a SELECT to determine which columns have any empty strings. Not strictly necessary - could just do the
             # update, but a log of counts of empty string values by field could be useful for tracking its frequency.
             # Use execute_sql to avoid peewee's problem handling an empty string in a numeric field.
-            select_sql_query = f"SELECT {numeric_field.db_column} FROM {db_table._meta.db_table} " + \
-                               f"WHERE {numeric_field.db_column} = ''"
+            # One pass over the table counts the empty strings in every numeric field.
+            select_sql_query = "SELECT " + \
+                               ", ".join(f"SUM({numeric_field.db_column} = '')" for numeric_field in numeric_fields) + \
+                               f" FROM {db_table._meta.db_table}"
             # logger.debug(select_sql_query)
-            cursor = db.execute_sql(select_sql_query)
-            n_empty_string_values = len(cursor.fetchall())
-            numeric_field_empty_string_cnts[numeric_field.db_column] = n_empty_string_values
-            if n_empty_string_values > 0:
-                fields_to_coerce.append(numeric_field)
+            counts = list(db.execute_sql(select_sql_query))[0]
+            for numeric_field, n_empty_string_values in zip(numeric_fields, counts):
+                n_empty_string_values = n_empty_string_values or 0  # SUM of no rows is NULL
+                numeric_field_empty_string_cnts[numeric_field.db_column] = n_empty_string_values
+                if n_empty_string_values > 0:
+                    fields_to_coerce.append(numeric_field)
 
         for field_to_coerce in fields_to_coerce:
             coerced_value = "NULL" if field_to_coerce.null else "0"
@@ -408,7 +514,7 @@ class ObserverDBUtil:
         return nrows
 
     @staticmethod
-    def checksum_peewee_model(peewee_model: Type[BaseModel], logger: logging.Logger) -> str:
+    def checksum_peewee_model(peewee_model: Type[BaseModel], logger: logging.Logger, use_cache: bool = False) -> str:
         """
         Can help answer the question: have the contents of a SQLite table changed at all?
         
@@ -428,14 +534,29 @@ class ObserverDBUtil:
             hashing method to directly support multiple inputs. One general way to do that is to use a hash list,
             in which every input value is first hashed separately, and the resulting hashes (which have a fixed length,
             and can thus be safely concatenated) are then concatenated and hashed together."
+
+        Rows are streamed from a raw cursor, with each field converted as peewee would convert it, and the
+        concatenations are fed to incremental SHA1s rather than built up as strings. The checksum is unchanged.
             
         :param peewee_model: The table to checksum. Must have a primary key field
                 (the case for all Peewee-based tables).
         :param logger: 
+        :param use_cache: Return the checksum last calculated on this connection, if the table can't have changed
+                since (see _get_checksum_table_state).
         :return: 
         """
         start_time = time.time()
 
+        table_name = peewee_model._meta.name
+        db = peewee_model._meta.database
+        cache_key = (db.get_conn(), peewee_model._meta.db_table)
+        if use_cache:
+            cached_state, cached_sha1 = ObserverDBUtil._checksum_cache.get(cache_key, (None, None))
+            if cached_state is not None and \
+                    cached_state == ObserverDBUtil._get_checksum_table_state(db, peewee_model._meta.db_table):
+                logger.info(f"SHA1 checksum for Table {table_name} unchanged: {cached_sha1}.")
+                return cached_sha1
+
         # Oracle and SQLite allow a value of empty string in numeric fields. Peewee takes exception: ValueError.
         # Empty string values could be added to TRIP_CHECKS by a DB Sync download.
         # Before running a checksum, convert any empty string values in a numeric field to null or zero,
@@ -444,29 +565,69 @@ class ObserverDBUtil:
         n_flds_empty_str = len([x for x in empty_string_counts if empty_string_counts[x] > 0])
         logger.info(f"Found {'no' if n_flds_empty_str == 0 else n_flds_empty_str} fields with empty strings.")
 
-        table_name = peewee_model._meta.name
         n_fields = len(peewee_model._meta.fields)
         primary_key_field = peewee_model._meta.primary_key
         # There will always be a primary key when using Peewee. But just in case:
         if not primary_key_field:
             raise Exception("checksum_peewee_model requires a primary key field by which to sort.")
 
-        all_rec_query = peewee_model.select().order_by(primary_key_field)
-        n_rows = all_rec_query.count()
-        row_sha1_concatenations = ""
-        for record in all_rec_query:
-            field_sha1_concatenations = ""
-            for name, value in record._data.items():
-                # print(f'{name}={value}')
-                field_sha1_concatenations += hashlib.sha1(str(value).encode()).hexdigest()
-
-            row_sha1_concatenations += hashlib.sha1(field_sha1_concatenations.encode()).hexdigest()
-
-        table_sha1 = hashlib.sha1(row_sha1_concatenations.encode()).hexdigest()
+        table_state = ObserverDBUtil._get_checksum_table_state(db, peewee_model._meta.db_table) \
+            if use_cache else None
+
+        # Hash fields in the order of a peewee model instance's _data: fields with a default value first,
+        # then the rest in the order selected.
+        selected_fields = peewee_model._meta.sorted_fields
+        field_indexes = {field.name: i for i, field in enumerate(selected_fields)}
+        fields_with_defaults = list(peewee_model._meta.get_default_dict())
+        hash_order = fields_with_defaults + \
+            [field.name for field in selected_fields if field.name not in fields_with_defaults]
+        field_converters = [(field_indexes[name], selected_fields[field_indexes[name]].python_value)
+                            for name in hash_order]
+
+        sql, params = peewee_model.select(*selected_fields).order_by(primary_key_field).sql()
+        sha1 = hashlib.sha1
+        table_sha1 = sha1()
+        n_rows = 0
+        for row in db.execute_sql(sql, params):
+            row_sha1 = sha1()
+            for i, python_value in field_converters:
+                row_sha1.update(sha1(str(python_value(row[i])).encode()).hexdigest().encode())
+            table_sha1.update(row_sha1.hexdigest().encode())
+            n_rows += 1
+        table_sha1 = table_sha1.hexdigest()
+
+        if use_cache:
+            ObserverDBUtil._checksum_cache[cache_key] = (table_state, table_sha1)
         logger.info(f"SHA1 checksum for Table {table_name} of {n_rows} rows by {n_fields} fields: {table_sha1}.")
         logger.info(f"\tTime to calculate table's SHA1: {time.time() - start_time:.2f} seconds.")
         return table_sha1
 
+    _checksum_cache = {}  # (connection, table name): (table state, SHA1)
+
+    @staticmethod
+    def _get_checksum_table_state(db: APSWDatabase, db_table: str):
+        """
+        State of a table on this connection that changes whenever the table may have changed:
+        - PRAGMA data_version, which changes on a commit by any other connection
+        - PRAGMA schema_version, which changes if the table is dropped and recreated
+        - a count of writes to the table on this connection, kept by temporary (per connection) triggers,
+          created here on first use
+        :return: tuple
+        """
+        db.execute_sql('CREATE TEMP TABLE IF NOT EXISTS CHECKSUM_TABLE_WRITES '
+                       '(TABLE_NAME TEXT PRIMARY KEY, N_WRITES INTEGER NOT NULL)')
+        db.execute_sql('INSERT OR IGNORE INTO CHECKSUM_TABLE_WRITES VALUES (?, 0)', (db_table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            db.execute_sql(f"CREATE TEMP TRIGGER IF NOT EXISTS CHECKSUM_{db_table}_{event} "
+                           f"AFTER {event} ON main.{db_table} BEGIN "
+                           f"UPDATE CHECKSUM_TABLE_WRITES SET N_WRITES = N_WRITES + 1 WHERE TABLE_NAME = '{db_table}'; "
+                           f"END")
+        n_writes = list(db.execute_sql('SELECT N_WRITES FROM CHECKSUM_TABLE_WRITES WHERE TABLE_NAME = ?',
+                                       (db_table,)))[0][0]
+        data_version = list(db.execute_sql('PRAGMA data_version'))[0][0]
+        schema_version = list(db.execute_sql('PRAGMA schema_version'))[0][0]
+        return data_version, schema_version, n_writes
+
     @staticmethod
     def get_setting(setting_name, fallback_value=None):
         """
@@ -475,10 +636,7 @@ class ObserverDBUtil:
         @param fallback_value: value to return if value not found
         @return: value or fallback_value or None
         """
-        try:
-            return Settings.get(Settings.parameter == setting_name).value
-        except Settings.DoesNotExist:
-            return fallback_value
+        return SettingsCache.get(setting_name, fallback_value)
 
     @staticmethod
     def get_or_set_setting(setting_name, default_value):
@@ -488,11 +646,10 @@ class ObserverDBUtil:
         @param default_value: value to set if setting not found
         @return: found value or default_value
         """
-        try:
-            return Settings.get(Settings.parameter == setting_name).value
-        except Settings.DoesNotExist:
-            ObserverDBUtil.db_save_setting(setting_name, default_value)
-            return default_value
+        if SettingsCache.contains(setting_name):
+            return SettingsCache.get(setting_name)
+        ObserverDBUtil.db_save_setting(setting_name, default_value)
+        return default_value
 
     @staticmethod
     def clear_setting(setting_name):
@@ -501,11 +658,14 @@ class ObserverDBUtil:
         @param setting_name: e.g. 'current_user_id'
         @return: True or None
         """
-        try:
-            Settings.get(Settings.parameter == setting_name).delete_instance()
-            return True
-        except Settings.DoesNotExist:
-            return None
+        def delete():
+            try:
+                Settings.get(Settings.parameter == setting_name).delete_instance()
+                return True
+            except Settings.DoesNotExist:
+                return None
+
+        return SettingsCache.write_through(setting_name, None, delete)
 
     @staticmethod
     def get_current_user_id():
@@ -670,6 +830,7 @@ class TestObserverDBUtil(unittest.TestCase):
     def setUp(self):
         logging.basicConfig(level=logging.DEBUG)
         self._logger = logging.getLogger(__name__)
+        SettingsCache.clear()  # Each test recreates SETTINGS
 
         # Shut up peewee debug and info messages. Comment out setLevel below to get them
         peewee_logger = logging.getLogger('peewee')
@@ -685,6 +846,58 @@ class TestObserverDBUtil(unittest.TestCase):
             retval2 = ObserverDBUtil.db_load_setting('TestSettingParam2')
             self.assertEqual(retval2, '12345')
 
+    def test_settings_cache(self):
+        with test_database(self.test_db, [Settings]):
+            self.assertTrue(ObserverDBUtil.db_save_setting('current_user_id', 1331))
+            self.assertEqual(1331, ObserverDBUtil.get_current_user_id())
+            self.assertEqual(1331, ObserverDBUtil.get_current_user_id())
+            self.assertEqual((1, 1), (SettingsCache.misses, SettingsCache.hits))
+
+            # Written through: no reload
+            self.assertTrue(ObserverDBUtil.db_save_setting('current_user_id', 1332))
+            self.assertEqual(1332, ObserverDBUtil.get_current_user_id())
+            self.assertTrue(ObserverDBUtil.clear_setting('current_user_id'))
+            self.assertIsNone(ObserverDBUtil.get_current_user_id())
+            self.assertEqual('fallback', ObserverDBUtil.get_setting('current_user_id', 'fallback'))
+            self.assertEqual(1, SettingsCache.misses)
+
+            # Written around: reloaded
+            Settings.create(parameter='trip_number', value='42')
+            self.assertEqual(42, ObserverDBUtil.get_current_trip_id())
+            self.assertEqual(2, SettingsCache.misses)
+
+            Settings.create(parameter='gear_type')
+            self.assertIsNone(ObserverDBUtil.get_setting('gear_type', 'fallback'))
+
+            # Written from another thread's connection, which doesn't move this connection's token: invalidated
+            from unittest.mock import patch
+            with patch.object(SettingsCache, '_current_token', return_value=('this connection',)) as token:
+                self.assertEqual(42, ObserverDBUtil.get_current_trip_id())
+                token.return_value = ('another connection',)
+                self.assertTrue(ObserverDBUtil.db_save_setting('trip_number', '43'))
+                token.return_value = ('this connection',)
+                self.assertEqual(43, ObserverDBUtil.get_current_trip_id())
+
+    def test_settings_cache_other_connection(self):
+        import apsw
+        import tempfile
+        test_dir = tempfile.mkdtemp()
+        db_file = os.path.join(test_dir, 'settings.db')
+        file_db = APSWDatabase(db_file)
+        try:
+            with test_database(file_db, [Settings]):
+                self.assertTrue(ObserverDBUtil.db_save_setting('trip_number', '42'))
+                self.assertEqual(42, ObserverDBUtil.get_current_trip_id())
+
+                # Committed on another connection, without going through write_through: reloaded
+                other = apsw.Connection(db_file)
+                other.cursor().execute("UPDATE SETTINGS SET VALUE = '43' WHERE PARAMETER = 'trip_number'")
+                other.close()
+                self.assertEqual(43, ObserverDBUtil.get_current_trip_id())
+        finally:
+            file_db.close()
+            shutil.rmtree(test_dir)
+
     def test_failcase(self):
         with test_database(self.test_db, [Settings]):
             retval = ObserverDBUtil.db_load_setting('TestSettingParam')
@@ -773,6 +986,23 @@ class TestObserverDBUtil(unittest.TestCase):
             actual_sha1 = ObserverDBUtil.checksum_peewee_model(Settings, logging)
             self.assertEqual(expected_sha1, actual_sha1)
 
+    def test_checksum_peewee_model_cached(self):
+        with test_database(self.test_db, [Settings]):
+            self.assertTrue(ObserverDBUtil.db_save_setting('TestSettingParam1', '1234'))
+            uncached_sha1 = ObserverDBUtil.checksum_peewee_model(Settings, logging)
+            self.assertEqual(uncached_sha1, ObserverDBUtil.checksum_peewee_model(Settings, logging, use_cache=True))
+            from unittest.mock import patch
+            with patch.object(ObserverDBUtil, 'db_coerce_empty_strings_in_number_fields') as coerce:
+                self.assertEqual(uncached_sha1,
+                                 ObserverDBUtil.checksum_peewee_model(Settings, logging, use_cache=True))
+                coerce.assert_not_called()
+
+            # A write by any means invalidates the cached checksum
+            self.test_db.execute_sql("UPDATE SETTINGS SET VALUE = '4321'")
+            updated_sha1 = ObserverDBUtil.checksum_peewee_model(Settings, logging, use_cache=True)
+            self.assertNotEqual(uncached_sha1, updated_sha1)
+            self.assertEqual(updated_sha1, ObserverDBUtil.checksum_peewee_model(Settings, logging))
+
     def test_checksum_peewee_model_exception_not_possible_with_peewee(self):
         clean_test_db = APSWDatabase(':memory:')
         with test_database(clean_test_db, [NoPrimaryKeyTable]):
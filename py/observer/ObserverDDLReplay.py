@@ -0,0 +1,319 @@
+# -----------------------------------------------------------------------------
+# Name:        ObserverDDLReplay.py
+# Purpose:     Apply the DDL/DML scripts downloaded from APPLIED_TRANSACTIONS to observer.db
+#
+# Author:      Will Smith <will.smith@noaa.gov>
+#
+# Created:     October 17, 2026
+# License:     MIT
+#
+# Every script is applied within one transaction, so an SEE-encrypted observer.db is journaled and synced once
+# per pull rather than once per script. Each script runs under its own SAVEPOINT: a script that fails
+# (e.g. reinserting the same record) is rolled back on its own and counted, as before, while any other failure
+# - the database being locked by another connection, or the final COMMIT failing - rolls the whole pull back,
+# leaving the last applied transaction ID unchanged.
+#
+# Runs of single-row INSERTs of literal values into the same table and columns - the bulk of a lookup table
+# update - are bound as parameters and applied with one executemany.
+# ------------------------------------------------------------------------------
+import logging
+import os
+import re
+import unittest
+from collections import namedtuple
+
+from apsw import BusyError, SQLError
+
+_TO_DATE_RE = re.compile(r"TO_DATE\(([^,]*),[^)]*\)")
+
+_INSERT_RE = re.compile(r"^\s*(?P<insert>INSERT\s+(?:OR\s+\w+\s+)?INTO)\s+(?P<table>[\w.\"]+)\s*"
+                        r"(?:\((?P<columns>[^()'\"]*)\)\s*)?VALUES\s*\((?P<values>.*)\)\s*;?\s*$",
+                        re.IGNORECASE | re.DOTALL)
+
+_LITERAL_RE = re.compile(r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<null>NULL)\b|"
+                         r"(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?))\s*(?:,|$)",
+                         re.IGNORECASE)
+
+_INTEGER_RE = re.compile(r"[-+]?\d+$")
+
+_SQLITE_MAX_INTEGER = 2 ** 63 - 1
+
+DDLStatement = namedtuple('DDLStatement', ['transaction_id', 'sql', 'insert_sql', 'params'])
+
+
+def remove_sql_to_date(transaction: str) -> str:
+    """
+    Remove all occurrences of oracle's TO_DATE(x, y) function from transaction
+    @param transaction: DDL with possible TO_DATE(x,y) function (one or more)
+    @return: transaction x without TO_DATE(...) (remove y)
+    """
+    return _TO_DATE_RE.sub(r'\1', transaction)
+
+
+def parse_literal_values(values: str):
+    """
+    Parse the VALUES list of an INSERT into python values, if it holds only literals
+    @param values: e.g. "12, 'O''Brien', NULL, -1.5"
+    @return: list of values, e.g. [12, "O'Brien", None, -1.5], or None if any value is not a literal
+    """
+    params = []
+    pos = 0
+    while pos < len(values):
+        m = _LITERAL_RE.match(values, pos)
+        if not m or m.end() == pos:
+            return None
+        if m.group('string') is not None:
+            params.append(m.group('string')[1:-1].replace("''", "'"))
+        elif m.group('null') is not None:
+            params.append(None)
+        else:
+            number = m.group('number')
+            if _INTEGER_RE.match(number) and abs(int(number)) <= _SQLITE_MAX_INTEGER:
+                params.append(int(number))
+            else:
+                params.append(float(number))  # SQLite reads out of range integers as REAL, too
+        pos = m.end()
+        if values[m.end() - 1] == ',' and pos == len(values):
+            return None  # trailing comma
+    return params if params else None
+
+
+def parse_ddl_statement(transaction_id, sql: str) -> DDLStatement:
+    """
+    Tokenize a downloaded script once, finding single-row INSERTs of literal values
+    @param transaction_id: APPLIED_TRANSACTIONS ID
+    @param sql: script, TO_DATE already removed
+    @return: DDLStatement - insert_sql (with ? parameters) and params are None unless sql is such an INSERT
+    """
+    m = _INSERT_RE.match(sql)
+    params = parse_literal_values(m.group('values')) if m else None
+    if params is None:
+        return DDLStatement(transaction_id, sql, None, None)
+
+    columns = m.group('columns')
+    if columns is not None:
+        columns = ', '.join(c.strip() for c in columns.split(','))
+        if len(columns.split(',')) != len(params):
+            return DDLStatement(transaction_id, sql, None, None)
+    insert_sql = '{insert} {table} {columns}VALUES ({params})'.format(
+        insert=' '.join(m.group('insert').upper().split()),
+        table=m.group('table'),
+        columns=f'({columns}) ' if columns is not None else '',
+        params=', '.join('?' * len(params)))
+    return DDLStatement(transaction_id, sql, insert_sql, params)
+
+
+class ObserverDDLReplay:
+    """
+    Apply APPLIED_TRANSACTIONS scripts to a database in one transaction
+    """
+    expected_transaction_types = {'U', 'I'}
+
+    def __init__(self, db, logger=None):
+        """
+        @param db: peewee APSWDatabase, e.g. ObserverDBBaseModel.database
+        @param logger: defaults to this module's logger
+        """
+        self._db = db
+        self._logger = logger or logging.getLogger(__name__)
+
+    def parse(self, ddl_results):
+        """
+        Decode and tokenize the downloaded scripts
+        @param ddl_results: List of dicts from CLOB
+        @return: list of DDLStatement, in transaction order
+        """
+        statements = []
+        for ddl in ddl_results:
+            if ddl['transaction_type'] not in self.expected_transaction_types:
+                self._logger.warning('Unexpected transaction type {}'.format(ddl['transaction_type']))
+                self._logger.warning(ddl['transaction_ddl'])
+                continue
+            transaction = ddl['transaction_ddl'].decode('utf-8', errors='ignore').rstrip('\0')  # axe \x00
+            transaction = remove_sql_to_date(transaction)
+            statements.append(parse_ddl_statement(ddl['transaction_id'], transaction))
+        return statements
+
+    @staticmethod
+    def batch(statements):
+        """
+        Group consecutive INSERTs that share the same parameterized SQL
+        @param statements: list of DDLStatement
+        @return: list of lists of DDLStatement
+        """
+        batches = []
+        for statement in statements:
+            if batches and statement.insert_sql is not None and batches[-1][-1].insert_sql == statement.insert_sql:
+                batches[-1].append(statement)
+            else:
+                batches.append([statement])
+        return batches
+
+    def replay(self, ddl_results):
+        """
+        Apply the downloaded scripts. A script that fails is rolled back and counted as an error; a BusyError
+        (database locked), or any exception raised outside of a script, rolls back all of them and is raised.
+        @param ddl_results: List of dicts from CLOB
+        @return: successes, errors (counts), last successful transaction ID (None if no script succeeded)
+        """
+        success_count = 0
+        error_count = 0
+        last_transaction_id = None
+
+        batches = self.batch(self.parse(ddl_results))
+        with self._db.atomic():
+            for batch in batches:
+                if len(batch) > 1 and self._execute_batch(batch):
+                    success_count += len(batch)
+                    last_transaction_id = batch[-1].transaction_id
+                    continue
+
+                # Single script, or a batch holding a failing INSERT: run its scripts one at a time
+                for statement in batch:
+                    if self._execute_statement(statement):
+                        success_count += 1
+                        last_transaction_id = statement.transaction_id
+                    else:
+                        error_count += 1
+
+        self._logger.info(f'Applied {success_count} scripts in {len(batches)} batches, {error_count} errors')
+        return success_count, error_count, last_transaction_id
+
+    def _execute_batch(self, batch):
+        """
+        executemany a batch of INSERTs under one SAVEPOINT
+        @param batch: list of DDLStatement with the same insert_sql
+        @return: True if all rows were inserted, False if the batch was rolled back
+        """
+        self._logger.info(f'TXid {batch[0].transaction_id}-{batch[-1].transaction_id}: '
+                          f'{len(batch)} x {batch[0].insert_sql[:40]}...')
+        try:
+            with self._db.savepoint():
+                self._db.get_cursor().executemany(batch[0].insert_sql, [s.params for s in batch])
+            return True
+        except BusyError:
+            raise  # Not the scripts' fault: retrying them one at a time wouldn't help
+        except Exception as e:
+            self._logger.warning(f'Batch failed, applying its scripts one at a time: {e}')
+            return False
+
+    def _execute_statement(self, statement):
+        """
+        Execute a script under its own SAVEPOINT
+        @param statement: DDLStatement
+        @return: True if applied, False if it failed and was rolled back
+        """
+        self._logger.info(f'TXid {statement.transaction_id}: {statement.sql[:15]}...')
+        self._logger.debug(f'Performing: {statement.sql}')
+        try:
+            with self._db.savepoint():
+                self._db.execute_sql(statement.sql, require_commit=False)
+            return True
+        except BusyError:
+            raise  # Database locked: the script itself didn't fail
+        except SQLError as e:
+            self._logger.error(e)
+        except Exception as e:  # might be reinserting the same record etc
+            self._logger.error(e)
+        return False
+
+
+class TestObserverDDLReplay(unittest.TestCase):
+    def setUp(self):
+        from playhouse.apsw_ext import APSWDatabase
+        self.test_db = APSWDatabase(':memory:')
+        self.test_db.execute_sql('CREATE TABLE LOOKUPS (LOOKUP_ID INTEGER PRIMARY KEY, NAME TEXT, VALUE TEXT, '
+                                 'ACTIVE INTEGER, WEIGHT REAL)')
+
+    @staticmethod
+    def _ddl(transaction_id, sql, transaction_type='I'):
+        return {'transaction_id': transaction_id, 'transaction_type': transaction_type,
+                'transaction_ddl': sql.encode('utf-8') + b'\0'}
+
+    def _rows(self):
+        return list(self.test_db.execute_sql('SELECT * FROM LOOKUPS ORDER BY LOOKUP_ID'))
+
+    def test_parse_literal_values(self):
+        self.assertEqual([12, "O'Brien", None, -1.5, '', 'a, b)'],
+                         parse_literal_values("12, 'O''Brien', null , -1.5,'', 'a, b)'"))
+        self.assertEqual([float(2 ** 64)], parse_literal_values(str(2 ** 64)))
+        self.assertIsNone(parse_literal_values("1, SYSDATE"))
+        self.assertIsNone(parse_literal_values("1, 2,"))
+        self.assertIsNone(parse_literal_values("1); DELETE FROM LOOKUPS; SELECT (1"))
+
+    def test_parse_ddl_statement(self):
+        statement = parse_ddl_statement(1, "INSERT INTO LOOKUPS (LOOKUP_ID,NAME) VALUES (1, 'a;b');")
+        self.assertEqual('INSERT INTO LOOKUPS (LOOKUP_ID, NAME) VALUES (?, ?)', statement.insert_sql)
+        self.assertEqual([1, 'a;b'], statement.params)
+        self.assertIsNone(parse_ddl_statement(2, "UPDATE LOOKUPS SET NAME = 'a' WHERE LOOKUP_ID = 1").insert_sql)
+        self.assertIsNone(parse_ddl_statement(3, "INSERT INTO LOOKUPS (LOOKUP_ID) VALUES (1, 2)").insert_sql)
+        self.assertIsNone(parse_ddl_statement(4, "INSERT INTO LOOKUPS (LOOKUP_ID) VALUES (1); "
+                                                 "INSERT INTO LOOKUPS (LOOKUP_ID) VALUES (2)").insert_sql)
+
+    def test_replay_batches_inserts(self):
+        ddl_results = [self._ddl(i, f"INSERT INTO LOOKUPS (LOOKUP_ID, NAME, VALUE, ACTIVE, WEIGHT) "
+                                    f"VALUES ({i}, 'NAME_{i}', '{i:03d}', NULL, TO_DATE('{i}.5', 'X'))")
+                       for i in range(1, 201)]
+        ddl_results.append(self._ddl(201, "UPDATE LOOKUPS SET ACTIVE = 1 WHERE LOOKUP_ID <= 10", 'U'))
+        ddl_results.append(self._ddl(202, "DROP TABLE LOOKUPS", 'D'))  # Unexpected type, ignored
+
+        replay = ObserverDDLReplay(self.test_db)
+        self.assertEqual(2, len(replay.batch(replay.parse(ddl_results))))
+        self.assertEqual((201, 0, 201), replay.replay(ddl_results))
+
+        rows = self._rows()
+        self.assertEqual(200, len(rows))
+        self.assertEqual((7, 'NAME_7', '007', 1, 7.5), rows[6])  # Text stays text, as with the literal SQL
+        self.assertEqual((11, 'NAME_11', '011', None, 11.5), rows[10])
+
+    def test_replay_failing_script_is_rolled_back_alone(self):
+        self.test_db.execute_sql("INSERT INTO LOOKUPS (LOOKUP_ID, NAME) VALUES (2, 'existing')")
+        ddl_results = [self._ddl(i, f"INSERT INTO LOOKUPS (LOOKUP_ID, NAME) VALUES ({i}, 'new')")
+                       for i in range(1, 5)]
+        ddl_results.append(self._ddl(5, "UPDATE LOOKUPS SET NAME = 'updated' WHERE LOOKUP_ID = 1; "
+                                        "UPDATE NO_SUCH_TABLE SET NAME = 'x'", 'U'))
+
+        self.assertEqual((3, 2, 4), ObserverDDLReplay(self.test_db).replay(ddl_results))
+        self.assertEqual([(1, 'new'), (2, 'existing'), (3, 'new'), (4, 'new')],
+                         [row[:2] for row in self._rows()])
+
+    def test_replay_rolls_back_on_failure(self):
+        import tempfile
+        import apsw
+        from playhouse.apsw_ext import APSWDatabase
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'observer.db')
+            self.test_db = APSWDatabase(db_path, timeout=100)
+            self.test_db.execute_sql('CREATE TABLE LOOKUPS (LOOKUP_ID INTEGER PRIMARY KEY, NAME TEXT)')
+            self.test_db.execute_sql("INSERT INTO LOOKUPS (LOOKUP_ID, NAME) VALUES (99, 'existing')")
+            ddl_results = [self._ddl(i, f"INSERT INTO LOOKUPS (LOOKUP_ID) VALUES ({i})") for i in range(1, 4)]
+            ddl_results.insert(1, self._ddl(10, "DELETE FROM LOOKUPS", 'U'))
+            other_connection = apsw.Connection(db_path)
+            try:
+                # Another connection reading: every script applies, but the COMMIT can't get its lock
+                other_connection.cursor().execute('BEGIN; SELECT COUNT(*) FROM LOOKUPS')
+                with self.assertRaises(BusyError):
+                    ObserverDDLReplay(self.test_db).replay(ddl_results)
+                other_connection.cursor().execute('COMMIT')
+                self.assertEqual([(99, 'existing')], [row[:2] for row in self._rows()])
+
+                # Another connection writing: the first script is locked out, which isn't counted as a script error
+                other_connection.cursor().execute('BEGIN IMMEDIATE')
+                with self.assertRaises(BusyError):
+                    ObserverDDLReplay(self.test_db).replay(ddl_results)
+                other_connection.cursor().execute('COMMIT')
+                self.assertEqual([(99, 'existing')], [row[:2] for row in self._rows()])
+
+                self.assertEqual((4, 0, 3), ObserverDDLReplay(self.test_db).replay(ddl_results))
+            finally:
+                other_connection.close()
+                self.test_db.close()
+
+    def test_remove_sql_to_date(self):
+        self.assertEqual("SET A = '1-Jun-2017', B = ''",
+                         remove_sql_to_date("SET A = TO_DATE('1-Jun-2017', 'd-mmm-yyyy'), B = TO_DATE('','DD')"))
+
+
+if __name__ == '__main__':
+    unittest.main()
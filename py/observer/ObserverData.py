@@ -9,10 +9,15 @@
 # ------------------------------------------------------------------------------
 
 # Python implementation of Observer data class
+import json
+import os
+import time
 from operator import itemgetter
 
 from PyQt5.QtCore import pyqtProperty, QObject, QVariant
 
+from py.observer.ObserverConfig import optecs_version, use_encrypted_database
+from py.observer.ObserverDBBaseModel import find_db_path
 from py.observer.ObserverDBUtil import ObserverDBUtil
 
 from py.observer.ObserverDBModels import Lookups, Users, Vessels, \
@@ -21,6 +26,7 @@ from py.observer.ObserverDBModels import Lookups, Users, Vessels, \
 from py.observer.ObserverUsers import ObserverUsers
 
 import logging
+import tempfile
 import unittest
 
 
@@ -36,7 +42,19 @@ class ObserverData(QObject):
     MIX_PACFIN_CODE = 'MIX'
     MIX_SPECIES_CODE = 99999
 
-    def __init__(self):
+    # Snapshot of the lists loaded from the DB, for a quicker start.
+    # Valid while the DB sync transaction and the tables the lists are loaded from are unchanged.
+    SNAPSHOT_FILENAME = 'observer_data_snapshot.json'
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_ATTRIBUTES = ('_observers', '_observers_keys', '_vessels', '_captains', '_ports', '_catch_categories',
+                           '_first_receivers', '_species', '_lookups', '_lookup_fisheries')
+    SNAPSHOT_TABLES = (Users, Vessels, Contacts, VesselContacts, Ports, CatchCategories, IfqDealers, Species, Lookups)
+
+    def __init__(self, snapshot_path=None):
+        """
+        Lists are loaded from the DB on first use, or from the snapshot, if current.
+        @param snapshot_path: snapshot file, e.g. default_snapshot_path(). None: no snapshot.
+        """
         super(ObserverData, self).__init__()
         self._logger = logging.getLogger(__name__)
 
@@ -55,33 +73,109 @@ class ObserverData(QObject):
 
         self._lookups = None
 
-        # Get data tables
-        self._get_observers_orm()
-        self._get_vessels_orm()
-        self._get_captains_orm()
-        self._get_ports_orm()
-        self._get_catch_categories_orm()
-        self._get_first_receivers_orm()
-        self._get_species_orm()
+        # Built from LOOKUPS on first use
+        self._weightmethods = None
+        self._sc_samplemethods = None
+        self._discardreasons = None
+        self._vesseltypes = None
+        self._beaufort = None
+        self._gearperf = None
+        self._gearperf_fg = None
+        self._soaktimes = None
+        self._bs_samplemethods = None
+        self._vessellogbooknames = None
 
-        # Data from LOOKUPS table
-        self._get_lookups_orm()
-        self._weightmethods = self._build_lookup_data('WEIGHT_METHOD')
-        self._sc_samplemethods = self._build_lookup_data('SC_SAMPLE_METHOD')
-        self._discardreasons = self._build_lookup_data('DISCARD_REASON', values_in_text=False)
-        self._vesseltypes = self._build_lookup_data('VESSEL_TYPE')
+        self._create_mix_species_if_not_present()
 
-        self._beaufort = self._get_beaufort_dict()
-        self._gearperf = self._get_gearperf_trawl_dict()
-        self._gearperf_fg = self._get_gearperf_fg_dict()
+        self._snapshot_path = snapshot_path
+        self._snapshot_key = None
+        self._snapshot_attributes_loaded = set()
+        if self._snapshot_path:
+            self._load_snapshot()
 
-        self._trawl_gear_types = self._get_trawl_gear_list()  # Single field, key + desc concatenated
-        self._fg_gear_types = self._get_fg_gear_list()  # Single field, key + desc concatenated
-        self._soaktimes = self._get_avg_soaktimes_list()
-        self._bs_samplemethods = sorted(self._list_lookup_desc('BS_SAMPLE_METHOD', values_in_text=True))
-        self._vessellogbooknames = self._list_lookup_desc('VESSEL_LOGBOOK_NAME')
+    @staticmethod
+    def default_snapshot_path():
+        """
+        @return: snapshot file path beside the DB, or None if the DB is encrypted (the snapshot would not be)
+        """
+        if use_encrypted_database:
+            return None
+        return os.path.join(os.path.dirname(find_db_path()), ObserverData.SNAPSHOT_FILENAME)
 
-        self._create_mix_species_if_not_present()
+    @staticmethod
+    def _get_snapshot_key():
+        """
+        Key identifying the DB contents the lists are loaded from: last sync transaction, and max ROWID per table
+        (the tables are only updated in place by DB sync).
+        @return: JSON-compatible list
+        """
+        max_rowids_sql = 'SELECT ' + ', '.join(f'(SELECT MAX(ROWID) FROM {model._meta.db_table})'
+                                               for model in ObserverData.SNAPSHOT_TABLES)
+        max_rowids = list(list(Users._meta.database.execute_sql(max_rowids_sql))[0])
+        return [ObserverData.SNAPSHOT_VERSION, optecs_version,
+                ObserverDBUtil.get_setting('last_db_transaction'), max_rowids]
+
+    def _load_snapshot(self):
+        """
+        Set the lists in the snapshot, if the snapshot is for the current DB contents.
+        """
+        start_time = time.time()
+        self._snapshot_key = self._get_snapshot_key()
+        try:
+            with open(self._snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            self._logger.info(f'No ObserverData snapshot loaded ({e}).')
+            return
+
+        if snapshot.get('key') != self._snapshot_key:
+            self._logger.info('ObserverData snapshot is out of date, not loaded.')
+            return
+        for attribute, value in snapshot.get('data', {}).items():
+            if attribute in self.SNAPSHOT_ATTRIBUTES:
+                setattr(self, attribute, value)
+                self._snapshot_attributes_loaded.add(attribute)
+        self._logger.info(f'Loaded {len(self._snapshot_attributes_loaded)} lists from ObserverData snapshot '
+                          f'in {time.time() - start_time:.3f} seconds.')
+
+    def save_snapshot(self):
+        """
+        Save the lists loaded so far, if any weren't from the snapshot and the DB is unchanged since start.
+        Intended to be called on exit.
+        """
+        if not self._snapshot_path or self._snapshot_key is None:
+            return
+        data = {attribute: getattr(self, attribute) for attribute in self.SNAPSHOT_ATTRIBUTES
+                if getattr(self, attribute) is not None}
+        if self._captain_vessel_id is not None:
+            data.pop('_captains', None)  # Only captains of all vessels
+        if set(data) <= self._snapshot_attributes_loaded:
+            return
+        if self._get_snapshot_key() != self._snapshot_key:
+            self._logger.info('DB changed since start: ObserverData snapshot not saved.')
+            return
+
+        temp_path = self._snapshot_path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({'key': self._snapshot_key, 'data': data}, f)
+            os.replace(temp_path, self._snapshot_path)
+            self._logger.info(f'Saved {len(data)} lists to ObserverData snapshot {self._snapshot_path}.')
+        except OSError as e:
+            self._logger.warning(f'Unable to save ObserverData snapshot: {e}')
+
+    def _get_lookup_data(self, attribute, build):
+        """
+        Build a LOOKUPS-derived attribute on first use
+        @param attribute: e.g. '_weightmethods'
+        @param build: function returning the attribute's value
+        @return: attribute value
+        """
+        value = getattr(self, attribute)
+        if value is None:
+            value = build()
+            setattr(self, attribute, value)
+        return value
 
     def _create_mix_species_if_not_present(self):
         """
@@ -124,7 +218,7 @@ class ObserverData(QObject):
         for obs in obs_q:
             username = self.make_username(obs)
             self._observers.append(username)
-            self._observers_keys[username] = obs
+            self._observers_keys[username] = obs.user  # USER_ID
         self._observers = sorted(self._observers)  # Sort Alphabetically - should we do this by last name instead?
 
     def _get_vessels_orm(self, rebuild=False):
@@ -258,8 +352,9 @@ class ObserverData(QObject):
         self._species = sorted(self._species)  # Sort Alphabetically
 
     def get_observer_id(self, observer_name):
+        self._get_observers_orm()
         if observer_name in self._observers_keys:
-            return self._observers_keys[observer_name].user  # USER_ID
+            return self._observers_keys[observer_name]
         else:
             return None
 
@@ -273,70 +368,79 @@ class ObserverData(QObject):
 
     @pyqtProperty(QVariant)
     def observers(self):
+        self._get_observers_orm()
         return self._observers
 
     @pyqtProperty(QVariant)
     def vessels(self):
+        self._get_vessels_orm()
         return self._vessels
 
     @pyqtProperty(QVariant)
     def vessel_logbook_names(self):
-        return self._vessellogbooknames
+        return self._get_lookup_data('_vessellogbooknames',
+                                     lambda: self._list_lookup_desc('VESSEL_LOGBOOK_NAME'))
 
     @property
     def weight_methods(self):
-        return self._weightmethods
+        return self._get_lookup_data('_weightmethods', lambda: self._build_lookup_data('WEIGHT_METHOD'))
 
     @property
     def sc_sample_methods(self):
-        return self._sc_samplemethods
+        return self._get_lookup_data('_sc_samplemethods',
+                                     lambda: self._build_lookup_data('SC_SAMPLE_METHOD'))
 
     @property
     def species(self):
+        self._get_species_orm()
         return self._species
 
     @property
     def bs_sample_methods(self):
-        return self._bs_samplemethods
+        return self._get_lookup_data('_bs_samplemethods', lambda: sorted(
+            self._list_lookup_desc('BS_SAMPLE_METHOD', values_in_text=True)))
 
     @property
     def vessel_types(self):
-        return self._vesseltypes
+        return self._get_lookup_data('_vesseltypes', lambda: self._build_lookup_data('VESSEL_TYPE'))
 
     @property
     def discard_reasons(self):
-        return self._discardreasons
+        return self._get_lookup_data('_discardreasons',
+                                     lambda: self._build_lookup_data('DISCARD_REASON', values_in_text=False))
 
     @property
     def catch_categories(self):  # For AutoComplete
+        self._get_catch_categories_orm()
         return self._catch_categories
 
     @property
     def trawl_gear_types(self):  # For AutoComplete
-        return self._trawl_gear_types
+        return self._get_lookup_data('_trawl_gear_types', self._get_trawl_gear_list)
 
     @property
     def fg_gear_types(self):  # For AutoComplete
-        return self._fg_gear_types
+        return self._get_lookup_data('_fg_gear_types', self._get_fg_gear_list)
 
     @property
     def beaufort(self):
-        return self._beaufort
+        return self._get_lookup_data('_beaufort', self._get_beaufort_dict)
 
     @property
     def soaktimes(self):
-        return self._soaktimes
+        return self._get_lookup_data('_soaktimes', self._get_avg_soaktimes_list)
 
     @property
     def gearperf(self):
-        return self._gearperf
+        return self._get_lookup_data('_gearperf', self._get_gearperf_trawl_dict)
 
     @property
     def gearperf_fg(self):
-        return self._gearperf_fg
+        return self._get_lookup_data('_gearperf_fg', self._get_gearperf_fg_dict)
 
     @property
     def first_receivers(self):
+        self._get_first_receivers_orm()
         return self._first_receivers
 
     @staticmethod
@@ -373,6 +477,7 @@ class ObserverData(QObject):
 
     @pyqtProperty(QVariant)
     def lookup_fisheries(self):
+        self._get_lookups_orm()
         return self._lookup_fisheries
 
     @pyqtProperty(QVariant)
@@ -381,6 +486,7 @@ class ObserverData(QObject):
 
     @pyqtProperty(QVariant)
     def captains(self):
+        self._get_captains_orm()
         return self._captains
 
     @pyqtProperty(QVariant)
@@ -396,6 +502,7 @@ class ObserverData(QObject):
 
     @pyqtProperty(QVariant)
     def ports(self):
+        self._get_ports_orm()
         return self._ports
 
     def _build_lookup_data(self, lookup_type, include_empty=True, values_in_text=True):
@@ -612,6 +719,38 @@ class TestObserverData(unittest.TestCase):
         self.assertGreater(len(copyobs), 0)
         self.assertEqual(len(copyobs), len(self.testdata._observers))
 
+    @staticmethod
+    def _all_lists(observer_data):
+        return [observer_data.observers, observer_data.vessels, observer_data.captains, observer_data.ports,
+                observer_data.catch_categories, observer_data.first_receivers, observer_data.species,
+                observer_data.lookup_fisheries, observer_data.weight_methods, observer_data.sc_sample_methods,
+                observer_data.vessel_types, observer_data.discard_reasons, observer_data.vessel_logbook_names,
+                observer_data.bs_sample_methods, observer_data.trawl_gear_types, observer_data.fg_gear_types,
+                observer_data.soaktimes, observer_data.beaufort, observer_data.gearperf, observer_data.gearperf_fg,
+                observer_data.get_observer_id('Eric Brasseur')]
+
+    def test_startup_time_with_snapshot(self):
+        """
+        Benchmark: time to start and load every list, cold and then warm from the snapshot.
+        """
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            snapshot_path = os.path.join(snapshot_dir, ObserverData.SNAPSHOT_FILENAME)
+
+            start_time = time.time()
+            cold = ObserverData(snapshot_path=snapshot_path)
+            cold_lists = self._all_lists(cold)
+            cold_seconds = time.time() - start_time
+            cold.save_snapshot()
+
+            start_time = time.time()
+            warm = ObserverData(snapshot_path=snapshot_path)
+            warm_lists = self._all_lists(warm)
+            warm_seconds = time.time() - start_time
+
+            logging.info(f'ObserverData start: {cold_seconds:.3f} seconds cold, {warm_seconds:.3f} warm.')
+            self.assertEqual(set(ObserverData.SNAPSHOT_ATTRIBUTES), warm._snapshot_attributes_loaded)
+            self.assertEqual(cold_lists, warm_lists)
+
     def test_get_observer(self):
         self.assertEqual(self.testdata.get_observer_id('Eric Brasseur'), 1484)
         self.assertEqual(self.testdata.get_observer_name(1471), 'Amos Cernohouz')
@@ -19,7 +19,6 @@ from typing import Any, Dict, Optional
 
 from apsw import BindingsError, BusyError, SQLError
 from peewee import *
-from playhouse.shortcuts import model_to_dict, dict_to_model
 
 # Database models
 from py.observer import ObserverDBBaseModel
@@ -29,6 +28,7 @@ from py.observer.ObserverDBErrorReportsModels import TripChecksOptecs, TripIssue
 from py.observer.ObserverDBBaseModel import database, DATABASE_TIMEOUT
 from py.observer.ObserverDBSyncController import ObserverDBSyncController
 
+from py.observer.ObserverTripCheckEngine import CheckResult, TripCheckEngine
 from py.observer.ObserverTrip import ObserverTrip   # For getting list of user's valid trips.
 
 from PyQt5.QtCore import pyqtProperty, pyqtSignal, pyqtSlot, QObject, Qt, QThread, QVariant
@@ -562,7 +562,7 @@ class TripChecksOptecsManager:
             logger.info("Checksum for Table TRIP_CHECKS has not yet been calculated.")
             return False
 
-        current_checksum = ObserverDBUtil.checksum_peewee_model(TripChecks, logger)
+        current_checksum = ObserverDBUtil.checksum_peewee_model(TripChecks, logger, use_cache=True)
         if last_checksum != current_checksum:
             logger.info("Checksum for Table TRIP_CHECKS has changed since last trip check evaluation.")
             return False
@@ -642,7 +642,7 @@ class TripChecksOptecsManager:
         # Evaluation completed. Save the checksum on the TRIP_CHECKS table.
         # Will be used in later runs to detect change.
         TripChecksOptecsManager.set_last_trip_checks_table_checksum(
-                ObserverDBUtil.checksum_peewee_model(TripChecks, logger))
+                ObserverDBUtil.checksum_peewee_model(TripChecks, logger, use_cache=True))
 
     @staticmethod
     def _evaluate_checks_on_trip(user_id, trip_id, logger):
@@ -943,16 +943,14 @@ class TripChecksOptecsManager:
 
         start_time = time.time()
 
-        categorized_trip_checks_q = TripChecksOptecs.select().order_by(TripChecksOptecs.trip_check).asc()
-        n_checks = 0
-        n_checks_this_chunk = 0
-        n_busyerror_exceptions = 0
+        # Checks that can't be run on OPTECS are skipped. The others are compiled (once per session) into
+        # parameterized statements and run by TripCheckEngine, which leaves the UI thread free to write
+        # by reading on separate connections, and writing the issues found only at the end.
+        checks_to_run = []
+        n_checks_not_run = 0
+        categorized_trip_checks_q = TripChecksOptecs.select(TripChecksOptecs, TripChecks).join(
+            TripChecks).order_by(TripChecksOptecs.trip_check).asc()
         for trip_check_optecs_record in categorized_trip_checks_q:
-            # This may be running on a background thread. Allow for possibility
-            # of concurrent UI thread DB access by yielding after after every
-            # SQL access (less than database.timeout)
-            time.sleep(0.01)    # Allow context switch to UI thread before every DB operation
-
             check_id = trip_check_optecs_record.trip_check.trip_check
             # TODO: If support for OPTECS-specifics SQL is add, will want to
             # use check_sql_optecs for checks needing mods to run in OPTECS.
@@ -960,45 +958,53 @@ class TripChecksOptecsManager:
             check_sql = trip_check_optecs_record.trip_check.check_sql
             check_status_optecs = TripCheckEvaluationStatus(
                 trip_check_optecs_record.check_status_optecs)  # Run/Don't run
+            if check_status_optecs.value < TripCheckEvaluationStatus.RUN_AS_IS:
+                logger.debug(f"Check {check_id} ({check_status_optecs.name}): not run.")
+                results_counter.tally(TripCheckExecutionStatus.NOT_RUN)
+                n_checks_not_run += 1
+            else:
+                checks_to_run.append(TripCheckEngine.compile(check_id, check_sql))
 
-            replace_parameters = {  # Key value is parameter as contained in PL SQL (namely, a leading colon)
-                ':trip_id': trip_id,
-                ':trip_check_id': check_id,
-                ':created_by': user_id,
-                ':created_date': created_date,
-            }
-            new_issue_field_updates = {  # Key value is peewee field name
-                'created_date': created_date
-            }
-            result = None
-            while result is None:
-                try:
-                    result = TripChecksOptecsManager._execute_one_check(
-                            check_status_optecs, check_sql, replace_parameters,
-                            new_issue_field_updates, logger)
-                except BusyError:
-                    n_busyerror_exceptions += 1
-
-            results_counter.tally(result)
-
-            if ThreadTER.cancel_requested:
-                logger.info(f'Received cancel request')
-                TripChecksOptecsManager.delete_issues_from_ter_run(trip_id, created_date, logger)
-                if callback_cancel_processed:
-                    callback_cancel_processed()
-                return created_date
-
-            n_checks += 1
-            n_checks_this_chunk += 1
+        n_checks = 0
+        n_checks_this_chunk = 0
+
+        def check_done(n_done: int):
+            nonlocal n_checks, n_checks_this_chunk
+            n_checks += n_done
+            n_checks_this_chunk += n_done
             if callback_check_chunk and n_checks_this_chunk >= callback_check_chunk_size:
                 callback_check_chunk(n_checks, callback_check_chunk_size)
                 n_checks_this_chunk = 0
 
+        def check_run(result: CheckResult):
+            if result.error is not None:
+                logger.error(f"Check {result.check_id}: Unexpected exception {result.error}")
+                results_counter.tally(TripCheckExecutionStatus.RUN_FAILED_UNEXPECTEDLY)
+            else:
+                if result.n_issues > 0:
+                    logger.info(f"Check {result.check_id}: triggered.")
+                results_counter.tally(TripCheckExecutionStatus.RUN)
+            check_done(1)
+
+        check_done(n_checks_not_run)
+        engine = TripCheckEngine(database, ObserverDBBaseModel.open_readonly_connection, logger=logger)
+        engine.run(checks_to_run, trip_id, user_id, created_date,
+                   is_canceled=lambda: ThreadTER.cancel_requested, callback_check_done=check_run)
+        n_busyerror_exceptions = engine.n_busy_errors
+
+        if ThreadTER.cancel_requested:
+            logger.info(f'Received cancel request')
+            TripChecksOptecsManager.delete_issues_from_ter_run(trip_id, created_date, logger)
+            if callback_cancel_processed:
+                callback_cancel_processed()
+            return created_date
+
         # Update any lingering trip checks less than a chunk.
         if callback_check_chunk and n_checks_this_chunk >= 0:
             callback_check_chunk(n_checks, callback_check_chunk_size)
 
         elapsed_time = time.time() - start_time
+        engine.log_timings()
         logger.info(f"CHECK_TRIP SQL Execution Results\n" +
                     f"\t(Run Date: '{created_date}', Elapsed Seconds: {elapsed_time:.1f}):\n" +
                     f"{results_counter}")
@@ -1009,93 +1015,6 @@ class TripChecksOptecsManager:
         TripChecksOptecsManager.delete_issues_from_superceded_ter_runs(trip_id, created_date, logger)
         return created_date
 
-    @staticmethod
-    def _execute_one_check(check_status_optecs: TripCheckEvaluationStatus,
-                           sql: str, replace_parameters: Dict[str, Any],
-                           new_issue_field_updates: Dict[str, Any],
-                           logger) -> TripCheckExecutionStatus:
-        """
-        Execute a single trip_check on a single trip. The trip id and the check
-        id are included in replace_parameters. No output, except a new entry in
-        TRIP_ISSUES.
-
-        :param check_status_optecs: Categorization of the check - can it be run
-        on OPTECS? Use to skip no-ops.
-        :param sql: the sql to execute. Return if empty string w/o attempting to run.
-        :param replace_parameters: Replace query variables (dictionary key)
-        with dictionary value. Using format of PL SQL: ':<variable>'
-        (i.e. name preceded by colon).
-        :param new_issue_field_updates: name/value pairs of fields in TRIP_ISSUES
-        whose value should be set after an issue is inserted. A bit of a fixup,
-        first used for created_date.
-        :return: TripCheckExecutionStatus (enumeration). Only method
-        (i.e. not evaluation) where RUN_FAILED_UNEXPECTEDLY can be returned.
-        """
-        trip_id = replace_parameters[':trip_id']
-        check_id = replace_parameters[':trip_check_id']
-        sql_formatted = sqlparse.format(sql, reindent=True, keyword_case='upper')
-
-        # Replace query variables with actual values from replace_parameters,
-        # allowing for upper or lower case.
-        for query_parm, value in replace_parameters.items():
-            sql = sql.replace(query_parm.lower(), str(value))
-            sql = sql.replace(query_parm.upper(), str(value))
-
-        if check_status_optecs.value < TripCheckEvaluationStatus.RUN_AS_IS:
-            logger.debug(f"Check {check_id} ({check_status_optecs.name}): not run.")
-            return TripCheckExecutionStatus.NOT_RUN
-
-        try:
-            n_trip_issues_before = TripIssues.select().count()
-            database.execute_sql(sql)
-            n_trip_issues_after = TripIssues.select().count()
-            issue_added = n_trip_issues_after > n_trip_issues_before
-            if issue_added:
-                # Update the created_date field and any others in new_issue_field_updates.
-                TripChecksOptecsManager._perform_new_issue_field_updates(
-                        trip_id, check_id, new_issue_field_updates, logger)
-                logger.info(f"Check {check_id} ({check_status_optecs.name}): triggered.")
-            return TripCheckExecutionStatus.RUN
-        except (SQLError, BindingsError, IntegrityError) as e:
-            logger.error(f"Check {check_id}: Unexpected exception {e}")
-            logger.debug(f"Check {check_id}: SQL causing exception:\n{sql_formatted}")
-            return TripCheckExecutionStatus.RUN_FAILED_UNEXPECTEDLY
-
-    @staticmethod
-    def _perform_new_issue_field_updates(trip_id: int, check_id: int,
-                                         fields_to_update: Dict[str, Any], logger):
-        """
-        Assumes that a trip issue has just been added for the specified trip
-        and and check. Updates to some null fields are desired.
-
-        Raises exception if field name doesn't exist. Raises exception if
-        pre-existing field value is not null.
-
-        :param fields_to_update: key is Peewee field name, value is the value to be set.
-        :return:
-        """
-        # The just-completed run will have generated trip issues without a created_date.
-        # These are the ones to update.
-        # Most trip checks will generate at most only one trip issue.
-        # But some TCs (e.g. check for location in each haul of a trip) can generate multiple.
-        issues_to_update = TripIssues.select().where(
-            (TripIssues.trip == trip_id) &
-            (TripIssues.trip_check == check_id) &
-            (TripIssues.created_date.is_null(True)))
-        for issue_to_update in issues_to_update:
-            model_as_dict = model_to_dict(issue_to_update)
-            for field_name, new_value in fields_to_update.items():
-                if model_as_dict[field_name] is not None:
-                    msg = f'Attempt to overwrite a non-null value' \
-                          f' {field_name}={model_as_dict[field_name]}.'
-                    logger.error(msg)
-                    raise ObserverErrorReportException(
-                            f"TripID:{trip_id}, CheckID:{check_id}: {msg}")
-                model_as_dict[field_name] = new_value
-                logger.debug(f"TC{check_id}: Set TripIssues.{field_name}={new_value}.")
-            dict_as_model = dict_to_model(TripIssues, model_as_dict)
-            dict_as_model.save()
-
     @staticmethod
     def get_issues_from_last_ter_run(trip_id, logger):
         """
@@ -45,10 +45,9 @@ from PyQt5.QtCore import QVariant
 from PyQt5.QtCore import pyqtProperty
 from PyQt5.QtCore import pyqtSignal
 
-from apsw import SQLError
-
-from py.observer.ObserverDBUtil import ObserverDBUtil
+from py.observer.ObserverDBUtil import ObserverDBUtil, SettingsCache
 from py.observer.ObserverDBBaseModel import database
+from py.observer.ObserverDDLReplay import ObserverDDLReplay, remove_sql_to_date
 from py.observer.ObserverDBModels import Users, fn, Settings
 
 # Enable DEBUG for dump of SOAP header
@@ -171,7 +170,7 @@ class ObserverSoap(QObject):
                                                      uid=user_id,
                                                      dt=formatted_dt)
 
-    def _get_user_id(self, username):
+    def get_user_id(self, username):
         try:
             user_check = Users.get((fn.Lower(Users.first_name.concat(Users.last_name))) == username.lower())
             self._logger.debug('ID {} found for user {}'.format(user_check.user, username))
@@ -179,18 +178,20 @@ class ObserverSoap(QObject):
         except Users.DoesNotExist:
             self._logger.warning('Name not found: {}'.format(username))
 
-    def action_upload(self, username, hashed_pw, filename, unenc_data):
+    def action_upload(self, username, hashed_pw, filename, unenc_data, user_id=None):
         """
         Upload binary blob to web service for parsing
         @param username: user for auth
         @param hashed_pw: hashed pw for auth
         @param filename:  filename from get_filename
         @param unenc_data: UN-encoded data of csv table data (base64 encoding is automatic.)
+        @param user_id: USER_ID of username if already looked up (no DB access, e.g. from an upload thread)
         @return: is_successful, new_trip_id (if TRIPS, else None)
         """
         # http://impl.webservices.obofflinesync.sdm.nwfsc.nmfs.noaa.gov//uploadClientData1
         self._logger.info('Upload client scripts to virtual filename {}'.format(filename))
-        user_id = self._get_user_id(username)
+        if user_id is None:
+            user_id = self.get_user_id(username)
         if not user_id:
             return False
         laptop_name = ObserverDBUtil.get_data_source()
@@ -330,37 +331,16 @@ class ObserverSoap(QObject):
 
     def perform_ddl(self, ddl_results):
         """
-        Perform DDL on database
+        Perform DDL on database, in one transaction (see ObserverDDLReplay)
         @param ddl_results: List of dicts from CLOB
         @return: successes, errors (counts)
         """
-        expected_transaction_types = {'U', 'I'}
-        success_count = 0
-        error_count = 0
-        last_transaction_id = None
-        for ddl in ddl_results:
-            transaction = ddl['transaction_ddl'].decode('utf-8', errors='ignore').rstrip('\0')  # axe \x00
-            if ddl['transaction_type'] in expected_transaction_types:
-                transaction = self.remove_sql_to_date(transaction)
-                self._logger.info(f'TXid {ddl.transaction_id}: {transaction[:15]}...')
-                self._logger.debug(f'Performing: {transaction}')
-                database.set_autocommit(True)
-                try:
-                    database.execute_sql(str(transaction))
-                    success_count += 1
-                    last_transaction_id = ddl['transaction_id']
-                except SQLError as e:
-                    self._logger.error(e)
-                    error_count += 1
-                except Exception as e:  # might be reinserting the same record etc
-                    self._logger.error(e)
-                    error_count += 1
-            else:
-                self._logger.warning('Unexpected transaction type {}'.format(ddl['transaction_type']))
-                self._logger.warning(ddl['transaction_ddl'])
+        success_count, error_count, last_transaction_id = \
+            ObserverDDLReplay(database, self._logger).replay(ddl_results)
 
         if last_transaction_id:
             self.db_sync_transaction_id = last_transaction_id
+        SettingsCache.invalidate()  # Scripts, and the setter above, may update SETTINGS
 
         return success_count, error_count
 
@@ -371,25 +351,7 @@ class ObserverSoap(QObject):
         @param transaction: DDL with possible TO_DATE(x,y) function (one or more)
         @return: transaction x without TO_DATE(...) (remove y)
         """
-        find_str = 'TO_DATE('
-        while transaction.find(find_str) >= 0:
-            start_idx = transaction.find(find_str)
-
-            comma_idx = transaction.find(',', start_idx)
-            if comma_idx == -1:  # malformed
-                return transaction
-
-            end_idx = transaction.find(')', start_idx)
-            if end_idx == -1:  # malformed
-                return transaction
-
-            # Remove TO_DATE( x, y ) -> x
-            before_to_date = transaction[:start_idx]
-            date_param = transaction[start_idx + len(find_str):comma_idx]
-            after_to_date = transaction[end_idx + 1:]
-            transaction = before_to_date + date_param + after_to_date
-
-        return transaction
+        return remove_sql_to_date(transaction)
 
     @property
     def db_sync_transaction_id(self):
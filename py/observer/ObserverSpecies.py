@@ -417,12 +417,11 @@ class ObserverSpecies(QObject):
         """
         Stuff sorted list of species entries as dicts into view model.
         """
-        self._full_list_species_model.clear()
-        self._full_list_species_model.setItems(self._full_list_species.copy())
+        # Keyed by ID, so a reload after filtering only signals the rows that were filtered out
+        self._full_list_species_model.setItems(self._full_list_species.copy(), key='species')
 
     def _load_frequent_list_model(self):
-        self._frequent_list_species_model.clear()
-        self._frequent_list_species_model.setItems(self._frequent_list_species.copy())
+        self._frequent_list_species_model.setItems(self._frequent_list_species.copy(), key='species')
 
     def _load_assoc_species_model(self, catch_category_id=None):
         """
@@ -430,18 +429,16 @@ class ObserverSpecies(QObject):
         @param catch_category_id: 
         @return: 
         """
-        self._assoc_species_model.clear()
         if catch_category_id:
             self._assoc_species.set_catch_category(cc_id=catch_category_id)
         assoc_species_codes = self._assoc_species.get_species_ids()
         self._assoc_species_list = [entry for entry in self._full_list_species
                                     if entry['species'] in assoc_species_codes]
         self._assoc_species_list = ObserverSpecies._sort_species(self._assoc_species_list)
-        self._assoc_species_model.setItems(self._assoc_species_list.copy())
+        self._assoc_species_model.setItems(self._assoc_species_list.copy(), key='species')
 
     def _load_trip_list_model(self):
-        self._trip_list_species_model.clear()
-        self._trip_list_species_model.setItems(self._trip_list_species.copy())
+        self._trip_list_species_model.setItems(self._trip_list_species.copy(), key='species')
 
     @pyqtSlot(QVariant, QVariant, name='setAvailableListModel')
     def set_available_list_model(self, model_type, catch_category_id):
@@ -921,7 +918,7 @@ class ObserverSpecies(QObject):
 
         avail_copy = self.species.copy()
         filtered_avail = self._filter_species_list(avail_copy, common_name)
-        self._available_species_model.setItems(filtered_avail)
+        self._available_species_model.setItems(filtered_avail, key='species')
 
         self.availModelChanged.emit()
 
@@ -0,0 +1,451 @@
+# -----------------------------------------------------------------------------
+# Name:        ObserverTripCheckEngine.py
+# Purpose:     Run the Trip Error Report (TER) checks of TRIP_CHECKS on a trip.
+#
+# Author:      Will Smith <will.smith@noaa.gov>
+#
+# Created:     October 17, 2026
+# License:     MIT
+#
+# Each check's CHECK_SQL is compiled once into parameterized SQL, with :trip_id, :trip_check_id, :created_by and
+# :created_date bound by SQLite instead of substituted into the text, so the same statement text is reused run to
+# run. Issues found are detected from the connection's total_changes() count rather than by counting TRIP_ISSUES
+# before and after every check.
+#
+# Most checks are of the form INSERT INTO TRIP_ISSUES (...) SELECT ... . Their SELECTs are independent of each
+# other, so they are run concurrently on read only connections, and the issues they find are inserted afterwards,
+# with their CREATED_DATE, in one transaction, with a savepoint per check. Checks of any other form, or that read
+# TRIP_ISSUES, are run as-is, one at a time, each in its own transaction, on the database connection. A check
+# failing, whether reading or inserting its issues, is reported as failed and leaves no issue behind; it doesn't
+# stop the other checks.
+#
+# observer.db is not in WAL mode, so a reader holding a transaction for the whole run would block the UI thread's
+# writes: each check reads in its own statement-level snapshot, and no issue is written until every read is done.
+# A statement finding the database locked is retried a short sleep apart, a bounded number of times and not once
+# the run is canceled, then reported as failed.
+# ------------------------------------------------------------------------------
+import logging
+import os
+import re
+import threading
+import time
+import unittest
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Any, Callable, Dict, List, Optional
+
+import apsw
+from apsw import BusyError, SQLError
+from peewee import IntegrityError
+
+_CHECK_PARAMETERS_RE = re.compile(r":(trip_id|trip_check_id|created_by|created_date)\b", re.IGNORECASE)
+
+_INSERT_TRIP_ISSUES_RE = re.compile(r"^\s*INSERT\s+INTO\s+TRIP_ISSUES\s*\((?P<columns>[^()]*)\)\s*"
+                                    r"(?P<select>SELECT\b.*?)[\s;]*$", re.IGNORECASE | re.DOTALL)
+
+CompiledCheck = namedtuple('CompiledCheck', ['check_id', 'sql', 'columns', 'select_sql'])
+CompiledCheck.__doc__ = """
+    sql: CHECK_SQL with its parameters in lower case, ready to be bound
+    columns: TRIP_ISSUES columns inserted by the check, or None if the check can't run concurrently
+    select_sql: the SELECT of the TRIP_ISSUES insert, or None if the check can't run concurrently
+"""
+
+CheckResult = namedtuple('CheckResult', ['check_id', 'n_issues', 'elapsed', 'error'])
+
+
+class TripCheckEngine:
+    """
+    Run a set of trip checks on a trip, inserting the issues found into TRIP_ISSUES
+    """
+    _compiled_checks = {}  # (check_id, CHECK_SQL): CompiledCheck. Kept across runs.
+    BUSY_RETRIES = 50  # Attempts of a statement finding the database locked, before the check is reported as failed
+    BUSY_RETRY_SLEEP = 0.1  # Seconds between attempts
+
+    def __init__(self, db, connection_factory: Optional[Callable] = None, max_workers: Optional[int] = None,
+                 logger=None):
+        """
+        :param db: peewee APSWDatabase - TRIP_ISSUES are written through this connection
+        :param connection_factory: returns a new read only apsw.Connection to the same database.
+            If None, or if db is in memory, the checks' SELECTs are run one at a time on db.
+        :param max_workers: number of checks run concurrently. Defaults to the number of CPUs, at most 4.
+        """
+        self._db = db
+        self._logger = logger or logging.getLogger(__name__)
+        self._connection_factory = connection_factory if db.database != ':memory:' else None
+        self._max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timings = {}  # check_id: seconds, of the last run
+        self.n_busy_errors = 0
+        self._busy_errors_lock = threading.Lock()  # n_busy_errors is counted from the worker threads
+
+    @classmethod
+    def compile(cls, check_id: int, check_sql: str) -> CompiledCheck:
+        """
+        Compile a check, once: bind its parameters by name, and split its INSERT INTO TRIP_ISSUES ... SELECT
+        :param check_id: TRIP_CHECK_ID
+        :param check_sql: CHECK_SQL
+        :return: CompiledCheck
+        """
+        key = (check_id, check_sql)
+        compiled = cls._compiled_checks.get(key)
+        if compiled is None:
+            sql = _CHECK_PARAMETERS_RE.sub(lambda m: ':' + m.group(1).lower(), check_sql)
+            m = _INSERT_TRIP_ISSUES_RE.match(sql)
+            if m and ';' not in m.group('select') and 'TRIP_ISSUES' not in m.group('select').upper():
+                columns = [c.strip().upper() for c in m.group('columns').split(',')]
+                compiled = CompiledCheck(check_id, sql, columns, m.group('select'))
+            else:
+                compiled = CompiledCheck(check_id, sql, None, None)
+            cls._compiled_checks[key] = compiled
+        return compiled
+
+    def run(self, checks: List[CompiledCheck], trip_id: int, user_id: int, created_date: str,
+            is_canceled: Callable[[], bool] = lambda: False,
+            callback_check_done: Optional[Callable[[CheckResult], Any]] = None) -> Dict[int, CheckResult]:
+        """
+        Run the checks on a trip. Issues are inserted with CREATED_DATE set to created_date.
+        :param checks: checks to run
+        :param trip_id: trip
+        :param user_id: bound to :created_by
+        :param created_date: TER run datetime
+        :param is_canceled: polled between checks and between retries of a locked database. The run returns early
+            once it returns True, possibly with some issues already inserted.
+        :param callback_check_done: called with the CheckResult of each check, in the order they complete.
+            Checks finding issues in the concurrent SELECTs complete once their issues are inserted.
+        :return: dict of check_id: CheckResult. error is the exception raised by the check, if any.
+        """
+        bindings_by_check = {c.check_id: {'trip_id': trip_id, 'trip_check_id': c.check_id,
+                                          'created_by': user_id, 'created_date': created_date} for c in checks}
+        concurrent_checks = [c for c in checks if c.select_sql is not None]
+        serial_checks = [c for c in checks if c.select_sql is None]
+        results = {}
+        self.timings = {}
+        self.n_busy_errors = 0
+
+        def check_done(result):
+            results[result.check_id] = result
+            self.timings[result.check_id] = result.elapsed
+            if callback_check_done:
+                callback_check_done(result)
+
+        # Read the issues of the INSERT INTO TRIP_ISSUES ... SELECT checks, then insert them all at once.
+        issues = {}
+        selected = {}  # check_id: CheckResult of the checks with issues to insert
+        for result, issue_rows in self._select_issues(concurrent_checks, bindings_by_check, is_canceled):
+            if issue_rows:
+                issues[result.check_id] = issue_rows
+                selected[result.check_id] = result
+            else:
+                check_done(result)
+        if is_canceled():
+            return results
+        checks_with_issues = [c for c in concurrent_checks if c.check_id in issues]
+        insert_errors = self._insert_issues(checks_with_issues, issues, created_date, is_canceled)
+        for check in checks_with_issues:
+            error = insert_errors.get(check.check_id)
+            result = selected[check.check_id]
+            check_done(result._replace(n_issues=0, error=error) if error else result)
+
+        # Then any other check, as-is
+        for check in serial_checks:
+            if is_canceled():
+                return results
+            check_done(self._execute_check(check, bindings_by_check[check.check_id], trip_id, created_date,
+                                           is_canceled))
+
+        return results
+
+    def _retry_busy(self, operation, is_canceled):
+        """
+        Call operation, retrying it while it finds the database locked, up to BUSY_RETRIES times
+        :param operation: function to call
+        :param is_canceled: no retry once it returns True
+        :return: operation's return value
+        :raises BusyError: once out of retries, or canceled
+        """
+        for attempt in range(1, self.BUSY_RETRIES + 1):
+            try:
+                return operation()
+            except BusyError:
+                with self._busy_errors_lock:
+                    self.n_busy_errors += 1
+                if attempt == self.BUSY_RETRIES or is_canceled():
+                    raise
+                time.sleep(self.BUSY_RETRY_SLEEP)
+
+    def _select_issues(self, checks, bindings_by_check, is_canceled):
+        """
+        Generator running the checks' SELECTs, concurrently if a connection factory was given
+        :return: yields (CheckResult, list of issue rows) as checks complete
+        """
+        if not checks:
+            return
+        if self._connection_factory is None or self._max_workers <= 1 or len(checks) == 1:
+            connections = Queue()
+            connections.put(self._db.get_conn())
+            for check in checks:
+                if is_canceled():
+                    return
+                yield self._select_check_issues(check, bindings_by_check[check.check_id], connections, is_canceled)
+            return
+
+        # Each worker uses one connection of the pool at a time
+        n_workers = min(self._max_workers, len(checks))
+        pool = [self._connection_factory() for _ in range(n_workers)]
+        connections = Queue()
+        for connection in pool:
+            connections.put(connection)
+        try:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(self._select_check_issues, check, bindings_by_check[check.check_id],
+                                           connections, is_canceled) for check in checks]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            for connection in pool:
+                connection.close()
+
+    def _select_check_issues(self, check, bindings, connections, is_canceled):
+        """
+        Run the SELECT of one check
+        :return: CheckResult, list of the issue rows it selected
+        """
+        if is_canceled():
+            return CheckResult(check.check_id, 0, 0.0, None), []
+        connection = connections.get()
+        try:
+            start_time = time.perf_counter()
+            rows = self._retry_busy(lambda: list(connection.cursor().execute(check.select_sql, bindings)),
+                                    is_canceled)
+            elapsed = time.perf_counter() - start_time
+        except (apsw.Error, KeyError) as e:
+            return CheckResult(check.check_id, 0, time.perf_counter() - start_time, e), []
+        finally:
+            connections.put(connection)
+
+        if rows and len(rows[0]) != len(check.columns):
+            e = SQLError(f'{len(rows[0])} values for {len(check.columns)} columns')
+            return CheckResult(check.check_id, 0, elapsed, e), []
+        return CheckResult(check.check_id, len(rows), elapsed, None), rows
+
+    def _insert_issues(self, checks, issues, created_date, is_canceled):
+        """
+        Insert, in check order and in one transaction, the issues selected by the checks.
+        Each check's issues are inserted under a savepoint, so a check failing to insert loses only its own issues.
+        :param checks: checks which found issues
+        :param issues: check_id: list of issue rows
+        :param created_date: TER run datetime
+        :param is_canceled: no retry of a locked database once it returns True
+        :return: dict of check_id: exception, of the checks whose issues could not be inserted
+        """
+        if not checks:
+            return {}
+
+        def insert():
+            errors = {}
+            with self._db.atomic():
+                cursor = self._db.get_cursor()
+                for check in checks:
+                    rows = issues[check.check_id]
+                    columns = check.columns
+                    if 'CREATED_DATE' not in columns:
+                        columns = columns + ['CREATED_DATE']
+                        rows = [row + (created_date,) for row in rows]
+                    try:
+                        with self._db.savepoint():
+                            cursor.executemany(f"INSERT INTO TRIP_ISSUES ({', '.join(columns)}) "
+                                               f"VALUES ({', '.join('?' * len(columns))})", rows)
+                    except BusyError:
+                        raise
+                    except apsw.Error as e:
+                        errors[check.check_id] = e
+            return errors
+
+        try:
+            return self._retry_busy(insert, is_canceled)
+        except BusyError as e:
+            return {check.check_id: e for check in checks}
+
+    def _execute_check(self, check, bindings, trip_id, created_date, is_canceled):
+        """
+        Run a check as-is, in its own transaction, setting the CREATED_DATE of any issue it inserts
+        :return: CheckResult
+        """
+        def execute():
+            with self._db.atomic():
+                cursor = self._db.get_cursor()
+                connection = cursor.getconnection()
+                total_changes = connection.totalchanges()
+                cursor.execute(check.sql, bindings)
+                n_issues = connection.totalchanges() - total_changes  # Over all of the check's statements
+                if n_issues > 0:
+                    cursor.execute('UPDATE TRIP_ISSUES SET CREATED_DATE = ? '
+                                   'WHERE TRIP_ID = ? AND TRIP_CHECK_ID = ? AND CREATED_DATE IS NULL',
+                                   (created_date, trip_id, check.check_id))
+            return n_issues
+
+        start_time = time.perf_counter()
+        try:
+            n_issues = self._retry_busy(execute, is_canceled)
+            return CheckResult(check.check_id, n_issues, time.perf_counter() - start_time, None)
+        except (apsw.Error, IntegrityError, KeyError) as e:  # Including a BusyError once out of retries
+            return CheckResult(check.check_id, 0, time.perf_counter() - start_time, e)
+
+    def log_timings(self, n_slowest=10):
+        """
+        Log the total and the slowest check times of the last run (all of them at debug level)
+        """
+        if not self.timings:
+            return
+        slowest = sorted(self.timings.items(), key=lambda t: t[1], reverse=True)
+        self._logger.info(f"{len(slowest)} checks, {sum(self.timings.values()):.2f} seconds of SQL. Slowest: " +
+                          ', '.join(f'{check_id} ({elapsed:.3f}s)' for check_id, elapsed in slowest[:n_slowest]))
+        self._logger.debug('Check times: ' +
+                           ', '.join(f'{check_id}: {elapsed:.3f}s' for check_id, elapsed in slowest))
+
+
+class TestTripCheckEngine(unittest.TestCase):
+    """
+    Runs on a temporary database holding just enough of TRIPS, FISHING_ACTIVITIES and TRIP_ISSUES
+    """
+    checks_sql = {
+        # Haul without a location
+        1: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID, ERROR_ITEM, ERROR_VALUE, CREATED_BY) "
+           "SELECT :TRIP_CHECK_ID, f.TRIP_ID, 'Haul #', f.FISHING_ACTIVITY_NUM, :created_by "
+           "FROM FISHING_ACTIVITIES f WHERE f.trip_id = :trip_id AND f.LOCATION IS NULL;",
+        # Issue every trip, spanning statements - run as-is
+        2: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID, CREATED_BY) "
+           "SELECT :trip_check_id, :trip_id, :CREATED_BY; "
+           "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID, CREATED_BY) SELECT :trip_check_id, :trip_id, 0",
+        # Never triggered; a time literal isn't a parameter
+        3: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID, ERROR_VALUE) "
+           "SELECT :trip_check_id, TRIP_ID, '12:30' FROM TRIPS WHERE TRIP_ID = :trip_id AND 1 = 0",
+        # Uses a column not in OPTECS
+        4: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID) SELECT :trip_check_id, t.NO_SUCH_COLUMN FROM TRIPS t",
+        # Reads TRIP_ISSUES - run as-is, after the others
+        5: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID, ERROR_VALUE) "
+           "SELECT :trip_check_id, :trip_id, COUNT(*) FROM TRIP_ISSUES WHERE TRIP_ID = :trip_id",
+    }
+
+    def setUp(self):
+        import tempfile
+        import apsw
+        from playhouse.apsw_ext import APSWDatabase
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, 'observer.db')
+        self.test_db = APSWDatabase(db_path, timeout=5000)
+        self.test_db.execute_sql('CREATE TABLE TRIPS (TRIP_ID INTEGER PRIMARY KEY)')
+        self.test_db.execute_sql('CREATE TABLE FISHING_ACTIVITIES (FISHING_ACTIVITY_ID INTEGER PRIMARY KEY, '
+                                 'TRIP_ID INTEGER, FISHING_ACTIVITY_NUM INTEGER, LOCATION TEXT)')
+        self.test_db.execute_sql('CREATE TABLE TRIP_ISSUES (TRIP_ISSUE_ID INTEGER PRIMARY KEY, '
+                                 'TRIP_CHECK_ID INTEGER NOT NULL, TRIP_ID INTEGER NOT NULL, ERROR_ITEM TEXT, '
+                                 'ERROR_VALUE TEXT, CREATED_BY INTEGER, CREATED_DATE TEXT)')
+        with self.test_db.atomic():
+            for trip_id in (1, 2):
+                self.test_db.execute_sql('INSERT INTO TRIPS VALUES (?)', (trip_id,))
+                for haul in range(1, 101):
+                    self.test_db.execute_sql('INSERT INTO FISHING_ACTIVITIES VALUES (NULL, ?, ?, ?)',
+                                             (trip_id, haul, None if haul % 25 == 0 else 'OK'))
+
+        def readonly_connection():
+            connection = apsw.Connection(db_path, flags=apsw.SQLITE_OPEN_READONLY)
+            connection.setbusytimeout(5000)
+            return connection
+        self.readonly_connection = readonly_connection
+
+    def tearDown(self):
+        self.test_db.close()
+        self.tmp_dir.cleanup()
+
+    def _run(self, engine, trip_id=1, **kwargs):
+        checks = [TripCheckEngine.compile(check_id, sql) for check_id, sql in self.checks_sql.items()]
+        return engine.run(checks, trip_id=trip_id, user_id=1331, created_date='01/24/2017 12:45:00', **kwargs)
+
+    def _issues(self):
+        return list(self.test_db.execute_sql('SELECT TRIP_CHECK_ID, TRIP_ID, ERROR_VALUE, CREATED_BY, CREATED_DATE '
+                                             'FROM TRIP_ISSUES ORDER BY TRIP_ISSUE_ID'))
+
+    def test_compile(self):
+        concurrent = TripCheckEngine.compile(1, self.checks_sql[1])
+        self.assertEqual(['TRIP_CHECK_ID', 'TRIP_ID', 'ERROR_ITEM', 'ERROR_VALUE', 'CREATED_BY'], concurrent.columns)
+        self.assertIn(':trip_check_id', concurrent.select_sql)
+        self.assertFalse(concurrent.select_sql.endswith(';'))
+        self.assertIs(concurrent, TripCheckEngine.compile(1, self.checks_sql[1]))
+        self.assertIsNone(TripCheckEngine.compile(2, self.checks_sql[2]).select_sql)
+        self.assertIsNone(TripCheckEngine.compile(5, self.checks_sql[5]).select_sql)
+
+    def test_run_concurrently(self):
+        results_done = []
+        engine = TripCheckEngine(self.test_db, connection_factory=self.readonly_connection, max_workers=3)
+        results = self._run(engine, callback_check_done=results_done.append)
+
+        self.assertEqual({1: 4, 2: 2, 3: 0, 4: 0, 5: 1}, {k: r.n_issues for k, r in results.items()})
+        self.assertEqual(5, len(results_done))
+        self.assertIsInstance(results[4].error, SQLError)
+        self.assertEqual(set(self.checks_sql), set(engine.timings))
+
+        issues = self._issues()
+        self.assertEqual([(1, 1, '25', 1331, '01/24/2017 12:45:00')], issues[:1])
+        self.assertEqual([1, 1, 1, 1, 2, 2, 5], [issue[0] for issue in issues])
+        self.assertEqual((5, 1, '6', None, '01/24/2017 12:45:00'), issues[-1])  # Sees the issues of checks 1 & 2
+        self.assertTrue(all(issue[4] == '01/24/2017 12:45:00' for issue in issues))
+
+    def test_run_serially_matches_concurrently(self):
+        self._run(TripCheckEngine(self.test_db, connection_factory=self.readonly_connection, max_workers=4), 2)
+        concurrent_issues = self._issues()
+        self.test_db.execute_sql('DELETE FROM TRIP_ISSUES')
+        self._run(TripCheckEngine(self.test_db), 2)
+        self.assertEqual(concurrent_issues, self._issues())
+
+    def test_constraint_errors(self):
+        # TRIP_ID is NOT NULL: each check fails, alone, and leaves none of its issues
+        checks_sql = {
+            11: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID) SELECT :trip_check_id, NULL FROM TRIPS",
+            12: "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID) SELECT :trip_check_id, :trip_id; "
+                "INSERT INTO TRIP_ISSUES (TRIP_CHECK_ID, TRIP_ID) SELECT :trip_check_id, NULL",
+            1: self.checks_sql[1],
+            2: self.checks_sql[2],
+        }
+        for engine in (TripCheckEngine(self.test_db, connection_factory=self.readonly_connection, max_workers=2),
+                       TripCheckEngine(self.test_db)):
+            self.test_db.execute_sql('DELETE FROM TRIP_ISSUES')
+            checks = [TripCheckEngine.compile(check_id, sql) for check_id, sql in checks_sql.items()]
+            results = engine.run(checks, trip_id=1, user_id=1331, created_date='01/24/2017 12:45:00')
+            self.assertIsInstance(results[11].error, apsw.ConstraintError)
+            self.assertIsInstance(results[12].error, apsw.ConstraintError)
+            self.assertEqual({11: 0, 12: 0, 1: 4, 2: 2}, {k: r.n_issues for k, r in results.items()})
+            self.assertEqual([1, 1, 1, 1, 2, 2], [issue[0] for issue in self._issues()])
+
+    def test_cancel(self):
+        engine = TripCheckEngine(self.test_db, connection_factory=self.readonly_connection, max_workers=2)
+        results = self._run(engine, is_canceled=lambda: True)
+        self.assertEqual([], self._issues())
+        self.assertTrue(all(r.n_issues == 0 for r in results.values()))
+
+    def test_locked_database(self):
+        # Another connection holds the database locked for the whole run, and nothing waits on it at the SQLite level
+        self.test_db.get_conn().setbusytimeout(0)
+        locker = apsw.Connection(self.test_db.database)
+        locker.cursor().execute('BEGIN EXCLUSIVE')
+        try:
+            engine = TripCheckEngine(self.test_db)
+            engine.BUSY_RETRIES = 3
+            engine.BUSY_RETRY_SLEEP = 0.01
+            results = self._run(engine)
+            self.assertEqual(set(self.checks_sql), set(results))
+            self.assertTrue(all(isinstance(r.error, BusyError) for k, r in results.items() if k != 4))
+            self.assertEqual(3 * (len(self.checks_sql) - 1), engine.n_busy_errors)
+
+            # Canceling stops the retries
+            results = self._run(engine, is_canceled=lambda: engine.n_busy_errors > 0)
+            self.assertEqual(1, engine.n_busy_errors)
+            self.assertEqual(1, len(results))
+        finally:
+            locker.cursor().execute('ROLLBACK')
+            locker.close()
+        self.assertEqual([], self._issues())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,11 @@
 # Created:     Oct 4, 2017
 # License:     MIT
 # ------------------------------------------------------------------------------
+import hashlib
 import textwrap
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from random import randint
 from time import sleep
 
@@ -42,6 +46,24 @@ class SyncDBWorker(QThread):
     is_running = False
     new_trip_ids = []
 
+    # Trip tables uploaded before TRIPS, in order, with the ObserverDBSyncController method generating each CSV
+    TRIP_UPLOAD_TABLES = (
+        ('FISHING_ACTIVITIES', 'generate_fishing_activities_csv'),
+        ('FISHING_LOCATIONS', 'generate_fishing_locations_csv'),
+        ('FISH_TICKETS', 'generate_fish_tickets_csv'),
+        ('TRIP_CERTIFICATES', 'generate_trip_certificates_csv'),
+        ('CATCHES', 'generate_catches_csv'),
+        ('SPECIES_COMPOSITIONS', 'generate_speciescomp_csv'),
+        ('SPECIES_COMPOSITION_ITEMS', 'generate_speciescomp_items_csv'),
+        ('SPECIES_COMPOSITION_BASKETS', 'generate_speciescomp_baskets_csv'),
+        ('CATCH_ADDITIONAL_BASKETS', 'generate_catch_additional_baskets_csv'),
+        ('BIOSPECIMENS', 'generate_bio_specimens_csv'),
+        ('BIOSPECIMEN_ITEMS', 'generate_bio_specimen_items_csv'),
+        ('DISSECTIONS', 'generate_dissections_csv'),
+    )
+    # Settings entry: JSON {trip ID: {table: SHA1 of uploaded CSV}} for trip uploads not yet complete
+    UPLOAD_PROGRESS_SETTING = 'trip_upload_progress'
+
     def __init__(self, *args, **kwargs):
         QThread.__init__(self, None)
         self.trip_ids = kwargs.get('trip_ids', None)
@@ -119,6 +141,8 @@ class SyncDBWorker(QThread):
         """
         Assume currentSOAPUsername and currentSOAPPassword are set
         Throw Exception on error
+        CSV generation of each table overlaps the upload of the previous one. Tables uploaded by an earlier,
+        failed attempt are not re-sent if their CSV is unchanged. TRIPS is always uploaded last.
         @param trip_id: trip to upload
         @return: new trip ID on success, else None
         """
@@ -128,60 +152,42 @@ class SyncDBWorker(QThread):
         user_id = ObserverDBUtil.get_current_user_id()
         self._logger.info('Uploading trip {}...'.format(trip_id))
 
-        # FISHING_ACTIVITIES
-        filename, csvdata = self.sync_controller.generate_fishing_activities_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='FISHING_ACTIVITIES')
-
-        # FISHING_LOCATIONS
-        filename, csvdata = self.sync_controller.generate_fishing_locations_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='FISHING_LOCATIONS')
-
-        # FISH_TICKETS
-        filename, csvdata = self.sync_controller.generate_fish_tickets_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='FISH_TICKETS')
-
-        # TRIP_CERTIFICATES
-        filename, csvdata = self.sync_controller.generate_trip_certificates_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='TRIP_CERTIFICATES')
-
-        # CATCHES
-        filename, csvdata = self.sync_controller.generate_catches_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='CATCHES')
-
-        # SPECIES_COMPOSITIONS
-        filename, csvdata = self.sync_controller.generate_speciescomp_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='SPECIES_COMPOSITIONS')
-
-        # SPECIES_COMPOSITION_ITEMS
-        filename, csvdata = self.sync_controller.generate_speciescomp_items_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='SPECIES_COMPOSITION_ITEMS')
-
-        # SPECIES_COMPOSITION_BASKETS
-        filename, csvdata = self.sync_controller.generate_speciescomp_baskets_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='SPECIES_COMPOSITION_BASKETS')
-
-        # CATCH_ADDITIONAL_BASKETS
-        filename, csvdata = self.sync_controller.generate_catch_additional_baskets_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='CATCH_ADDITIONAL_BASKETS')
-
-        # BIOSPECIMENS
-        filename, csvdata = self.sync_controller.generate_bio_specimens_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='BIOSPECIMENS')
-
-        # BIOSPECIMEN_ITEMS
-        filename, csvdata = self.sync_controller.generate_bio_specimen_items_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='BIOSPECIMEN_ITEMS')
-
-        # DISSECTIONS
-        filename, csvdata = self.sync_controller.generate_dissections_csv(trip_id=trip_id, user_id=user_id)
-        self.perform_sync_operation(csvdata, filename, description='DISSECTIONS')
+        # Look up credentials here: the upload thread only talks to the web service, never to the DB
+        soapusername = self.sync_controller.currentSOAPUsername
+        credentials = {'username': soapusername,
+                       'hashed_pw': self.sync_controller.currentSOAPPassword,
+                       'user_id': self.soap.get_user_id(soapusername)}
+        if not credentials['user_id']:
+            raise Exception(f'Error syncing trip {trip_id}: user {soapusername} not found')
+
+        uploaded_tables = self._load_upload_progress(trip_id)
+        if uploaded_tables:
+            self._logger.info(f'Resuming upload of trip {trip_id}, already uploaded: {list(uploaded_tables)}')
+
+        upload_failed = threading.Event()
+        pending_uploads = deque()  # (description, CSV hash, Future), in upload order
+        with ThreadPoolExecutor(max_workers=1) as uploader:  # One upload at a time, in submission order
+            for description, generate_csv in self.TRIP_UPLOAD_TABLES:
+                if upload_failed.is_set():
+                    break
+                filename, csvdata = getattr(self.sync_controller, generate_csv)(trip_id=trip_id, user_id=user_id)
+                csv_hash = hashlib.sha1((csvdata or '').encode('utf-8')).hexdigest()
+                if uploaded_tables.get(description) == csv_hash:
+                    self._logger.info(f'{description} already uploaded for trip {trip_id}, skipping.')
+                    continue
+                pending_uploads.append((description, csv_hash,
+                                        uploader.submit(self._pipelined_sync_operation, upload_failed,
+                                                        csvdata, filename, description, credentials)))
+                self._record_completed_uploads(trip_id, uploaded_tables, pending_uploads, wait=False)
+            self._record_completed_uploads(trip_id, uploaded_tables, pending_uploads, wait=True)
 
         # TRIPS - Triggers OBSPROD.EXTRACT_TRIPS_v2017 on DB
         new_trip_id = None
         filename, csvdata = self.sync_controller.generate_trips_csv(trip_id=trip_id, user_id=user_id)
         fake_failure = False  # For debugging - True to fake a failed Sync Upload, False for production
         if not fake_failure:
-            uploaded_trip, new_trip_id = self.perform_sync_operation(csvdata, filename, description='TRIPS')
+            uploaded_trip, new_trip_id = self.perform_sync_operation(csvdata, filename, description='TRIPS',
+                                                                     **credentials)
             self._logger.info(f'New TRIP ID: {new_trip_id}')
             self._store_external_trip_id(local_trip_id=trip_id, external_trip_id=new_trip_id)
         else:
@@ -190,6 +196,7 @@ class SyncDBWorker(QThread):
 
         if uploaded_trip:
             self._logger.info('Trip {} upload success.'.format(trip_id))
+            self._save_upload_progress(trip_id, None)
             self._mark_trip_sync_complete(trip_id)
         else:
             # TODO more error handling, mark trip as error state
@@ -200,6 +207,61 @@ class SyncDBWorker(QThread):
 
         return new_trip_id
 
+    def _pipelined_sync_operation(self, upload_failed, csvdata, filename, description, credentials):
+        """
+        Upload one table's CSV on the upload thread, unless an earlier table's upload failed.
+        @param upload_failed: threading.Event, set on the first failed upload
+        @return: perform_sync_operation result
+        """
+        if upload_failed.is_set():
+            raise Exception(f'{description} not uploaded: an earlier table failed')
+        try:
+            return self.perform_sync_operation(csvdata, filename, description, **credentials)
+        except Exception:
+            upload_failed.set()
+            raise
+
+    def _record_completed_uploads(self, trip_id, uploaded_tables, pending_uploads, wait):
+        """
+        Record uploads that completed, in upload order, as trip progress. Throw the first upload error.
+        @param trip_id: trip being uploaded
+        @param uploaded_tables: dict of description: CSV hash, updated in place
+        @param pending_uploads: deque of (description, CSV hash, Future)
+        @param wait: True to wait for all pending uploads to complete
+        """
+        while pending_uploads and (wait or pending_uploads[0][2].done()):
+            description, csv_hash, upload = pending_uploads.popleft()
+            try:
+                upload.result()
+            except Exception:
+                for _, _, not_started in pending_uploads:
+                    not_started.cancel()
+                raise
+            uploaded_tables[description] = csv_hash
+            self._save_upload_progress(trip_id, uploaded_tables)
+
+    def _load_upload_progress(self, trip_id):
+        """
+        @param trip_id: trip being uploaded
+        @return: dict of description: CSV hash of tables already uploaded for trip_id
+        """
+        progress = ObserverDBUtil.db_load_setting_as_json(self.UPLOAD_PROGRESS_SETTING) or {}
+        return progress.get(str(trip_id), {})
+
+    def _save_upload_progress(self, trip_id, uploaded_tables):
+        """
+        @param trip_id: trip being uploaded
+        @param uploaded_tables: dict of description: CSV hash, or None to clear (trip upload complete)
+        """
+        progress = ObserverDBUtil.db_load_setting_as_json(self.UPLOAD_PROGRESS_SETTING) or {}
+        if uploaded_tables:
+            progress[str(trip_id)] = uploaded_tables
+        elif str(trip_id) in progress:
+            progress.pop(str(trip_id))
+        else:
+            return
+        ObserverDBUtil.db_save_setting_as_json(self.UPLOAD_PROGRESS_SETTING, progress)
+
     def _mark_trip_sync_complete(self, trip_id):
         self._logger.info('Marking Trip {} as completed sync.'.format(trip_id))
         try:
@@ -233,13 +295,13 @@ class SyncDBWorker(QThread):
         except Trips.DoesNotExist as e:
             self._logger.error(f'Bad {local_trip_id} passed: {e}')
 
-    def perform_sync_operation(self, csvdata, filename, description):
+    def perform_sync_operation(self, csvdata, filename, description, username=None, hashed_pw=None, user_id=None):
         if not csvdata:
             self._logger.info('No data for {} ({}), skipping.'.format(filename, description))
             return True, None
         unenc_data = csvdata.encode('utf-8')
-        soapusername = self.sync_controller.currentSOAPUsername
-        hashed_pw = self.sync_controller.currentSOAPPassword
+        soapusername = username or self.sync_controller.currentSOAPUsername
+        hashed_pw = hashed_pw or self.sync_controller.currentSOAPPassword
 
         simulation_debug_mode = False  # True for testing, False for production
         if simulation_debug_mode:
@@ -252,7 +314,8 @@ class SyncDBWorker(QThread):
                 updated, new_trip_id = self.soap.action_upload(username=soapusername,
                                                                hashed_pw=hashed_pw,
                                                                filename=filename,
-                                                               unenc_data=unenc_data)
+                                                               unenc_data=unenc_data,
+                                                               user_id=user_id)
             except Exception as e:
                 updated = False
                 description = description + ': ' + str(e)
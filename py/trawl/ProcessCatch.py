@@ -50,6 +50,9 @@ class SpeciesListModel(FramListModel):
         self.add_role_name(name='catchContentId')
         self.add_role_name(name='catchId')
 
+        # Species are added and removed by displayName
+        self.add_index('displayName')
+
 
 class SpeciesTreeModel(FramTreeModel):
     """
@@ -430,13 +433,13 @@ class ProcessCatch(QObject):
         self._filter = filter_text
 
         self.avFullSpeciesFiltered = self._filter_model(filter_text=filter_text, data=self.avFullSpecies, type="Taxon")
-        self.avFullModel.setItems(self.avFullSpeciesFiltered)
+        self.avFullModel.setItems(self.avFullSpeciesFiltered, key="displayName")
 
         self.avRecentSpeciesFiltered = self._filter_model(filter_text=filter_text, data=self.avRecentSpecies, type="Taxon")
-        self.avRecentModel.setItems(self.avRecentSpeciesFiltered)
+        self.avRecentModel.setItems(self.avRecentSpeciesFiltered, key="displayName")
 
         self.avDebrisFiltered = self._filter_model(filter_text=filter_text, data=self.avDebris, type="Debris")
-        self.avDebrisModel.setItems(self.avDebrisFiltered)
+        self.avDebrisModel.setItems(self.avDebrisFiltered, key="displayName")
 
     @pyqtSlot(QModelIndex, result=bool)
     def add_list_item(self, index):
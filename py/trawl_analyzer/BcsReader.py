@@ -32,7 +32,9 @@ import serial
 import csv
 import math
 from threading import Thread
+import unittest
 import arrow
+import numpy as np
 # from pyCollector.Utilities import TimeConverter
 # from kivy.event import EventDispatcher
 # from kivy.logger import Logger
@@ -40,6 +42,95 @@ import arrow
 BUFFER_LIMIT = 10000000
 
 
+class NwfscBcsDecoder:
+
+    """
+    Incremental decoder of the data section of a NWFSC/FRAM BCS memory dump, i.e. the FF...FF header holding the
+    start date/time, the 6 digit X/Y angle records and the EE...EE footer.  Text can be fed to it in chunks as it is
+    received from the serial port, complete records are decoded as they arrive into numpy arrays and the timestamps
+    are computed from the start date/time and the 1Hz record index when the tilt values are requested.  Records
+    holding line noise, i.e. anything but digits, are dropped
+    """
+    RECORD_DTYPE = np.dtype([('x', 'u1', (3,)), ('y', 'u1', (3,))])
+    RECORD_SIZE = 6
+    OFFSET_HOUR = "-07:00"
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = ''
+        self._x = []
+        self._y = []
+        self._valid = []
+        self.start_datetime = None
+        self.is_complete = False
+
+    def feed(self, text):
+        """
+        Method to decode the next chunk of the BCS text
+        :param text: str
+        :return: None
+        """
+        if self.is_complete or not text:
+            return
+
+        self._buffer += text
+
+        if self.start_datetime is None:
+            header = re.search('FF\d+FF', self._buffer)
+            if not header:
+                return
+            beginning = header.group().strip('F')
+            self.start_datetime = arrow.get(beginning[8:20] + self.OFFSET_HOUR, 'MMDDYYHHmmssZZ')
+            self._buffer = self._buffer[header.end():]
+
+        # The data ends at the EE footer
+        end = self._buffer.find('E')
+        if end >= 0:
+            self._buffer = self._buffer[:end]
+            self.is_complete = True
+
+        size = len(self._buffer) // self.RECORD_SIZE * self.RECORD_SIZE
+        if size:
+            records = np.frombuffer(self._buffer[:size].encode('ascii', errors='replace'), dtype=self.RECORD_DTYPE)
+            x = records['x'].astype(np.int64) - ord('0')
+            y = records['y'].astype(np.int64) - ord('0')
+            self._valid.append(((x >= 0) & (x <= 9) & (y >= 0) & (y <= 9)).all(axis=1))
+            digits = np.array([100, 10, 1])
+            self._x.append(x @ digits)
+            self._y.append(y @ digits)
+        self._buffer = self._buffer[size:]
+
+    def __len__(self):
+        return sum(len(x) for x in self._x)
+
+    def get_tilt_values(self, angles='x'):
+        """
+        Method to return the decoded tilt values
+        :param angles:  x / xy - whether to return only the X or X and Y angles
+        :return: tilt_values - N x 2 or N x 3 list of date-time, X tilt[, Y tilt]
+        """
+        if self.start_datetime is None or len(self) == 0:
+            return []
+
+        # Drop the line noise records, keeping the 1Hz timing of the others
+        valid = np.concatenate(self._valid)
+        x = np.concatenate(self._x)[valid]
+        date_times = np.datetime64(self.start_datetime.naive, 's') + np.arange(len(valid)).astype('timedelta64[s]')
+        date_times = np.char.add(np.datetime_as_string(date_times[valid], unit='s'),
+                                 self.start_datetime.format('ZZ')).tolist()
+
+        if angles == 'x':
+            # Values are converted to -179 <= x <= 180 and bounded to -10 <= x <= 100 for plotting in Integrator
+            values = np.clip(np.where(x < 270, 90 - x, 450 - x), -10, 100)
+            return [list(row) for row in zip(date_times, values.tolist())]
+
+        elif angles == 'xy':
+            y = np.concatenate(self._y)[valid]
+            return [list(row) for row in zip(date_times, (x - 180).tolist(), (y - 180).tolist())]
+
+        return []
+
+
 # class BcsReader(EventDispatcher):
 class BcsReader:
 
@@ -65,6 +156,7 @@ class BcsReader:
         self.priority_count = 1
 
         self.is_streaming = False
+        self._decoder = None
 
 
         if raw_content:
@@ -112,6 +204,7 @@ class BcsReader:
             return
 
         self.raw_content = raw_content
+        self._decoder = None
         format = 'database'
         self.position = position
         self.sensor_type = self.validate_sensor_type()
@@ -279,6 +372,7 @@ class BcsReader:
         is_successful = False
 
         self.is_streaming = True
+        self._decoder = NwfscBcsDecoder()
 
         try:
             while True:
@@ -397,7 +491,17 @@ class BcsReader:
                 # buffer += current_data
                 # TODO Check that we only receive \x10\x130-9EFZ characters
 
-                buffer += conn.read(conn.inWaiting()).decode('ISO-8859-1')
+                current_data = conn.read(conn.inWaiting()).decode('ISO-8859-1')
+                buffer += current_data
+
+                # Decode the records as they arrive so that the data is ready once the download ends.  If that
+                # fails, the data is parsed at the end of the download instead, without aborting the download
+                if self._decoder is not None:
+                    try:
+                        self._decoder.feed(current_data)
+                    except Exception as ex:
+                        print('Error decoding serial data, parsing it once downloaded:', ex)
+                        self._decoder = None
 
             conn.close()
 
@@ -817,84 +921,43 @@ class BcsReader:
         :param angles:  x / xy - whether to return only the X or X and Y angles
         :return: tilt_values - N x 3 dimensional array of date-time, X tilt, Y tilt
         """
-        # byte_count_arr = [int(x.strip('\r\nH')) if int(x.strip('\r\nH')) else x.strip('\r\nH')
-        # 					  for x in self.content_list[0].split(' L')]
-        # byte_count = byte_count_arr[0]*65536 + byte_count_arr[1]
-        byte_count = self.get_byte_count(byte_string=self.content_list[0])
-        # print('Total byte size:', byte_count, 'bytes')
+        # Use the records decoded while streaming from the serial port when available
+        decoder = self._decoder
+        if decoder is None or not decoder.is_complete:
+            decoder = NwfscBcsDecoder()
+            decoder.feed(self.content_list[1])
 
-        beginning = re.search('FF\d+FF', self.content_list[1]).group().strip('F')
-        ending = re.search('EE\d+EEZ{0,2}', self.content_list[1]).group().strip('EZ')
-        count = ending[20:25]
-        data = re.search('FF\d+EE', self.content_list[1]).group().strip('FE')
+        self.start_datetime = decoder.start_datetime
 
-        # print('File Data:')
-        # print('\tBeginning:', beginning)
-        # print('\tEnding:', ending)
-        # print('\tCount:', count)
-
-        if time.daylight:
-            offset_hour = -time.altzone / 3600
-        else:
-            offset_hour = -time.timezone / 3600
-
-        # start_datetime = beginning[8:10] + '/' + beginning[10:12] + '/' + beginning[12:14] + \
-        #             ' ' + beginning[14:16] + ':' + beginning[16:18] + ':' + beginning[18:20] + \
-        #             ' ' + '%02d:00' % offset_hour
-        # self.start_datetime = parser.parse(start_datetime)
-
-
-        offset_hour = '%02d:00' % offset_hour
-
-        offset_hour = "-07:00"
-        self.start_datetime = arrow.get(beginning[8:20] + offset_hour, 'MMDDYYHHmmssZZ')
-
-        # print('\nParsed Results:  (Note: parsed times are in ISO format, UTC time zone (7 hours ahead)')
-        # print('\tStart Date-Time:', self.start_datetime.isoformat())
-
-
-        # TODO Convert 2 angle values into 1 angle between 0 and 90
-        # Iterate through the data, turning it into a N x 3 lis
-        tilt_values = []
-        current_datetime = self.start_datetime
-        for values in re.findall(".{6}", data):
+        # Format:  date-time, X, Y
+        return decoder.get_tilt_values(angles=angles)
 
-            if angles == 'x':
 
-                value = int(values[0:3])
+class TestNwfscBcsDecoder(unittest.TestCase):
 
-                if 0 <= value < 270:
-                    value = 90 - value
-                else:
-                    value = 450 - value
+    def test_feed(self):
+        content = "FF00000000052116181430FF" + "180180" + "090270" + "300100" + "EE0000000005211618143300003EEZZ"
 
-                # If the value is not between 0 <= x <= 359, then it is a bad value, indicate so
-                # TODO
+        decoder = NwfscBcsDecoder()
+        for i in range(0, len(content), 5):
+            decoder.feed(content[i:i+5])
 
-                # else:
-                # 	value = 999		# Bad Data
+        self.assertTrue(decoder.is_complete)
+        self.assertEqual(decoder.get_tilt_values(angles='x'),
+                         [["2016-05-21T18:14:30-07:00", -10], ["2016-05-21T18:14:31-07:00", 0],
+                          ["2016-05-21T18:14:32-07:00", 100]])
+        self.assertEqual(decoder.get_tilt_values(angles='xy')[1], ["2016-05-21T18:14:31-07:00", -90, 90])
 
-                # Values have been converted between -179 <= x <= 180
-                # Set overall boundaries for what will be returned and plotted in Integrator
-                if value < -10:
-                    value = -10
-                elif value > 100:
-                    value = 100
+    def test_feed_line_noise(self):
+        content = "FF00000000052116181430FF" + "180180" + "09\xb5270" + "300100" + "EE0000000005211618143300003EEZZ"
 
-                # tilt_values.append([current_datetime.astimezone().isoformat(), value])
-                tilt_values.append([current_datetime.isoformat(), value])
+        decoder = NwfscBcsDecoder()
+        decoder.feed(content)
 
-            elif angles == 'xy':
-                # tilt_values.append([current_datetime.astimezone().isoformat(), int(values[0:3])-180, int(values[3:6])-180])
-                tilt_values.append([current_datetime.isoformat(), int(values[0:3])-180, int(values[3:6])-180])
+        self.assertTrue(decoder.is_complete)
+        self.assertEqual(decoder.get_tilt_values(angles='xy'),
+                         [["2016-05-21T18:14:30-07:00", 0, 0], ["2016-05-21T18:14:32-07:00", 120, -80]])
 
-            current_datetime.shift(seconds=1)
-            # current_datetime += timedelta(seconds=1)
-
-        # Format:  date-time, X, Y
-        # print(tilt_values)
-        # print('angle:', angles)
-        return tilt_values
 
 if __name__ == '__main__':
 
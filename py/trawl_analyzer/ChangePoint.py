@@ -0,0 +1,356 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        ChangePoint.py
+# Purpose:     Change point engine used to auto-calculate the Begin Tow and Net Off Bottom waypoints
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+Change point detection for the bottom contact sensor (BCS) signals.  Both methods work only on the cumulative sums
+of the values and of their squares, so the mean and least squares error of any run of points, and therefore the
+score of any candidate change point, cost a constant number of operations:
+
+- bayesian_change_point - the single change point posterior used by autoCalculateWaypoints.  The peaks of its
+  log posterior give the Begin Tow and Net Off Bottom times
+- multiple_change_times - the Multiple Change Times dynamic program (Kay, Fundamentals of Statistical Signal
+  Processing, Volume II, pp. 449-455, 471-472), which splits the signal into a number of constant levels
+
+When numba is installed the dynamic program runs as a compiled kernel, otherwise it is vectorized with numpy.
+
+The module can also be run as a script to replay recorded hauls, i.e. pickled points data frames with times, values
+and invalid columns as saved from autoCalculateWaypoints, comparing the engine to the original pure Python
+implementation:
+
+    python -m py.trawl_analyzer.ChangePoint --tolerance 1 haul1.pickle haul2.pickle ...
+
+Without any haul files it runs the unit tests.
+"""
+import argparse
+import logging
+import math
+import sys
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+EXTREMA_ORDER = 10
+
+
+def relative_extrema(data, comparator, axis=0, order=1, mode='clip'):
+    """
+    Method adapted from scipy.signal.argrelextrema to determine the extrema of a dataset, used instead of scipy
+    as importing scipy fails when frozen with cxFreeze:  https://github.com/anthony-tuininga/cx_Freeze/issues/233
+
+    :param data: numpy array
+    :param comparator: callable - np.greater or np.less
+    :param axis: int
+    :param order: int - how many points on each side to use for the comparison
+    :param mode: str - how the edges of the array are treated, see numpy.take
+    :return: tuple of arrays of the indices of the extrema
+    """
+    if (int(order) != order) or (order < 1):
+        raise ValueError('Order must be an int >= 1')
+
+    datalen = data.shape[axis]
+    locs = np.arange(0, datalen)
+
+    results = np.ones(data.shape, dtype=bool)
+    main = data.take(locs, axis=axis, mode=mode)
+    for shift in range(1, order + 1):
+        plus = data.take(locs + shift, axis=axis, mode=mode)
+        minus = data.take(locs - shift, axis=axis, mode=mode)
+        results &= comparator(main, plus)
+        results &= comparator(main, minus)
+        if ~results.any():
+            break
+
+    return np.where(results)
+
+
+def bayesian_change_point(values):
+    """
+    Method to calculate the log posterior of a single change point at every position of the values
+
+    :param values: list or numpy array of float
+    :return: numpy array of length n - 1, element m is the score of a change between points m and m + 1
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n < 2:
+        return np.array([], dtype=np.float64)
+
+    dbar = values.mean()
+    fac = np.mean(values * values) - dbar ** 2
+
+    summup = np.cumsum(values)
+    summ = summup[-1]
+    pos = np.arange(1, n, dtype=np.float64)
+    mscale = 4 * pos * (n - pos)
+    q = 2 * summup[:-1] - summ
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = -np.square(dbar * (n - 2 * pos) + q) / mscale + fac
+        return -(n / 2.0 - 1) * np.log(n * u / 2) - 0.5 * np.log(pos * (n - pos))
+
+
+def bayesian_change_point_reference(values):
+    """
+    Method holding the original pure Python loop implementation of bayesian_change_point, kept as the reference that
+    the replay benchmark compares against
+
+    :param values: list of float
+    :return: list of float
+    """
+    n = len(values)
+    dbar = np.mean(values)
+    dsbar = np.mean(np.multiply(values, values))
+
+    fac = dsbar - np.square(dbar)
+
+    summ = 0
+    summup = []
+
+    for z in range(n):
+        summ += values[z]
+        summup.append(summ)
+
+    y = []
+
+    for m in range(n - 1):
+        pos = m + 1
+        mscale = 4 * (pos) * (n - pos)
+        Q = summup[m] - (summ - summup[m])
+        U = -np.square(dbar * (n - 2 * pos) + Q) / float(mscale) + fac
+        y.append(-(n / float(2) - 1) * math.log(n * U / 2) - 0.5 * math.log((pos * (n - pos))))
+
+    return y
+
+
+def _segment_costs(s1, s2, starts, end):
+    """
+    Method to compute the least squares error of the values[start:end] runs for an array of starts
+    :param s1: numpy array - cumulative sum of the values, with a leading 0
+    :param s2: numpy array - cumulative sum of the squared values, with a leading 0
+    :param starts: numpy array of int
+    :param end: int
+    :return: numpy array of float
+    """
+    counts = end - starts
+    sums = s1[end] - s1[starts]
+    return s2[end] - s2[starts] - sums * sums / counts
+
+
+def _multiple_change_times_numpy(s1, s2, n, segments):
+    """
+    Method to run the Multiple Change Times dynamic program with numpy, one vectorized minimization per segment end
+    :return: tuple of (costs, splits) arrays of shape (segments, n + 1)
+    """
+    costs = np.full((segments, n + 1), np.inf)
+    splits = np.zeros((segments, n + 1), dtype=np.int64)
+
+    ends = np.arange(1, n + 1)
+    costs[0, 1:] = _segment_costs(s1, s2, np.zeros(n, dtype=np.int64), ends)
+
+    for k in range(1, segments):
+        for end in range(k + 1, n + 1):
+            starts = np.arange(k, end)
+            total = costs[k - 1, starts] + _segment_costs(s1, s2, starts, end)
+            best = total.argmin()
+            costs[k, end] = total[best]
+            splits[k, end] = starts[best]
+
+    return costs, splits
+
+
+def _multiple_change_times_loop(s1, s2, n, segments):
+    """
+    Method to run the Multiple Change Times dynamic program as plain loops, compiled by numba when it is installed
+    :return: tuple of (costs, splits) arrays of shape (segments, n + 1)
+    """
+    costs = np.full((segments, n + 1), np.inf)
+    splits = np.zeros((segments, n + 1), dtype=np.int64)
+
+    for end in range(1, n + 1):
+        costs[0, end] = s2[end] - s1[end] * s1[end] / end
+
+    for k in range(1, segments):
+        for end in range(k + 1, n + 1):
+            for start in range(k, end):
+                sums = s1[end] - s1[start]
+                total = costs[k - 1, start] + s2[end] - s2[start] - sums * sums / (end - start)
+                if total < costs[k, end]:
+                    costs[k, end] = total
+                    splits[k, end] = start
+
+    return costs, splits
+
+
+if njit is not None:
+    _multiple_change_times_kernel = njit(cache=True)(_multiple_change_times_loop)
+else:
+    _multiple_change_times_kernel = _multiple_change_times_numpy
+
+
+def multiple_change_times(values, segments=3):
+    """
+    Method to find the change times that split the values into the given number of constant levels with the least
+    total squared error.  For a BCS signal the three levels are the net descending, on bottom and ascending.
+
+    :param values: list or numpy array of float
+    :param segments: int - number of constant levels, giving segments - 1 change times
+    :return: list of int - the index of the first point of each level after the first one
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n < segments:
+        return []
+
+    # Centering the values keeps the cumulative sum of squares from losing precision over long hauls
+    values = values - values.mean()
+    s1 = np.concatenate([[0.0], np.cumsum(values)])
+    s2 = np.concatenate([[0.0], np.cumsum(values * values)])
+
+    costs, splits = _multiple_change_times_kernel(s1, s2, n, segments)
+
+    changes = []
+    end = n
+    for k in range(segments - 1, 0, -1):
+        end = int(splits[k, end])
+        changes.insert(0, end)
+
+    return changes
+
+
+def auto_calculate_waypoints(points, start_time):
+    """
+    Method to auto-calculate the Begin Tow and Net Off Bottom waypoints from the points of a BCS signal
+
+    :param points: pandas DataFrame with times, values and invalid columns
+    :param start_time: datetime or str - only the valid points at or after this time are used
+    :return: dict - Begin Tow / Net Off Bottom: pandas Timestamp, empty when the peaks are not found
+    """
+    times = pd.to_datetime(points["times"])
+    mask = (times >= start_time) & (~points["invalid"].fillna(False).astype(bool))
+    times = times.loc[mask]
+
+    y = bayesian_change_point(points.loc[mask, "values"].values)
+    maxm = relative_extrema(y, np.greater, order=EXTREMA_ORDER)
+
+    results = dict()
+    if len(maxm[0]) < 2:
+        logging.error(f"Error getting auto-calculated waypoints, found {len(maxm[0])} change points, "
+                      "likely that the Doors Fully Out is after the BCS signal change")
+        return results
+
+    results["Begin Tow"] = times.iloc[maxm[0][0]]
+    results["Net Off Bottom"] = times.iloc[maxm[0][1]]
+
+    return results
+
+
+def replay_hauls(paths, tolerance=1.0):
+    """
+    Method to replay recorded hauls through the change point engine and the original implementation, comparing the
+    waypoints and timing both
+
+    :param paths: list of str - pickled points DataFrames
+    :param tolerance: float - maximum waypoint difference in seconds
+    :return: list of dict - one per haul with the path, the two timings and whether the waypoints matched
+    """
+    results = []
+    for path in paths:
+        points = pd.read_pickle(path)
+        start_time = pd.to_datetime(points["times"]).min()
+        mask = ~points["invalid"].fillna(False).astype(bool)
+        values = points.loc[mask, "values"].tolist()
+
+        start = time.perf_counter()
+        waypoints = auto_calculate_waypoints(points=points, start_time=start_time)
+        engine_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y = np.asarray(bayesian_change_point_reference(values))
+        reference_time = time.perf_counter() - start
+
+        maxm = relative_extrema(y, np.greater, order=EXTREMA_ORDER)
+        times = pd.to_datetime(points.loc[mask, "times"])
+        reference = {k: times.iloc[maxm[0][i]] for i, k in enumerate(["Begin Tow", "Net Off Bottom"])
+                     if len(maxm[0]) > i}
+
+        matched = waypoints.keys() == reference.keys() and \
+            all(abs((waypoints[k] - reference[k]).total_seconds()) <= tolerance for k in reference)
+
+        results.append({"path": path, "points": len(values), "engine_time": engine_time,
+                        "reference_time": reference_time, "matched": matched})
+
+        logging.info(f"{path}: {len(values)} points, engine {engine_time:.4f}s, "
+                     f"reference {reference_time:.4f}s, matched: {matched}")
+
+    return results
+
+
+class TestChangePoint(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.values = np.concatenate([rng.normal(0, 2, 300), rng.normal(88, 2, 1200), rng.normal(0, 2, 250)])
+
+    def test_bayesian_change_point(self):
+        y = bayesian_change_point(self.values)
+        np.testing.assert_allclose(y, bayesian_change_point_reference(self.values.tolist()), rtol=1e-9)
+
+        maxm = relative_extrema(y, np.greater, order=EXTREMA_ORDER)
+        self.assertLessEqual(abs(maxm[0][0] - 300), 2)
+        self.assertLessEqual(abs(maxm[0][1] - 1500), 2)
+
+    def test_multiple_change_times(self):
+        changes = multiple_change_times(self.values[::5], segments=3)
+        self.assertEqual(changes, [60, 300])
+
+        self.assertEqual(_multiple_change_times_numpy(*self._sums(self.values[::10]), 3)[1].tolist(),
+                         _multiple_change_times_loop(*self._sums(self.values[::10]), 3)[1].tolist())
+
+    @staticmethod
+    def _sums(values):
+        return np.concatenate([[0.0], np.cumsum(values)]), np.concatenate([[0.0], np.cumsum(values * values)]), \
+            len(values)
+
+    def test_replay_hauls(self):
+        import os
+        import tempfile
+
+        times = pd.date_range("2016-05-21T18:00:00", periods=len(self.values), freq="s", tz="UTC")
+        points = pd.DataFrame({"times": times, "values": self.values, "invalid": False})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "haul.pickle")
+            points.to_pickle(path)
+            results = replay_hauls([path])
+
+        self.assertTrue(results[0]["matched"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay recorded hauls through the change point engine")
+    parser.add_argument("hauls", nargs="*", help="pickled points data frames")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="waypoint tolerance in seconds")
+    args = parser.parse_args()
+
+    if args.hauls:
+        logging.basicConfig(level=logging.INFO)
+        results = replay_hauls(args.hauls, tolerance=args.tolerance)
+        sys.exit(0 if all(x["matched"] for x in results) else 1)
+
+    unittest.main(argv=sys.argv[:1])
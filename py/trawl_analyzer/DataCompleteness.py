@@ -30,6 +30,8 @@ from dateutil import parser
 from timeit import timeit, Timer
 import datetime
 from struct import pack
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import Manager
 import psycopg2
 
 # Unit Testing Support Only - START
@@ -46,6 +48,10 @@ from py.trawl_analyzer.BcsReader import BcsReader
 from py.trawl_analyzer.SbeReader import SeabirdCNVreader
 
 from py.trawl_analyzer.CommonFunctions import CommonFunctions
+from py.trawl_analyzer.MeasurementsLoader import MeasurementsCopyLoader
+from py.trawl_analyzer.SentenceParser import SentenceParser, parse_haul
+from py.trawl_analyzer.LoadWatermarks import LoadWatermarks
+from py.trawl_analyzer.SensorsCatalog import SensorsCatalog
 
 from py.trawl_analyzer.TrawlAnalyzerDB_model import Lookups, Operations, OperationFilesMtx, OperationFiles, VesselLu, \
     PersonnelLu, StationInventoryLu, OperationsFlattenedVw, Events, Comments, OperationMeasurements, OperationAttributes, \
@@ -385,97 +391,87 @@ class PopulateModelSensorDataThread(QObject):
         fc_hauls = OperationsFlattenedVw.select().where(OperationsFlattenedVw.cruise == cruise_id,
                                                         OperationsFlattenedVw.operation_type == "Tow")
 
-        start = arrow.now()
-        for i, x in enumerate(self._app.file_management.sensorsModel.items):
+        # Get the sensor load dates of all of the hauls of the cruise with a single query
+        sensor_load_dates = {x.tow_name: x.sensor_load_date for x in fc_hauls}
 
-            logging.info(f"\t\tSensor database population: {x['dstFileName']}")
+        # Catalogs of the sensors databases time ranges, one per data folder
+        catalogs = dict()
 
-            try:
-                if not os.path.exists(x["dstFileName"]):
-                    logging.error("Sensor database does not exist in the target location: {0}".format(x["dstFileName"]))
-                    continue
+        start = arrow.now()
+        try:
+            for i, x in enumerate(self._app.file_management.sensorsModel.items):
 
-                if not self._is_running:
-                    raise BreakIt
+                logging.info(f"\t\tSensor database population: {x['dstFileName']}")
 
-                self._app.settings.set_sensors_proxy(db_file=x["dstFileName"])
+                try:
+                    if not os.path.exists(x["dstFileName"]):
+                        logging.error("Sensor database does not exist in the target location: {0}".format(x["dstFileName"]))
+                        continue
 
-                strings = EnviroNetRawStrings.select().limit(1)
-                if strings.count() > 0:
+                    if not self._is_running:
+                        raise BreakIt
 
-                # TODO Todd Hay - Why is count() not working against the active sensors db here when at home, 2016, MJ
-                # if EnviroNetRawStrings.select().count() > 0:
+                    folder = os.path.dirname(x["dstFileName"])
+                    if folder not in catalogs:
+                        catalogs[folder] = SensorsCatalog(folder=folder)
+                    entry = catalogs[folder].get(db_file=x["dstFileName"])
+
+                    if entry and entry["row_count"] > 0:
 
-                    start_date_time = EnviroNetRawStrings.select().order_by(EnviroNetRawStrings.date_time.asc()).limit(1)
-                    if len(start_date_time) > 0:
-                        start_date_time = arrow.get(start_date_time.get().date_time).to('US/Pacific').format("MM/DD HH:mm:ss")
-                    else:
-                        logging.info('start time is none: {0}'.format(x["dstFileName"]))
                         start_date_time = None
+                        if entry["start_date_time"]:
+                            start_date_time = arrow.get(entry["start_date_time"]).to('US/Pacific').format("MM/DD HH:mm:ss")
+                        else:
+                            logging.info('start time is none: {0}'.format(x["dstFileName"]))
 
-                    end_date_time = EnviroNetRawStrings.select().order_by(EnviroNetRawStrings.date_time.desc()).limit(1)
-                    if len(end_date_time) > 0:
-                        end_date_time = arrow.get(end_date_time.get().date_time).to('US/Pacific').format("MM/DD HH:mm:ss")
-                    else:
-                        logging.info('end time is none: {0}'.format(x["dstFileName"]))
                         end_date_time = None
+                        if entry["end_date_time"]:
+                            end_date_time = arrow.get(entry["end_date_time"]).to('US/Pacific').format("MM/DD HH:mm:ss")
+                        else:
+                            logging.info('end time is none: {0}'.format(x["dstFileName"]))
 
-                    # logging.info(f"{start_date_time}, {end_date_time}")
-                    hauls = []
-                    if start_date_time and end_date_time:
-                        hauls = [[j, x] for j, x in enumerate(model_hauls) if x["haulEnd"] and x["haulStart"] and \
-                             x["haulStart"] <= end_date_time and
-                             x["haulEnd"] >= start_date_time]
-
-
-                             # x["haulStart"] >= start_date_time and
-                             # x["haulEnd"] <= end_date_time]
-
-                    logging.info(f'\t\tNumber of hauls that match this sensor db > {len(hauls)}')
+                        hauls = []
+                        if start_date_time and end_date_time:
+                            hauls = [[j, x] for j, x in enumerate(model_hauls) if x["haulEnd"] and x["haulStart"] and \
+                                 x["haulStart"] <= end_date_time and
+                                 x["haulEnd"] >= start_date_time]
 
-                    for haul in hauls:
+                        logging.info(f'\t\tNumber of hauls that match this sensor db > {len(hauls)}')
 
-                        # logging.info(f'sensors population, matching haul: {haul[1]["haul"]}')
+                        for haul in hauls:
 
-                        if not self._is_running:
-                            raise BreakIt
+                            if not self._is_running:
+                                raise BreakIt
 
-                        item = dict()
-                        item["sensorDatabase"] = x['dstFileName']
+                            item = dict()
+                            item["sensorDatabase"] = x['dstFileName']
 
-                        try:
-                            # fc_haul = fc_hauls.get(fc_hauls.tow_name == haul[1]["haul"])
-                            fc_haul = OperationsFlattenedVw.get(OperationsFlattenedVw.cruise == cruise_id,
-                                                                 OperationsFlattenedVw.operation_type == "Tow",
-                                                                 OperationsFlattenedVw.tow_name == haul[1]["haul"])
+                            if haul[1]["haul"] in sensor_load_dates:
+                                sensor_load_date = sensor_load_dates[haul[1]["haul"]]
+                                item["sensorsLoadStatus"] = arrow.get(sensor_load_date).format("MM/DD HH:mm:ss") \
+                                    if sensor_load_date else None
 
-                            item["sensorsLoadStatus"] = arrow.get(fc_haul.sensor_load_date).format("MM/DD HH:mm:ss") \
-                                if fc_haul.sensor_load_date else None
-                        except Exception as ex:
-                            # logging.info('Unable to match a haul in OperationsFlattenedVw')
-                            pass
+                            # logging.info(f"Sensor data parsed for table population: row {haul[0]}, haul {haul[1]['haul']}, info: {item}")
+                            self.sensorDataUpdated.emit(int(haul[0]), item)
 
-                        # logging.info(f"Sensor data parsed for table population: row {haul[0]}, haul {haul[1]['haul']}, info: {item}")
-                        self.sensorDataUpdated.emit(int(haul[0]), item)
+                except BreakIt:
+                    msg = "Breaking model loading"
+                    logging.info(msg)
+                    status = False
+                    return status, msg
 
-            except BreakIt:
-                self._app.settings.set_sensors_proxy(db_file=None)
-                msg = "Breaking model loading"
-                logging.info(msg)
-                status = False
-                return status, msg
+                except Exception as ex:
+                    logging.error("Error loading the sensors data: {0} > {1}".format(x["dstFileName"], ex))
+                    status = False
+                    return status, msg
 
-            except Exception as ex:
-                self._app.settings.set_sensors_proxy(db_file=None)
-                logging.error("Error loading the sensors data: {0} > {1}".format(x["dstFileName"], ex))
-                status = False
-                return status, msg
+        finally:
+            for catalog in catalogs.values():
+                catalog.close()
 
         end = arrow.now()
         logging.info('\t\tDataCompleteness Sensors DB Population, Elapsed time, sensor DBs: {0:.1f}s'.format((end - start).total_seconds()))
 
-        self._app.settings.set_sensors_proxy(db_file=None)
-
         return status, msg
 
 
@@ -999,6 +995,9 @@ class LoadSensorSerialDataThread(QObject):
         self._functions = CommonFunctions()
         self._items = kwargs["items"].toVariant() if isinstance(kwargs["items"], QJSValue) else kwargs["items"]
         self._load_status = kwargs["loadStatus"]
+        self._parallel = kwargs.get("parallel", False)
+        self._workers = kwargs.get("workers", None)
+        self._use_copy = True
 
     def stop(self):
         """
@@ -1048,9 +1047,6 @@ class LoadSensorSerialDataThread(QObject):
         status = False
         msg = ""
 
-        insert_template = {"raw_string": None, "date_time": None, "reading_numeric": None,
-                           "reading_alpha": None, "measurement_stream": None, "is_not_valid": False}
-
         # Get all of the serial parsing rules
         # parsing_rules = ParsingRulesVw.select() \
         #     .distinct([ParsingRulesVw.equipment, ParsingRulesVw.line_starting,
@@ -1079,6 +1075,13 @@ class LoadSensorSerialDataThread(QObject):
             except Exception as ex:
                 logging.info(f"\t\tError in retrieving parsing rules: {ex}")
 
+        copy_loader = MeasurementsCopyLoader(database=self._app.settings._database)
+        self._use_copy = True
+
+        if self._parallel:
+            return self._load_data_parallel(items=items, parsing_rules=parsing_rules, copy_loader=copy_loader,
+                                            method_start=method_start)
+
         db_count = 0
         for k, v in sorted(items):
             if "sensorDatabase" in v and v["sensorDatabase"] != "":
@@ -1113,94 +1116,13 @@ class LoadSensorSerialDataThread(QObject):
                     if DEBUG:
                         logging.info(f"\t\top_file_mtx found successfully")
 
-                    """
-                    If we're reloading the data for this haul, then delete all of the associated measurement_streams
-                    and operation_measurements
-                    """
-
-                    logging.info(f"\t\tload status = {self._load_status}")
-                    if self._load_status == "reload":
-                        if DEBUG:
-                            logging.info(f"\t\treloading data, checking for measurement streams")
+                    streams = list(self._prepare_streams(haul_op=haul_op, op_file_mtx=op_file_mtx,
+                                                         parsing_rules=parsing_rules))
 
-                        ms = MeasurementStreams.select()\
-                            .join(ParsingRulesVw, on=(ParsingRulesVw.parsing_rules==MeasurementStreams.equipment_field))\
-                            .where(MeasurementStreams.operation == haul_op.operation,
-                                   ParsingRulesVw.logger_or_serial == "serial")
-                        OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
-                        OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
-                        MeasurementStreams.delete().where(MeasurementStreams.measurement_stream << ms).execute()
-
-                        if DEBUG:
-                            logging.info(f"\t\told measurement streams found and deleted")
-
-                    """
-                    Create all of the required measurement_streams
-
-                    Key elements to populate:
-                    - operation_id - haul_op.operation
-                    - equipment_id - parsing_rules_vw
-                    - data_field_id - parsing_rules_vw
-                    - operation_files_mtx_id - op_file_mtx object above
-
-                    Iterate through all of the parsing rules, and create measurement streams for each one of them for
-                    every haul.  Gosh, that seems really verbose.
-                    """
-                    streams = []
-
-                    if DEBUG:
-                        logging.info(f"\t\tbefore for statement for parsing_rules, the count is: {parsing_rules.count()}")
-                        logging.info(f"\t\tparsing_rules = {parsing_rules}")
-                    for rule in parsing_rules:
-
-                        update_msg = "Gathering parsing rules into streams"
-                        if DEBUG:
-                            logging.info(f"\t\t{update_msg} > {model_to_dict(rule)}")
-
-                        self.updateHaulSerialStatus.emit(update_msg)
-
-                        if not self._is_running:
-                            raise BreakIt
-
-                        # TODO Todd Hay - Fix by removing attachment position, but adding what for PSIMP measurements?  channel # ?
-                        stream = {"operation": haul_op.operation,
-                                  "equipment_field": rule.parsing_rules,
-                                  "operation_files_mtx": op_file_mtx.operation_files_mtx}
-                        streams.append(stream)
-
-                    if DEBUG:
-                        logging.info(f"\t\tBefore reading/creating the measurement streams, streams count = {len(streams)}")
-                    if streams:
-                        with self._app.settings._database.atomic():
-
-                            update_msg = "Inserting measurement streams"
-                            if DEBUG:
-                                logging.info(f"\t\t{update_msg}")
-                            self.updateHaulSerialStatus.emit(update_msg)
-
-                            ms_count = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation).count()
-
-                            if self._load_status == "reload" or ms_count == 0:
-                                MeasurementStreams.insert_many(streams).execute()
-                            else:
-                                for stream in streams:
-
-                                    if not self._is_running:
-                                        raise BreakIt
-
-                                    MeasurementStreams.get_or_create(**stream)
-
-                    # Return all of the measurement_streams for this particular operation that were just inserted
-                    update_msg = "Retrieving measurement streams"
-                    if DEBUG:
-                        logging.info(f"\t\t{update_msg}")
-                    self.updateHaulSerialStatus.emit(update_msg)
-
-                    streams = MeasurementStreams.select(MeasurementStreams,ParsingRulesVw)\
-                        .join(ParsingRulesVw, on=(MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias('rules'))\
-                        .where(MeasurementStreams.operation == haul_op.operation,
-                               ParsingRulesVw.logger_or_serial == "serial",
-                               ParsingRulesVw.is_parsed)
+                    # When only loading new data, resume each stream after its high-water mark
+                    marks = LoadWatermarks.for_streams([x.measurement_stream for x in streams]) \
+                        if self._load_status == "load new" else dict()
+                    after = LoadWatermarks.resume_after(marks, [x.measurement_stream for x in streams])
 
                     """
                     Get the mapping from the wheelhouse database between the wheelhouse deployed_equipment_id and equipment_id
@@ -1211,6 +1133,9 @@ class LoadSensorSerialDataThread(QObject):
                         logging.info(f"\t\t{update_msg}")
                     self.updateHaulSerialStatus.emit(update_msg)
 
+                    haul_rows = 0
+                    haul_insert_seconds = 0.0
+
                     deployed_equipment = DeployedEquipment.select(DeployedEquipment.equipment, DeployedEquipment.deployed_equipment).dicts()
                     deployed_equipment = {x["deployed_equipment"]: x["equipment"] for x in deployed_equipment}
                     logging.info(f'\t\tdeployed equipment: {deployed_equipment}')
@@ -1219,9 +1144,7 @@ class LoadSensorSerialDataThread(QObject):
                     update_msg = "Getting the haul start and end date/times"
                     self.updateHaulSerialStatus.emit(update_msg)
 
-                    haul_start = arrow.get(v["haulStart"], 'MM/DD HH:mm:ss').replace(year=int(self._app.settings.year), tzinfo="US/Pacific").shift(minutes=-1)
-                    haul_end = arrow.get(v["haulEnd"], 'MM/DD HH:mm:ss').replace(year=int(self._app.settings.year), tzinfo="US/Pacific").shift(minutes=+1) \
-                        if "haulEnd" in v and v["haulEnd"] != "" else haul_start.shift(minutes=+32)
+                    haul_start, haul_end = self._get_haul_window(v)
 
                     """
                     Get one string from EnviroNetRawStrings, check time zone and adjust haul_start/haul_end to the same time zone
@@ -1247,16 +1170,20 @@ class LoadSensorSerialDataThread(QObject):
                         # Gather all of the strings that fall within the haul start/end timeframe, returning as a list of dicts
                         logging.info(f"\t\tretrieving serial data")
                         strings = EnviroNetRawStrings.select().where(EnviroNetRawStrings.date_time >= haul_start.isoformat(),
-                                                                     EnviroNetRawStrings.date_time <= haul_end.isoformat()).dicts()
+                                                                     EnviroNetRawStrings.date_time <= haul_end.isoformat())
+                        if after is not None:
+                            logging.info(f"\t\tresuming after raw string id {after}")
+                            strings = strings.where(EnviroNetRawStrings.enviro_net_raw_strings > after)
+                        strings = strings.dicts()
 
                         logging.info(f"strings count = {len(strings)}")
 
                         sents = list(set([x.rules.line_starting for x in streams]))
                         logging.info(f"streams = {sents}")
 
-                        # Start working through groups of the strings, grouped by the line_starting
-                        current_line_starting = ""
-                        current_equipment_id = -1
+                        # Group and split the strings by sentence type once for the whole haul
+                        parser = SentenceParser(strings=strings, deployed_equipment=deployed_equipment,
+                                                line_startings=sents)
 
                         for stream in streams:
 
@@ -1267,347 +1194,53 @@ class LoadSensorSerialDataThread(QObject):
                                                                         stream.rules.line_starting,
                                                                         stream.rules.equipment,
                                                                         stream.rules.reading_type)
-                            # logging.info(f"\t\t{update_msg}")
 
                             if DEBUG:
                                 logging.info("\t\t" + update_msg)
                             self.updateHaulSerialStatus.emit(update_msg)
 
-                            # inner_start = arrow.now()
-
-                            # Check if the load status is "load new" - if so, skip this iteration if any
-                            # operation_measurements exist for this stream
-                            # logging.info(f"\t\tload_status = {self._load_status}")
-
-                            if self._load_status == "load new":
-
-                                om_count = OperationMeasurements.select().where(OperationMeasurements.measurement_stream == stream.measurement_stream).count()
+                            # If the load status is "load new", only parse the strings after this stream's high-water mark
+                            mark = marks.get(stream.measurement_stream)
+                            if mark:
+                                logging.info(f"\t\t{mark.rows} measurements already loaded, resuming after raw "
+                                             f"string id {mark.raw_string} at {mark.date_time}")
 
-                                logging.info(f"\t\top_meas_count = {om_count}")
+                            sentence_count = parser.sentence_count(stream.rules.line_starting, stream.rules.equipment)
+                            logging.info(f"{stream.rules.line_starting} > stream eqp: {stream.rules.equipment} "
+                                         f" > {sentence_count} sentences")
 
-                                if om_count > 0:
-                                    continue
-
-                            fast_list = []
-                            insert_list = []
-                            template = deepcopy(insert_template)
-                            template["measurement_stream"] = stream.measurement_stream
-
-                            if current_line_starting != stream.rules.line_starting or \
-                                current_equipment_id != stream.rules.equipment:
-
-                                if not self._is_running:
-                                    raise BreakIt
-
-                                # logging.info(f"\t\tbefore getting lines:  {stream.rules.line_starting}, {stream.rules.equipment}")
-
-                                # d_equip = list(set([x["deployed_equipment"] for x in strings]))
-                                # logging.info(f"\t\td_equip = {d_equip}")
-                                # logging.info(f"\t\ttop 5 = {strings[:5]}")
-
-                                lines = [x for x in strings if x["raw_strings"] is not None and \
-                                         stream.rules.line_starting in x["raw_strings"] and \
-                                         x["deployed_equipment"] is not None and \
-                                         stream.rules.equipment == deployed_equipment[x["deployed_equipment"]]
-                                         ]
-
-                                # logging.info(f"\t\tafter getting lines")
-
-                                # TODO Todd Hay - the issue is that the stream.rules.equipment != deployed_equipment[x['deployed_equipment']]
-                                # lines = [x for x in strings if stream.rules.line_starting in x["raw_strings"]]
-
-                                logging.info(f"{stream.rules.line_starting} > stream eqp: {stream.rules.equipment} "
-                                             f" > {len(lines)} sentences")
-
-                            # Now I have all of the lines for the given stream + equipment ID, time to parse
-                            if len(lines) > 0:
-
-                                # Get the proper field
-                                if stream.rules.fixed_or_delimited.lower() == "delimited":
-
-                                    update_msg += ", Sentence Count: {0}".format(len(lines))
-                                    self.updateHaulSerialStatus.emit(update_msg)
+                            # If no lines exist for this stream, then just delete this particular stream from measurement_streams
+                            if sentence_count == 0:
+                                if not mark:
+                                    stream.delete_instance()
+                                continue
 
-                                    delim = stream.rules.delimiter
+                            update_msg += ", Sentence Count: {0}".format(sentence_count)
+                            self.updateHaulSerialStatus.emit(update_msg)
 
-                                    if delim == "[Space]":
-                                        delim = " "
+                            logging.info(f"\t\tReading type = {stream.rules.reading_type}, Field_format = {stream.rules.field_format}")
 
-                                    pos = stream.rules.field_position
+                            parsed = parser.parse(stream.rules, after=mark.raw_string if mark else None)
+                            rows = SentenceParser.to_rows(parsed, measurement_stream=stream.measurement_stream)
+                            if DEBUG:
+                                logging.info(f"\t\tparsed rows just created, size = {len(rows)}")
 
-                                    # insert_list = [deepcopy(template) for x in lines]
+                            if not self._is_running:
+                                raise BreakIt
 
-                                    if not self._is_running:
-                                        raise BreakIt
-
-                                    # VALUES
-                                    start = arrow.now()
-                                    # raw_split = [x["raw_strings"].split(delim) for x in lines]
-
-                                    if delim == " " or delim == "[Space]" or delim.lower() == "[space]":
-                                        raw_split = [[x["enviro_net_raw_strings"], x["date_time"],
-                                                  x["raw_strings"].split()]
-                                                 for x in lines]
-                                    else:
-                                        raw_split = [[x["enviro_net_raw_strings"], x["date_time"],
-                                                  x["raw_strings"].split(delim)]
-                                                 for x in lines]
-
-                                    # logging.info(f"\t\traw_split = {raw_split}")
-
-                                    # Remove the checksum at the end of the string if it exists
-                                    for x in raw_split:
-                                        x[2][-1] = x[2][-1].split('*')[0] if "*" in x[2][-1] else x[2][-1]
-
-                                    logging.info(f"\t\tReading type = {stream.rules.reading_type}, Field_format = {stream.rules.field_format}")
-
-                                    # TODO Todd Hay - Why is the boolean not working, have Beth fix parsing_rules_vw is_numeric
-                                    # if "0" in stream.rules.field_format:
-                                    if stream.rules.is_numeric:
-
-                                        # PI44 - Further reduce sentences based on the channel number and reading_type_code
-                                        reading_code_pos = stream.rules.reading_type_position
-                                        channel_pos = stream.rules.channel_position
-                                        if stream.rules.line_starting == "$PSIMP,D1" and channel_pos and reading_code_pos:
-                                            # logging.info(f'\t\t\tbefore channel: {len(raw_split)}')
-                                            raw_split = [x for x in raw_split if reading_code_pos-1 < len(x[2]) and channel_pos-1 < len(x[2]) \
-                                                         and x[2][reading_code_pos-1] == stream.rules.reading_type_code \
-                                                         and x[2][channel_pos-1] == stream.rules.channel]
-                                            # logging.info(f'\t\t\tafter channel: {len(raw_split)}')
-
-                                        # logging.info('\t\tfinished channel/reading_code')
-
-                                        # Quality Indicator - Only get those with a value of 22 (per quality_status field) for PI44
-                                        if self._functions.is_float(stream.rules.quality_status) and stream.rules.line_starting == "$PSIMP,D1":
-                                            # logging.info(f"{haul_start} >>> {haul_end}")
-
-                                            stat_pos = stream.rules.quality_status_position
-                                            # logging.info(f'raw_split length: {len(raw_split)}')
-                                            raw_split = [x for x in raw_split if stat_pos - 1 < len(x[2]) and x[2][stat_pos - 1] == stream.rules.quality_status]
-                                            # logging.info(f'raw_split length: {len(raw_split)}')
-
-                                        # PX - Further parsing - Added 20191106
-                                        if stream.rules.line_starting == "$PSIMTV80":
-
-                                            if stream.rules.reading_type_code\
-                                                and stream.rules.measurement_to\
-                                                and stream.rules.measurement_to_position\
-                                                and stream.rules.measurement_from\
-                                                and stream.rules.measurement_from_position:
-
-                                                reading_type_pos = stream.rules.reading_type_position
-                                                meas_from_pos = stream.rules.measurement_from_position
-                                                meas_to_pos = stream.rules.measurement_to_position
-                                                raw_split = [x for x in raw_split
-                                                    if reading_type_pos - 1 < len(x[2])
-                                                    and meas_from_pos-1 < len(x[2])
-                                                    and meas_to_pos-1 < len(x[2])
-                                                    and x[2][reading_type_pos - 1] == stream.rules.reading_type_code
-                                                    and x[2][meas_from_pos - 1] == stream.rules.measurement_from
-                                                    and x[2][meas_to_pos - 1] == stream.rules.measurement_to]
-                                                logging.info(f"\t\tPX Spread Distance raw_split for $PSIMTV80 > {stream.rules.reading_basis} > "
-                                                             f"{stream.rules.measurement_from}, {stream.rules.measurement_to}")
-
-                                            elif stream.rules.reading_type_code\
-                                                    and stream.rules.measurement_from\
-                                                    and stream.rules.measurement_from_position:
-                                                # Only the measurement_from_position exists, i.e. measurement_to is blank
-
-                                                reading_type_pos = stream.rules.reading_type_position
-                                                meas_from_pos = stream.rules.measurement_from_position
-                                                raw_split = [x for x in raw_split
-                                                    if reading_type_pos - 1 < len(x[2])
-                                                    and meas_from_pos-1 < len(x[2])
-                                                    and x[2][reading_type_pos - 1] == stream.rules.reading_type_code
-                                                    and x[2][meas_from_pos - 1] == stream.rules.measurement_from]
-                                                logging.info(f"\t\tPX Spread Distance raw_split for $PSIMTV80 > "
-                                                             f"{stream.rules.reading_basis} > "
-                                                             f"{stream.rules.measurement_from}")
-
-                                        # Convert to a floating point value data type
-                                        clean_data = [{"raw_string": x[0], "date_time": x[1], "reading_numeric": float(x[2][pos-1])}
-                                                      for x in raw_split
-                                                      if pos - 1 < len(x[2]) and self._functions.is_float(x[2][pos - 1])]
-
-                                    else:
-                                        if "DDMM.MM" in stream.rules.field_format:
-
-                                            if stream.rules.hemisphere_position:
-                                                clean_data = [{"raw_string": x[0], "date_time": x[1],
-                                                               "reading_numeric": self._functions.convert_lat_lon_to_dd(
-                                                            x[2][pos-1],
-                                                            stream.rules.reading_type,
-                                                            x[2][stream.rules.hemisphere_position-1])}
-                                                              for x in raw_split
-                                                          if pos - 1 < len(x[2]) and stream.rules.hemisphere_position-1 < len(x[2])]
-                                            else:
-                                                clean_data = [{"raw_string": x[0], "date_time": x[1],
-                                                               "reading_numeric": self._functions.convert_lat_lon_to_dd(
-                                                                                    input_str=x[2][pos-1],
-                                                                                    type=stream.rules.reading_type,
-                                                                                    hemisphere=x[2][pos])}
-                                                              for x in raw_split if pos - 1 < len(x[2]) and pos < len(x[2])]
-                                            clean_data = [x for x in clean_data if x["reading_numeric"] is not None]
-
-                                        # TODO Todd Hay - How do we actually want to store a time only item???
-                                        elif "hhmmss" in stream.rules.field_format.lower():
-                                            clean_data = [{"raw_string": x[0], "date_time": x[1], "reading_alpha": x[2][pos-1]}
-                                                          for x in raw_split
-                                                          if pos-1 < len(x[2]) and self._functions.is_float(x[2][pos-1])]
-                                            clean_data = [x for x in clean_data if x["reading_alpha"] is not None]
-
-                                        else:
-                                            clean_data = [{"raw_string": x[0], "date_time": x[1], "reading_alpha": x[2][pos-1]}
-                                                          for x in raw_split
-                                                          if pos-1 < len(x[2])]
-                                            clean_data = [x for x in clean_data if x["reading_alpha"] is not None]
-
-                                    end = arrow.now()
-                                    if DEBUG:
-                                        logging.info(f"\t\tclean_data just created, size = {len(clean_data)}")
-
-                                    if not self._is_running:
-                                        raise BreakIt
-
-                                    if len(clean_data) > 0:
-
-                                        # logging.info(f"\t\tclean_data samples:\n\t\t{clean_data[0]}\n\t\t{clean_data[1]}\n\t\t{clean_data[2]}")
-                                        # logging.info(f"raw_split[0]: {raw_split[0]}")
-
-                                        # DATE_TIMES
-                                        for cd in clean_data:
-                                            if cd is not None:
-                                                cd["date_time"] = self._functions.fastStrptime(cd["date_time"]).to("US/Pacific").isoformat() if "date_time" in cd else None
-
-                                        if not self._is_running:
-                                            raise BreakIt
-
-                                        insert_list = [deepcopy(template)] * len(clean_data)
-                                        insert_list = [{**insert_list[i], **clean_data[i]} for i in range(len(clean_data)) if clean_data[i] is not None]
-
-                                        # logging.info(f"\t\tinsert_list len: {len(insert_list)}")
-                                        # if len(insert_list) > 0:
-                                        #     logging.info(f"\t\tinsert_list[0]: {insert_list[0]}")
-
-                                        insert_list = [x for x in insert_list if x["reading_numeric"] is not None or x["reading_alpha"] is not None]
-
-                                    # for d, value, dt, raw_string_id in zip(insert_list, values, date_times, raw_string_ids):
-                                    #     # TODO Todd Hay - Fix the reading_numeric + reading_alpha once the boolean fields are fixed
-                                    #     d["reading_numeric"] = value if isinstance(value, float) else None
-                                    #     d["reading_alpha"] = value if isinstance(value, str) else None
-                                    #     d["is_not_valid"] = True if not value else False
-                                    #     d["date_time"] = dt
-                                    #     d["raw_string"] = raw_string_id
-
-                                    # logging.info(f'insert_list sample:\n{insert_list[0]}\n{insert_list[1]}\n{insert_list[-1]}')
-                                    # logging.info(f"{len(insert_list)}")
-
-
-                                    # logging.info('\t\tElapsed time, merging: {0:.1f}s'.format((end - start).total_seconds()))
-                                    # return
-
-                                    # BULK INSERTS
-                                    start = arrow.now()
-                                    with self._app.settings._database.atomic():
-                                        # OperationMeasurements.insert_many(insert_list).execute()
-
-                                        for idx in range(0, len(insert_list), 5000):
-
-                                            if not self._is_running:
-                                                raise BreakIt
-
-                                            OperationMeasurements.insert_many(insert_list[idx:idx+5000]).execute()
-
-                                    # BULK INSERT TESTING - psycopg copy_expert test
-                                    # ---------------------------------------------------------------------------------
-                                    # TEST
-                                    # ---------------------------------------------------------------------------------
-                                    # insert_template = {"raw_file": None, "raw_string": None, "date_time": None,
-                                    #                    "reading_numeric": None,
-                                    #                    "reading_alpha": None, "measurement_stream": None,
-                                    #                    "is_not_valid": False}
-
-                                    # rawfileid = OperationFiles.get(
-                                    #     OperationFiles.final_path_name == v["sensorDatabase"]).operation_file
-                                    # rawfile = [rawfileid] * len(values)
-                                    # mstream = [stream.measurement_stream] * len(values)
-                                    # reading_numerics = [x if stream.rules.is_numeric else None for x in values]
-                                    # reading_alpha = [x if not stream.rules.is_numeric else None for x in values]
-                                    # valids = [True if not x else False for x in values]
-                                    # val_lu_id = [None] * len(values)
-                                    #
-                                    # # Ref: http://stackoverflow.com/questions/10592674/updating-a-list-of-python-dictionaries-with-a-key-value-pair-from-another-list
-                                    # params = list(zip(rawfile, raw_string_ids, date_times, reading_numerics,
-                                    #                 reading_alpha, mstream, valids, val_lu_id))
-                                    # for i in range(3):
-                                    #     logging.info('params[{0}]: {1}'.format(i, params[i]))
-                                    #
-                                    # sql = """
-                                    #     INSERT INTO OPERATION_MEASUREMENTS(raw_file_id, raw_string_id,
-                                    #         date_time, reading_numeric, reading_alpha, measurement_stream_id,
-                                    #         is_not_valid) VALUES (%s, %s, %s, %s, %s, %s, %s);
-                                    #       """
-                                    # sql = """
-                                    #         INSERT INTO operation_measurements
-                                    #         (raw_file_id, raw_string_id, date_time, reading_numeric, reading_alpha,
-                                    #         measurement_stream_id, is_not_valid, validation_lu_id)
-                                    #         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                                    #         """
-                                    # logging.info('sql: {0}'.format(sql))
-                                    # self._app.settings._database.execute_sql(sql, params, False)
-
-
-                                    # Ref: http://stackoverflow.com/questions/8144002/use-binary-copy-table-from-with-psycopg2/8150329#8150329
-
-                                    # curs.execute("SELECT nextval('operation_measurements_operation_measurement_id_seq')")
-                                    # id_seq = curs.fetchone()[0]
-                                    #
-                                    # cpy = io.BytesIO()
-                                    # cpy.write(pack('!11sii', b'PGCOPY\n\377\r\n\0', 0, 0))
-                                    #
-                                    # row_format = list(zip(range(-1, 6),
-                                    #                     ('i', 'i', 'i', ?, ?, 'i', ?, 'd'),
-                                    #                     (4, 4, 4, 8, ?, 4, 1, 4, ?)))
-                                    # for i, row in enumerate(params):
-                                    #
-                                    #     # Number of columns/fields (always 7)
-                                    #     cpy.write(pack('!h', 7))
-                                    #     if i < 3:
-                                    #         logging.info('{0}'.format(row))
-                                    #     for col, fmt, size in row_format:
-                                    #         value = (id_seq if col == -1 else row[col])
-                                    #
-                                    #         cpy.write(pack('!i' + fmt, size, value))
-                                    #         id_seq += 1
-                                    #
-                                    # # File trailer
-                                    # cpy.write(pack('!h', -1))
-                                    #
-                                    # curs = self._app.settings._connection.cursor()
-                                    # cpy.seek(0)
-                                    # curs.copy_expert("COPY OPERATION_MEASUREMENTS FROM STDIN WITH BINARY", cpy)
-                                    #
-                                    # # Update sequence on database
-                                    # curs.execute("SELECT setval('operation_measurements_operation_measurement_id_seq', %s, false)", (id_seq,))
-                                    # self._app.settings._connection.commit()
-
-
-                                    # ---------------------------------------------------------------------------------
-                                    # TEST - END
-                                    # --------------------------------------------------------------------------------- #
-                                    end = arrow.now()
-                                    logging.info(f'\t\tElapsed time inserting {stream.rules.line_starting}, {stream.rules.reading_type}, count = {len(clean_data)}: {(end - start).total_seconds():.1f}s')
-
-                                    # TODO Todd Hay - Add signal emissions for updating the statusbar telling what has been parsed/inserted
-                                    update_msg += " > Done"
-                                    self.updateHaulSerialStatus.emit(update_msg)
+                            row_count, seconds = self._write_rows(rows=rows, copy_loader=copy_loader)
+                            haul_rows += row_count
+                            haul_insert_seconds += seconds
+                            logging.info(f'\t\tElapsed time inserting {stream.rules.line_starting}, {stream.rules.reading_type}, count = {row_count}: {seconds:.1f}s')
 
-                            # If no lines exist for this stream, then just delete this particular stream from measurement_streams
-                            else:
-                                stream.delete_instance()
+                            update_msg += " > Done"
+                            self.updateHaulSerialStatus.emit(update_msg)
 
-                            current_line_starting = stream.rules.line_starting
-                            current_equipment_id = stream.rules.equipment
+                    rate = haul_rows / haul_insert_seconds if haul_insert_seconds > 0 else 0
+                    update_msg = f"Haul {v['haul']} loaded: {haul_rows} rows in {haul_insert_seconds:.1f}s " \
+                                 f"({rate:.0f} rows/s, {'binary COPY' if self._use_copy else 'insert_many'})"
+                    logging.info(f"\t\t{update_msg}")
+                    self.updateHaulSerialStatus.emit(update_msg)
 
                     # Emit signal to update the DataCompleteness model as well as update the Operations table
                     load_date = arrow.now()
@@ -1618,28 +1251,23 @@ class LoadSensorSerialDataThread(QObject):
                         Operations.update(sensor_load_date=load_date).where(Operations.operation==haul_op.operation).execute()
 
                 except BreakIt:
-                    # Delete the current haul measurement streams and operation_measurements data
+                    # Each stream is committed on its own, so keep the streams that were loaded and flag the haul as
+                    # not loaded.  A "load new" run then resumes every stream after its high-water mark
                     try:
 
                         self._app.settings.set_sensors_proxy(db_file=None)
 
-                        ms = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation)
-                        OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
-                        OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
-                        MeasurementStreams.delete().where(MeasurementStreams.operation == haul_op.operation).execute()
-
-                        Operations.update(sensor_load_date=None).where(Operations.operation==haul_op.operation).execute()
+                        if haul_op:
+                            Operations.update(sensor_load_date=None).where(Operations.operation==haul_op.operation).execute()
                         self.haulSensorSerialDataLoaded.emit(int(k), None)
 
                         haul_op = None
                         return False, "Processing halted", None
 
-                        break
-
                     except Exception as ex:
 
                         self._app.settings.set_sensors_proxy(db_file=None)
-                        logging.error("Error deleting the aborted haul sensor data: {0} > {1}".format(haul_op))
+                        logging.error("Error flagging the aborted haul sensor data: {0} > {1}".format(haul_op, ex))
 
                 except Exception as ex:
 
@@ -1664,6 +1292,317 @@ class LoadSensorSerialDataThread(QObject):
 
         return status, msg, elapsed_time
 
+    def _prepare_streams(self, haul_op, op_file_mtx, parsing_rules):
+        """
+        Method to create, or recreate when reloading, the serial measurement_streams for a haul
+        :param haul_op: OperationsFlattenedVw record of the haul
+        :param op_file_mtx: OperationFilesMtx record of the sensors database
+        :param parsing_rules: ParsingRulesVw query of the serial parsing rules
+        :return: MeasurementStreams query joined to the parsing rules, aliased as rules
+        """
+        # If we're reloading the data for this haul, then delete all of the associated measurement_streams
+        # and operation_measurements
+        logging.info(f"\t\tload status = {self._load_status}")
+        if self._load_status == "reload":
+            if DEBUG:
+                logging.info(f"\t\treloading data, checking for measurement streams")
+
+            ms = MeasurementStreams.select()\
+                .join(ParsingRulesVw, on=(ParsingRulesVw.parsing_rules==MeasurementStreams.equipment_field))\
+                .where(MeasurementStreams.operation == haul_op.operation,
+                       ParsingRulesVw.logger_or_serial == "serial")
+            OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
+            OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
+            MeasurementStreams.delete().where(MeasurementStreams.measurement_stream << ms).execute()
+
+            if DEBUG:
+                logging.info(f"\t\told measurement streams found and deleted")
+
+        """
+        Create all of the required measurement_streams
+
+        Key elements to populate:
+        - operation_id - haul_op.operation
+        - equipment_id - parsing_rules_vw
+        - data_field_id - parsing_rules_vw
+        - operation_files_mtx_id - op_file_mtx object above
+
+        Iterate through all of the parsing rules, and create measurement streams for each one of them for
+        every haul.  Gosh, that seems really verbose.
+        """
+        streams = []
+
+        if DEBUG:
+            logging.info(f"\t\tbefore for statement for parsing_rules, the count is: {parsing_rules.count()}")
+            logging.info(f"\t\tparsing_rules = {parsing_rules}")
+        for rule in parsing_rules:
+
+            update_msg = "Gathering parsing rules into streams"
+            if DEBUG:
+                logging.info(f"\t\t{update_msg} > {model_to_dict(rule)}")
+
+            self.updateHaulSerialStatus.emit(update_msg)
+
+            if not self._is_running:
+                raise BreakIt
+
+            # TODO Todd Hay - Fix by removing attachment position, but adding what for PSIMP measurements?  channel # ?
+            stream = {"operation": haul_op.operation,
+                      "equipment_field": rule.parsing_rules,
+                      "operation_files_mtx": op_file_mtx.operation_files_mtx}
+            streams.append(stream)
+
+        if DEBUG:
+            logging.info(f"\t\tBefore reading/creating the measurement streams, streams count = {len(streams)}")
+        if streams:
+            with self._app.settings._database.atomic():
+
+                update_msg = "Inserting measurement streams"
+                if DEBUG:
+                    logging.info(f"\t\t{update_msg}")
+                self.updateHaulSerialStatus.emit(update_msg)
+
+                ms_count = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation).count()
+
+                if self._load_status == "reload" or ms_count == 0:
+                    MeasurementStreams.insert_many(streams).execute()
+                else:
+                    for stream in streams:
+
+                        if not self._is_running:
+                            raise BreakIt
+
+                        MeasurementStreams.get_or_create(**stream)
+
+        # Return all of the measurement_streams for this particular operation that were just inserted
+        update_msg = "Retrieving measurement streams"
+        if DEBUG:
+            logging.info(f"\t\t{update_msg}")
+        self.updateHaulSerialStatus.emit(update_msg)
+
+        streams = MeasurementStreams.select(MeasurementStreams,ParsingRulesVw)\
+            .join(ParsingRulesVw, on=(MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias('rules'))\
+            .where(MeasurementStreams.operation == haul_op.operation,
+                   ParsingRulesVw.logger_or_serial == "serial",
+                   ParsingRulesVw.is_parsed)
+
+        return streams
+
+    def _get_haul_window(self, v):
+        """
+        Method to return the start and end date/times used for gathering the serial strings of a haul, padded by
+        one minute on either side
+        :param v: dict - the haul item
+        :return: tuple of (haul_start, haul_end) arrow objects
+        """
+        haul_start = arrow.get(v["haulStart"], 'MM/DD HH:mm:ss').replace(year=int(self._app.settings.year), tzinfo="US/Pacific").shift(minutes=-1)
+        haul_end = arrow.get(v["haulEnd"], 'MM/DD HH:mm:ss').replace(year=int(self._app.settings.year), tzinfo="US/Pacific").shift(minutes=+1) \
+            if "haulEnd" in v and v["haulEnd"] != "" else haul_start.shift(minutes=+32)
+        return haul_start, haul_end
+
+    def _write_rows(self, rows, copy_loader):
+        """
+        Method to bulk insert the OPERATION_MEASUREMENTS rows of one stream with a binary COPY, falling back to
+        insert_many for the remainder of the load if the COPY fails
+        :param rows: list of tuples ordered per MeasurementsCopyLoader.COLUMNS
+        :param copy_loader: MeasurementsCopyLoader
+        :return: tuple of (row count, elapsed seconds)
+        """
+        start = arrow.now()
+        if self._use_copy and len(rows) > 0:
+            try:
+                with self._app.settings._database.atomic():
+                    copy_loader.load(rows)
+            except Exception as ex:
+                logging.error(f"\t\tBinary COPY failed, falling back to insert_many: {ex}")
+                self._use_copy = False
+
+        if not self._use_copy and len(rows) > 0:
+            insert_list = [dict(zip(MeasurementsCopyLoader.FIELDS, x)) for x in rows]
+
+            with self._app.settings._database.atomic():
+                for idx in range(0, len(insert_list), 5000):
+
+                    if not self._is_running:
+                        raise BreakIt
+
+                    OperationMeasurements.insert_many(insert_list[idx:idx+5000]).execute()
+
+        return len(rows), (arrow.now() - start).total_seconds()
+
+    def _as_completed(self, futures):
+        """
+        Generator to yield the futures as they complete, checking every half second whether the loading has been
+        stopped while waiting on the workers
+        :param futures: list of futures
+        :return:
+        """
+        pending = set(futures)
+        while pending:
+
+            if not self._is_running:
+                raise BreakIt
+
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            yield from done
+
+    def _load_data_parallel(self, items, parsing_rules, copy_loader, method_start):
+        """
+        Method to load the serial sensor data with the hauls parsed concurrently in a pool of worker processes.
+        The measurement streams are prepared and the parsed rows are written to FRAM_CENTRAL here, one haul at a
+        time, while the reading and parsing of the SQLite sensor databases is done by SentenceParser.parse_haul
+        in the workers, each with its own connections.  When the loading is stopped, the pending hauls are cancelled
+        and the workers drop the hauls they are parsing at their next check of the shared stop event
+        :param items: haul items
+        :param parsing_rules: ParsingRulesVw query of the serial parsing rules
+        :param copy_loader: MeasurementsCopyLoader
+        :param method_start: arrow - start time of the load
+        :return: tuple of (status, msg, elapsed_time)
+        """
+        jobs = dict()
+        db_count = 0
+        haul_op = None
+        k = None
+
+        manager = Manager()
+        stop_event = manager.Event()
+        executor = ProcessPoolExecutor(max_workers=self._workers)
+        try:
+            try:
+                # Prepare the measurement streams and submit each haul for parsing
+                for k, v in sorted(items):
+                    if "sensorDatabase" not in v or v["sensorDatabase"] == "":
+                        continue
+
+                    if not self._is_running:
+                        raise BreakIt
+
+                    update_msg = "Sensor Serial Data Loading, haul: {0}".format(v["haul"])
+                    logging.info(f"{update_msg}")
+                    self.updateHaulSerialStatus.emit(update_msg)
+
+                    try:
+                        haul_op = OperationsFlattenedVw.get(OperationsFlattenedVw.tow_name == v["haul"])
+                    except Exception as ex:
+                        msg = f"\t\tHaul {v['haul']} has not been loaded, please load hauls before loading sensor data"
+                        logging.info(msg)
+                        return False, msg, None
+
+                    op_file_mtx = OperationFilesMtx.select(OperationFilesMtx)\
+                        .join(OperationFiles)\
+                        .where(OperationFilesMtx.operation == haul_op.cruise,
+                               OperationFiles.final_path_name == v["sensorDatabase"]).first()
+
+                    streams = list(self._prepare_streams(haul_op=haul_op, op_file_mtx=op_file_mtx,
+                                                         parsing_rules=parsing_rules))
+
+                    # When only loading new data, resume each stream after its high-water mark
+                    marks = LoadWatermarks.for_streams([x.measurement_stream for x in streams]) \
+                        if self._load_status == "load new" else dict()
+
+                    haul_start, haul_end = self._get_haul_window(v)
+                    rules = [(x.measurement_stream, model_to_dict(x.rules),
+                              marks[x.measurement_stream].raw_string if x.measurement_stream in marks else None)
+                             for x in streams]
+                    future = executor.submit(parse_haul, v["sensorDatabase"], v["haulDatabase"],
+                                             haul_start.isoformat(), haul_end.isoformat(), rules, stop_event)
+                    jobs[future] = (k, v, haul_op, {x.measurement_stream: x for x in streams}, marks)
+                    haul_op = None
+
+                self.updateHaulSerialStatus.emit(f"Parsing {len(jobs)} hauls in parallel")
+
+                # Write each haul to FRAM_CENTRAL as soon as its parsing is done
+                for future in self._as_completed(list(jobs)):
+
+                    if not self._is_running:
+                        raise BreakIt
+
+                    k, v, haul_op, streams, marks = jobs.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as ex:
+                        logging.error("Error in loading sensor data, haul: {0} > {1}".format(v["haul"], ex))
+                        haul_op = None
+                        continue
+
+                    update_msg = f"Haul {v['haul']} parsed in {result['elapsed']:.1f}s, " \
+                                 f"{result['strings']} strings, writing to the database"
+                    logging.info(f"\t\t{update_msg}")
+                    self.updateHaulSerialStatus.emit(update_msg)
+
+                    haul_rows = 0
+                    haul_insert_seconds = 0.0
+                    try:
+                        # If no lines exist for a stream, then just delete this particular stream from measurement_streams
+                        for measurement_stream, count in result["sentences"].items():
+                            if count == 0 and measurement_stream not in marks:
+                                streams[measurement_stream].delete_instance()
+
+                        for measurement_stream, rows in result["rows"].items():
+
+                            if not self._is_running:
+                                raise BreakIt
+
+                            row_count, seconds = self._write_rows(rows=rows, copy_loader=copy_loader)
+                            haul_rows += row_count
+                            haul_insert_seconds += seconds
+
+                    except BreakIt:
+                        raise
+
+                    except Exception as ex:
+                        logging.error("Error in loading sensor data, haul: {0} > {1}".format(v["haul"], ex))
+                        haul_op = None
+                        continue
+
+                    rate = haul_rows / haul_insert_seconds if haul_insert_seconds > 0 else 0
+                    update_msg = f"Haul {v['haul']} loaded: {haul_rows} rows in {haul_insert_seconds:.1f}s " \
+                                 f"({rate:.0f} rows/s, {'binary COPY' if self._use_copy else 'insert_many'})"
+                    logging.info(f"\t\t{update_msg}")
+                    self.updateHaulSerialStatus.emit(update_msg)
+
+                    # Emit signal to update the DataCompleteness model as well as update the Operations table
+                    load_date = arrow.now()
+                    self.haulSensorSerialDataLoaded.emit(int(k), load_date.format("MM/DD HH:mm:ss"))
+                    Operations.update(sensor_load_date=load_date.isoformat())\
+                        .where(Operations.operation == haul_op.operation).execute()
+                    haul_op = None
+                    db_count += 1
+
+            except BreakIt:
+                for future in jobs:
+                    future.cancel()
+
+                # Keep the streams that were committed and flag the haul being written, and any haul not yet
+                # written, as not loaded.  A "load new" run then resumes every stream after its high-water mark
+                aborted = [(x[0], x[2]) for x in jobs.values()]
+                if haul_op:
+                    aborted.append((k, haul_op))
+                for k, op in aborted:
+                    Operations.update(sensor_load_date=None).where(Operations.operation == op.operation).execute()
+                    self.haulSensorSerialDataLoaded.emit(int(k), None)
+
+                return False, "Processing halted", None
+
+        finally:
+            # Stop the workers still parsing and wait for them, so none is left running after a cancel
+            stop_event.set()
+            for future in jobs:
+                future.cancel()
+            executor.shutdown(wait=True)
+            manager.shutdown()
+
+        elapsed_time = (arrow.now() - method_start).total_seconds()
+        if db_count == 0:
+            msg = "No sensor data was loaded as no sensor databases were found"
+            logging.info(msg)
+            return False, msg, elapsed_time
+
+        msg = '\t\tElapsed time: {0:.1f}s'.format(elapsed_time)
+        logging.info(msg)
+        return True, msg, elapsed_time
+
+
 
 class LoadSensorFileDataThread(QObject):
 
@@ -1733,6 +1672,8 @@ class LoadSensorFileDataThread(QObject):
 
                 try:
 
+                    current_file = None
+
                     update_msg = "Sensor File Processing, haul: {0}".format(v["haul"])
                     logging.info(update_msg)
                     self.updateHaulFileStatus.emit(update_msg)
@@ -1829,161 +1770,87 @@ class LoadSensorFileDataThread(QObject):
                                 if DEBUG:
                                     logging.info(f"\t\tfiles count in tomorrow's database: {files.count()}")
 
+                    # When only loading new data, skip the files that have already been loaded for this haul
+                    loaded_files = LoadWatermarks.loaded_files(haul_op.operation,
+                                                               [x.enviro_net_raw_files for x in files]) \
+                        if self._load_status == "load new" else set()
+
                     for file in files:
 
                         if not self._is_running:
                             raise BreakIt
 
-                        try:
+                        if file.enviro_net_raw_files in loaded_files:
+                            logging.info(f"\tFile already loaded, skipping, ID: {file.enviro_net_raw_files}")
+                            continue
 
-                            # Get the deployed_equipment for this particular file deployed_equipment
-                            deployed_equipment = DeployedEquipment.get(DeployedEquipment.deployed_equipment == file.deployed_equipment)
-
-                            logging.info(f"\tProcessing file, type: {deployed_equipment.position}, ID: {file.enviro_net_raw_files}")
-
-                            # If reloading, delete associated measurement_streams and operation_measurements
-                            if self._load_status == "reload":
-                                ms = MeasurementStreams.select() \
-                                    .join(ParsingRulesVw,
-                                          on=(ParsingRulesVw.parsing_rules == MeasurementStreams.equipment_field)) \
-                                    .where(MeasurementStreams.operation == haul_op.operation,
-                                           MeasurementStreams.attachment_position == deployed_equipment.position,
-                                           ParsingRulesVw.logger_or_serial == "logger")
-                                OperationMeasurements.delete().where(
-                                    OperationMeasurements.measurement_stream << ms).execute()
-                                OperationMeasurementsErr.delete().where(
-                                    OperationMeasurementsErr.measurement_stream << ms).execute()
-                                OperationAttributes.delete().where(
-                                    OperationAttributes.measurement_stream << ms).execute()
-                                MeasurementStreams.delete().where(MeasurementStreams.measurement_stream << ms).execute()
-
-                            # Find all parsing_rules for this deployed_equipment
-                            # .distinct([ParsingRulesVw.equipment, ParsingRulesVw.reading_type]) \
-                            rules = ParsingRulesVw.select() \
-                                .where(ParsingRulesVw.is_parsed,
-                                       ParsingRulesVw.logger_or_serial == "logger",
-                                       ParsingRulesVw.equipment == deployed_equipment.equipment) \
-                                .order_by(ParsingRulesVw.equipment, ParsingRulesVw.reading_type) \
-                                .distinct()
-
-                            # Create the measurement_streams for the rules that were just found
-                            for rule in rules:
-                                stream, _ = MeasurementStreams.get_or_create(
-                                    operation_id=haul_op.operation,
-                                    attachment_position=deployed_equipment.position,
-                                    operation_files_mtx=op_file_mtx.operation_files_mtx,
-                                    equipment_field=rule.parsing_rules,
-                                    raw_files=file.enviro_net_raw_files,
-                                    defaults={
-                                        "stream_offset_seconds": 0
-                                    }
-                                )
+                        current_file = file.enviro_net_raw_files
 
-                            # Process BCS data
-                            if 'bcs' in deployed_equipment.position.lower():
-
-                                # Handle BCS data processing
-                                self._bcs_reader.set_raw_content(raw_content=file.raw_file, position=deployed_equipment.position)
+                        try:
 
-                                update_msg = f'\t\tBCS Sensor File Type: {self._bcs_reader.sensor_type}'
-                                logging.info(update_msg)
-                                self.updateHaulFileStatus.emit(update_msg)
+                            # Load all of the file in one transaction, so a file is either completely loaded or not at all
+                            with self._app.settings._database.atomic():
 
-                                bcs_data = self._bcs_reader.parse_data(angles="xy")
-                                if bcs_data is not None:
+                                # Get the deployed_equipment for this particular file deployed_equipment
+                                deployed_equipment = DeployedEquipment.get(DeployedEquipment.deployed_equipment == file.deployed_equipment)
 
-                                    key, values = bcs_data
+                                logging.info(f"\tProcessing file, type: {deployed_equipment.position}, ID: {file.enviro_net_raw_files}")
 
-                                    # Get the X Tilt measurement stream, applies to both AFSC + NWFSC BCS's
-                                    x_stream = MeasurementStreams.select(MeasurementStreams) \
+                                # If reloading, delete associated measurement_streams and operation_measurements
+                                if self._load_status == "reload":
+                                    ms = MeasurementStreams.select() \
                                         .join(ParsingRulesVw,
-                                              on=(
-                                                  MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias(
-                                                  'rules')) \
+                                              on=(ParsingRulesVw.parsing_rules == MeasurementStreams.equipment_field)) \
                                         .where(MeasurementStreams.operation == haul_op.operation,
                                                MeasurementStreams.attachment_position == deployed_equipment.position,
-                                               ParsingRulesVw.logger_or_serial == "logger",
-                                               ParsingRulesVw.equipment == deployed_equipment.equipment,
-                                               ParsingRulesVw.reading_type == "X Tilt Angle").first()
-                                    template = deepcopy(insert_template)
-                                    template["measurement_stream"] = x_stream.measurement_stream
-                                    if DEBUG:
-                                        logging.info(f"\t\tstream: {model_to_dict(x_stream)}")
-
-                                    # Get the X Tilt Values - this applies to both AFSC + NWFSC BCS sensors
-                                    # Sample values:  ['2016-05-21T05:11:45-07:00', 87]
-                                    x_parsed_data = [{"date_time": x[0], "reading_numeric": x[1]}
-                                                     for x in values["data"] if x[1] is not None]
-                                    insert_list = [deepcopy(template)] * len(x_parsed_data)
-                                    insert_list = [{**insert_list[i], **x_parsed_data[i]} for i in
-                                                   range(len(x_parsed_data))]
-
-                                    if DEBUG:
-                                        logging.info(f"\t\tinsert_list len: {len(insert_list)}")
-                                        if len(insert_list) > 0:
-                                            logging.info(f"\t\tinsert_list[0]: {insert_list[0]}")
-
-                                    # Insert the X Tilt Values
-                                    insert_list = [x for x in insert_list if x["reading_numeric"] is not None]
-                                    with self._app.settings._database.atomic():
-                                        # OperationMeasurements.insert_many(insert_list).execute()
-                                        for idx in range(0, len(insert_list), 5000):
-                                            if not self._is_running:
-                                                raise BreakIt
-                                            OperationMeasurements.insert_many(insert_list[idx:idx + 5000]).execute()
-
-                                    if self._bcs_reader.sensor_type == "nwfsc_txt":
-                                        # We have both an X Tilt Angle and Y Tilt Angle for the NWFSC BCS
-
-                                        # Get the Y Tilt Measurement stream
-                                        y_stream = MeasurementStreams.select(MeasurementStreams) \
-                                            .join(ParsingRulesVw,
-                                                  on=(
-                                                      MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias(
-                                                      'rules')) \
-                                            .where(MeasurementStreams.operation == haul_op.operation,
-                                                   MeasurementStreams.attachment_position == deployed_equipment.position,
-                                                   ParsingRulesVw.logger_or_serial == "logger",
-                                                   ParsingRulesVw.equipment == deployed_equipment.equipment,
-                                                   ParsingRulesVw.reading_type == "Y Tilt Angle").first()
-                                        if DEBUG:
-                                            logging.info(f"\t\tstream: {model_to_dict(y_stream)}")
+                                               ParsingRulesVw.logger_or_serial == "logger")
+                                    OperationMeasurements.delete().where(
+                                        OperationMeasurements.measurement_stream << ms).execute()
+                                    OperationMeasurementsErr.delete().where(
+                                        OperationMeasurementsErr.measurement_stream << ms).execute()
+                                    OperationAttributes.delete().where(
+                                        OperationAttributes.measurement_stream << ms).execute()
+                                    MeasurementStreams.delete().where(MeasurementStreams.measurement_stream << ms).execute()
+
+                                # Find all parsing_rules for this deployed_equipment
+                                # .distinct([ParsingRulesVw.equipment, ParsingRulesVw.reading_type]) \
+                                rules = ParsingRulesVw.select() \
+                                    .where(ParsingRulesVw.is_parsed,
+                                           ParsingRulesVw.logger_or_serial == "logger",
+                                           ParsingRulesVw.equipment == deployed_equipment.equipment) \
+                                    .order_by(ParsingRulesVw.equipment, ParsingRulesVw.reading_type) \
+                                    .distinct()
+
+                                # Create the measurement_streams for the rules that were just found
+                                for rule in rules:
+                                    stream, _ = MeasurementStreams.get_or_create(
+                                        operation_id=haul_op.operation,
+                                        attachment_position=deployed_equipment.position,
+                                        operation_files_mtx=op_file_mtx.operation_files_mtx,
+                                        equipment_field=rule.parsing_rules,
+                                        raw_files=file.enviro_net_raw_files,
+                                        defaults={
+                                            "stream_offset_seconds": 0
+                                        }
+                                    )
 
-                                        # Y Tilt Values - Retrieve from the data structure
-                                        y_parsed_data = [{"date_time": x[0], "reading_numeric": x[2]}
-                                                       for x in values["data"] if x[2] is not None]
+                                # Process BCS data
+                                if 'bcs' in deployed_equipment.position.lower():
 
-                                        # Create the insert_list
-                                        template = deepcopy(insert_template)
-                                        template["measurement_stream"] = y_stream.measurement_stream
-                                        insert_list = [deepcopy(template)] * len(y_parsed_data)
-                                        insert_list = [{**insert_list[i], **y_parsed_data[i]} for i in range(len(y_parsed_data))]
-                                        insert_list = [x for x in insert_list if x["reading_numeric"] is not None]
+                                    # Handle BCS data processing
+                                    self._bcs_reader.set_raw_content(raw_content=file.raw_file, position=deployed_equipment.position)
 
-                                        # Insert the actual data
-                                        with self._app.settings._database.atomic():
-                                            # OperationMeasurements.insert_many(insert_list).execute()
-                                            for idx in range(0, len(insert_list), 5000):
-                                                if not self._is_running:
-                                                    raise BreakIt
-                                                OperationMeasurements.insert_many(insert_list[idx:idx + 5000]).execute()
-
-                            # Process SBE39 Data
-                            elif 'sbe39' in deployed_equipment.position.lower():
+                                    update_msg = f'\t\tBCS Sensor File Type: {self._bcs_reader.sensor_type}'
+                                    logging.info(update_msg)
+                                    self.updateHaulFileStatus.emit(update_msg)
 
-                                # Handle SBE39 data processing
-                                logging.info('\t\tSBE39 Sensor File Type')
-                                self._sbe_reader.set_raw_content(raw_content=file.raw_file)
-                                sbe_data = self._sbe_reader.get_temperature_and_depth()
-                                if sbe_data is not None:
+                                    bcs_data = self._bcs_reader.parse_data(angles="xy")
+                                    if bcs_data is not None:
 
-                                    for sbe_k, sbe_v in sbe_data.items():
+                                        key, values = bcs_data
 
-                                        if DEBUG:
-                                            logging.info(f"SBE39 key/value: {sbe_k} > {sbe_v}")
-
-                                        # Get the measurement stream associated with the key (sbe_k)
-                                        stream = MeasurementStreams.select(MeasurementStreams) \
+                                        # Get the X Tilt measurement stream, applies to both AFSC + NWFSC BCS's
+                                        x_stream = MeasurementStreams.select(MeasurementStreams) \
                                             .join(ParsingRulesVw,
                                                   on=(
                                                       MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias(
@@ -1992,25 +1859,26 @@ class LoadSensorFileDataThread(QObject):
                                                    MeasurementStreams.attachment_position == deployed_equipment.position,
                                                    ParsingRulesVw.logger_or_serial == "logger",
                                                    ParsingRulesVw.equipment == deployed_equipment.equipment,
-                                                   ParsingRulesVw.reading_type == sbe_k.replace("Gear", "").strip()).first()
+                                                   ParsingRulesVw.reading_type == "X Tilt Angle").first()
                                         template = deepcopy(insert_template)
-                                        template["measurement_stream"] = stream.measurement_stream
+                                        template["measurement_stream"] = x_stream.measurement_stream
                                         if DEBUG:
-                                            logging.info(f"\t\tstream: {model_to_dict(stream)}")
+                                            logging.info(f"\t\tstream: {model_to_dict(x_stream)}")
 
-                                        # Get the Values associated with the values (sbe_v)
-                                        parsed_data = [{"date_time": x[0], "reading_numeric": x[1]}
-                                                         for x in sbe_v["data"] if x[1] is not None]
-                                        insert_list = [deepcopy(template)] * len(parsed_data)
-                                        insert_list = [{**insert_list[i], **parsed_data[i]} for i in
-                                                       range(len(parsed_data))]
+                                        # Get the X Tilt Values - this applies to both AFSC + NWFSC BCS sensors
+                                        # Sample values:  ['2016-05-21T05:11:45-07:00', 87]
+                                        x_parsed_data = [{"date_time": x[0], "reading_numeric": x[1]}
+                                                         for x in values["data"] if x[1] is not None]
+                                        insert_list = [deepcopy(template)] * len(x_parsed_data)
+                                        insert_list = [{**insert_list[i], **x_parsed_data[i]} for i in
+                                                       range(len(x_parsed_data))]
 
                                         if DEBUG:
                                             logging.info(f"\t\tinsert_list len: {len(insert_list)}")
                                             if len(insert_list) > 0:
                                                 logging.info(f"\t\tinsert_list[0]: {insert_list[0]}")
 
-                                        # Insert the Values
+                                        # Insert the X Tilt Values
                                         insert_list = [x for x in insert_list if x["reading_numeric"] is not None]
                                         with self._app.settings._database.atomic():
                                             # OperationMeasurements.insert_many(insert_list).execute()
@@ -2019,12 +1887,111 @@ class LoadSensorFileDataThread(QObject):
                                                     raise BreakIt
                                                 OperationMeasurements.insert_many(insert_list[idx:idx + 5000]).execute()
 
+                                        if self._bcs_reader.sensor_type == "nwfsc_txt":
+                                            # We have both an X Tilt Angle and Y Tilt Angle for the NWFSC BCS
+
+                                            # Get the Y Tilt Measurement stream
+                                            y_stream = MeasurementStreams.select(MeasurementStreams) \
+                                                .join(ParsingRulesVw,
+                                                      on=(
+                                                          MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias(
+                                                          'rules')) \
+                                                .where(MeasurementStreams.operation == haul_op.operation,
+                                                       MeasurementStreams.attachment_position == deployed_equipment.position,
+                                                       ParsingRulesVw.logger_or_serial == "logger",
+                                                       ParsingRulesVw.equipment == deployed_equipment.equipment,
+                                                       ParsingRulesVw.reading_type == "Y Tilt Angle").first()
+                                            if DEBUG:
+                                                logging.info(f"\t\tstream: {model_to_dict(y_stream)}")
+
+                                            # Y Tilt Values - Retrieve from the data structure
+                                            y_parsed_data = [{"date_time": x[0], "reading_numeric": x[2]}
+                                                           for x in values["data"] if x[2] is not None]
+
+                                            # Create the insert_list
+                                            template = deepcopy(insert_template)
+                                            template["measurement_stream"] = y_stream.measurement_stream
+                                            insert_list = [deepcopy(template)] * len(y_parsed_data)
+                                            insert_list = [{**insert_list[i], **y_parsed_data[i]} for i in range(len(y_parsed_data))]
+                                            insert_list = [x for x in insert_list if x["reading_numeric"] is not None]
+
+                                            # Insert the actual data
+                                            with self._app.settings._database.atomic():
+                                                # OperationMeasurements.insert_many(insert_list).execute()
+                                                for idx in range(0, len(insert_list), 5000):
+                                                    if not self._is_running:
+                                                        raise BreakIt
+                                                    OperationMeasurements.insert_many(insert_list[idx:idx + 5000]).execute()
+
+                                # Process SBE39 Data
+                                elif 'sbe39' in deployed_equipment.position.lower():
+
+                                    # Handle SBE39 data processing
+                                    logging.info('\t\tSBE39 Sensor File Type')
+                                    self._sbe_reader.set_raw_content(raw_content=file.raw_file)
+                                    sbe_data = self._sbe_reader.get_temperature_and_depth()
+                                    if sbe_data is not None:
+
+                                        for sbe_k, sbe_v in sbe_data.items():
+
+                                            if DEBUG:
+                                                logging.info(f"SBE39 key/value: {sbe_k} > {sbe_v}")
+
+                                            # Get the measurement stream associated with the key (sbe_k)
+                                            stream = MeasurementStreams.select(MeasurementStreams) \
+                                                .join(ParsingRulesVw,
+                                                      on=(
+                                                          MeasurementStreams.equipment_field == ParsingRulesVw.parsing_rules).alias(
+                                                          'rules')) \
+                                                .where(MeasurementStreams.operation == haul_op.operation,
+                                                       MeasurementStreams.attachment_position == deployed_equipment.position,
+                                                       ParsingRulesVw.logger_or_serial == "logger",
+                                                       ParsingRulesVw.equipment == deployed_equipment.equipment,
+                                                       ParsingRulesVw.reading_type == sbe_k.replace("Gear", "").strip()).first()
+                                            template = deepcopy(insert_template)
+                                            template["measurement_stream"] = stream.measurement_stream
+                                            if DEBUG:
+                                                logging.info(f"\t\tstream: {model_to_dict(stream)}")
+
+                                            # Get the Values associated with the values (sbe_v)
+                                            parsed_data = [{"date_time": x[0], "reading_numeric": x[1]}
+                                                             for x in sbe_v["data"] if x[1] is not None]
+                                            insert_list = [deepcopy(template)] * len(parsed_data)
+                                            insert_list = [{**insert_list[i], **parsed_data[i]} for i in
+                                                           range(len(parsed_data))]
+
+                                            if DEBUG:
+                                                logging.info(f"\t\tinsert_list len: {len(insert_list)}")
+                                                if len(insert_list) > 0:
+                                                    logging.info(f"\t\tinsert_list[0]: {insert_list[0]}")
+
+                                            # Insert the Values
+                                            insert_list = [x for x in insert_list if x["reading_numeric"] is not None]
+                                            with self._app.settings._database.atomic():
+                                                # OperationMeasurements.insert_many(insert_list).execute()
+                                                for idx in range(0, len(insert_list), 5000):
+                                                    if not self._is_running:
+                                                        raise BreakIt
+                                                    OperationMeasurements.insert_many(insert_list[idx:idx + 5000]).execute()
+
                             load_date = arrow.now()
                             self.haulSensorFileDataLoaded.emit(int(k), load_date.format("MM/DD HH:mm:ss"))
+                            current_file = None
+
+                        except BreakIt:
+                            raise
 
                         except Exception as ex:
                             logging.error(f"Error in loading sensor file data, haul: {v['haul']} > {os.path.basename(v['sensorDatabase'])} > {ex}")
 
+                            # Make sure that none of the file is left loaded, so that a "load new" run retries it
+                            ms = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation,
+                                                                   MeasurementStreams.raw_files == current_file)
+                            OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
+                            OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
+                            OperationAttributes.delete().where(OperationAttributes.measurement_stream << ms).execute()
+                            current_file = None
+
                     if haul_op:
                         load_date = arrow.now().isoformat()
                         Operations.update(sensor_load_date=load_date).where(Operations.operation==haul_op.operation).execute()
@@ -2032,15 +1999,18 @@ class LoadSensorFileDataThread(QObject):
                 # except psycopg2.DatabaseError
 
                 except BreakIt:
-                    # Delete the current haul measurement streams and operation_measurements data
+                    # Keep the files that were completely loaded, so that a "load new" run resumes with the remaining
+                    # files, and only delete the measurements of the file that was interrupted
                     try:
 
                         self._app.settings.set_sensors_proxy(db_file=None)
 
-                        ms = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation)
-                        OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
-                        OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
-                        MeasurementStreams.delete().where(MeasurementStreams.operation == haul_op.operation).execute()
+                        if haul_op and current_file is not None:
+                            ms = MeasurementStreams.select().where(MeasurementStreams.operation == haul_op.operation,
+                                                                   MeasurementStreams.raw_files == current_file)
+                            OperationMeasurements.delete().where(OperationMeasurements.measurement_stream << ms).execute()
+                            OperationMeasurementsErr.delete().where(OperationMeasurementsErr.measurement_stream << ms).execute()
+                            OperationAttributes.delete().where(OperationAttributes.measurement_stream << ms).execute()
 
                         Operations.update(sensor_load_date=None).where(Operations.operation==haul_op.operation).execute()
                         self.haulSensorFileDataLoaded.emit(int(k), None)
@@ -2106,7 +2076,9 @@ class RemoveHaulSensorDataThread(QObject):
 
     def _remove_data(self):
         """
-        Method to remove the haul and sensor data for the items in the self._items variable
+        Method to remove the haul and sensor data for the items in the self._items variable.  The operation ids of all
+        of the hauls are gathered first and then each table is cleared with a single set-based DELETE, all inside of
+        one transaction, so that a cancel or an error leaves the database untouched
         :return:
         """
         if isinstance(self._hauls, QJSValue):
@@ -2117,114 +2089,88 @@ class RemoveHaulSensorDataThread(QObject):
         msg = ""
 
         try:
-            for index, row in self._hauls.items():
-                haul_number = row["haul"]
-                op_id = Operations.get(Operations.operation_name == haul_number).operation
-                if not op_id:
-                    continue
+            haul_numbers = {row["haul"]: index for index, row in self._hauls.items()}
+            op_ids = [x.operation for x in Operations.select(Operations.operation)
+                .where(Operations.operation_name.in_(list(haul_numbers.keys())))]
 
-                logging.info(f"removing haul {row['haul']} >>>  op_id = {op_id}")
+            logging.info(f"removing hauls {list(haul_numbers.keys())} >>>  op_ids = {op_ids}")
 
-                # Performance Details
-                try:
-                    PerformanceDetails.delete().where(PerformanceDetails.operation == op_id).execute()
-                except Exception as ex:
-                    logging.info(f"Error deleting performance details for {haul_number}")
+            counts = OrderedDict()
+            if op_ids:
+                with self._app.settings._database.atomic():
+                    counts = self._remove_operations(op_ids=op_ids)
 
-                try:
-                    op_file_mtx = OperationFilesMtx.select().where(OperationFilesMtx.operation == op_id)
-                    op_meas_streams = MeasurementStreams.select() \
-                        .where(MeasurementStreams.operation_files_mtx.in_(op_file_mtx))
-                except Exception as ex:
-                    logging.info(f"Error retrieving op_file_mtx or op_meas_streams for {haul_number}: {ex}")
-
-                # Operation_Measurement_Err
-                try:
-                    OperationMeasurementsErr.delete()\
-                        .where(OperationMeasurementsErr.measurement_stream.in_(op_meas_streams)).execute()
-
-                except Exception as ex:
-                    logging.info(f"Error deleting operation_measurement_err for {haul_number}: {ex}")
-
-                # Operation_Measurement
-                try:
-                    OperationMeasurements.delete()\
-                        .where(OperationMeasurements.measurement_stream.in_(op_meas_streams)).execute()
-
-                except Exception as ex:
-                    logging.info(f"Error deleting operation_measurement for {haul_number}: {ex}")
-
-                # Remove Comments - from Operations or Events
-                try:
-                    # Operations Comments
-                    Comments.delete().where(Comments.operation == op_id).execute()
-
-                    # Events Comments
-                    op_events = Events.select().where(Events.operation == op_id)
-                    Comments.delete().where(Comments.event.in_(op_events)).execute()
-
-                except Exception as ex:
-                    logging.info(f"Error deleting comments for {haul_number}: {ex}")
-
-                # Remove Events
-                try:
-                    Events.delete().where(Events.operation == op_id).execute()
-                except Exception as ex:
-                    logging.info(f"Error deleting events for {haul_number}: {ex}")
-
-                # Remove Operation_Attributes
-                try:
-                    # Measurement Stream Level
-                    OperationAttributes.delete()\
-                        .where(OperationAttributes.measurement_stream.in_(op_meas_streams)).execute()
-
-                    # Operation Level
-                    OperationAttributes.delete().where(OperationAttributes.operation == op_id).execute()
-
-                except Exception as ex:
-                    logging.info(f"Error deleting operation_attributes for {haul_number}: {ex}")
-
-                # Measurement_Stream
-                try:
-                    MeasurementStreams.delete()\
-                        .where(MeasurementStreams.measurement_stream.in_(op_meas_streams)).execute()
-
-                except Exception as ex:
-                    logging.info(f"Error deleting measurement_stream for {haul_number}: {ex}")
-
-                # Operation_File_Mtx
-                try:
-                    OperationFilesMtx.delete()\
-                        .where(OperationFilesMtx.operation_files_mtx.in_(op_file_mtx)).execute()
-                except Exception as ex:
-                    logging.info(f"Error deleting operation_file_mtx for {haul_number}: {ex}")
+            for index in haul_numbers.values():
+                self.haulCompleted.emit(index)
 
-                # Remove Operations
-                try:
-                    Operations.delete().where(Operations.operation_name == haul_number).execute()
-                except Exception as ex:
-                    logging.info(f"Error deleting operations for {haul_number}: {ex}")
+        except BreakIt:
 
-                self.haulCompleted.emit(index)
+            end = arrow.now()
+            elapsed_time = (end - start).total_seconds()
+            msg = "Removing the haul + sensor data was cancelled, nothing was removed"
+            logging.info(msg)
+            return status, msg, elapsed_time
 
         except Exception as ex:
 
             end = arrow.now()
             elapsed_time = (end - start).total_seconds()
-            msg = f"Error removing the haul + sensor data: {ex}"
+            msg = f"Error removing the haul + sensor data, nothing was removed: {ex}"
             logging.error(msg)
             return status, msg, elapsed_time
 
-
         end = arrow.now()
 
         elapsed_time = (end - start).total_seconds()
-        msg = f"Elapsed time: {elapsed_time:.1f}s"
+        msg = f"Elapsed time: {elapsed_time:.1f}s, rows removed: " + \
+              ", ".join(f"{k} {v}" for k, v in counts.items())
         logging.info(msg)
         status = True
 
         return status, msg, elapsed_time
 
+    def _remove_operations(self, op_ids):
+        """
+        Method to delete the operations and all of their dependent records with one DELETE per table.  The rows are
+        removed from the children up to the operations, so the sub-selects are evaluated before their parents go
+        :param op_ids: list of operation_id values
+        :return: OrderedDict - table name: number of rows deleted
+        """
+        op_file_mtx = OperationFilesMtx.select(OperationFilesMtx.operation_files_mtx)\
+            .where(OperationFilesMtx.operation.in_(op_ids))
+        op_meas_streams = MeasurementStreams.select(MeasurementStreams.measurement_stream)\
+            .where(MeasurementStreams.operation_files_mtx.in_(op_file_mtx))
+        op_events = Events.select(Events.event).where(Events.operation.in_(op_ids))
+
+        deletes = [
+            ("performance_details", PerformanceDetails.delete().where(PerformanceDetails.operation.in_(op_ids))),
+            ("operation_measurement_err", OperationMeasurementsErr.delete()
+                .where(OperationMeasurementsErr.measurement_stream.in_(op_meas_streams))),
+            ("operation_measurement", OperationMeasurements.delete()
+                .where(OperationMeasurements.measurement_stream.in_(op_meas_streams))),
+            ("comments", Comments.delete().where(Comments.operation.in_(op_ids) | Comments.event.in_(op_events))),
+            ("events", Events.delete().where(Events.operation.in_(op_ids))),
+            ("operation_attributes", OperationAttributes.delete()
+                .where(OperationAttributes.measurement_stream.in_(op_meas_streams) |
+                       OperationAttributes.operation.in_(op_ids))),
+            ("measurement_stream", MeasurementStreams.delete()
+                .where(MeasurementStreams.measurement_stream.in_(op_meas_streams))),
+            ("operation_files_mtx", OperationFilesMtx.delete()
+                .where(OperationFilesMtx.operation_files_mtx.in_(op_file_mtx))),
+            ("operations", Operations.delete().where(Operations.operation.in_(op_ids)))
+        ]
+
+        counts = OrderedDict()
+        for table, query in deletes:
+            if not self._is_running:
+                raise BreakIt
+            table_start = arrow.now()
+            counts[table] = query.execute()
+            logging.info(f"\t{table}: {counts[table]} rows removed in "
+                         f"{(arrow.now() - table_start).total_seconds():.1f}s")
+
+        return counts
+
 
 class DataCheckModel(FramListModel):
 
@@ -2251,6 +2197,9 @@ class DataCheckModel(FramListModel):
         self.add_role_name(name="specimenCount")
         self.add_role_name(name="zeroBasketWeightCount")
 
+        # Hauls are looked up by name when linking and unlinking tows
+        self.add_index("haul")
+
         self._populate_model_thread = QThread()
         self._populate_model_worker = None
 
@@ -2513,6 +2462,8 @@ class DataCompleteness(QObject):
     showMessage = pyqtSignal(str, bool, str, arguments=["job", "status", "msg"])
     haulDataRemoved = pyqtSignal(int, arguments=["index",])
 
+    parallelLoadingChanged = pyqtSignal()
+
     def __init__(self, app=None, db=None):
         super().__init__()
 
@@ -2536,6 +2487,31 @@ class DataCompleteness(QObject):
         self._remove_haul_sensor_data_thread = QThread()
         self._remove_haul_sensor_data_worker = None
 
+        # Parse the serial data of multiple hauls concurrently, one worker process per core, when turned on
+        self._parallel_loading = False
+
+    @pyqtProperty(bool, notify=parallelLoadingChanged)
+    def parallelLoading(self):
+        """
+        Method to return the self._parallel_loading variable
+        :return:
+        """
+        return self._parallel_loading
+
+    @parallelLoading.setter
+    def parallelLoading(self, value):
+        """
+        Method to set the self._parallel_loading variable
+        :param value: bool - True to parse hauls in a pool of worker processes
+        :return:
+        """
+        if not isinstance(value, bool):
+            logging.error(f"trying to set the self._parallel_loading variable, but it is not a bool: {value}")
+            return
+
+        self._parallel_loading = value
+        self.parallelLoadingChanged.emit()
+
     @pyqtProperty(FramListModel, notify=dataCheckModelChanged)
     def dataCheckModel(self):
         """
@@ -2615,7 +2591,7 @@ class DataCompleteness(QObject):
         """
 
         # Create + Start Thread for Loading Serial NMEA data
-        kwargs = {"app": self._app, "items": items, "loadStatus": load_status}
+        kwargs = {"app": self._app, "items": items, "loadStatus": load_status, "parallel": self._parallel_loading}
         self._load_sensor_serial_data_worker = LoadSensorSerialDataThread(kwargs=kwargs)
         self._load_sensor_serial_data_worker.moveToThread(self._load_sensor_serial_data_thread)
 
@@ -2899,6 +2875,99 @@ class TestDataCompleteness(unittest.TestCase):
         print('done')
 
 
+class TestRemoveHaulSensorData(unittest.TestCase):
+    """
+    Runs on an in-memory SQLite database with fram_central attached, holding just the tables of the removal
+    """
+    MODELS = [Operations, OperationFilesMtx, MeasurementStreams, OperationMeasurements, OperationMeasurementsErr,
+              OperationAttributes, Events, Comments, PerformanceDetails]
+
+    def setUp(self):
+        from types import SimpleNamespace
+        from peewee import SqliteDatabase
+        from py.trawl_analyzer.Settings import database_proxy
+
+        self.db = SqliteDatabase(":memory:")
+        self.db.execute_sql("ATTACH DATABASE ':memory:' AS fram_central")
+        database_proxy.initialize(self.db)
+
+        # SQLite does not take schema qualified foreign keys, so the tables are created without them
+        for model in self.MODELS:
+            columns = [f"{x.column_name} INTEGER PRIMARY KEY" if x.primary_key else x.column_name
+                       for x in model._meta.sorted_fields]
+            self.db.execute_sql(f"CREATE TABLE fram_central.{model._meta.table_name} ({', '.join(columns)})")
+
+        # Two hauls, each with a sensor file, two streams and their dependent records
+        stream_id = 0
+        for op_id, haul in [(1, "201603008001"), (2, "201603008002")]:
+            Operations.insert(operation=op_id, operation_name=haul).execute()
+            Events.insert(event=op_id, operation=op_id).execute()
+            Comments.insert(operation=op_id).execute()
+            Comments.insert(event=op_id).execute()
+            PerformanceDetails.insert(operation=op_id).execute()
+            OperationAttributes.insert(operation=op_id).execute()
+            OperationFilesMtx.insert(operation_files_mtx=op_id, operation=op_id).execute()
+            for _ in range(2):
+                stream_id += 1
+                MeasurementStreams.insert(measurement_stream=stream_id, operation=op_id,
+                                          operation_files_mtx=op_id).execute()
+                OperationMeasurements.insert_many([{"measurement_stream": stream_id, "reading_numeric": x}
+                                                   for x in range(10)]).execute()
+                OperationMeasurementsErr.insert(measurement_stream=stream_id, operation_measurement=0).execute()
+                OperationAttributes.insert(operation=op_id, measurement_stream=stream_id).execute()
+
+        self.app = SimpleNamespace(settings=SimpleNamespace(_database=self.db))
+        self.hauls = {0: {"haul": "201603008001"}}
+
+    def tearDown(self):
+        self.db.close()
+
+    def _counts(self):
+        return {model._meta.table_name: model.select().count() for model in self.MODELS}
+
+    def test_remove_data(self):
+        thread = RemoveHaulSensorDataThread(kwargs={"app": self.app, "hauls": self.hauls})
+        thread._is_running = True
+        before = self._counts()
+        removed = thread._remove_operations(op_ids=[1])
+
+        self.assertEqual(OrderedDict([("performance_details", 1), ("operation_measurement_err", 2),
+                                      ("operation_measurement", 20), ("comments", 2), ("events", 1),
+                                      ("operation_attributes", 3), ("measurement_stream", 2),
+                                      ("operation_files_mtx", 1), ("operations", 1)]), removed)
+
+        # Only the other haul is left
+        after = self._counts()
+        self.assertEqual({k: v // 2 for k, v in before.items()}, after)
+        self.assertEqual(["201603008002"], [x.operation_name for x in Operations.select()])
+        self.assertEqual([3, 4], sorted(x.measurement_stream for x in MeasurementStreams.select()))
+
+    def test_remove_data_cancelled(self):
+        class CancelledThread(RemoveHaulSensorDataThread):
+            """
+            Cancelled by the user once the first four tables have been cleared
+            """
+            n_checks = 0
+
+            @property
+            def _is_running(self):
+                self.n_checks += 1
+                return self.n_checks <= 4
+
+            @_is_running.setter
+            def _is_running(self, value):
+                pass
+
+        thread = CancelledThread(kwargs={"app": self.app, "hauls": self.hauls})
+        before = self._counts()
+        status, msg, elapsed_time = thread._remove_data()
+
+        self.assertFalse(status)
+        self.assertIn("cancelled", msg)
+        self.assertEqual(5, thread.n_checks)
+        self.assertEqual(before, self._counts())
+
+
 if __name__ == '__main__':
 
     unittest.main()
\ No newline at end of file
@@ -19,23 +19,7 @@ import os
 import psycopg2.tz
 
 from py.trawl_analyzer.CommonFunctions import CommonFunctions
-
-from ctypes import cdll, c_int, c_double, Structure, POINTER, ARRAY, cast
-
-
-
-class LatLon(Structure):
-    _fields_ = [("latitude", c_double), ("longitude", c_double)]
-
-
-class RangeBearing(Structure):
-    _fields_ = [("range", c_double), ("bearing", c_double)]
-
-
-geodll = cdll.LoadLibrary(r"py\trawl_analyzer\GeographicLib.dll")
-geodll.sum_test.restype = c_double
-geodll.get_lat_lon.restype = POINTER(LatLon)
-geodll.get_range_bearing.restype = POINTER(RangeBearing)
+from py.trawl_analyzer import Geodesy
 
 
 
@@ -53,10 +37,66 @@ class DistanceFished:
     The Distance Fished class performs all of the distance fished calculations for the Trawl Survey.  Algorithms
     typically have two components:  Pre Haulback and Post Haulback.
     """
-    def __init__(self):
+    def __init__(self, geodesy=None):
+        """
+        :param geodesy: Geodesy.GeodesyBackend - defaults to the one chosen by Geodesy.get_backend
+        """
         super().__init__()
         self._functions = CommonFunctions()
+        self._geodesy = geodesy if geodesy is not None else Geodesy.get_backend()
         self._is_depth_valid = False
+        logging.info(f"Distance fished geodesy backend: {self._geodesy.name}")
+
+    @staticmethod
+    def reverse_bearing(heading):
+        """
+        Method to turn a vessel heading into the bearing from the vessel back towards the net
+        :param heading: pandas Series of headings, degrees
+        :return: pandas Series of bearings, degrees
+        """
+        return (heading - 180).where(heading >= 180, heading + 180)
+
+    @staticmethod
+    def trig_range(scope, depth):
+        """
+        Method to calculate the horizontal range of the net from the scope and depth, using the pythagorean theorem.
+        Rows where the depth is negative or at least the scope are NaN
+        :param scope: pandas Series - scope in meters
+        :param depth: pandas Series - depth in meters
+        :return: numpy array of ranges in meters
+        """
+        scope = np.asarray(scope, dtype=np.float64)
+        depth = np.asarray(depth, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            return np.where((scope > depth) & (depth >= 0), np.sqrt(scope ** 2 - depth ** 2), np.nan)
+
+    @staticmethod
+    def catenary_a(scope, depth):
+        """
+        Method to calculate the catenary shape factor, a, from the scope and depth.  Rows with a zero or missing
+        depth are NaN
+        :param scope: pandas Series - scope in meters
+        :param depth: pandas Series - depth in meters
+        :return: numpy array
+        """
+        scope = np.asarray(scope, dtype=np.float64)
+        depth = np.asarray(depth, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(depth != 0, (scope ** 2 - depth ** 2) / (2 * depth), np.nan)
+
+    @staticmethod
+    def catenary_range(scope, a):
+        """
+        Method to calculate the catenary horizontal range from the scope and the shape factor, a.  Rows with a zero
+        or missing a are NaN
+        :param scope: pandas Series - scope in meters
+        :param a: pandas Series - catenary shape factor
+        :return: numpy array of ranges in meters
+        """
+        scope = np.asarray(scope, dtype=np.float64)
+        a = np.asarray(a, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(a != 0, a * np.log((scope / a) + np.sqrt((scope / a) ** 2 + 1)), np.nan)
 
     def calculate_all_distances_fished(self, tracklines, scope, span, df_depth, df_headrope):
         """
@@ -158,9 +198,7 @@ class DistanceFished:
         df_vessel.drop_duplicates(subset=['times'], keep="first", inplace=True)         # Required as headings are at 4 Hz
 
         # TODO Todd Hay - Is this bearing correction even correct?  I'm not convinced !!!!!!! ******* XXXXXX
-        df_vessel["bearing"] = df_vessel.apply(
-            lambda x: (x["track made good"] - 180)  # Calculate the net bearing from vessel heading
-            if (x["track made good"] - 180) >= 0 else x["track made good"] + 180, axis=1)  # Create Bearing
+        df_vessel["bearing"] = self.reverse_bearing(df_vessel["track made good"])    # Net bearing from vessel heading
 
         logging.info(f"\tVESSEL track data, in distance fished, start/end: {df_vessel.iloc[0]} > {df_vessel.iloc[-1]}")
 
@@ -353,8 +391,7 @@ class DistanceFished:
                 df_dist = df_dist.rename(columns={"gear_lat": "lat1", "gear_lon": "lon1"})
                 df_dist["lat2"] = df_dist["lat1"].shift()
                 df_dist["lon2"] = df_dist["lon1"].shift()
-                df_dist["dist"] = df_dist.apply(lambda x: self._functions.get_distance(x["lat1"], x["lon1"],
-                                                                                       x["lat2"], x["lon2"]), axis=1)
+                df_dist["dist"], _ = self._geodesy.inverse(df_dist["lat1"], df_dist["lon1"], df_dist["lat2"], df_dist["lon2"])
 
                 distance_pre_M = df_dist.loc[pre_mask, "dist"].sum()
                 distance_post_M = df_dist.loc[post_mask, "dist"].sum()
@@ -666,8 +703,8 @@ class DistanceFished:
             df_dist_pre = df_dist_pre.rename(columns={"gear_lat": "lat1", "gear_lon": "lon1"})
             df_dist_pre["lat2"] = df_dist_pre["lat1"].shift()
             df_dist_pre["lon2"] = df_dist_pre["lon1"].shift()
-            df_dist_pre.loc[mask, "dist"] = df_dist_pre.loc[mask].apply(
-                lambda x: self._functions.get_distance(x["lat1"], x["lon1"], x["lat2"], x["lon2"]), axis=1)
+            df_dist_pre.loc[mask, "dist"], _ = self._geodesy.inverse(df_dist_pre.loc[mask, "lat1"], df_dist_pre.loc[mask, "lon1"],
+                                                               df_dist_pre.loc[mask, "lat2"], df_dist_pre.loc[mask, "lon2"])
             distance = df_dist_pre["dist"].sum()
             distance_N = N_PER_M * distance
 
@@ -802,15 +839,14 @@ class DistanceFished:
         trig_end_time = df_trig["times"].iloc[-1]                                   # Time at Doors At Surface
 
         # Calculate and assign the scope
-        df_trig.loc[:, "scope"] = df_trig.apply(lambda x: (trig_end_time - x["times"]).seconds * ratio, axis=1)
+        df_trig.loc[:, "scope"] = (trig_end_time - df_trig["times"]).dt.seconds * ratio
         df_post = df_post.assign(scope=df_trig["scope"])
 
         # path = os.path.expanduser("~/Desktop/df_post_before.csv")
         # df_post.loc[:, ['times', 'latitude', 'longitude', 'a', 'scope', 'depth', 'track made good', 'bearing', 'gear_lat', 'gear_lon']].to_csv(path)
 
         # Calculate the range from the scope + depth using pythagorean theorem
-        df_post.loc[:, "range"] = df_post.apply(lambda x: math.sqrt(x["scope"] ** 2 - x["depth"] ** 2)
-                                                if x["scope"] > x["depth"] and x["depth"] >= 0 else None, axis=1)
+        df_post.loc[:, "range"] = self.trig_range(scope=df_post["scope"], depth=df_post["depth"])
 
         # path = os.path.expanduser("~/Desktop/df_post_after.csv")
         # df_post.loc[:, ['times', 'latitude', 'longitude', 'a', 'scope', 'depth', 'range', 'track made good', 'bearing', 'gear_lat', 'gear_lon']].to_csv(path)
@@ -824,14 +860,8 @@ class DistanceFished:
         #     return None
 
         # Calculate the gear_lat and gear_lon
-        df_post["gear_lat"] = df_post.apply(lambda x: self._functions.get_lat(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]) if x["range"] is not None else None, axis=1)
-        df_post["gear_lon"] = df_post.apply(lambda x: self._functions.get_lon(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]) if x["range"] is not None else None, axis=1)
+        df_post["gear_lat"], df_post["gear_lon"] = self._geodesy.direct(df_post["latitude"], df_post["longitude"],
+                                                                  df_post["bearing"], df_post["range"])
 
         # Smooth the df_post line using a running mean
         df_post.loc[:, ["gear_lat", "gear_lon"]] = df_post.loc[:, ["gear_lat", "gear_lon"]].rolling(window=span,
@@ -930,12 +960,9 @@ class DistanceFished:
         scope_grow_rate = scope / (num_pts - 1)
         logging.info(f"Number of points before the tow starts: {num_pts}")
 
-        df_gear.loc[mask, "scope"] = [i * scope_grow_rate for i in range(num_pts)]
-        df_gear.loc[mask, "a"] = df_gear.loc[mask].apply(lambda x: (x["scope"]**2 - x["depth"]**2) / (2*x["depth"])
-                                                         if x["depth"] != 0 and not math.isnan(x["depth"]) else None, axis=1)
-        df_gear.loc[mask, "range"] = df_gear.loc[mask] \
-            .apply(lambda x: x["a"] * math.log((x["scope"] / x["a"]) + math.sqrt((x["scope"] / x["a"]) ** 2 + 1))
-                if not math.isnan(x["a"]) and x["a"] != 0 else None, axis=1)
+        df_gear.loc[mask, "scope"] = np.arange(num_pts) * scope_grow_rate
+        df_gear.loc[mask, "a"] = self.catenary_a(scope=df_gear.loc[mask, "scope"], depth=df_gear.loc[mask, "depth"])
+        df_gear.loc[mask, "range"] = self.catenary_range(scope=df_gear.loc[mask, "scope"], a=df_gear.loc[mask, "a"])
 
         #################################################################################
         # Doors Fully Out > Start Haulback Phase
@@ -946,11 +973,8 @@ class DistanceFished:
         #################################################################################
         mask = (df_gear["times"] >= doors_fully_out) & (df_gear["times"] < start_haulback)
         df_gear.loc[mask, "scope"] = scope
-        df_gear.loc[mask, "a"] = df_gear.loc[mask].apply(lambda x: (x["scope"]**2 - x["depth"]**2) / (2*x["depth"])
-                                                            if x["depth"] != 0 and not math.isnan(x["depth"]) else None, axis=1)
-        df_gear.loc[mask, "range"] = df_gear.loc[mask]\
-                .apply(lambda x: x["a"] * math.log((x["scope"]/x["a"]) + math.sqrt((x["scope"]/x["a"])**2 + 1))
-                                    if not math.isnan(x["a"]) and x["a"] != 0 else None, axis=1)
+        df_gear.loc[mask, "a"] = self.catenary_a(scope=df_gear.loc[mask, "scope"], depth=df_gear.loc[mask, "depth"])
+        df_gear.loc[mask, "range"] = self.catenary_range(scope=df_gear.loc[mask, "scope"], a=df_gear.loc[mask, "a"])
 
         #################################################################################
         # Start Haulback > End of Haul Phase
@@ -966,42 +990,29 @@ class DistanceFished:
 
         # Decrement Scope, then calculate a, approach
         scope_shrink_rate = scope / (post_haulback_size-1)
-        df_gear.loc[mask, "scope"] = [scope - i * scope_shrink_rate for i in range(post_haulback_size)]
-        df_gear.loc[mask, "a"] = df_gear.loc[mask].apply(lambda x: (x["scope"]**2 - x["depth"]**2) / (2*x["depth"])
-                                                     if x["depth"] != 0 and not math.isnan(x["depth"]) else None, axis=1)
-        df_gear.loc[mask, "range"] = df_gear.loc[mask]\
-                .apply(lambda x: x["a"] * math.log((x["scope"]/x["a"]) + math.sqrt((x["scope"]/x["a"])**2 + 1))
-                                    if not math.isnan(x["a"]) and x["a"] != 0 else None, axis=1)
+        df_gear.loc[mask, "scope"] = scope - np.arange(post_haulback_size) * scope_shrink_rate
+        df_gear.loc[mask, "a"] = self.catenary_a(scope=df_gear.loc[mask, "scope"], depth=df_gear.loc[mask, "depth"])
+        df_gear.loc[mask, "range"] = self.catenary_range(scope=df_gear.loc[mask, "scope"], a=df_gear.loc[mask, "a"])
 
         #################################################################################
-        # Calculate all of the gear lat/lon values using the C DLL function
+        # Calculate all of the gear lat/lon values using the geodesy backend
         #################################################################################
         start = arrow.now()
 
         mask = (df_gear["times"] >= start_haul) & (df_gear["times"] <= end_of_haul)
         num_rows = len(df_gear.loc[mask])
 
-        # Prepare the vessel_data structure for passing into the C DLL
-        vessel_data = df_gear.loc[mask, ["latitude", "longitude", "range"]].copy(deep=True).as_matrix()
-        vessel_data = np.ascontiguousarray(vessel_data, dtype=np.double)
-        vessel_ctypes = [np.ctypeslib.as_ctypes(array) for array in vessel_data]
-        vessel_ptr = (POINTER(c_double) * num_rows)(*vessel_ctypes)
-
-        # Prepare gear_data data structure to catch gear lat/lon values calculated via C DLL function
-        gear_data = np.zeros([num_rows, 3], dtype=np.double)
-        gear_ctypes = [np.ctypeslib.as_ctypes(array) for array in gear_data]
-        gear_ptr = (POINTER(c_double) * num_rows)(*gear_ctypes)
-
-        # Calculate gear lat/lon values from the C DLL
-        geodll.get_gear_lat_lon(c_int(num_rows), vessel_ptr, c_double(gear_lat), c_double(gear_lon), gear_ptr)
+        vessel_data = df_gear.loc[mask, ["latitude", "longitude", "range"]].values.astype(np.double)
+        gear_data = self._geodesy.gear_lat_lon(vessel_data=vessel_data, gear_lat=gear_lat, gear_lon=gear_lon)
 
         end = arrow.now()
-        logging.info(f"C DLL Iterations:  {num_rows} iterations took {(end-start).total_seconds():.4f}s")
+        logging.info(f"Gear lat/lon {self._geodesy.name} iterations:  {num_rows} iterations took "
+                     f"{(end-start).total_seconds():.4f}s")
 
         # Add the gear_data back to the pandas data frame:
-        df_gear.loc[mask, "gear_lat"] = [gear_data[i][0] for i in range(num_rows)]
-        df_gear.loc[mask, "gear_lon"] = [gear_data[i][1] for i in range(num_rows)]
-        df_gear.loc[mask, "bearing"] = [gear_data[i][2] for i in range(num_rows)]
+        df_gear.loc[mask, "gear_lat"] = gear_data[:, 0]
+        df_gear.loc[mask, "gear_lon"] = gear_data[:, 1]
+        df_gear.loc[mask, "bearing"] = gear_data[:, 2]
 
         path = os.path.expanduser("~/Desktop/df_gear_cat.csv")
         # df_gear.loc[:, ['times', 'latitude', 'longitude', 'a', 'scope', 'depth', 'range', 'track made good', 'bearing', 'gear_lat', 'gear_lon']].to_csv(path)
@@ -1106,17 +1117,13 @@ class DistanceFished:
         df_pre = df_vessel.iloc[start:end].copy(deep=True)
 
         # Calculate the Pre-Haulback Range
-        df_pre.loc[:, "range"] = df_pre.apply(lambda x: math.sqrt(scope ** 2 - x["depth"] ** 2) if scope > x["depth"] else None, axis=1)
+        depth = df_pre["depth"].values.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            df_pre.loc[:, "range"] = np.where(scope > depth, np.sqrt(scope ** 2 - depth ** 2), np.nan)
 
         # Calculate the gear_lat and gear_lon
-        df_pre["gear_lat"] = df_pre.apply(lambda x: self._functions.get_lat(lat=x["latitude"],
-                                                                            lon=x["longitude"],
-                                                                            bearing=x["bearing"],
-                                                                            range=x["range"]), axis=1)
-        df_pre["gear_lon"] = df_pre.apply(lambda x: self._functions.get_lon(lat=x["latitude"],
-                                                                            lon=x["longitude"],
-                                                                            bearing=x["bearing"],
-                                                                            range=x["range"]), axis=1)
+        df_pre["gear_lat"], df_pre["gear_lon"] = self._geodesy.direct(df_pre["latitude"], df_pre["longitude"],
+                                                                df_pre["bearing"], df_pre["range"])
 
         # Smooth the df_pre line with a running mean
         df_pre.loc[:, ["gear_lat", "gear_lon"]] = df_pre.loc[:, ["gear_lat", "gear_lon"]].rolling(window=span,
@@ -1170,14 +1177,12 @@ class DistanceFished:
 
         # Bearing Method B. Smoothed vessel bearing
         elif bearing_type == "vessel_smoothed":
-            df_gear["bearing"] = df_gear.apply(lambda x: (x["track made good"] - 180)   # Calculate the net bearing from vessel heading
-                            if (x["track made good"] - 180) >= 0 else x["track made good"] + 180, axis=1)    # Create Bearing
+            df_gear["bearing"] = self.reverse_bearing(df_gear["track made good"])   # Net bearing from vessel heading
             df_gear.loc[:, "bearing"] = df_gear.loc[:, "bearing"].rolling(window=span).mean()
 
         # Bearing Method C. Point-wise bearing, no smoothingn
         elif bearing_type == "standard":
-            df_gear["bearing"] = df_gear.apply(lambda x: (x["track made good"] - 180)   # Calculate the net bearing from vessel heading
-                            if (x["track made good"] - 180) >= 0 else x["track made good"] + 180, axis=1)    # Create Bearing
+            df_gear["bearing"] = self.reverse_bearing(df_gear["track made good"])   # Net bearing from vessel heading
 
         # Bearing Method D. Large Smoothing from Vessel Position to Gear Position.  Take a span of the number of points
         # between where the vessel is at begin_tow and trace backwards by the initial scope size, achieved by going back
@@ -1189,8 +1194,8 @@ class DistanceFished:
             #     .rolling(window=span).mean()
             df_vessel_dist["latitude2"] = df_vessel_dist["latitude"].shift()
             df_vessel_dist["longitude2"] = df_vessel_dist["longitude"].shift()
-            df_vessel_dist["dist"] = df_vessel_dist.apply(lambda x: self._functions.get_distance(x["latitude"], x["longitude"],
-                                                                                   x["latitude2"], x["longitude2"]), axis=1)
+            df_vessel_dist["dist"], _ = self._geodesy.inverse(df_vessel_dist["latitude"], df_vessel_dist["longitude"],
+                                                        df_vessel_dist["latitude2"], df_vessel_dist["longitude2"])
             mask = (df_vessel_dist["times"] <= begin_tow)
             df_vessel_dist = df_vessel_dist.loc[mask]
             df_vessel_dist["sum"] = df_vessel_dist.iloc[::-1].loc[:, "dist"].cumsum()[::-1]
@@ -1203,8 +1208,7 @@ class DistanceFished:
 
             df_vessel.loc[:, "smoothed heading"] = df_vessel.loc[:, "track made good"].rolling(window=vessel_scope_span).mean()
             df_gear = df_gear.assign(smoothed_heading=df_vessel["smoothed heading"])
-            df_gear["bearing"] = df_gear.apply(lambda x: (x["smoothed_heading"] - 180)
-                                                 if x["smoothed_heading"] - 180 >= 0 else x["smoothed_heading"]+180, axis=1)
+            df_gear["bearing"] = self.reverse_bearing(df_gear["smoothed_heading"])
 
         # Begin the catenary calculation.  Find the shape factor, a, of the catenary at begin_tow with the
         # starting depth and starting scope
@@ -1234,17 +1238,18 @@ class DistanceFished:
         # df_gear.loc[df_gear["times"] >= start_haulback, "a"] = df_gear.loc[df_gear["times"] >= start_haulback] \
         #     .apply(lambda x: (x["scope"]**2 - x["depth"]**2) / (2*x["depth"]), axis=1)
 
-        df_gear.loc[df_gear["times"] >= start_haulback, "a"] = [a - i*2 for i in range(post_haulback_size)]
-
+        haulback_mask = (df_gear["times"] >= start_haulback)
+        df_gear.loc[haulback_mask, "a"] = a - np.arange(post_haulback_size) * 2
 
-        df_gear.loc[df_gear["times"] >= start_haulback, "scope"] = \
-            df_gear.loc[df_gear["times"] >= start_haulback] \
-                .apply(lambda x: math.sqrt(x["depth"]**2 + 2*x["depth"]*x["a"]) if x["a"] > 0 else None, axis=1)
+        haulback_a = df_gear.loc[haulback_mask, "a"].values.astype(np.float64)
+        haulback_depth = df_gear.loc[haulback_mask, "depth"].values.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            df_gear.loc[haulback_mask, "scope"] = np.where(haulback_a > 0,
+                                                           np.sqrt(haulback_depth ** 2 + 2 * haulback_depth * haulback_a),
+                                                           np.nan)
 
-        df_gear.loc[df_gear["times"] >= start_haulback, "range"] = \
-            df_gear.loc[df_gear["times"] >= start_haulback]\
-                .apply(lambda x: x["a"] * math.log((x["scope"]/x["a"]) + math.sqrt((x["scope"]/x["a"])**2 + 1))
-                                    if not math.isnan(x["a"]) else None, axis=1)
+        df_gear.loc[haulback_mask, "range"] = self.catenary_range(scope=df_gear.loc[haulback_mask, "scope"],
+                                                                  a=df_gear.loc[haulback_mask, "a"])
 
         # df_gear.loc[df_gear["times"] >= start_haulback, "range"] = \
         #     df_gear.loc[df_gear["times"] >= start_haulback]\
@@ -1263,14 +1268,8 @@ class DistanceFished:
 
 
         # Calculate the gear_lat and gear_lon with the newly generated bearing and range information
-        df_gear["gear_lat"] = df_gear.apply(lambda x: self._functions.get_lat(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]), axis=1)
-        df_gear["gear_lon"] = df_gear.apply(lambda x: self._functions.get_lon(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]), axis=1)
+        df_gear["gear_lat"], df_gear["gear_lon"] = self._geodesy.direct(df_gear["latitude"], df_gear["longitude"],
+                                                                  df_gear["bearing"], df_gear["range"])
 
         # Smooth the df_post line using a running mean
         df_gear.loc[:, ["gear_lat", "gear_lon"]] = df_gear.loc[:, ["gear_lat", "gear_lon"]].rolling(window=span,
@@ -1318,7 +1317,7 @@ class DistanceFished:
         trig_end_time = df_trig["times"].iloc[-1]                                   # Time at Doors At Surface
 
         # Calculate and assign the scope
-        df_trig.loc[:, "scope"] = df_trig.apply(lambda x: (trig_end_time - x["times"]).seconds * ratio, axis=1)
+        df_trig.loc[:, "scope"] = (trig_end_time - df_trig["times"]).dt.seconds * ratio
         df_post = df_post.assign(trig_scope=df_trig["scope"])
 
         # Determine where the vessel speed starts decreasing and then levels out
@@ -1340,25 +1339,22 @@ class DistanceFished:
         # Calculate thhe range using the catenary method
         initial_guess = 100
         a = self.calculate_catenary(depth=depth, range=range, initial=initial_guess)
-        df_post.loc[:, "range"] = df_post.apply(lambda x: a * math.acosh((x["depth"] + a) / a), axis=1)
+        df_post.loc[:, "range"] = a * np.arccosh((df_post["depth"].values.astype(np.float64) + a) / a)
 
-        df_slack.loc[:, "range"] = df_slack.apply(lambda x: a * math.acosh((x["depth"] + a) / a), axis=1)
+        df_slack.loc[:, "range"] = a * np.arccosh((df_slack["depth"].values.astype(np.float64) + a) / a)
 
         # Calculate the range from the scope + depth using pythagorean theorem, i.e  Trig Method
         df_taut = df_post.iloc[end+1:].copy(deep=True)
-        df_taut.loc[:, "range"] = \
-            df_taut.apply(lambda x: math.sqrt(x["trig_scope"] ** 2 - x["depth"] ** 2) if x["trig_scope"] > x["depth"] else None, axis=1)
+        trig_scope = df_taut["trig_scope"].values.astype(np.float64)
+        taut_depth = df_taut["depth"].values.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            df_taut.loc[:, "range"] = np.where(trig_scope > taut_depth, np.sqrt(trig_scope ** 2 - taut_depth ** 2),
+                                               np.nan)
         df_slack = df_slack.append(df_taut)
 
         # Calculate the gear_lat and gear_lon
-        df_post["gear_lat"] = df_post.apply(lambda x: self._functions.get_lat(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]), axis=1)
-        df_post["gear_lon"] = df_post.apply(lambda x: self._functions.get_lon(lat=x["latitude"],
-                                                                              lon=x["longitude"],
-                                                                              bearing=x["bearing"],
-                                                                              range=x["range"]), axis=1)
+        df_post["gear_lat"], df_post["gear_lon"] = self._geodesy.direct(df_post["latitude"], df_post["longitude"],
+                                                                  df_post["bearing"], df_post["range"])
 
         # Smooth the df_post line using a running mean
         df_post.loc[:, ["gear_lat", "gear_lon"]] = df_post.loc[:, ["gear_lat", "gear_lon"]].rolling(window=span,
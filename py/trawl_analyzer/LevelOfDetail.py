@@ -0,0 +1,128 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        LevelOfDetail.py
+# Purpose:     Min/max decimation pyramids for drawing long time series in matplotlib
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+A MinMaxPyramid holds, for a time series sorted by time, a set of levels where level k keeps only the minimum and
+the maximum point of every bucket of 2**k consecutive points.  Drawing the minimum and maximum of each bucket
+preserves the spikes and the overall envelope of the signal, so once a bucket is narrower than a pixel the
+decimated line looks the same as the full one.
+
+The pyramid is built once per series with numpy and, for a given x range and pixel width, returns the indices of
+the finest level that still fits within the requested number of points.  Zooming in therefore progressively
+refines the line until every raw point is drawn.
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+
+
+def times_to_num(times, offset=None):
+    """
+    Method to convert a series of date/times into matplotlib date numbers, applying the stream offset as a single
+    vectorized timedelta addition
+    :param times: Series of datetimes, tz-aware or UTC-naive
+    :param offset: int - stream offset in seconds, or None
+    :return: numpy array of float
+    """
+    times = pd.to_datetime(times, utc=True)
+    if offset:
+        times = times + pd.Timedelta(seconds=offset)
+    if len(times) == 0:
+        return np.array([], dtype=np.float64)
+    return mdates.date2num(times.dt.tz_convert("UTC").dt.tz_localize(None).values)
+
+
+class MinMaxPyramid:
+    """
+    Input parameters include:
+    x: numpy array of the x values (matplotlib date numbers), sorted ascending
+    y: numpy array of the y values
+    """
+    MIN_BUCKETS = 64
+
+    def __init__(self, x, y):
+        super().__init__()
+        self._x = np.asarray(x, dtype=np.float64)
+        self._y = np.asarray(y, dtype=np.float64)
+        self._levels = [np.arange(len(self._x))]
+        self._build()
+
+    def __len__(self):
+        return len(self._x)
+
+    def _build(self):
+        """
+        Method to build the decimated levels.  Each level is an array of indices into the raw points, holding the
+        argmin and argmax of each bucket in time order
+        :return: None
+        """
+        y = np.where(np.isnan(self._y), np.inf, self._y)
+        y_max = np.where(np.isnan(self._y), -np.inf, self._y)
+        size = 2
+        while len(self._x) // size >= self.MIN_BUCKETS:
+            buckets = len(self._x) // size
+            end = buckets * size
+            offsets = np.arange(buckets) * size
+            mins = y[:end].reshape(buckets, size).argmin(axis=1) + offsets
+            maxs = y_max[:end].reshape(buckets, size).argmax(axis=1) + offsets
+            indices = np.sort(np.concatenate([mins, maxs]))
+            if end < len(self._x):
+                indices = np.concatenate([indices, np.arange(end, len(self._x))])
+            self._levels.append(np.unique(indices))
+            size *= 2
+
+    def visible(self, x_min, x_max, max_points):
+        """
+        Method to return the indices of the points to draw for the given x range.  One point beyond each edge is
+        included so that the line runs off of the axes instead of stopping short of them
+        :param x_min: float - left x limit
+        :param x_max: float - right x limit
+        :param max_points: int - the maximum number of points to return, typically twice the axes pixel width
+        :return: numpy array of indices into the raw points
+        """
+        x_min, x_max = sorted([x_min, x_max])
+        indices = self._levels[-1]
+        for level in self._levels:
+            lower = np.searchsorted(self._x[level], x_min, side="left")
+            upper = np.searchsorted(self._x[level], x_max, side="right")
+            if upper - lower <= max_points:
+                indices = level[max(lower - 1, 0):upper + 1]
+                break
+        return indices
+
+
+class TestLevelOfDetail(unittest.TestCase):
+
+    def test_pyramid(self):
+        x = np.arange(10000, dtype=np.float64)
+        y = np.sin(x / 100.0)
+        y[5000] = 50.0
+        pyramid = MinMaxPyramid(x=x, y=y)
+
+        # The full range is decimated but keeps the spike
+        indices = pyramid.visible(0, 9999, 500)
+        self.assertLessEqual(len(indices), 502)
+        self.assertIn(5000, indices)
+
+        # A narrow range returns every raw point plus one beyond each edge
+        indices = pyramid.visible(100, 199, 500)
+        np.testing.assert_array_equal(indices, np.arange(99, 201))
+
+    def test_times_to_num(self):
+        times = pd.Series(pd.to_datetime(["2016-05-21T18:00:00+00:00"], utc=True))
+        self.assertAlmostEqual(times_to_num(times, offset=60)[0] - times_to_num(times)[0], 60 / 86400.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
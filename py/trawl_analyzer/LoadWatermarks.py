@@ -0,0 +1,171 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        LoadWatermarks.py
+# Purpose:     High-water marks for incremental, resumable sensor data loads
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+The high-water mark of a serial measurement stream is the last ENVIRO_NET_RAW_STRINGS id, and its date/time,
+that has been loaded into OPERATION_MEASUREMENTS for that stream.  The marks are read back from the
+OPERATION_MEASUREMENTS.RAW_STRING_ID values themselves, so they are committed in the same transaction as the
+measurements and can never get ahead of, or fall behind, the data that was actually loaded.  Each stream is
+written in its own transaction, so after a crash or a cancel a re-run only needs to parse and insert the strings
+after the mark of each stream.  The raw string ids of a sensors database only ever increase as strings are
+appended, so the same applies to data added to a sensors database after it was first loaded.
+
+For the logger files (BCS, SBE39) the unit of work is a whole ENVIRO_NET_RAW_FILES record.  All of the measurements
+of a file are inserted in one transaction, and deleted again if loading the file fails, so a file is marked as loaded
+once any of its measurement streams holds measurements.
+"""
+import unittest
+from collections import namedtuple
+
+from peewee import fn
+
+from py.trawl_analyzer.TrawlAnalyzerDB_model import OperationMeasurements, MeasurementStreams
+
+
+Watermark = namedtuple("Watermark", ["raw_string", "date_time", "rows"])
+
+
+class LoadWatermarks:
+    """
+    Class for reading the serial stream and logger file high-water marks of FRAM_CENTRAL
+    """
+    @staticmethod
+    def for_streams(measurement_streams):
+        """
+        Method to return the high-water marks of the given serial measurement streams.  Streams that do not have
+        any measurements yet are not included
+        :param measurement_streams: list of measurement_stream_id values
+        :return: dict - measurement_stream_id: Watermark
+        """
+        if not measurement_streams:
+            return dict()
+
+        marks = OperationMeasurements.select(OperationMeasurements.measurement_stream,
+                                             fn.MAX(OperationMeasurements.raw_string).alias("raw_string"),
+                                             fn.MAX(OperationMeasurements.date_time).alias("date_time"),
+                                             fn.COUNT(OperationMeasurements.operation_measurement).alias("rows"))\
+            .where(OperationMeasurements.measurement_stream << measurement_streams)\
+            .group_by(OperationMeasurements.measurement_stream)\
+            .tuples()
+
+        return {stream: Watermark(raw_string, date_time, rows) for stream, raw_string, date_time, rows in marks}
+
+    @staticmethod
+    def loaded_files(operation, raw_files):
+        """
+        Method to return which of the logger files already have measurements loaded for the operation
+        :param operation: int - operation_id of the haul
+        :param raw_files: list of ENVIRO_NET_RAW_FILES ids
+        :return: set of the loaded ENVIRO_NET_RAW_FILES ids
+        """
+        if not raw_files:
+            return set()
+
+        loaded = MeasurementStreams.select(MeasurementStreams.raw_files)\
+            .join(OperationMeasurements,
+                  on=(OperationMeasurements.measurement_stream == MeasurementStreams.measurement_stream))\
+            .where(MeasurementStreams.operation == operation,
+                   MeasurementStreams.raw_files << raw_files)\
+            .distinct()\
+            .tuples()
+
+        return {x[0] for x in loaded}
+
+    @staticmethod
+    def resume_after(marks, measurement_streams):
+        """
+        Method to return the raw string id after which the strings of a haul need to be read, i.e. the lowest mark
+        across the streams, or None if any stream has not been loaded at all
+        :param marks: dict returned by for_streams
+        :param measurement_streams: list of measurement_stream_id values that will be parsed
+        :return: int or None
+        """
+        after = [marks[x].raw_string if x in marks else None for x in measurement_streams]
+        if not after or None in after:
+            return None
+        return min(after)
+
+
+class TestLoadWatermarks(unittest.TestCase):
+    """
+    Runs on an in-memory SQLite database with fram_central attached, holding just the measurement tables
+    """
+    def setUp(self):
+        from peewee import SqliteDatabase
+        from py.trawl_analyzer.Settings import database_proxy
+
+        self.db = SqliteDatabase(":memory:")
+        self.db.execute_sql("ATTACH DATABASE ':memory:' AS fram_central")
+        database_proxy.initialize(self.db)
+
+        # SQLite does not take schema qualified foreign keys, so the tables are created without them
+        for model in [MeasurementStreams, OperationMeasurements]:
+            columns = [f"{x.column_name} INTEGER PRIMARY KEY" if x.primary_key else x.column_name
+                       for x in model._meta.sorted_fields]
+            self.db.execute_sql(f"CREATE TABLE fram_central.{model._meta.table_name} ({', '.join(columns)})")
+
+    def tearDown(self):
+        self.db.close()
+
+    def _load(self, measurement_stream, raw_strings):
+        OperationMeasurements.insert_many([{"measurement_stream": measurement_stream, "raw_string": x,
+                                            "date_time": f"2016-05-21T18:14:{x:02d}+00:00", "reading_numeric": x}
+                                           for x in raw_strings]).execute()
+
+    def test_resume_after_partial_load(self):
+        # Stream 1 was fully loaded, the load was cancelled after the first strings of stream 2 and before stream 3
+        self._load(1, range(1, 13))
+        self._load(2, range(1, 8))
+
+        marks = LoadWatermarks.for_streams([1, 2, 3])
+        self.assertEqual({1: Watermark(12, "2016-05-21T18:14:12+00:00", 12),
+                          2: Watermark(7, "2016-05-21T18:14:07+00:00", 7)}, marks)
+
+        # The haul is read again from the lowest mark, or from the start when a stream has nothing loaded
+        self.assertEqual(7, LoadWatermarks.resume_after(marks, [1, 2]))
+        self.assertIsNone(LoadWatermarks.resume_after(marks, [1, 2, 3]))
+        self.assertIsNone(LoadWatermarks.resume_after(marks, []))
+        self.assertEqual(dict(), LoadWatermarks.for_streams([]))
+
+    def test_boundary_raw_string(self):
+        from py.trawl_analyzer.SentenceParser import SentenceParser, TestSentenceParser
+
+        # The mark is the highest id, compared as a number, i.e. 10 and not 9
+        self._load(1, [8, 9, 10])
+        mark = LoadWatermarks.for_streams([1])[1].raw_string
+        self.assertEqual(10, mark)
+
+        # The string at the mark was loaded and is skipped, the one after it is not
+        strings = [{"enviro_net_raw_strings": x, "date_time": f"2016-05-21T18:14:{x:02d}+00:00",
+                    "deployed_equipment": 10, "raw_strings": f"$GPGGA,1814{x:02d},4630.1234,N,12410.5000,W,1,08,0.9,"
+                                                             f"{x}.0,M*4F"} for x in [9, 10, 11]]
+        parser = SentenceParser(strings=strings, deployed_equipment={10: 1}, line_startings=["$GPGGA"])
+        parsed = parser.parse(TestSentenceParser.Rule(line_starting="$GPGGA", field_position=10), after=mark)
+        self.assertEqual([11], parsed["raw_string"].tolist())
+
+    def test_loaded_files(self):
+        # File 100 was loaded, file 101 failed and had its measurements deleted, file 102 is of another haul
+        for stream, operation, raw_file in [(1, 1, 100), (2, 1, 100), (3, 1, 101), (4, 2, 102)]:
+            MeasurementStreams.insert(measurement_stream=stream, operation=operation, raw_files=raw_file,
+                                      equipment_field=1).execute()
+        self._load(1, [1, 2])
+        self._load(2, [1, 2])
+        self._load(4, [1])
+
+        self.assertEqual({100}, LoadWatermarks.loaded_files(1, [100, 101, 102]))
+        self.assertEqual({102}, LoadWatermarks.loaded_files(2, [100, 101, 102]))
+        self.assertEqual(set(), LoadWatermarks.loaded_files(1, [101]))
+        self.assertEqual(set(), LoadWatermarks.loaded_files(1, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
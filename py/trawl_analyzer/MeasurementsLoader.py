@@ -0,0 +1,289 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        MeasurementsLoader.py
+# Purpose:     Bulk loading of OPERATION_MEASUREMENTS rows via PostgreSQL binary COPY
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+The MeasurementsCopyLoader streams OPERATION_MEASUREMENTS rows straight into the PostgreSQL binary COPY format
+and hands them to psycopg2's copy_expert.  This avoids building a dictionary per reading and the INSERT round
+trips that the peewee insert_many path requires.
+
+Rows are supplied as tuples in the order of MeasurementsCopyLoader.COLUMNS.  The operation_measurement_id
+column is not part of the COPY column list, so its sequence default is applied by the server.
+
+Reference:  https://www.postgresql.org/docs/current/sql-copy.html - Binary Format
+"""
+import logging
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from struct import Struct, pack
+
+import arrow
+
+
+PGCOPY_HEADER = pack('!11sii', b'PGCOPY\n\377\r\n\0', 0, 0)
+PGCOPY_TRAILER = pack('!h', -1)
+PG_EPOCH = datetime(2000, 1, 1)
+PG_EPOCH_UTC = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+NUMERIC_POS = 0x0000
+NUMERIC_NEG = 0x4000
+NUMERIC_NAN = 0xC000
+
+_NULL = pack('!i', -1)
+_INT2 = Struct('!ih')
+_INT4 = Struct('!ii')
+_INT8 = Struct('!iq')
+_FLOAT4 = Struct('!if')
+_FLOAT8 = Struct('!id')
+_BOOL = Struct('!i?')
+_FIELD_COUNT = Struct('!h')
+_NUMERIC_HEADER = Struct('!ihhHH')
+
+
+def encode_numeric(value):
+    """
+    Method to encode a value into the PostgreSQL binary numeric representation, which is a header of
+    (ndigits, weight, sign, dscale) followed by ndigits base-10000 digits
+    :param value: float, int, str or Decimal
+    :return: bytes - length-prefixed numeric field
+    """
+    d = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+    if d.is_nan():
+        return _NUMERIC_HEADER.pack(8, 0, 0, NUMERIC_NAN, 0)
+    if d.is_infinite():
+        raise ValueError(f"numeric cannot hold an infinite value: {value}")
+
+    sign, digits, exponent = d.as_tuple()
+    digits = ''.join(map(str, digits))
+    dscale = max(-exponent, 0)
+
+    if exponent > 0:
+        digits += '0' * exponent
+        exponent = 0
+    if len(digits) < -exponent:
+        digits = '0' * (-exponent - len(digits)) + digits
+
+    split = len(digits) + exponent
+    int_part, frac_part = digits[:split], digits[split:]
+    int_part = int_part.zfill((len(int_part) + 3) // 4 * 4)
+    frac_part = frac_part.ljust((len(frac_part) + 3) // 4 * 4, '0')
+
+    groups = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)] + \
+             [int(frac_part[i:i + 4]) for i in range(0, len(frac_part), 4)]
+    weight = len(int_part) // 4 - 1
+
+    # Strip the leading and trailing zero groups, adjusting the weight for the leading ones
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+        sign = 0
+
+    ndigits = len(groups)
+    return _NUMERIC_HEADER.pack(8 + 2 * ndigits, ndigits, weight, NUMERIC_NEG if sign else NUMERIC_POS, dscale) + \
+        pack(f'!{ndigits}h', *groups)
+
+
+def encode_text(value):
+    data = str(value).encode('utf-8')
+    return pack('!i', len(data)) + data
+
+
+def encode_timestamp(value):
+    """
+    Method to encode a date/time into a timestamp without time zone.  As with a text literal sent to such a column,
+    the wall clock time is retained and any offset is dropped
+    :param value: datetime, arrow or ISO-8601 str
+    :return: bytes
+    """
+    value = _to_datetime(value).replace(tzinfo=None)
+    delta = value - PG_EPOCH
+    return _INT8.pack(8, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def encode_timestamptz(value):
+    """
+    Method to encode a date/time into a timestamp with time zone, i.e. microseconds since 2000-01-01 UTC
+    :param value: datetime, arrow or ISO-8601 str.  Naive datetimes are taken to be UTC
+    :return: bytes
+    """
+    value = _to_datetime(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - PG_EPOCH_UTC
+    return _INT8.pack(8, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, arrow.Arrow):
+        return value.datetime
+    return arrow.get(value).datetime
+
+
+ENCODERS = {
+    "smallint": lambda x: _INT2.pack(2, x),
+    "integer": lambda x: _INT4.pack(4, x),
+    "bigint": lambda x: _INT8.pack(8, x),
+    "real": lambda x: _FLOAT4.pack(4, x),
+    "double precision": lambda x: _FLOAT8.pack(8, x),
+    "numeric": encode_numeric,
+    "boolean": lambda x: _BOOL.pack(1, bool(x)),
+    "text": encode_text,
+    "character varying": encode_text,
+    "timestamp without time zone": encode_timestamp,
+    "timestamp with time zone": encode_timestamptz,
+}
+
+
+class CopyStream:
+    """
+    Minimal read-only file-like object that feeds copy_expert from a generator of encoded rows, so that the full
+    COPY payload never has to be held in memory
+    """
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = bytearray(PGCOPY_HEADER)
+        self._exhausted = False
+
+    def read(self, size=-1):
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                self._buffer += PGCOPY_TRAILER
+                self._exhausted = True
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    readline = read
+
+
+class MeasurementsCopyLoader:
+    """
+    Class for bulk loading OPERATION_MEASUREMENTS rows with a binary COPY.  The column data types are read from
+    information_schema once, so the encoders always match the actual table definition.
+    """
+    SCHEMA = "fram_central"
+    TABLE = "operation_measurements"
+    COLUMNS = ("measurement_stream_id", "raw_string_id", "date_time", "reading_numeric", "reading_alpha",
+               "is_not_valid")
+    FIELDS = ("measurement_stream", "raw_string", "date_time", "reading_numeric", "reading_alpha", "is_not_valid")
+    CHUNK_ROWS = 1000
+
+    def __init__(self, database):
+        super().__init__()
+        self._database = database
+        self._encoders = None
+
+    def _get_encoders(self):
+        """
+        Method to determine the encoder for each of the COLUMNS based on the server-side column data types
+        :return: list of encoder functions
+        """
+        if self._encoders is None:
+            cursor = self._database.execute_sql(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = %s AND table_name = %s", (self.SCHEMA, self.TABLE))
+            types = {name: data_type for name, data_type in cursor.fetchall()}
+            missing = [x for x in self.COLUMNS if types.get(x) not in ENCODERS]
+            if missing:
+                raise ValueError(f"Unsupported or missing {self.TABLE} columns for binary COPY: {missing}")
+            self._encoders = [ENCODERS[types[x]] for x in self.COLUMNS]
+        return self._encoders
+
+    def encode_rows(self, rows):
+        """
+        Generator that yields the binary COPY encoding of the rows, CHUNK_ROWS rows at a time
+        :param rows: iterable of tuples ordered per COLUMNS
+        :return:
+        """
+        encoders = self._get_encoders()
+        field_count = _FIELD_COUNT.pack(len(encoders))
+        chunk = []
+        for row in rows:
+            chunk.append(field_count)
+            chunk.extend(_NULL if value is None else encoder(value) for encoder, value in zip(encoders, row))
+            if len(chunk) >= self.CHUNK_ROWS * (len(encoders) + 1):
+                yield b''.join(chunk)
+                chunk = []
+        if chunk:
+            yield b''.join(chunk)
+
+    def load(self, rows):
+        """
+        Method to COPY the rows into OPERATION_MEASUREMENTS.  This runs inside of the caller's transaction when one
+        is open, so a failure can be rolled back and retried with insert_many
+        :param rows: iterable of tuples ordered per COLUMNS
+        :return: int - the number of rows copied
+        """
+        counted = _CountingIterator(rows)
+        stream = CopyStream(self.encode_rows(counted))
+        sql = f"COPY {self.SCHEMA}.{self.TABLE} ({', '.join(self.COLUMNS)}) FROM STDIN WITH BINARY"
+        cursor = self._database.cursor()
+        cursor.copy_expert(sql, stream)
+        return counted.count
+
+
+class _CountingIterator:
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.count += 1
+        return row
+
+
+class TestMeasurementsLoader(unittest.TestCase):
+
+    def test_encode_numeric(self):
+        # Samples verified against SELECT 'value'::numeric with a binary result format
+        self.assertEqual(encode_numeric(0), pack('!ihhHH', 8, 0, 0, 0, 0))
+        self.assertEqual(encode_numeric(1), pack('!ihhHHh', 10, 1, 0, 0, 0, 1))
+        self.assertEqual(encode_numeric(12345.678), pack('!ihhHHhhh', 14, 3, 1, 0, 3, 1, 2345, 6780))
+        self.assertEqual(encode_numeric(-0.0001), pack('!ihhHHh', 10, 1, -1, NUMERIC_NEG, 4, 1))
+        self.assertEqual(encode_numeric(10000), pack('!ihhHHh', 10, 1, 1, 0, 0, 1))
+        self.assertEqual(encode_numeric(float("nan")), pack('!ihhHH', 8, 0, 0, NUMERIC_NAN, 0))
+
+    def test_encode_timestamp(self):
+        self.assertEqual(encode_timestamp(datetime(2000, 1, 1, 0, 0, 1)), pack('!iq', 8, 1000000))
+        self.assertEqual(encode_timestamptz("2000-01-01T00:00:00-07:00"), pack('!iq', 8, 7 * 3600 * 1000000))
+        self.assertEqual(encode_timestamp("2000-01-01T00:00:00-07:00"), pack('!iq', 8, 0))
+
+    def test_copy_stream(self):
+        stream = CopyStream(iter([b'abc', b'def']))
+        data = b''
+        while True:
+            chunk = stream.read(4)
+            if not chunk:
+                break
+            data += chunk
+        self.assertEqual(data, PGCOPY_HEADER + b'abcdef' + PGCOPY_TRAILER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,6 +21,9 @@ from dateutil import parser, tz
 # from pyCollector.Utilities import TimeConverter, get_iso_datetime
 import arrow
 import logging
+import unittest
+
+import numpy as np
 
 
 from py.trawl_analyzer.CommonFunctions import CommonFunctions
@@ -165,104 +168,165 @@ class SeabirdCNVreader(SeabirdReader):
                                   # correct assignment of get_iso_datetime
         super(SeabirdCNVreader, self).__init__(filename, raw_content, **kwargs)
 
-    def parse_data(self, measurements=''):
+    def _parse_header(self):
         """
-        Method to actually parse the data
-        :return:
+        Method to parse the # name and # start_time header lines once
+        :return: dict - with the temp_col, pressure_col, depth_col, time_col, valid_columns, column_count, start_year
+                    and the data_start character offset of the first data line, or None if there is no *END* line
         """
-        if not self.raw_content:
-            return
-
-        is_data = False
-        is_first_data_line = True
-        temp_col = -1
-        pressure_col = -1
-        depth_col = -1
-        time_col = -1
-        start_year = None
-        data = []
-        valid_columns = []
-
-        temp_data = []
-        depth_data = []
-
-        for i, line in enumerate(self.raw_content.splitlines()):
-
-            if is_data:
-                # data row is detected, parse and add it to the data list
-                items = line.split()
-
-                # logging.info(f"date_time before: {items[time_col]}, {start_year}")
-                date_time = self._functions.convert_julian_to_iso(julian_days=items[time_col], year=start_year)
-                # logging.info(f"date_time after: {date_time}")
-
-                # Capture the start_datetime of the data set
-                if is_first_data_line:
-
-                    self.start_datetime = parser.parse(date_time)
-                    is_first_data_line = False
-
-                # Capture the end_datetime of the data set - just keep getting the latest date_time as data exists
-                # and we roll through the data
-                if date_time:
-                    self.end_datetime = parser.parse(date_time)
-
-                if measurements == 'temperature' and time_col > -1 and temp_col > -1:
-                    data.append([date_time, float(items[temp_col])])
-
-                elif measurements == 'pressure' and time_col > -1 and pressure_col > -1:
-                    data.append([date_time, float(items[pressure_col])])
-
-                elif measurements == 'tempdepth' and \
-                    time_col > -1 and \
-                    temp_col > -1 and \
-                    depth_col > -1:
-
-                    # Format:  date-time, temperature, depth
-                    data.append([date_time, float(items[temp_col]),
-                                 float(items[depth_col])])
+        end = self.raw_content.find('*END*')
+        if end == -1:
+            return None
 
-                    temp_data.append([date_time, float(items[temp_col])])
-                    depth_data.append([date_time, float(items[depth_col])])
+        header = {'temp_col': -1, 'pressure_col': -1, 'depth_col': -1, 'time_col': -1,
+                  'valid_columns': [], 'column_count': 0, 'start_year': None}
 
-                else:
-                    # if temp_col > -1 and time_col > -1 and pressure_col > -1:
-                    row_items = [date_time]
-                    for x in valid_columns:
-                        if x > -1:
-                            row_items += [float(items[x])]
-                    data.append(row_items)
-                    # print(row_items)
-                    # data.append([date_time, float(items[temp_col]), float(items[pressure_col])])
+        for line in self.raw_content[:end].splitlines():
 
             if "# name" in line:
                 # # name indicates the column headers for the data
                 key, value = line.split('=')
                 col = int(key.strip('# name'))
+                header['column_count'] += 1
                 if 'temperature' in value.lower():
-                    temp_col = col
-                    valid_columns.append(temp_col)
+                    header['temp_col'] = col
+                    header['valid_columns'].append(col)
                 elif 'pressure' in value.lower():
-                    pressure_col = col
-                    valid_columns.append(pressure_col)
+                    header['pressure_col'] = col
+                    header['valid_columns'].append(col)
                 elif 'depth' in value.lower():
-                    depth_col = col
-                    valid_columns.append(depth_col)
+                    header['depth_col'] = col
+                    header['valid_columns'].append(col)
                 elif 'time' in value.lower():
-                    time_col = col
+                    header['time_col'] = col
 
             if '# start_time' in line:
                 start_time = line.split('=')[1]
                 start_date_time = parser.parse(start_time)
-                start_year = start_date_time.strftime('%Y')
+                header['start_year'] = start_date_time.strftime('%Y')
                 # TODO Todd Hay - If the start year does not equal the year of the haul, then should use the haul
                 # start date/time + span interval to increment the time count for each data line
 
-                # print(start_date_time, start_year)
+        # Data starts on the line after *END*
+        line_end = self.raw_content.find('\n', end)
+        header['data_start'] = len(self.raw_content) if line_end == -1 else line_end + 1
 
-            if '*END*' in line:
-                # Data starts on the next line
-                is_data = True
+        return header
+
+    @staticmethod
+    def _convert_julian_to_iso(julian_days, year):
+        """
+        Method to convert an array of julian fractional days into ISO-formatted US/Pacific date/time strings, the
+        vectorized equivalent of CommonFunctions.convert_julian_to_iso
+        :param julian_days: numpy array of float
+        :param year: str - year of the julian days
+        :return: list of str
+        """
+        frac_day, day = np.modf(julian_days)
+        frac_hour, hour = np.modf(frac_day * 24)
+        frac_min, minute = np.modf(frac_hour * 60)
+        frac_sec, sec = np.modf(frac_min * 60)
+        microsecond = np.floor(frac_sec * 1000000)
+
+        date_times = np.datetime64(f"{int(year):04d}-01-01", 'us') + \
+            (day.astype(np.int64) - 1).astype('timedelta64[D]') + \
+            hour.astype(np.int64).astype('timedelta64[h]') + \
+            minute.astype(np.int64).astype('timedelta64[m]') + \
+            sec.astype(np.int64).astype('timedelta64[s]') + \
+            microsecond.astype(np.int64).astype('timedelta64[us]')
+
+        # US/Pacific daylight savings changes on the hour, so only look up the UTC offset once per distinct hour
+        hours, hour_index = np.unique(date_times.astype('datetime64[h]'), return_inverse=True)
+        offsets = np.array([arrow.get(x.astype(datetime)).replace(tzinfo="US/Pacific").isoformat()[-6:]
+                            for x in hours])
+
+        # datetime.isoformat drops the microseconds when they are zero
+        iso = np.datetime_as_string(date_times, unit='us')
+        iso = np.where(microsecond == 0, iso.astype('U19'), iso)
+
+        return np.char.add(iso, offsets[hour_index]).tolist()
+
+    def _get_data_rows(self, data_start, column_count=0):
+        """
+        Method to split the data block into rows of values, dropping any truncated, ragged or non-numeric line
+        so that it does not shift the columns of the rows around it
+        :param data_start: int - offset of the first data line in self.raw_content
+        :param column_count: int - number of # name columns in the header, else the first data line sets it
+        :return: list of lists of str
+        """
+        rows = []
+        column_count = column_count or None
+        for i, line in enumerate(self.raw_content[data_start:].splitlines()):
+            items = line.split()
+            if not items:
+                continue
+
+            if column_count is None:
+                column_count = len(items)
+
+            if len(items) != column_count:
+                logging.warning(f"Seabird data line {i+1} has {len(items)} values instead of {column_count}, "
+                                f"skipping it: {line}")
+                continue
+
+            try:
+                [float(x) for x in items]
+            except ValueError:
+                logging.warning(f"Seabird data line {i+1} is not numeric, skipping it: {line}")
+                continue
+
+            rows.append(items)
+
+        return rows
+
+    def parse_data(self, measurements=''):
+        """
+        Method to actually parse the data.  The header is parsed once and then the data lines with the full set of
+        numeric columns are stacked and converted in a single pass
+        :return:
+        """
+        if not self.raw_content:
+            return
+
+        header = self._parse_header()
+        data = []
+        temp_data = []
+        depth_data = []
+
+        rows = self._get_data_rows(data_start=header['data_start'], column_count=header['column_count']) \
+            if header else []
+        if rows:
+            values = np.array(rows, dtype=np.float64)
+
+            time_col = header['time_col']
+            temp_col = header['temp_col']
+            pressure_col = header['pressure_col']
+            depth_col = header['depth_col']
+
+            date_times = self._convert_julian_to_iso(julian_days=values[:, time_col], year=header['start_year'])
+
+            # Capture the start_datetime and end_datetime of the data set
+            self.start_datetime = parser.parse(date_times[0])
+            self.end_datetime = parser.parse(date_times[-1])
+
+            if measurements == 'temperature' and time_col > -1 and temp_col > -1:
+                data = [list(x) for x in zip(date_times, values[:, temp_col].tolist())]
+
+            elif measurements == 'pressure' and time_col > -1 and pressure_col > -1:
+                data = [list(x) for x in zip(date_times, values[:, pressure_col].tolist())]
+
+            elif measurements == 'tempdepth' and time_col > -1 and temp_col > -1 and depth_col > -1:
+
+                # Format:  date-time, temperature, depth
+                temps = values[:, temp_col].tolist()
+                depths = values[:, depth_col].tolist()
+                data = [list(x) for x in zip(date_times, temps, depths)]
+                temp_data = [list(x) for x in zip(date_times, temps)]
+                depth_data = [list(x) for x in zip(date_times, depths)]
+
+            else:
+                columns = [x for x in header['valid_columns'] if x > -1]
+                data = [[date_time] + row for date_time, row in zip(date_times, values[:, columns].tolist())]
 
         if measurements == 'tempdepth':
             self.parsed_results = {'temp_data': temp_data, 'depth_data': depth_data}
@@ -318,6 +382,49 @@ class SeabirdCNVreader(SeabirdReader):
         return self.end_datetime
 
 
+class TestSeabirdCNVreader(unittest.TestCase):
+
+    def test_parse_data(self):
+        raw_content = "* Sea-Bird SBE39 Data File:\n" \
+                      "# name 0 = tv290C: Temperature [ITS-90, deg C]\n" \
+                      "# name 1 = depSM: Depth [salt water, m]\n" \
+                      "# name 2 = timeJ: Julian Days\n" \
+                      "# start_time = Mar 12 2016 23:59:59\n" \
+                      "# span 0 = 1, 2\n# span 1 = 1, 2\n# span 2 = 1, 2\n" \
+                      "*END*\n" \
+                      "   9.8721   12.250  73.083333\n" \
+                      "   9.8700  112.500  73.083345\n"
+        reader = SeabirdCNVreader(raw_content=raw_content)
+        reader.parse_data(measurements='tempdepth')
+
+        functions = CommonFunctions()
+        date_times = [functions.convert_julian_to_iso(julian_days=x, year="2016") for x in ["73.083333", "73.083345"]]
+        self.assertEqual(reader.parsed_results['temp_data'], [[date_times[0], 9.8721], [date_times[1], 9.87]])
+        self.assertEqual(reader.parsed_results['depth_data'], [[date_times[0], 12.25], [date_times[1], 112.5]])
+        self.assertEqual(reader.end_datetime, parser.parse(date_times[1]))
+
+    def test_parse_data_bad_lines(self):
+        raw_content = "* Sea-Bird SBE39 Data File:\n" \
+                      "# name 0 = tv290C: Temperature [ITS-90, deg C]\n" \
+                      "# name 1 = depSM: Depth [salt water, m]\n" \
+                      "# name 2 = timeJ: Julian Days\n" \
+                      "# start_time = Mar 12 2016 23:59:59\n" \
+                      "*END*\n" \
+                      "   9.8721   12.250  73.083333\n" \
+                      "   9.8710   12.500\n" \
+                      "   9.8705   bad  73.083339\n" \
+                      "   9.8700  112.500  73.083345\n" \
+                      "   9.8690  112.750  73.083351   1.0   2.0\n" \
+                      "   9.86"
+        reader = SeabirdCNVreader(raw_content=raw_content)
+        reader.parse_data(measurements='tempdepth')
+
+        # The short, non-numeric, long and truncated lines are all dropped without shifting the other rows
+        self.assertEqual([x[1] for x in reader.parsed_results['temp_data']], [9.8721, 9.87])
+        self.assertEqual([x[1] for x in reader.parsed_results['depth_data']], [12.25, 112.5])
+
+
+
 if __name__ == '__main__':
 
     folder = r'..\data\samples\Excalibur_General'
@@ -0,0 +1,156 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        SensorsCatalog.py
+# Purpose:     Persistent catalog of the time ranges and row counts of the sensors databases
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+The SensorsCatalog keeps, in a small sensors_catalog.db SQLite sidecar within each folder of sensors_YYYYMMDD.db
+files, the first and last ENVIRO_NET_RAW_STRINGS date/time, the total and per deployed equipment row counts and the
+modification time and size of each sensors database.
+
+A sensors database is only opened, read only, when it is not yet in the catalog or when its modification time or size
+no longer match the catalog, i.e. while it is still being written to at sea.  Otherwise the Data Completeness screen
+gets the time range of every sensors database of a season from the sidecar without touching the databases.
+"""
+import logging
+import os
+import pathlib
+import sqlite3
+import unittest
+
+
+CATALOG_FILE_NAME = "sensors_catalog.db"
+
+
+class SensorsCatalog:
+    """
+    Input parameters include:
+    folder: folder holding the sensors databases and the catalog sidecar
+    """
+    def __init__(self, folder):
+        super().__init__()
+        self._folder = folder
+        self._conn = None
+
+        try:
+            self._conn = sqlite3.connect(os.path.join(folder, CATALOG_FILE_NAME))
+            with self._conn:
+                self._conn.execute("CREATE TABLE IF NOT EXISTS SENSOR_FILES (FILE_NAME TEXT PRIMARY KEY, "
+                                   "MTIME REAL, SIZE INTEGER, START_DATE_TIME TEXT, END_DATE_TIME TEXT, "
+                                   "ROW_COUNT INTEGER)")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS SENSOR_FILE_EQUIPMENT (FILE_NAME TEXT, "
+                                   "DEPLOYED_EQUIPMENT_ID INTEGER, ROW_COUNT INTEGER, "
+                                   "PRIMARY KEY (FILE_NAME, DEPLOYED_EQUIPMENT_ID))")
+        except sqlite3.Error as ex:
+            logging.info(f"Unable to open the sensors catalog in {folder}, sensors databases will be scanned: {ex}")
+            self.close()
+
+    def close(self):
+        """
+        Method to close the catalog sidecar
+        :return: None
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get(self, db_file):
+        """
+        Method to return the catalog entry of a sensors database, scanning the database and updating the catalog
+        when it has changed since it was last cataloged
+        :param db_file: str - full path of the sensors database
+        :return: dict - with start_date_time, end_date_time, row_count and equipment, a dict of deployed equipment
+                    id: row count, or None if the database does not exist
+        """
+        if not os.path.exists(db_file):
+            return None
+
+        stat = os.stat(db_file)
+        file_name = os.path.basename(db_file)
+
+        if self._conn is not None:
+            row = self._conn.execute("SELECT START_DATE_TIME, END_DATE_TIME, ROW_COUNT FROM SENSOR_FILES "
+                                     "WHERE FILE_NAME = ? AND MTIME = ? AND SIZE = ?",
+                                     (file_name, stat.st_mtime, stat.st_size)).fetchone()
+            if row is not None:
+                equipment = self._conn.execute("SELECT DEPLOYED_EQUIPMENT_ID, ROW_COUNT FROM SENSOR_FILE_EQUIPMENT "
+                                               "WHERE FILE_NAME = ?", (file_name,)).fetchall()
+                return {"start_date_time": row[0], "end_date_time": row[1], "row_count": row[2],
+                        "equipment": dict(equipment)}
+
+        entry = self.scan(db_file)
+
+        if self._conn is not None:
+            try:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO SENSOR_FILES VALUES (?, ?, ?, ?, ?, ?)",
+                                       (file_name, stat.st_mtime, stat.st_size, entry["start_date_time"],
+                                        entry["end_date_time"], entry["row_count"]))
+                    self._conn.execute("DELETE FROM SENSOR_FILE_EQUIPMENT WHERE FILE_NAME = ?", (file_name,))
+                    self._conn.executemany("INSERT INTO SENSOR_FILE_EQUIPMENT VALUES (?, ?, ?)",
+                                           [(file_name, k, v) for k, v in entry["equipment"].items()])
+            except sqlite3.Error as ex:
+                logging.info(f"Unable to update the sensors catalog for {db_file}: {ex}")
+
+        return entry
+
+    @staticmethod
+    def scan(db_file):
+        """
+        Method to read the time range and row counts of a sensors database, opening it read only
+        :param db_file: str - full path of the sensors database
+        :return: dict - see get
+        """
+        conn = sqlite3.connect(pathlib.Path(os.path.abspath(db_file)).as_uri() + "?mode=ro", uri=True)
+        try:
+            start_date_time, end_date_time, row_count = \
+                conn.execute("SELECT MIN(DATE_TIME), MAX(DATE_TIME), COUNT(*) FROM ENVIRO_NET_RAW_STRINGS").fetchone()
+            equipment = conn.execute("SELECT DEPLOYED_EQUIPMENT_ID, COUNT(*) FROM ENVIRO_NET_RAW_STRINGS "
+                                     "GROUP BY DEPLOYED_EQUIPMENT_ID").fetchall()
+        finally:
+            conn.close()
+
+        return {"start_date_time": start_date_time, "end_date_time": end_date_time, "row_count": row_count,
+                "equipment": dict(equipment)}
+
+
+class TestSensorsCatalog(unittest.TestCase):
+
+    def test_get(self):
+        import tempfile
+        from unittest.mock import patch
+
+        with tempfile.TemporaryDirectory() as folder:
+            db_file = os.path.join(folder, "sensors_20160521.db")
+            conn = sqlite3.connect(db_file)
+            with conn:
+                conn.execute("CREATE TABLE ENVIRO_NET_RAW_STRINGS (ENVIRO_NET_RAW_STRINGS_ID INTEGER PRIMARY KEY, "
+                             "DATE_TIME TEXT, DEPLOYED_EQUIPMENT_ID INTEGER, HAUL_ID TEXT, RAW_STRINGS TEXT)")
+                conn.executemany("INSERT INTO ENVIRO_NET_RAW_STRINGS (DATE_TIME, DEPLOYED_EQUIPMENT_ID) VALUES (?, ?)",
+                                 [("2016-05-21T18:14:31", 1), ("2016-05-21T18:14:30", 1), ("2016-05-21T18:15:00", 2)])
+            conn.close()
+
+            catalog = SensorsCatalog(folder=folder)
+            entry = catalog.get(db_file)
+            self.assertEqual(entry, {"start_date_time": "2016-05-21T18:14:30", "end_date_time": "2016-05-21T18:15:00",
+                                     "row_count": 3, "equipment": {1: 2, 2: 1}})
+
+            # A catalog reopened on the same folder returns the entry without scanning the database
+            catalog.close()
+            catalog = SensorsCatalog(folder=folder)
+            with patch.object(SensorsCatalog, "scan", side_effect=AssertionError):
+                self.assertEqual(catalog.get(db_file), entry)
+
+            self.assertIsNone(catalog.get(os.path.join(folder, "sensors_20160522.db")))
+            catalog.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
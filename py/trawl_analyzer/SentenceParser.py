@@ -0,0 +1,373 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        SentenceParser.py
+# Purpose:     Column-oriented parsing of the serial sentences of a haul
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+The SentenceParser takes all of the ENVIRO_NET_RAW_STRINGS of a haul and evaluates the PARSING_RULES_VW rules
+against them as pandas column operations.  The raw strings are tagged with their sentence type in a single pass,
+and each (sentence type, equipment, delimiter) group is split into a table of fields only once.  Every rule for
+that sentence type is then a set of column selects and masks on the shared table, so the cost of a haul grows with
+the number of sentences rather than the number of sentences times the number of rules.
+"""
+import logging
+import re
+import sqlite3
+import unittest
+from types import SimpleNamespace
+
+import arrow
+import numpy as np
+import pandas as pd
+
+
+RESULT_COLUMNS = ["raw_string", "date_time", "reading_numeric", "reading_alpha"]
+
+
+class SentenceParser:
+    """
+    Input parameters include:
+    strings: iterable of ENVIRO_NET_RAW_STRINGS dicts with the enviro_net_raw_strings, date_time, raw_strings and
+        deployed_equipment keys
+    deployed_equipment: dict mapping the wheelhouse deployed_equipment_id to the FRAM_CENTRAL equipment_id
+    line_startings: iterable of the line_starting values of the parsing rules that will be evaluated
+    time_zone: time zone that the parsed date_time values are converted to
+    """
+    def __init__(self, strings, deployed_equipment, line_startings, time_zone="US/Pacific"):
+        super().__init__()
+
+        self._time_zone = time_zone
+        self._tables = dict()
+
+        frame = pd.DataFrame.from_records(list(strings),
+                                          columns=["enviro_net_raw_strings", "date_time", "raw_strings",
+                                                   "deployed_equipment"])
+        frame = frame[frame["raw_strings"].notnull() & frame["deployed_equipment"].notnull()]
+        frame["equipment"] = frame["deployed_equipment"].map(deployed_equipment)
+
+        # Tag every string with its sentence type in one pass, preferring the longest line_starting, i.e.
+        # $PSIMP,D1 over $PSIMP
+        keys = sorted(set(x for x in line_startings if x), key=len, reverse=True)
+        if keys and len(frame) > 0:
+            pattern = "(" + "|".join(re.escape(x) for x in keys) + ")"
+            frame["line_starting"] = frame["raw_strings"].str.extract(pattern, expand=False)
+        else:
+            frame["line_starting"] = np.nan
+
+        frame = frame[frame["line_starting"].notnull() & frame["equipment"].notnull()]
+        self._groups = {k: g for k, g in frame.groupby(["line_starting", "equipment"])}
+
+    def sentence_count(self, line_starting, equipment):
+        """
+        Method to return the number of sentences for the given line_starting and equipment
+        :param line_starting: str
+        :param equipment: int - FRAM_CENTRAL equipment_id
+        :return: int
+        """
+        return sum(len(g) for g in self._sentences(line_starting, equipment))
+
+    def _sentences(self, line_starting, equipment):
+        """
+        Method to return the groups of strings that contain line_starting for the given equipment.  A raw string
+        containing line_starting anywhere in it matches, as was the case for the previous per-stream scans
+        """
+        return [g for (key, eqp), g in self._groups.items() if eqp == equipment and line_starting in key]
+
+    def _get_table(self, line_starting, equipment, delimiter):
+        """
+        Method to split the sentences for the line_starting + equipment into a table of fields, one column per
+        field position.  The table is cached, so it is only built once for all of the rules that share it
+        :return: tuple of (raw string ids, date_times, fields DataFrame)
+        """
+        key = (line_starting, equipment, delimiter)
+        if key in self._tables:
+            return self._tables[key]
+
+        groups = self._sentences(line_starting, equipment)
+        if not groups:
+            self._tables[key] = None
+            return None
+
+        group = pd.concat(groups) if len(groups) > 1 else groups[0]
+
+        # Remove the checksum at the end of the string if it exists, then split into fields
+        if delimiter is None:
+            fields = group["raw_strings"].str.replace(r"\*\S*\s*$", "", regex=True).str.split(expand=True)
+        else:
+            checksum = r"\*[^" + re.escape(delimiter) + r"]*$"
+            fields = group["raw_strings"].str.replace(checksum, "", regex=True).str.split(delimiter, expand=True)
+
+        date_times = pd.to_datetime(group["date_time"], utc=True).dt.tz_convert(self._time_zone)
+
+        table = (group["enviro_net_raw_strings"], date_times, fields)
+        self._tables[key] = table
+        return table
+
+    @staticmethod
+    def _field(fields, position):
+        """
+        Method to return the column for the 1-based field position, or an all-null column when no sentence has
+        that many fields
+        """
+        if position is None or position < 1 or position - 1 not in fields.columns:
+            return pd.Series(None, index=fields.index, dtype=object)
+        return fields[position - 1]
+
+    def parse(self, rule, after=None):
+        """
+        Method to evaluate a single ParsingRulesVw rule
+        :param rule: ParsingRulesVw
+        :param after: int - only parse the strings with an ENVIRO_NET_RAW_STRINGS id above this high-water mark
+        :return: DataFrame with the RESULT_COLUMNS columns
+        """
+        empty = pd.DataFrame(columns=RESULT_COLUMNS)
+
+        if rule.fixed_or_delimited is None or rule.fixed_or_delimited.lower() != "delimited":
+            logging.info(f"\t\tOnly delimited parsing rules are supported: {rule.line_starting}")
+            return empty
+
+        delimiter = rule.delimiter
+        if delimiter is None or delimiter == " " or delimiter.lower() == "[space]":
+            delimiter = None
+
+        table = self._get_table(rule.line_starting, rule.equipment, delimiter)
+        if table is None:
+            return empty
+
+        ids, date_times, fields = table
+        pos = rule.field_position
+        value = self._field(fields, pos)
+        mask = value.notnull()
+        if after is not None:
+            mask &= ids > after
+
+        if rule.is_numeric:
+
+            # PI44 - Further reduce sentences based on the channel number and reading_type_code
+            if rule.line_starting == "$PSIMP,D1":
+                if rule.channel_position and rule.reading_type_position:
+                    mask &= (self._field(fields, rule.reading_type_position) == rule.reading_type_code) & \
+                            (self._field(fields, rule.channel_position) == rule.channel)
+
+                # Quality Indicator - Only get those with a value of 22 (per quality_status field) for PI44
+                if _is_float(rule.quality_status):
+                    mask &= self._field(fields, rule.quality_status_position) == rule.quality_status
+
+            # PX - Further parsing by the from and to positions
+            if rule.line_starting == "$PSIMTV80" and rule.reading_type_code and \
+                    rule.measurement_from and rule.measurement_from_position:
+                mask &= (self._field(fields, rule.reading_type_position) == rule.reading_type_code) & \
+                        (self._field(fields, rule.measurement_from_position) == rule.measurement_from)
+                if rule.measurement_to and rule.measurement_to_position:
+                    mask &= self._field(fields, rule.measurement_to_position) == rule.measurement_to
+
+            numeric = pd.to_numeric(value[mask].str.strip(), errors="coerce")
+            keep = numeric.notnull()
+            result = pd.DataFrame({"raw_string": ids[mask][keep], "date_time": date_times[mask][keep],
+                                   "reading_numeric": numeric[keep], "reading_alpha": None})
+
+        elif "DDMM.MM" in (rule.field_format or ""):
+            hemisphere_pos = rule.hemisphere_position if rule.hemisphere_position else pos + 1
+            hemisphere = self._field(fields, hemisphere_pos)
+            mask &= hemisphere.notnull()
+            numeric = self.convert_lat_lon_to_dd(value[mask], rule.reading_type, hemisphere[mask])
+            keep = numeric.notnull()
+            result = pd.DataFrame({"raw_string": ids[mask][keep], "date_time": date_times[mask][keep],
+                                   "reading_numeric": numeric[keep], "reading_alpha": None})
+
+        else:
+            # Text values, including time only (hhmmss) values, are stored as reading_alpha
+            if "hhmmss" in (rule.field_format or "").lower():
+                mask &= pd.to_numeric(value.str.strip(), errors="coerce").notnull()
+            result = pd.DataFrame({"raw_string": ids[mask], "date_time": date_times[mask],
+                                   "reading_numeric": None, "reading_alpha": value[mask]})
+
+        return result[RESULT_COLUMNS]
+
+    @staticmethod
+    def convert_lat_lon_to_dd(values, type, hemispheres):
+        """
+        Vectorized version of CommonFunctions.convert_lat_lon_to_dd
+        :param values: Series of DDMM.MM / DDDMM.MM strings
+        :param type: Latitude or Longitude
+        :param hemispheres: Series of the NSEWnsew hemisphere strings
+        :return: Series of decimal degrees, null where the value could not be parsed or is out of range
+        """
+        pos = 2 if type == "Latitude" else 3
+        limit = 90 if type == "Latitude" else 180
+
+        dd = pd.to_numeric(values.str[:pos], errors="coerce") + pd.to_numeric(values.str[pos:], errors="coerce") / 60
+        dd = dd.where(~hemispheres.str.lower().isin(["w", "s"]), -dd)
+
+        invalid = dd.notnull() & ((dd < -limit) | (dd > limit))
+        if invalid.any():
+            logging.info(f"Invalid {type} values > {values[invalid].tolist()}")
+
+        return dd.where(~invalid)
+
+    @staticmethod
+    def to_rows(parsed, measurement_stream):
+        """
+        Method to convert a parse result into OPERATION_MEASUREMENTS row tuples, in the column order of
+        MeasurementsCopyLoader.COLUMNS
+        :param parsed: DataFrame returned by parse
+        :param measurement_stream: int - measurement_stream_id
+        :return: list of tuples
+        """
+        if len(parsed) == 0:
+            return []
+
+        numeric = parsed["reading_numeric"].astype(object)
+        numeric = numeric.where(parsed["reading_numeric"].notnull(), None).tolist()
+        alpha = parsed["reading_alpha"].where(parsed["reading_alpha"].notnull(), None).tolist()
+
+        return list(zip([measurement_stream] * len(parsed), parsed["raw_string"].tolist(),
+                        parsed["date_time"].dt.to_pydatetime(), numeric, alpha, [False] * len(parsed)))
+
+
+def parse_haul(sensor_db, wheelhouse_db, haul_start, haul_end, streams, stop_event=None):
+    """
+    Function to read and parse all of the serial data of a single haul.  This is the unit of work for the parallel
+    ingest mode of LoadSensorSerialDataThread, so it is a module-level function that only opens its own SQLite
+    connections to the sensors and wheelhouse databases and does not touch the global peewee proxies.
+
+    :param sensor_db: str - path to the sensors_YYYYMMDD.db file
+    :param wheelhouse_db: str - path to the trawl_wheelhouse.db file
+    :param haul_start: str - ISO-8601 start of the haul window
+    :param haul_end: str - ISO-8601 end of the haul window
+    :param streams: list of (measurement_stream_id, parsing rule dict, high-water mark raw string id) tuples
+    :param stop_event: Event shared with the loading thread, set when the loading is stopped
+    :return: dict with the string count and, per measurement_stream_id, the sentence count and row tuples, or None
+        if the loading was stopped
+    """
+    def is_stopped():
+        return stop_event is not None and stop_event.is_set()
+
+    if is_stopped():
+        return None
+
+    start = arrow.now()
+    result = {"strings": 0, "sentences": dict(), "rows": dict(), "elapsed": 0}
+
+    conn = sqlite3.connect(wheelhouse_db)
+    try:
+        deployed_equipment = dict(conn.execute("SELECT DEPLOYED_EQUIPMENT_ID, EQUIPMENT_ID "
+                                               "FROM DEPLOYED_EQUIPMENT").fetchall())
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(sensor_db)
+    try:
+        # Match the haul window to the time zone of the stored strings, as they are compared as text
+        sample = conn.execute("SELECT DATE_TIME FROM ENVIRO_NET_RAW_STRINGS LIMIT 1").fetchone()
+        if sample is None:
+            return result
+        sample_tz = arrow.get(sample[0]).tzinfo
+        haul_start = arrow.get(haul_start).to(sample_tz).isoformat()
+        haul_end = arrow.get(haul_end).to(sample_tz).isoformat()
+
+        # Only read the strings after the lowest high-water mark when every stream has been partially loaded
+        after = [x[2] for x in streams]
+        after = min(after) if after and None not in after else 0
+        cursor = conn.execute("SELECT ENVIRO_NET_RAW_STRINGS_ID, DATE_TIME, RAW_STRINGS, DEPLOYED_EQUIPMENT_ID "
+                              "FROM ENVIRO_NET_RAW_STRINGS WHERE DATE_TIME >= ? AND DATE_TIME <= ? "
+                              "AND ENVIRO_NET_RAW_STRINGS_ID > ?",
+                              (haul_start, haul_end, after))
+        strings = [{"enviro_net_raw_strings": x[0], "date_time": x[1], "raw_strings": x[2],
+                    "deployed_equipment": x[3]} for x in cursor]
+    finally:
+        conn.close()
+
+    if is_stopped():
+        return None
+
+    result["strings"] = len(strings)
+    rules = [(measurement_stream, SimpleNamespace(**rule), mark) for measurement_stream, rule, mark in streams]
+    parser = SentenceParser(strings=strings, deployed_equipment=deployed_equipment,
+                            line_startings=[rule.line_starting for _, rule, _ in rules])
+    for measurement_stream, rule, mark in rules:
+        if is_stopped():
+            return None
+        count = parser.sentence_count(rule.line_starting, rule.equipment)
+        result["sentences"][measurement_stream] = count
+        if count > 0:
+            result["rows"][measurement_stream] = SentenceParser.to_rows(parser.parse(rule, after=mark),
+                                                                        measurement_stream)
+
+    result["elapsed"] = (arrow.now() - start).total_seconds()
+    return result
+
+
+def _is_float(value):
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class TestSentenceParser(unittest.TestCase):
+
+    class Rule:
+        def __init__(self, **kwargs):
+            defaults = {"fixed_or_delimited": "Delimited", "delimiter": ",", "equipment": 1, "is_numeric": True,
+                        "field_format": "0.0", "reading_type": None, "hemisphere_position": None,
+                        "channel": None, "channel_position": None, "reading_type_code": None,
+                        "reading_type_position": None, "quality_status": None, "quality_status_position": None,
+                        "measurement_from": None, "measurement_from_position": None,
+                        "measurement_to": None, "measurement_to_position": None}
+            defaults.update(kwargs)
+            self.__dict__.update(defaults)
+
+    def setUp(self):
+        strings = [
+            {"enviro_net_raw_strings": 1, "date_time": "2016-05-21T18:14:30.538808+00:00", "deployed_equipment": 10,
+             "raw_strings": "$GPGGA,181430,4630.1234,N,12410.5000,W,1,08,0.9,12.0,M*4F"},
+            {"enviro_net_raw_strings": 2, "date_time": "2016-05-21T18:14:31.538808+00:00", "deployed_equipment": 10,
+             "raw_strings": "$GPGGA,181431,4630.2234,N,12410.6000,W,1,08,0.9,bad,M*4F"},
+            {"enviro_net_raw_strings": 3, "date_time": "2016-05-21T18:14:31.638808+00:00", "deployed_equipment": 20,
+             "raw_strings": "$PSIMP,D1,181431,M,A,1,22,DPT,101.5*12"},
+            {"enviro_net_raw_strings": 4, "date_time": "2016-05-21T18:14:31.738808+00:00", "deployed_equipment": 20,
+             "raw_strings": "$PSIMP,D1,181431,M,A,2,22,DPT,55.5*12"},
+            {"enviro_net_raw_strings": 5, "date_time": "2016-05-21T18:14:31.838808+00:00", "deployed_equipment": None,
+             "raw_strings": "$GPGGA,181431,4630.2234,N,12410.6000,W,1,08,0.9,13.0,M*4F"},
+        ]
+        self.parser = SentenceParser(strings=strings, deployed_equipment={10: 1, 20: 2},
+                                     line_startings=["$GPGGA", "$PSIMP,D1"])
+
+    def test_numeric(self):
+        parsed = self.parser.parse(self.Rule(line_starting="$GPGGA", field_position=10))
+        self.assertEqual(parsed["raw_string"].tolist(), [1])
+        self.assertEqual(parsed["reading_numeric"].tolist(), [12.0])
+        self.assertEqual(str(parsed["date_time"].iloc[0].tz), "US/Pacific")
+
+    def test_channel(self):
+        parsed = self.parser.parse(self.Rule(line_starting="$PSIMP,D1", equipment=2, field_position=9,
+                                             channel="2", channel_position=6, reading_type_code="DPT",
+                                             reading_type_position=8, quality_status="22",
+                                             quality_status_position=7))
+        self.assertEqual(parsed["reading_numeric"].tolist(), [55.5])
+
+    def test_lat_lon(self):
+        parsed = self.parser.parse(self.Rule(line_starting="$GPGGA", field_position=5, is_numeric=False,
+                                             field_format="DDDMM.MM", reading_type="Longitude"))
+        self.assertAlmostEqual(parsed["reading_numeric"].iloc[0], -(124 + 10.5 / 60))
+        self.assertEqual(self.parser.sentence_count("$GPGGA", 1), 2)
+
+    def test_rows(self):
+        parsed = self.parser.parse(self.Rule(line_starting="$GPGGA", field_position=11, is_numeric=False,
+                                             field_format="A"))
+        rows = SentenceParser.to_rows(parsed, measurement_stream=7)
+        self.assertEqual([(x[0], x[1], x[3], x[4], x[5]) for x in rows], [(7, 1, None, "M", False),
+                                                                          (7, 2, None, "M", False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
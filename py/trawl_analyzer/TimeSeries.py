@@ -36,6 +36,9 @@ import pstats, sys
 # from scipy.signal import argrelextrema
 
 from py.trawl_analyzer.CommonFunctions import CommonFunctions
+from py.trawl_analyzer.TimeSeriesCache import TimeSeriesCache
+from py.trawl_analyzer.LevelOfDetail import MinMaxPyramid, times_to_num
+from py.trawl_analyzer import ChangePoint
 from py.trawl_analyzer.TrawlAnalyzerDB_model import OperationsFlattenedVw, \
     MeasurementStreams, OperationMeasurements, ParsingRulesVw, Events, Lookups, EquipmentLu, Comments, Operations, \
     OperationAttributes, ReportingRules, PerformanceDetails, OperationTracklines, LookupGroups, GroupMemberVw
@@ -129,8 +132,7 @@ class HaulsModel(FramListModel):
                 .order_by(OperationsFlattenedVw.tow_name) \
                 .distinct()
             items = [{"haul": "Select Haul"}] + [{"haul": x.tow_name} for x in ops]
-            for item in items:
-                self.appendItem(item)
+            self.appendItems(items)
 
         except Exception as ex:
 
@@ -742,6 +744,7 @@ class MplMap(QObject):
             self._is_drawing = True
             self.cur_rect = Rectangle((0, 0), 1, 1, color='lightblue', zorder=100, visible=True, alpha=0.7)
             gca.add_patch(self.cur_rect)
+            self.qml_item.begin_animation([self.cur_rect])
 
     def on_release(self, event):
         """
@@ -757,6 +760,8 @@ class MplMap(QObject):
 
         elif self._tool_mode == "invalidData":
 
+            self.qml_item.end_animation()
+
             if event.inaxes is None: return
 
             gca = event.inaxes
@@ -968,7 +973,7 @@ class MplMap(QObject):
                 self.cur_rect.set_width(event.xdata- self.xpress)
                 self.cur_rect.set_height(event.ydata - self.ypress)
                 self.cur_rect.set_xy((self.xpress, self.ypress))
-                self.qml_item.draw_idle()
+                self.qml_item.update_animation()
 
     def on_scroll(self, event):
         """
@@ -2186,6 +2191,7 @@ class TimeSeries(QObject):
             self.cur_rect = Rectangle((0, 0), 1, 1, color='lightblue', zorder=100, visible=True, alpha=0.7)
             gca.add_patch(self.cur_rect)
             gca.patches = sorted(gca.patches, key=lambda v: v.get_x())
+            self.qml_item.begin_animation([self.cur_rect])
 
         elif self.toolMode == "addWaypoint":
             QApplication.setOverrideCursor(QCursor(Qt.SizeHorCursor))
@@ -2214,7 +2220,7 @@ class TimeSeries(QObject):
                     else:
                         line = ax.axvline(event.xdata, linewidth=width, color=color, linestyle="dashed")
                         self._postseason_waypoints[self._active_waypoint_type].append(line)
-                self.qml_item.draw()
+                self.qml_item.begin_animation(self._postseason_waypoints[self._active_waypoint_type])
 
         elif self.toolMode == "invalidData":
 
@@ -2222,6 +2228,7 @@ class TimeSeries(QObject):
             self._is_drawing = True
             self.cur_rect = Rectangle((0, 0), 1, 1, color='lightblue', zorder=100, visible=True, alpha=0.7)
             gca.add_patch(self.cur_rect)
+            self.qml_item.begin_animation([self.cur_rect])
 
         elif self.toolMode == "shiftTimeSeries":
 
@@ -2262,9 +2269,12 @@ class TimeSeries(QObject):
 
         if self.toolMode in ["pan", "zoomVertical"]:
             self._is_pressed = False
+            self._refine_level_of_detail()
+            self.qml_item.draw_idle()
 
         elif self.toolMode == "measureTime":
             self._is_drawing = False
+            self.qml_item.end_animation()
 
             if self.cur_rect.get_x() != 0 and self.cur_rect.get_width() != 1:
                 start_time = mdates.num2date(self.cur_rect.get_x())
@@ -2280,12 +2290,15 @@ class TimeSeries(QObject):
             # self.qml_item.draw()
 
         elif self.toolMode == "addWaypoint":
+            self.qml_item.end_animation()
             self._update_event_datetime(event=self._active_waypoint_type, date_time=mdates.num2date(event.xdata))
             self._is_pressed = False
             self.activeWaypointType = None
 
         elif self.toolMode == "invalidData":
 
+            self.qml_item.end_animation()
+
             if event.inaxes is None: return
 
             gca = event.inaxes
@@ -2315,37 +2328,29 @@ class TimeSeries(QObject):
                     label = line.get_label()
                     logging.info(f"Mark as invalid from Time Series: {label}")
 
-                    xy_data = line.get_xydata()
-                    ids = line.get_gid()
-
-                    # Find the newly selected invalid points for the current time series line, within the selection rectangle
-                    invalid_pts = [(i, [mdates.num2date(pt[0]), pt[1]]) for i, pt in enumerate(xy_data)
-                                   if (x_min <= pt[0] <= x_max) and (y_min <= pt[1] <= y_max)]
-                    idx = set([x[0] for x in invalid_pts])
-
                     # Update the time series points dataframe to set these new points as invalid
                     time_series = [i for i, x in enumerate(self._time_series_data) if x["legend_name"] == label]
-                    if len(time_series) == 1:
-                        ts_idx = time_series[0]
-                        df = self._time_series_data[ts_idx]["points"]
-                        df.loc[df["id"].isin(ids.loc[idx]), "invalid"] = True
-                        self._time_series_data[ts_idx]["points"] = df
+                    if len(time_series) != 1 or self._time_series_data[time_series[0]].get("lod", None) is None:
+                        continue
+
+                    # Find the newly selected invalid points within the selection rectangle.  This uses all of the
+                    # valid points of the time series and not just those drawn at the current level of detail
+                    ts_idx = time_series[0]
+                    df_valids = self._time_series_data[ts_idx]["lod"]["df"]
+                    mask = df_valids["times"].between(x_min, x_max) & df_valids["values"].between(y_min, y_max)
+                    ids = df_valids.loc[mask, "id"].tolist()
 
-                        # Redraw the valid and invalid lines
-                        self._draw_time_series_graph(idx=ts_idx)
+                    df = self._time_series_data[ts_idx]["points"]
+                    df.loc[df["id"].isin(ids), "invalid"] = True
+                    self._time_series_data[ts_idx]["points"] = df
 
-                    # Find all of the points that don't include the invalid_pts
-                    # xy_data_clean = np.array([pt for i, pt in enumerate(xy_data) if i not in idx])
-                    # xy_data_clean = xy_data_clean.T     # Transpose to be a 2 x N array for use with set_data later
-                    # line.set_data(xy_data_clean)
+                    # Redraw the valid and invalid lines
+                    self._draw_time_series_graph(idx=ts_idx)
 
                     # Grow the invalid_ids to include all invalid_pts from all of the time series for this graph
-                    if invalid_ids:
-                        invalid_ids.extend(ids.loc[idx].tolist())
-                    else:
-                        invalid_ids = ids.loc[idx].tolist()
+                    invalid_ids.extend(ids)
 
-                    logging.info(f"Number of invalid pts: {len(invalid_pts)}")
+                    logging.info(f"Number of invalid pts: {len(ids)}")
 
                 logging.info(f"invalid_ids selected:\t{invalid_ids}")
 
@@ -2386,6 +2391,7 @@ class TimeSeries(QObject):
                     stream_id = time_series_dict["stream_id"]
                     MeasurementStreams.update(stream_offset_seconds=self._total_offset) \
                         .where(MeasurementStreams.measurement_stream == stream_id).execute()
+                    self._shift_level_of_detail(time_series_dict=time_series_dict, offset=self._total_offset)
                     time_series_dict["offset"] = self._total_offset
 
                     # Get the equipment of the active_time_series, and then find all time series that have the same equipment
@@ -2401,6 +2407,7 @@ class TimeSeries(QObject):
                             stream_id = series["stream_id"]
                             MeasurementStreams.update(stream_offset_seconds=self._total_offset) \
                                 .where(MeasurementStreams.measurement_stream == stream_id).execute()
+                            self._shift_level_of_detail(time_series_dict=series, offset=self._total_offset)
                             series["offset"] = self._total_offset
 
                         start_haul = self._waypoints.loc["Start Haul", "best_datetime"]
@@ -2487,13 +2494,13 @@ class TimeSeries(QObject):
                 self.cur_rect.set_width(event.xdata - self.xpress)
                 self.cur_rect.set_height(event.ydata - self.ypress)
                 self.cur_rect.set_xy((self.xpress, self.ypress))
-                self.qml_item.draw()
+                self.qml_item.update_animation()
 
         elif self.toolMode == "addWaypoint":
             if self._is_pressed and event.inaxes and event.xdata and event.ydata:
                 for i, ax in enumerate(self.axes):
                     self._postseason_waypoints[self._active_waypoint_type][i].set_xdata(event.xdata)
-                self.qml_item.draw()
+                self.qml_item.update_animation()
 
         elif self.toolMode == "invalidData":
 
@@ -2502,7 +2509,7 @@ class TimeSeries(QObject):
                 self.cur_rect.set_width(event.xdata- self.xpress)
                 self.cur_rect.set_height(event.ydata - self.ypress)
                 self.cur_rect.set_xy((self.xpress, self.ypress))
-                self.qml_item.draw_idle()
+                self.qml_item.update_animation()
 
         elif self.toolMode == "shiftTimeSeries":
 
@@ -2577,6 +2584,7 @@ class TimeSeries(QObject):
 
         if self.toolMode in ["pan", "shiftTimeSeries"]:
             gca.set_xlim([xdata - new_width * (1 - relx), xdata + new_width * (relx)])
+            self._refine_level_of_detail()
         elif self.toolMode == "zoomVertical":
             gca.set_ylim([ydata - new_height * (1-rely), ydata + new_height * (rely)])
 
@@ -3830,6 +3838,7 @@ class TimeSeries(QObject):
                         ax.axvline(wp["datetime"], linewidth=width, color=color)
 
                     self.axes[0].set_xlim(self.xMin, self.xMax)
+                self._refine_level_of_detail()
                 logging.info("waypoint vertical lines all drawn")
 
                 #######################################
@@ -4470,38 +4479,15 @@ class TimeSeries(QObject):
             # Set the data frame date/time field to a pandas date-time format
             points['times'] = pd.to_datetime(points['times'])
 
-            # Make a boolean mask for restricting the times to between the field doors_fully_out and 5 mins after
-            # the field net_off_bottom waypoint
-            # mask = (points['times'] >= start_time) & (points['times'] <= end_time) & (points["valid"] != True)
-            mask = (points['times'] >= start_time) & (~points["invalid"])
-
-            # Reassign to the subset dataset - now we have the working set of data with which to perform the Multiple
-            # Change Times algorithm
-            points = points.loc[mask]
-            values = points["values"].tolist()
-
-            # Pickling for testing
+            # Pickling for testing, the pickles can be replayed with python -m py.trawl_analyzer.ChangePoint
             # filename = r"C:\Users\Todd.Hay\Desktop\test.pickle"
             # points.to_pickle(filename)
             # return
 
-            y = self._calculate_bayesian_change_point_detection(points=values)
-            # results = self._calculate_multiple_change_times(points=points)
-
-            # Get the initial best Begin Tow and Net Off Bottom times
-            # maxm = argrelextrema(np.asarray(y), np.greater, order=10)
-
-            maxm = self._get_extrema(np.asarray(y), np.greater, order=10)
-
-            results = dict()
-
-            try:
-                results["Begin Tow"] = arrow.get(points["times"].iloc[maxm[0][0]]).datetime
-                results["Net Off Bottom"] = arrow.get(points["times"].iloc[maxm[0][1]]).datetime
-            except Exception as ex:
-                logging.info(f"maxm: {maxm} >>> shape: {maxm[0].shape}")
-                logging.error(f"Error getting auto-calculated waypoints: {ex}, likely that the Doors Fully Out is after the BCS signal change")
-
+            # Restrict the times to those after 2 minutes before the field doors_fully_out waypoint and find the peaks
+            # of the Bayesian change point posterior
+            results = {k: arrow.get(v).datetime for k, v in
+                       ChangePoint.auto_calculate_waypoints(points=points, start_time=start_time).items()}
 
             # Take the second point, and walk back step_back secconds in time looking for smaller values,
             # take the first smallest value.  In a good tow, this would be the first 87 value encountered
@@ -4545,68 +4531,6 @@ class TimeSeries(QObject):
         # Draw the new lines
         self.qml_item.draw_idle()
 
-    def _get_extrema(self, data, comparator, axis=0, order=1, mode='clip'):
-        """
-        Method adapted from scipy to determine the extrema of a dataset.  Used here instead of importing scipy
-        due to failing of importing scipy when using cxFreeze.  Here is the error that I'm tracking on jira, and once
-        it is resolved, I should be able to revert to using the scipy technique:
-
-        Scipy method:  scipy.signal.argrelextrema
-
-        Code copied from:  https://github.com/scipy/scipy/blob/master/scipy/signal/_peak_finding.py, _boolrelextrema method
-
-        cxFreeze jira ticket:  https://github.com/anthony-tuininga/cx_Freeze/issues/233
-
-        :return:
-        """
-
-        if((int(order) != order) or (order < 1)):
-            raise ValueError('Order must be an int >= 1')
-
-        datalen = data.shape[axis]
-        locs = np.arange(0, datalen)
-
-        results = np.ones(data.shape, dtype=bool)
-        main = data.take(locs, axis=axis, mode=mode)
-        for shift in range(1, order + 1):
-            plus = data.take(locs + shift, axis=axis, mode=mode)
-            minus = data.take(locs - shift, axis=axis, mode=mode)
-            results &= comparator(main, plus)
-            results &= comparator(main, minus)
-            if(~results.any()):
-                break
-                # return results
-
-        # return results
-
-        return np.where(results)
-
-    def _calculate_bayesian_change_point_detection(self, points):
-
-        n = len(points)
-        dbar = np.mean(points)
-        dsbar = np.mean(np.multiply(points, points))
-
-        fac = dsbar - np.square(dbar)
-
-        summ = 0
-        summup = []
-
-        for z in range(n):
-            summ += points[z]
-            summup.append(summ)
-
-        y = []
-
-        for m in range(n - 1):
-            pos = m + 1
-            mscale = 4 * (pos) * (n - pos)
-            Q = summup[m] - (summ - summup[m])
-            U = -np.square(dbar * (n - 2 * pos) + Q) / float(mscale) + fac
-            y.append(-(n / float(2) - 1) * math.log(n * U / 2) - 0.5 * math.log((pos * (n - pos))))
-
-        return y
-
     def _calculate_multiple_change_times(self, points):
         """
         Method to perform the actual Multiple Change Times Calculation, given a set of points in a pandas data frame
@@ -4632,85 +4556,15 @@ class TimeSeries(QObject):
         # Results Dictionary
         results = {"Begin Tow": None, "Net Off Bottom": None}
 
-        # Size of data set (# of rows)
-        N = len(points)
-
-        # Number of DCs (constant time values), and so number of time changes is DC-1
-        DC = 3
-
-        ############################################################################################################
-        # Multiple Change Times Algorithm - starts here
-        ############################################################################################################
-
-        # Initialize I
-        columns = [i for i in range(DC)]
-        I = pd.DataFrame(columns=columns, index=[i for i in range(N)])
-        Idx = pd.DataFrame(columns=columns, index=[i for i in range(N)])
-
-        # Find the initial means
-        for n in range(N - DC):
-            A = points["values"].iloc[n:N-DC].mean()
-            I[0][n] = np.sum(np.square(points["values"].iloc[n:N-DC] - A))
-
-            # logging.info(f"I.iloc[0][{n}]: {I.iloc[n,0]}")
-
-        # logging.info(f"I: {I}")
-        # logging.info(f"I.iloc[:20]: {I.iloc[:20]}")
-
-        N = 100
-
+        # We are assuming three DCs (constant time values), and so two change times
         start = arrow.now()
-        for k in range(DC):
-            if k < DC - 1:
-
-                # Compute for all of the intermediary stages
-                for L in range(k, N - DC + k):
-
-                    logging.info(f"k: {k}, L: {L}")
-
-                    # Load in large number to prevent minimizing value of J to occur for value of J(0:k-1)
-                    # which is not computed
-                    # J = pd.DataFrame(10000 * np.ones((k, 1)))
-                    # J = pd.DataFrame(index=[i for i in range(N-DC+k)])
-                    # J = pd.DataFrame(10000 * np.ones((L-k,1)))
-                    J = pd.DataFrame(10000 * np.ones((k, 1)))
-
-                    # Compute least squares error for all possible change times
-                    delta = None
-                    for n in range(k, L):
-                        delta = np.sum(np.square(points["values"].iloc[n:L] - points["values"].iloc[n:L].mean()))
-                        J[n] = I.iloc[n, k] + delta
-                        # logging.info(f"k: {k}, L: {L}, n: {n} >>>> delta: {delta}  >>>> mean: {points['values'].iloc[n:L].mean()}" + \
-                        #              f" >>> points size: {points['values'].iloc[n:L].shape} >>>> I.iloc[{k},{n}]: {I.iloc[n,k]}")
-                        # logging.info(f"J: {J.iloc[n]}")
-                        # logging.info(f"k: {k}, L: {L}, n: {n}, J[{n}]: {J[n]}")
-
-                    # Determine minimum of least squares error and change time that yields this minimum
-                    I[k+1][L] = J.iloc[0:L].min()
-                    if not J.empty:
-                        Idx[k+1][L] = J.iloc[0:L].idxmin()
-                    # logging.info(f"I[{k+1}][{L}]: {I[k+1][L]}")
-
-            else:
-                # Final stage computation
-                L = N-1
-                J = pd.DataFrame(10000 * np.ones((k, 1)))
-                for n in range(DC, N):
-                    delta = np.sum(np.square(points["values"].iloc[n:L] - points["values"].iloc[n:L].mean()))
-                    J[n] = I.iloc[n, k] + delta
-
-                # Determine minimum of least squares error and change time that yields this minimum
-                Imin = J.iloc[0:N].min()
-                Iminidx = J.iloc[0:N].idxmin()
-
-        # Retrieve the times when the changes occur
-
-        logging.info(f"{Imin}")
-        # logging.info(f"I: {I.iloc[:100]}")
-        # logging.info(f"Iminidx: {Iminidx}")
+        changes = ChangePoint.multiple_change_times(values=points["values"].values, segments=3)
+        if len(changes) == 2:
+            results["Begin Tow"] = arrow.get(points["times"].iloc[changes[0]]).datetime
+            results["Net Off Bottom"] = arrow.get(points["times"].iloc[changes[1] - 1]).datetime
 
         end = arrow.now()
-        logging.info(f"Elapsed time: {(end-start).total_seconds():.2f}")
+        logging.info(f"Multiple change times elapsed time: {(end-start).total_seconds():.2f}")
 
         return results
 
@@ -5089,20 +4943,24 @@ class TimeSeries(QObject):
 
         df = time_series_dict["points"]
         mask = (~df["invalid"])
-        df_valids = df.loc[mask].copy(deep=True)
-        df_invalids = df.loc[~mask].copy(deep=True)
+        df_valids = df.loc[mask].reset_index(drop=True)
+        df_invalids = df.loc[~mask].reset_index(drop=True)
 
         # Adjust the times by the current offset value.  Note that this values is in seconds
         offset = time_series_dict["offset"]
         logging.info(f"{label} offset: {offset}")
-        if offset is not None:
-            df_valids.loc[:, "times"] = df_valids.loc[:, "times"].apply(lambda x: arrow.get(x).shift(seconds=offset).datetime)
-            df_invalids.loc[:, "times"] = df_invalids.loc[:, "times"].apply(lambda x: arrow.get(x).shift(seconds=offset).datetime)
+        df_valids["times"] = times_to_num(df_valids["times"], offset=offset)
+        df_invalids["times"] = times_to_num(df_invalids["times"], offset=offset)
 
         # logging.info(f"df_invalids size: {len(df_invalids)}")
 
+        # Build the level of detail pyramid of the valid points and only draw the points visible at the current zoom
+        time_series_dict["lod"] = {"df": df_valids,
+                                   "pyramid": MinMaxPyramid(x=df_valids["times"].values, y=df_valids["values"].values)}
+        visible = df_valids.iloc[self._get_visible_indices(ax=ax, lod=time_series_dict["lod"])]
+
         # Draw the valid line
-        valid_line = ax.plot(df_valids["times"], df_valids["values"], gid=df_valids["id"],
+        valid_line = ax.plot(visible["times"], visible["values"], gid=visible["id"].reset_index(drop=True),
                     marker='o', markersize=3, linewidth=1, color=color, label=label)
 
         # Draw the invalid line, er, really just points
@@ -5118,6 +4976,54 @@ class TimeSeries(QObject):
         # Refresh the graph axes
         self.qml_item.draw_idle()
 
+    def _get_visible_indices(self, ax, lod):
+        """
+        Method to get the indices of the valid points to draw for the current x limits of the axes, drawing at most
+        a minimum and a maximum point per pixel column
+        :param ax: matplotlib axes
+        :param lod: dict - the level of detail dictionary of a time series
+        :return: numpy array of indices into lod["df"]
+        """
+        x_min, x_max = ax.get_xlim()
+        max_points = max(2 * int(ax.bbox.width), 2)
+        return lod["pyramid"].visible(x_min=x_min, x_max=x_max, max_points=max_points)
+
+    def _refine_level_of_detail(self):
+        """
+        Method to redraw the valid lines of all of the time series with the points visible at the current x limits.
+        This is called whenever the user zooms or pans the time series graphs
+        :return: None
+        """
+        for time_series_dict in self._time_series_data:
+
+            lod = time_series_dict.get("lod", None)
+            if lod is None or time_series_dict["graph_type"] not in self._to_graphs:
+                continue
+
+            axes_index = list(self._to_graphs.keys()).index(time_series_dict["graph_type"])
+            ax = self.figure.axes[axes_index]
+            lines = [x for x in ax.lines if x.get_label() == time_series_dict["legend_name"]]
+            if len(lines) == 1:
+                visible = lod["df"].iloc[self._get_visible_indices(ax=ax, lod=lod)]
+                lines[0].set_data(visible["times"].values, visible["values"].values)
+                lines[0].set_gid(visible["id"].reset_index(drop=True))
+
+    def _shift_level_of_detail(self, time_series_dict, offset):
+        """
+        Method to move the level of detail points of a time series to a new offset, keeping them in step with the
+        lines that were shifted on the graphs
+        :param time_series_dict: dict - the time series
+        :param offset: int - the new offset in seconds
+        :return: None
+        """
+        lod = time_series_dict.get("lod", None)
+        if lod is None:
+            return
+
+        delta = (offset - (time_series_dict["offset"] or 0)) / SEC_PER_DAY
+        lod["df"]["times"] = lod["df"]["times"] + delta
+        lod["pyramid"] = MinMaxPyramid(x=lod["df"]["times"].values, y=lod["df"]["values"].values)
+
     def _time_series_loaded(self, time_series_dict):
 
         """
@@ -5237,6 +5143,9 @@ class LoadTimeSeriesThread(QObject):
         """
         self._to_map = ["Latitude", "Longitude"] #, "Heading"]
 
+        # Retrieve the points of all of the streams of the haul with a single query as opposed to one query per stream
+        self._bulk_fetch = kwargs.get("bulk_fetch", True)
+
     def stop(self):
         """
         Method to interrupt the thread, stopping it from running
@@ -5244,6 +5153,67 @@ class LoadTimeSeriesThread(QObject):
         """
         self._is_running = False
 
+    @staticmethod
+    def _points_to_frame(points):
+        """
+        Method to convert (date_time, reading_numeric, is_not_valid, operation_measurement_id) tuples into the points
+        DataFrame used by the TimeSeries graphs
+        :param points: list of tuples
+        :return: DataFrame with times, values, invalid and id columns
+        """
+        df = pd.DataFrame(points, columns=["times", "values", "invalid", "id"])
+        df["times"] = pd.to_datetime(df["times"], utc=True)
+        df["values"] = df["values"].astype(float)
+        return df
+
+    def _fetch_points(self, stream_ids):
+        """
+        Method to retrieve the points of all of the given measurement streams with one query.  The rows are read
+        through a server-side cursor FETCH_SIZE rows at a time, ordered by stream and date/time, and are then
+        split into a DataFrame per stream
+        :param stream_ids: list of measurement_stream_id values
+        :return: dict - measurement_stream_id: points DataFrame
+        """
+        FETCH_SIZE = 50000
+
+        start = arrow.now()
+        query = OperationMeasurements.select(OperationMeasurements.measurement_stream,
+                                             OperationMeasurements.date_time,
+                                             OperationMeasurements.reading_numeric,
+                                             OperationMeasurements.is_not_valid,
+                                             OperationMeasurements.operation_measurement) \
+            .where(OperationMeasurements.measurement_stream << stream_ids,
+                   OperationMeasurements.reading_numeric.is_null(False)) \
+            .order_by(OperationMeasurements.measurement_stream.asc(), OperationMeasurements.date_time.asc())
+        sql, params = query.sql()
+
+        rows = []
+        database = self._app.settings._database
+        with database.atomic():
+            cursor = database.connection().cursor(name=f"time_series_{self._haul}")
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    if not self._is_running:
+                        raise BreakIt
+                    chunk = cursor.fetchmany(FETCH_SIZE)
+                    if not chunk:
+                        break
+                    rows.extend(chunk)
+            finally:
+                cursor.close()
+
+        frames = dict()
+        if rows:
+            streams = np.array([x[0] for x in rows])
+            bounds = np.flatnonzero(np.diff(streams)) + 1
+            for lower, upper in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+                frames[int(streams[lower])] = self._points_to_frame([x[1:] for x in rows[lower:upper]])
+
+        logging.info(f"Bulk retrieved {len(rows)} points for {len(frames)} streams, "
+                     f"elapsed time: {(arrow.now()-start).total_seconds():.2f}s")
+        return frames
+
     def run(self):
         self._is_running = True
         status, msg = self._load_data()
@@ -5299,6 +5269,20 @@ class LoadTimeSeriesThread(QObject):
             # stream_ids = [x.measurement_stream for x in streams]
             # logging.info(f"stream_ids = {stream_ids}")
 
+            # Use the cached points of the streams that have not changed since they were last displayed and only
+            # query FRAM_CENTRAL for the remaining ones
+            streams = list(streams)
+            cache = TimeSeriesCache.for_streams(streams)
+            fingerprints = TimeSeriesCache.fingerprints([x.measurement_stream for x in streams])
+            frames = cache.load(self._haul, fingerprints)
+            cached_count = len(frames)
+            logging.info(f"Time Series cached streams: {cached_count} of {len(fingerprints)}")
+
+            if self._bulk_fetch:
+                missing = [x for x in fingerprints if x not in frames]
+                if missing:
+                    frames.update(self._fetch_points(missing))
+
             for stream in streams:
 
                 if not self._is_running:
@@ -5321,41 +5305,33 @@ class LoadTimeSeriesThread(QObject):
                     timeSeriesDict["legend_name"] = f"{stream.rules.reading_basis} {stream.rules.reading_type} ({stream.attachment_position})"
                     timeSeriesDict["equipment"] = stream.attachment_position
 
-                points = OperationMeasurements.select(OperationMeasurements.date_time,
-                                                      OperationMeasurements.reading_numeric,
-                                                      OperationMeasurements.is_not_valid,
-                                                      OperationMeasurements.operation_measurement) \
-                                    .where(OperationMeasurements.measurement_stream == stream.measurement_stream,
-                                           OperationMeasurements.reading_numeric.is_null(False))\
-                                    .order_by(OperationMeasurements.date_time.asc())
+                df = frames.get(stream.measurement_stream)
+                if df is None and stream.measurement_stream in fingerprints:
+                    points = OperationMeasurements.select(OperationMeasurements.date_time,
+                                                          OperationMeasurements.reading_numeric,
+                                                          OperationMeasurements.is_not_valid,
+                                                          OperationMeasurements.operation_measurement) \
+                                        .where(OperationMeasurements.measurement_stream == stream.measurement_stream,
+                                               OperationMeasurements.reading_numeric.is_null(False))\
+                                        .order_by(OperationMeasurements.date_time.asc())\
+                                        .tuples()
+                    df = self._points_to_frame(list(points))
+                    frames[stream.measurement_stream] = df
 
                 logging.info(f"\tRetrieved data: {timeSeriesDict['legend_name']} > "
                              f"basis = {timeSeriesDict['reading_basis']}, type = {timeSeriesDict['reading_type']}, "
-                             f"stream_id = {stream.measurement_stream}, {len(points)} points")
-
-                if len(points) > 0:
-                    timeSeriesDict["max_value"] = float(max([x.reading_numeric for x in points]))
-                    timeSeriesDict["min_value"] = float(min([x.reading_numeric for x in points]))
-
-                    times = [arrow.get(x.date_time).datetime for x in points]
-                    values = [float(x.reading_numeric) for x in points]
-                    valids = [x.is_not_valid for x in points]
-                    ids = [x.operation_measurement for x in points]
-                    timeSeriesDict["points"] = (pd.DataFrame({"times": times, "values": values,
-                                                              "invalid": valids, "id": ids}))
+                             f"stream_id = {stream.measurement_stream}, {0 if df is None else len(df)} points")
 
-                    # if "Vessel Latitude" in timeSeriesDict['legend_name']:
-                    #     logging.info(f"\tVessel latitude start/end date/time: {times[0]} > {times[-1]}")
-                    # if "Vessel Longitude" in timeSeriesDict['legend_name']:
-                    #     logging.info(f"\tVessel longitude start/end date/time: {times[0]} > {times[-1]}")
+                if df is not None and len(df) > 0:
+                    timeSeriesDict["max_value"] = float(df["values"].max())
+                    timeSeriesDict["min_value"] = float(df["values"].min())
+                    timeSeriesDict["points"] = df
 
-
-                    # timeSeriesDict["points"] = [[arrow.get(x.date_time).datetime, float(x.reading_numeric), x.is_not_valid, x.operation_measurement]
-                    #                             for x in points]     # WORKS WORKS WORKS
-                    # timeSeriesDict["points"] = [[QDateTime(x.date_time), float(x.reading_numeric), x.is_not_valid, x.operation_measurement]
-                    #                             for x in points]     # WORKS WORKS WORKS - QChartView
                     self.timeSeriesLoaded.emit(timeSeriesDict)
 
+            if len(frames) > cached_count:
+                cache.save(self._haul, frames, fingerprints)
+
             end = arrow.now()
             logging.info(f"Finished time series background thread, elapsed time: {(end-start).total_seconds():.2f}")
 
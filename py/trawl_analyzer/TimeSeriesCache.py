@@ -0,0 +1,250 @@
+__author__ = 'Todd.Hay'
+
+# -------------------------------------------------------------------------------
+# Name:        TimeSeriesCache.py
+# Purpose:     On-disk columnar cache of the time series points of a haul
+#
+# Author:      Todd.Hay
+# Email:       Todd.Hay@noaa.gov
+#
+# Created:     October 17, 2026
+# License:     MIT
+# -------------------------------------------------------------------------------
+"""
+The TimeSeriesCache stores the OPERATION_MEASUREMENTS points of the measurement streams of a haul as numpy arrays in
+a single uncompressed .npz file per haul, in a time_series_cache folder beside the sensors database files.  For
+each stream it keeps the datetime64 times, the float64 values, the invalid mask and the operation_measurement ids.
+
+Each cached stream carries a fingerprint of its rows in FRAM_CENTRAL - the row count, the highest
+operation_measurement_id, the number of invalid rows and a hash of their ordered ids.  The fingerprints of all of
+the streams of a haul are computed when the haul is opened, with an aggregate query plus a query of the invalid ids,
+and a cached stream is only used when its fingerprint still matches.  Reloading a stream gives it new ids and any
+validity edit changes the invalid ids hash, from this workstation or any other, so both invalidate the cached stream
+without any bookkeeping by the callers.
+"""
+import hashlib
+import io
+import logging
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+from peewee import fn, Case
+
+from py.trawl_analyzer.TrawlAnalyzerDB_model import OperationMeasurements, OperationFiles, OperationFilesMtx
+
+
+CACHE_FOLDER = "time_series_cache"
+
+
+class TimeSeriesCache:
+    """
+    Input parameters include:
+    directory: folder holding the cache files, None to disable caching
+    """
+    def __init__(self, directory=None):
+        super().__init__()
+        self._directory = directory
+
+    @classmethod
+    def for_streams(cls, streams):
+        """
+        Method to create a cache located beside the sensors database files of the given measurement streams
+        :param streams: list of MeasurementStreams
+        :return: TimeSeriesCache
+        """
+        mtx_ids = list(set(x.operation_files_mtx for x in streams if x.operation_files_mtx))
+        if not mtx_ids:
+            return cls(directory=None)
+
+        sensor_file = OperationFiles.select(OperationFiles.final_path_name)\
+            .join(OperationFilesMtx, on=(OperationFilesMtx.operation_file == OperationFiles.operation_file))\
+            .where(OperationFilesMtx.operation_files_mtx << mtx_ids,
+                   OperationFiles.final_path_name.is_null(False))\
+            .first()
+
+        if sensor_file is None or not os.path.isdir(os.path.dirname(sensor_file.final_path_name)):
+            return cls(directory=None)
+
+        return cls(directory=os.path.join(os.path.dirname(sensor_file.final_path_name), CACHE_FOLDER))
+
+    @property
+    def enabled(self):
+        return self._directory is not None
+
+    def _path(self, haul):
+        return os.path.join(self._directory, f"{haul}.npz")
+
+    @staticmethod
+    def fingerprints(stream_ids):
+        """
+        Method to compute the fingerprints of the measurement streams with a single aggregate query
+        :param stream_ids: list of measurement_stream_id values
+        :return: dict - measurement_stream_id: (row count, max operation_measurement_id, invalid row count,
+            invalid ids hash)
+        """
+        if not stream_ids:
+            return dict()
+
+        is_invalid = Case(None, [(OperationMeasurements.is_not_valid == True, 1)], 0)
+        rows = OperationMeasurements.select(OperationMeasurements.measurement_stream,
+                                            fn.COUNT(OperationMeasurements.operation_measurement),
+                                            fn.MAX(OperationMeasurements.operation_measurement),
+                                            fn.SUM(is_invalid))\
+            .where(OperationMeasurements.measurement_stream << stream_ids,
+                   OperationMeasurements.reading_numeric.is_null(False))\
+            .group_by(OperationMeasurements.measurement_stream)\
+            .tuples()
+        counts = {stream: (int(count), int(max_id), int(invalid_count or 0)) for stream, count, max_id, invalid_count
+                  in rows}
+
+        # Hash the invalid ids themselves, as any sum of them can be kept by editing the validity of several points
+        invalid_ids = {stream: [] for stream, count in counts.items() if count[2] > 0}
+        if invalid_ids:
+            rows = OperationMeasurements.select(OperationMeasurements.measurement_stream,
+                                                OperationMeasurements.operation_measurement)\
+                .where(OperationMeasurements.measurement_stream << list(invalid_ids),
+                       OperationMeasurements.reading_numeric.is_null(False),
+                       OperationMeasurements.is_not_valid == True)\
+                .order_by(OperationMeasurements.measurement_stream, OperationMeasurements.operation_measurement)\
+                .tuples()
+            for stream, measurement_id in rows:
+                invalid_ids[stream].append(str(measurement_id))
+
+        return {stream: count + (TimeSeriesCache._hash_ids(invalid_ids.get(stream, [])), )
+                for stream, count in counts.items()}
+
+    @staticmethod
+    def _hash_ids(ids):
+        """
+        Method to hash a list of ids into an int64, so it can be stored with the rest of a fingerprint
+        :param ids: list of str ids, in order
+        :return: int
+        """
+        if not ids:
+            return 0
+        return int.from_bytes(hashlib.sha1(",".join(ids).encode("ascii")).digest()[:8], "little", signed=True)
+
+    def load(self, haul, fingerprints):
+        """
+        Method to return the cached points of the streams whose fingerprints still match
+        :param haul: str - haul number
+        :param fingerprints: dict returned by fingerprints
+        :return: dict - measurement_stream_id: points DataFrame with times, values, invalid and id columns
+        """
+        if not self.enabled or not os.path.exists(self._path(haul)):
+            return dict()
+
+        frames = dict()
+        try:
+            with np.load(self._path(haul)) as data:
+                cached = dict(zip(data["streams"].tolist(), [tuple(x) for x in data["fingerprints"].tolist()]))
+                for stream, fingerprint in fingerprints.items():
+                    if cached.get(stream) != fingerprint:
+                        continue
+                    frames[stream] = pd.DataFrame({"times": pd.to_datetime(data[f"times_{stream}"]).tz_localize("UTC"),
+                                                   "values": data[f"values_{stream}"],
+                                                   "invalid": data[f"invalid_{stream}"],
+                                                   "id": data[f"id_{stream}"]},
+                                                  columns=["times", "values", "invalid", "id"])
+        except Exception as ex:
+            logging.info(f"Error reading the time series cache for haul {haul}, ignoring it: {ex}")
+            return dict()
+
+        return frames
+
+    def save(self, haul, frames, fingerprints):
+        """
+        Method to write the points of all of the streams of the haul to the cache
+        :param haul: str - haul number
+        :param frames: dict - measurement_stream_id: points DataFrame
+        :param fingerprints: dict returned by fingerprints
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        streams = [x for x in frames if x in fingerprints]
+        arrays = {"streams": np.array(streams, dtype=np.int64),
+                  "fingerprints": np.array([fingerprints[x] for x in streams], dtype=np.int64).reshape(-1, 4)}
+        for stream in streams:
+            df = frames[stream]
+            times = pd.to_datetime(df["times"], utc=True)
+            arrays[f"times_{stream}"] = times.dt.tz_convert("UTC").dt.tz_localize(None).values.astype("datetime64[us]")
+            arrays[f"values_{stream}"] = df["values"].values.astype(np.float64)
+            arrays[f"invalid_{stream}"] = df["invalid"].fillna(False).values.astype(bool)
+            arrays[f"id_{stream}"] = df["id"].values.astype(np.int64)
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            temp_path = self._path(haul) + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(temp_path, self._path(haul))
+        except Exception as ex:
+            logging.info(f"Error writing the time series cache for haul {haul}: {ex}")
+
+    def invalidate(self, haul):
+        """
+        Method to remove the cache file of a haul
+        :param haul: str - haul number
+        :return: None
+        """
+        if self.enabled and os.path.exists(self._path(haul)):
+            try:
+                os.remove(self._path(haul))
+            except OSError as ex:
+                logging.info(f"Error removing the time series cache for haul {haul}: {ex}")
+
+
+class TestTimeSeriesCache(unittest.TestCase):
+
+    def test_round_trip(self):
+        import tempfile
+
+        times = pd.to_datetime(["2016-05-21T18:14:30.538808+00:00", "2016-05-21T18:14:31.538808+00:00"], utc=True)
+        df = pd.DataFrame({"times": times, "values": [1.5, 2.5], "invalid": [False, True], "id": [10, 11]},
+                          columns=["times", "values", "invalid", "id"])
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TimeSeriesCache(directory=directory)
+            cache.save("201603008001", {5: df}, {5: (2, 11, 1, 7)})
+
+            frames = cache.load("201603008001", {5: (2, 11, 1, 7)})
+            pd.testing.assert_frame_equal(frames[5], df, check_dtype=False)
+
+            self.assertEqual(cache.load("201603008001", {5: (2, 11, 0, 0)}), dict())
+
+            cache.invalidate("201603008001")
+            self.assertEqual(cache.load("201603008001", {5: (2, 11, 1, 7)}), dict())
+
+    def test_fingerprints_validity_edits(self):
+        from peewee import SqliteDatabase
+        from py.trawl_analyzer.Settings import database_proxy
+
+        db = SqliteDatabase(":memory:")
+        db.execute_sql("ATTACH DATABASE ':memory:' AS fram_central")
+        database_proxy.initialize(db)
+        # SQLite does not take schema qualified foreign keys, so the table is created without them
+        db.execute_sql("CREATE TABLE fram_central.operation_measurements ("
+                       "operation_measurement_id INTEGER PRIMARY KEY, measurement_stream_id INTEGER, "
+                       "reading_numeric REAL, is_not_valid INTEGER)")
+        OperationMeasurements.insert_many([{"operation_measurement": i, "measurement_stream": 5, "reading_numeric": i,
+                                            "is_not_valid": False} for i in range(1, 21)]).execute()
+
+        def set_invalid(ids):
+            OperationMeasurements.update(is_not_valid=OperationMeasurements.operation_measurement.in_(ids)).execute()
+            return TimeSeriesCache.fingerprints([5])[5]
+
+        # Edits keeping the same invalid id sum, count and sum of squares are all told apart
+        fingerprints = [set_invalid(ids) for ids in ([], [11], [5, 6], [1, 4], [2, 3], [1, 5, 6], [2, 3, 7])]
+        self.assertEqual(len(fingerprints), len(set(fingerprints)))
+        self.assertEqual((20, 20, 0, 0), fingerprints[0])
+        self.assertEqual(fingerprints[3], set_invalid([1, 4]))
+        db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
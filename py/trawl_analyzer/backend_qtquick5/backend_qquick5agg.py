@@ -83,6 +83,10 @@ class FigureCanvasQtQuickAgg(QtQuick.QQuickPaintedItem, FigureCanvasAgg):
 
         self._drawRect = None
         self.blitbox = None
+
+        # Animated artists layer, i.e. artists redrawn by blitting over a cached background of the static figure
+        self._animated_artists = []
+        self._background = None
         
         # Activate hover events and mouse press events
         self.setAcceptHoverEvents(True)
@@ -211,7 +215,48 @@ class FigureCanvasQtQuickAgg(QtQuick.QQuickPaintedItem, FigureCanvasAgg):
         self.blitbox = bbox
         l, b, w, h = bbox.bounds
         t = b + h
-        self.repaint(l, self.renderer.height-t, w, h)       
+        # QQuickPaintedItem does not have a repaint method, so request an update of just the blitted area instead
+        self.update(QtCore.QRect(int(l), int(self.renderer.height-t), int(w), int(h)))
+
+    def begin_animation(self, artists):
+        """
+        Start redrawing the given artists by blitting.  The figure is drawn once without them and that background
+        is cached, so moving the artists only requires restoring the background and drawing the artists themselves
+        :param artists: list of matplotlib artists that will be moving, e.g. axvlines or a Rectangle patch
+        """
+        self.end_animation(redraw=False)
+        self._animated_artists = [x for x in artists if x is not None]
+        for artist in self._animated_artists:
+            artist.set_animated(True)
+        self._background = None
+        self.update_animation()
+
+    def update_animation(self):
+        """
+        Redraw the animated artists on top of the cached background and blit the result
+        """
+        if not self._animated_artists:
+            return
+        if self._background is None:
+            FigureCanvasAgg.draw(self)
+            self._background = self.copy_from_bbox(self.figure.bbox)
+        else:
+            self.restore_region(self._background)
+        for artist in self._animated_artists:
+            self.figure.draw_artist(artist)
+        self.blit(self.figure.bbox)
+
+    def end_animation(self, redraw=True):
+        """
+        Stop blitting the animated artists and return them to the normal, fully drawn, figure
+        :param redraw: bool - True to queue a full redraw of the figure
+        """
+        for artist in self._animated_artists:
+            artist.set_animated(False)
+        self._animated_artists = []
+        self._background = None
+        if redraw:
+            self.draw_idle()
 
     def geometryChanged(self, new_geometry, old_geometry):
         w = new_geometry.width()
@@ -223,6 +268,7 @@ class FigureCanvasQtQuickAgg(QtQuick.QQuickPaintedItem, FigureCanvasAgg):
         if DEBUG:
             print('resize (%d x %d)' % (w, h))
             print("FigureCanvasQtQuickAgg.geometryChanged(%d, %d)" % (w, h))
+        self._background = None
         dpival = self.figure.dpi
         winch = w / dpival
         hinch = h / dpival
@@ -301,6 +301,15 @@ Item {
 //                settings.isLoading = true;
 //            }
         } // btnLoadCatch
+        CheckBox {
+            id: cbParallelLoading
+            text: qsTr("Parallel Loading")
+            checked: dataCompleteness.parallelLoading
+            enabled: !settings.isLoading
+            onClicked: {
+                dataCompleteness.parallelLoading = checked;
+            }
+        } // cbParallelLoading
         Item { Layout.fillWidth: true }
         Button {
             id: btnStopProcessing
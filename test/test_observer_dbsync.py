@@ -1,14 +1,20 @@
 import base64
 import logging
 import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
 
 import arrow
 from playhouse.apsw_ext import APSWDatabase
 from playhouse.test_utils import test_database
 
-from py.observer.ObserverDBModels import FishingActivities, Trips
+from py.observer.ObserverDBModels import FishingActivities, Trips, DbSync, Settings, FishingLocations, Catches, \
+    SpeciesCompositions, SpeciesCompositionItems, SpeciesCompositionBaskets, CatchAdditionalBaskets, BioSpecimens, \
+    BioSpecimenItems, Dissections, TripCertificates, FishTickets, Users
 from py.observer.ObserverDBSyncController import ObserverDBSyncController
+from py.observer.ObserverDBUtil import ObserverDBUtil
 from py.observer.ObserverSOAP import ObserverSoap
+from py.observer.SyncDBWorker import SyncDBWorker
 
 
 class TestObserverDBSync(unittest.TestCase):
@@ -172,3 +178,222 @@ class TestObserverDBSync(unittest.TestCase):
         self.assertIn('TRIPS#', tripfilename)
         self.assertIn('"TRIP_ID","VESSEL_ID","USER_ID"', trips)
         self.assertNotIn(',""', trips)
+
+
+class TestObserverDBSyncExport(unittest.TestCase):
+    """
+    Time CSV generation for a large synthetic trip in a temporary in-memory DB
+    """
+    test_db = APSWDatabase(':memory:')
+    test_models = [Trips, DbSync, Settings, FishingActivities, FishingLocations, Catches, SpeciesCompositions,
+                   SpeciesCompositionItems, SpeciesCompositionBaskets, CatchAdditionalBaskets, BioSpecimens,
+                   BioSpecimenItems, Dissections, TripCertificates, FishTickets]
+
+    n_hauls = 150
+    n_catches = 8  # per haul
+    n_species = 4  # per species comp
+    n_baskets = 2  # per species comp item
+    n_specimens = 3  # per bio specimen
+
+    def setUp(self):
+        logging.basicConfig(level=logging.INFO)
+        self.test_trip_id = 1
+        self.test_user_id = 2027
+
+    @staticmethod
+    def _insert_rows(model, rows):
+        for i in range(0, len(rows), 50):  # stay below the SQLite variable limit
+            model.insert_many(rows[i:i + 50]).execute()
+
+    def create_test_trip(self):
+        # Only call this within a with test_database block
+        # Uses bogus values for required fields - would fail trip checks at Center.
+        created_date = '01/24/2017 12:45'
+        Trips.create(trip=self.test_trip_id, partial_trip='F', program=1, trip_status='FALSE', user=1, vessel=1)
+        Trips.create(trip=self.test_trip_id + 1, partial_trip='F', program=1, trip_status='FALSE', user=1, vessel=1)
+        hauls, locations, catches, comps, items, baskets, specimens, specimen_items, dissections = \
+            [], [], [], [], [], [], [], [], []
+        for haul in range(1, self.n_hauls + 1):
+            # Every tenth haul belongs to another trip and must not be exported
+            trip = self.test_trip_id + 1 if haul % 10 == 0 else self.test_trip_id
+            hauls.append({'fishing_activity': haul, 'fishing_activity_num': haul, 'data_quality': '5',
+                          'trip': trip, 'brd_present': 'TRUE', 'created_date': created_date})
+            for position in (-1, 0):
+                locations.append({'fishing_activity': haul, 'location_date': created_date, 'depth': 100,
+                                  'depth_um': 'FM', 'latitude': 45.0, 'longitude': -124.0, 'position': position})
+            for catch_num in range(1, self.n_catches + 1):
+                catch = len(catches) + 1
+                catches.append({'catch': catch, 'fishing_activity': haul, 'catch_category': catch_num,
+                                'catch_disposition': 'D', 'catch_num': catch_num, 'catch_weight': 12.5,
+                                'created_date': created_date})
+                comps.append({'species_composition': catch, 'catch': catch, 'data_quality': '5',
+                              'sample_method': '1', 'created_date': created_date})
+                for species in range(1, self.n_species + 1):
+                    item = len(items) + 1
+                    items.append({'species_comp_item': item, 'species_composition': catch, 'species': species,
+                                  'species_weight': 2.5, 'created_date': created_date})
+                    for _ in range(self.n_baskets):
+                        baskets.append({'species_comp_item': item, 'basket_weight_itq': 1.25, 'fish_number_itq': 3,
+                                        'created_date': created_date})
+                specimens.append({'bio_specimen': catch, 'catch': catch, 'sample_method': '7', 'species': 1,
+                                  'created_date': created_date})
+                for _ in range(self.n_specimens):
+                    specimen_item = len(specimen_items) + 1
+                    specimen_items.append({'bio_specimen_item': specimen_item, 'bio_specimen': catch,
+                                           'specimen_length': 45, 'specimen_length_um': 'CM',
+                                           'created_date': created_date})
+                    dissections.append({'bio_specimen_item': specimen_item, 'dissection_type': '1',
+                                        'dissection_barcode': 100000 + specimen_item, 'created_date': created_date})
+
+        with self.test_db.atomic():
+            for model, rows in ((FishingActivities, hauls), (FishingLocations, locations), (Catches, catches),
+                                (SpeciesCompositions, comps), (SpeciesCompositionItems, items),
+                                (SpeciesCompositionBaskets, baskets), (BioSpecimens, specimens),
+                                (BioSpecimenItems, specimen_items), (Dissections, dissections)):
+                self._insert_rows(model, rows)
+
+    def test_large_trip_csv_timing(self):
+        with test_database(self.test_db, self.test_models):
+            dbsync = ObserverDBSyncController()
+            self.create_test_trip()
+
+            trip_hauls = self.n_hauls - self.n_hauls // 10
+            trip_catches = trip_hauls * self.n_catches
+            expected_rows = [
+                (dbsync.generate_trips_csv, 1),
+                (dbsync.generate_fishing_activities_csv, trip_hauls),
+                (dbsync.generate_fishing_locations_csv, trip_hauls * 2),
+                (dbsync.generate_catches_csv, trip_catches),
+                (dbsync.generate_speciescomp_csv, trip_catches),
+                (dbsync.generate_speciescomp_items_csv, trip_catches * self.n_species),
+                (dbsync.generate_speciescomp_baskets_csv, trip_catches * self.n_species * self.n_baskets),
+                (dbsync.generate_bio_specimens_csv, trip_catches),
+                (dbsync.generate_bio_specimen_items_csv, trip_catches * self.n_specimens),
+                (dbsync.generate_dissections_csv, trip_catches * self.n_specimens),
+            ]
+
+            total_time = 0.0
+            for generate_csv, n_rows in expected_rows:
+                start = arrow.now()
+                with patch.object(self.test_db, 'execute_sql', wraps=self.test_db.execute_sql) as counter:
+                    filename, csv_data = generate_csv(self.test_trip_id, user_id=self.test_user_id)
+                elapsed = (arrow.now() - start).total_seconds()
+                total_time += elapsed
+                logging.info(f'{filename.split("#")[0]}: {n_rows} rows, {counter.call_count} queries, {elapsed:.3f}s')
+
+                self.assertEqual(n_rows + 1, len(csv_data.splitlines()))
+                self.assertNotIn(',""', csv_data)
+                self.assertNotIn('py.observer', csv_data, "Class -> str conversion is bad")
+                # One SELECT per table, plus the MIX species comp item counts, however large the trip
+                self.assertLessEqual(counter.call_count, 3)
+
+            logging.info(f'Generated CSVs for a trip of {trip_catches} catches in {total_time:.3f}s')
+
+            # Foreign keys are exported as IDs, and only the trip's rows are exported
+            _, catches = dbsync.generate_catches_csv(self.test_trip_id, user_id=self.test_user_id)
+            self.assertTrue(catches.splitlines()[1].startswith('1,1,1,12.5,'))
+            self.assertNotIn('\n73,10,', catches)
+
+            # Trips without data have no CSV
+            _, tickets = dbsync.generate_fish_tickets_csv(self.test_trip_id, user_id=self.test_user_id)
+            self.assertIsNone(tickets)
+
+
+class StandInSyncService:
+    """
+    Stands in for the zeep client service of the OPTECS sync web service: records uploaded tables,
+    optionally failing the upload of one table.
+    """
+    def __init__(self, fail_table=None, online_trip_id=30135):
+        self.fail_table = fail_table
+        self.online_trip_id = online_trip_id
+        self.uploaded_tables = []
+
+    def uploadClientData1(self, userName, password, fileName, data, version, var1, var2, var3, var4):
+        table = fileName.split('#')[0]
+        if table == self.fail_table:
+            raise ConnectionError(f'Connection reset uploading {table}')
+        self.uploaded_tables.append(table)
+        n_rows = len(data.splitlines()) - 1
+        if table == 'TRIPS':
+            return f'<br>SUCCESS:  Parsed {n_rows} TRIPS row.<div style="font-size:2em;color:#990000">' \
+                   f'Your Online Trip ID is <b>{self.online_trip_id}</b> </div>.'
+        return f'<br>SUCCESS:  Parsed {n_rows} {table} rows.'
+
+
+class TestSyncDBWorkerUpload(unittest.TestCase):
+    """
+    Upload a synthetic trip through SyncDBWorker to a stand-in sync service, in a temporary in-memory DB
+    """
+    test_db = APSWDatabase(':memory:')
+    test_models = TestObserverDBSyncExport.test_models + [Users]
+
+    n_hauls = 10
+    n_catches = 2
+    n_species = 2
+    n_baskets = 1
+    n_specimens = 1
+
+    create_test_trip = TestObserverDBSyncExport.create_test_trip
+    _insert_rows = staticmethod(TestObserverDBSyncExport._insert_rows)
+
+    def setUp(self):
+        logging.basicConfig(level=logging.INFO)
+        self.test_trip_id = 1
+
+    def _upload_trip(self, service):
+        with patch('py.observer.ObserverSOAP.zeep.Client', return_value=SimpleNamespace(service=service)), \
+                patch.object(ObserverSoap, '_get_dbsync_pw', return_value='test'), \
+                patch.object(ObserverSoap, 'get_oracle_salt', return_value='test'):
+            dbsync = ObserverDBSyncController()
+            dbsync._initialize_soap_obj()
+            dbsync.currentSOAPUsername = 'TestUser'
+            dbsync.currentSOAPPassword = 'test'
+            worker = SyncDBWorker(trip_ids=[self.test_trip_id], upload_trips=True, sync_controller=dbsync,
+                                  soap=dbsync._soap)
+            worker._logger = logging.getLogger(__name__)
+            return worker.upload_trip(self.test_trip_id)
+
+    def test_failed_upload_resumes(self):
+        with test_database(self.test_db, self.test_models):
+            Users.create(first_name='Test', last_name='User', password='test', status='1')
+            self.create_test_trip()
+            child_tables = ['FISHING_ACTIVITIES', 'FISHING_LOCATIONS', 'CATCHES', 'SPECIES_COMPOSITIONS',
+                            'SPECIES_COMPOSITION_ITEMS', 'SPECIES_COMPOSITION_BASKETS', 'BIO_SPECIMENS',
+                            'BIO_SPECIMEN_ITEMS', 'DISSECTIONS']  # Uploaded files of tables with data, in order
+
+            # Connection drops at CATCHES: tables before it are uploaded and recorded, no table after it is sent
+            service = StandInSyncService(fail_table='CATCHES')
+            with self.assertRaisesRegex(Exception, 'Error syncing CATCHES'):
+                self._upload_trip(service)
+            self.assertEqual(child_tables[:2], service.uploaded_tables)
+            progress = ObserverDBUtil.db_load_setting_as_json(SyncDBWorker.UPLOAD_PROGRESS_SETTING)
+            self.assertIn('FISHING_LOCATIONS', progress[str(self.test_trip_id)])
+            self.assertNotIn('CATCHES', progress[str(self.test_trip_id)])
+            self.assertIsNone(Trips.get(Trips.trip == self.test_trip_id).external_trip)
+
+            # Retry resumes at CATCHES, and TRIPS goes last
+            service = StandInSyncService()
+            self.assertEqual(30135, self._upload_trip(service))
+            self.assertEqual(child_tables[2:] + ['TRIPS'], service.uploaded_tables)
+            self.assertEqual(30135, Trips.get(Trips.trip == self.test_trip_id).external_trip)
+            self.assertEqual({}, ObserverDBUtil.db_load_setting_as_json(SyncDBWorker.UPLOAD_PROGRESS_SETTING))
+
+            # Once complete, a new upload of the trip sends every table again
+            service = StandInSyncService(online_trip_id=30136)
+            self.assertEqual(30136, self._upload_trip(service))
+            self.assertEqual(child_tables + ['TRIPS'], service.uploaded_tables)
+
+    def test_changed_table_is_uploaded_again(self):
+        with test_database(self.test_db, self.test_models):
+            Users.create(first_name='Test', last_name='User', password='test', status='1')
+            self.create_test_trip()
+
+            with self.assertRaises(Exception):
+                self._upload_trip(StandInSyncService(fail_table='TRIPS'))
+
+            # A haul edited since the failed upload: FISHING_ACTIVITIES is sent again, unchanged tables are not
+            FishingActivities.update(brd_present='FALSE').where(FishingActivities.fishing_activity == 1).execute()
+            service = StandInSyncService()
+            self._upload_trip(service)
+            self.assertEqual(['FISHING_ACTIVITIES', 'TRIPS'], service.uploaded_tables)